@@ -0,0 +1,132 @@
+"""Бенчмарк генерации кода для вложенных управляющих конструкций.
+
+Строит типизированное AST метода, в котором условные операторы и циклы
+вложены друг в друга на глубину --depth (на каждом уровне --width
+присваиваний, условия с and then и or else), и замеряет время
+generate_bytecode_for_method вместе с assemble. Время на одну команду
+JVM не должно расти с глубиной вложенности: смещения переходов
+вычисляются одной раскладкой меток (см. serpent/codegen/assembler.py),
+а не пересчетом размеров вложенных участков кода.
+
+С --width побольше код метода выходит за 32 КБ, и дальние переходы
+становятся goto_w - их число печатается в столбце wide.
+
+Запуск:
+    python benchmarks/bench_branches.py --depths 16 32 64 128
+    python benchmarks/bench_branches.py --depths 8 --width 600
+"""
+import argparse
+import sys
+import time
+
+from serpent.codegen.assembler import assemble
+from serpent.codegen.bytecommand import GotoW
+from serpent.codegen.constpool import ConstPool
+from serpent.codegen.genbytecode import LocalTable, generate_bytecode_for_method
+from serpent.codegen.layout import JvmLayout
+from serpent.semantic_checker.symtab import Type
+from serpent.semantic_checker.type_check import (
+    TAssignment,
+    TBinaryOp,
+    TFeatureCall,
+    TIfStmt,
+    TIntegerConst,
+    TLoopStmt,
+    TStatement,
+    TUserDefinedMethod,
+    TVariable)
+
+
+INTEGER = Type("INTEGER")
+BOOLEAN = Type("BOOLEAN")
+CLASS_NAME = "com/eiffel/APPLICATION"
+
+
+def integer(value: int) -> TIntegerConst:
+    return TIntegerConst(INTEGER, value)
+
+
+def call(name: str, target: TVariable, argument: int) -> TFeatureCall:
+    return TFeatureCall(
+        BOOLEAN if name.startswith("INTEGER_is") else INTEGER, name, [integer(argument)], target)
+
+
+def increment(variable: TVariable, value: int) -> TAssignment:
+    return TAssignment(variable, call("INTEGER_plus", variable, value))
+
+
+def nested_statements(depth: int, width: int) -> list[TStatement]:
+    """Присваивания уровня и вложенный условный оператор или цикл"""
+    x = TVariable(INTEGER, "local_x")
+    statements: list[TStatement] = [increment(x, k) for k in range(width)]
+    if depth == 0:
+        return statements
+
+    inner = nested_statements(depth - 1, width)
+    if depth % 2:
+        condition = TBinaryOp(
+            BOOLEAN, "and then",
+            call("INTEGER_is_greater", x, depth), call("INTEGER_is_less", x, 1000 * depth))
+        statements.append(TIfStmt(
+            condition=condition,
+            then_branch=inner,
+            else_branch=[TAssignment(x, call("INTEGER_minus", x, 1))],
+            elseif_branches=[(call("INTEGER_is_less", x, depth), [increment(x, 1)])]))
+    else:
+        i = TVariable(INTEGER, f"local_i{depth}")
+        until = TBinaryOp(
+            BOOLEAN, "or else",
+            call("INTEGER_is_greater_equal", i, 3), call("INTEGER_is_greater", x, 10 ** 6))
+        statements.append(TLoopStmt(
+            init_stmts=[TAssignment(i, integer(0))],
+            until_cond=until,
+            body=[*inner, increment(i, 1)]))
+    return statements
+
+
+def make_method(depth: int, width: int) -> TUserDefinedMethod:
+    variables = [("local_x", INTEGER)] + [
+        (f"local_i{d}", INTEGER) for d in range(2, depth + 1, 2)]
+    return TUserDefinedMethod(
+        method_name="APPLICATION_nested",
+        parameters=[],
+        return_type=Type("<VOID>"),
+        is_constructor=False,
+        variables=variables,
+        body=nested_statements(depth, width))
+
+
+def measure(method: TUserDefinedMethod, repeat: int) -> tuple[float, list]:
+    best = float("inf")
+    for _ in range(repeat):
+        pool = ConstPool(CLASS_NAME)
+        start = time.perf_counter()
+        bytecode = assemble(
+            generate_bytecode_for_method(method, CLASS_NAME, pool, LocalTable(), JvmLayout()))
+        best = min(best, time.perf_counter() - start)
+    return best, bytecode
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Nested control flow code generation benchmark")
+    parser.add_argument("--depths", type=int, nargs="+", default=[16, 32, 64, 128],
+                        help="Nesting depths to measure.")
+    parser.add_argument("--width", type=int, default=4,
+                        help="Assignments on every nesting level.")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    # Генератор кода рекурсивен по вложенности операторов
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 100 * max(args.depths)))
+
+    print(f"{'depth':>6} {'commands':>9} {'bytes':>8} {'wide':>5} {'time':>9} {'us/command':>11}")
+    for depth in args.depths:
+        seconds, bytecode = measure(make_method(depth, args.width), args.repeat)
+        size = sum(command.size() for command in bytecode)
+        wide = sum(type(command) is GotoW for command in bytecode)
+        print(f"{depth:>6} {len(bytecode):>9} {size:>8} {wide:>5} {seconds * 1e3:>7.1f}ms"
+              f" {seconds * 1e6 / len(bytecode):>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""Бенчмарк пропускной способности компилятора.
+
+Генерирует синтетическую систему на Eiffel (см. eiffel_generator.py)
+и несколько раз собирает ее через build_class_files с нуля, замеряя
+каждую фазу компилятора (фазы размечены в serpent.timings). Для каждой
+фазы берется минимальное время по всем повторам.
+
+Результат можно записать в JSON (--output) и сравнить с сохраненным
+базовым результатом (--baseline): если какая-либо фаза стала медленнее
+базовой более чем на --threshold (доля от базового времени) и при этом
+более чем на --min-delta секунд, бенчмарк завершается с кодом 1.
+С кодом 1 он завершается и тогда, когда набор фаз отличается от базового
+(фазу добавили, переименовали или удалили): базовый результат нужно
+перезаписать через --save-baseline в том же изменении.
+Сравнивать можно только результаты для одной и той же формы системы,
+одного и того же числа процессов (--jobs) и уровня оптимизации (-O).
+По умолчанию система собирается с -O2, чтобы замерялась и фаза peephole.
+
+Запуск:
+    python benchmarks/bench_compiler.py --classes 200 --output result.json
+    python benchmarks/bench_compiler.py --save-baseline
+    python benchmarks/bench_compiler.py --baseline benchmarks/baseline.json
+"""
+from __future__ import annotations
+from dataclasses import asdict
+from pathlib import Path
+import argparse
+import json
+import platform
+import sys
+import tempfile
+
+from serpent.build import build_class_files, user_cache_dir
+from serpent.codegen.peephole import OPTIMIZATION_LEVELS
+from serpent.errors import ErrorCollector
+from serpent.resources import get_resource_path
+from serpent.stdlib_cache import STDLIB_CACHE_NAME
+from serpent.timings import Tracer, tracing
+
+from eiffel_generator import (
+    ProjectShape,
+    add_shape_arguments,
+    shape_from_args,
+    write_project)
+
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def build_once(source_dir: Path, build_dir: Path, jobs: int, optimization_level: int) -> Tracer:
+    """Собирает систему из source_dir с нуля и возвращает замеры фаз"""
+    stdlib = get_resource_path("stdlib")
+    rtl = get_resource_path("rtl")
+    resources_build_dir = get_resource_path("build")
+    error_collector = ErrorCollector()
+
+    tracer = Tracer()
+    with tracing(tracer), tracer.span("build"):
+        build_class_files(
+            eiffel_source_dirs=[stdlib, source_dir],
+            java_source_dirs=[rtl],
+            parser_path=resources_build_dir / "eiffelp",
+            error_collector=error_collector,
+            java_version=11,
+            build_dir=build_dir,
+            main_class_name="APPLICATION",
+            main_routine_name="make",
+            eiffel_package="com.eiffel",
+            verbose=False,
+            jobs=jobs,
+            incremental=False,
+            stdlib_dir=stdlib,
+            stdlib_cache_path=resources_build_dir / STDLIB_CACHE_NAME,
+            rtl_dir=rtl,
+            java_cache_dir=user_cache_dir(),
+            optimization_level=optimization_level)
+
+    if not error_collector.ok():
+        error_collector.show()
+        raise SystemExit("benchmark project failed to compile")
+    return tracer
+
+
+def stage_times(tracer: Tracer) -> dict[str, float]:
+    """Суммарное время каждой фазы в секундах, фазы идут в порядке начала"""
+    times: dict[str, float] = {}
+    for span in sorted(tracer.spans, key=lambda s: (s.start_us, -s.duration_us)):
+        times[span.name] = times.get(span.name, 0.0) + span.duration_us / 1e6
+    return times
+
+
+def run_benchmark(shape: ProjectShape, repeat: int, jobs: int, optimization_level: int) -> dict:
+    with tempfile.TemporaryDirectory(prefix="serpent-bench-") as tmp:
+        source_dir = Path(tmp) / "src"
+        files = write_project(shape, source_dir)
+
+        stages: dict[str, float] = {}
+        peak_memory = 0
+        for i in range(repeat):
+            tracer = build_once(source_dir, Path(tmp) / f"classes{i}", jobs, optimization_level)
+            for name, seconds in stage_times(tracer).items():
+                stages[name] = min(stages.get(name, seconds), seconds)
+            peak_memory = max(
+                [peak_memory] + [s.peak_memory or 0 for s in tracer.spans])
+
+    return {
+        "shape": asdict(shape),
+        "files": len(files),
+        "repeat": repeat,
+        "jobs": jobs,
+        "optimization_level": optimization_level,
+        "python": platform.python_version(),
+        "peak_memory_mb": round(peak_memory / 2**20, 1),
+        "stages": {name: round(seconds, 6) for name, seconds in stages.items()},
+    }
+
+
+def find_regressions(
+        result: dict,
+        baseline: dict,
+        threshold: float,
+        min_delta: float) -> list[str]:
+    """Возвращает описания фаз, ставших медленнее базовых"""
+    regressions = []
+    for name, base in baseline["stages"].items():
+        current = result["stages"].get(name)
+        if current is not None and current > base * (1 + threshold) and current - base > min_delta:
+            regressions.append(
+                f"{name}: {base:.3f}s -> {current:.3f}s (+{100 * (current / base - 1):.0f}%)")
+    return regressions
+
+
+def find_stage_mismatches(result: dict, baseline: dict) -> list[str]:
+    """Возвращает фазы, которые есть только в результате или только в базовом"""
+    current, base = result["stages"], baseline["stages"]
+    return ([f"{name}: missing from the result" for name in base if name not in current] +
+            [f"{name}: missing from the baseline" for name in current if name not in base])
+
+
+def print_result(result: dict, baseline: dict | None) -> None:
+    print(f"{result['files']} files, {result['repeat']} runs, "
+          f"peak RSS {result['peak_memory_mb']} MB")
+    for name, seconds in result["stages"].items():
+        line = f"  {name:<32} {seconds:>9.3f}s"
+        if baseline is not None and name in baseline["stages"]:
+            base = baseline["stages"][name]
+            change = 100 * (seconds / base - 1) if base else 0.0
+            line += f"   baseline {base:>9.3f}s  {change:>+6.1f}%"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compiler throughput benchmark")
+    add_shape_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Number of builds; the fastest time of every stage is kept.")
+    parser.add_argument("-J", "--jobs", type=int, default=1)
+    parser.add_argument("-O", dest="optimization_level", type=int, choices=OPTIMIZATION_LEVELS, default=2,
+                        help="Peephole optimization level of the build (default: 2).")
+    parser.add_argument("--output", type=Path, help="Write the result as JSON.")
+    parser.add_argument("--baseline", type=Path,
+                        help="Compare with a stored result and fail on regressions.")
+    parser.add_argument("--save-baseline", nargs="?", type=Path, const=DEFAULT_BASELINE,
+                        help=f"Store the result as a baseline (default: {DEFAULT_BASELINE.name}).")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed slowdown of a stage, as a fraction of the baseline (default: 0.25).")
+    parser.add_argument("--min-delta", type=float, default=0.005,
+                        help="Slowdowns below this many seconds are ignored (default: 0.005).")
+    args = parser.parse_args()
+
+    shape = shape_from_args(args)
+    baseline = None
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text())
+        if (baseline["shape"] != asdict(shape) or baseline["jobs"] != args.jobs
+                or baseline["optimization_level"] != args.optimization_level):
+            sys.exit(f"baseline was recorded for a different project shape: "
+                     f"{baseline['shape']}, jobs={baseline['jobs']}, "
+                     f"-O{baseline['optimization_level']}")
+
+    result = run_benchmark(shape, args.repeat, args.jobs, args.optimization_level)
+    print_result(result, baseline)
+
+    for path in (args.output, args.save_baseline):
+        if path is not None:
+            path.write_text(json.dumps(result, indent=1) + "\n")
+
+    if baseline is not None:
+        mismatches = find_stage_mismatches(result, baseline)
+        if mismatches:
+            print("Stages differ from the baseline (refresh it with --save-baseline):")
+            for mismatch in mismatches:
+                print(f"  {mismatch}")
+            sys.exit(1)
+        regressions = find_regressions(result, baseline, args.threshold, args.min_delta)
+        if regressions:
+            print("Regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Микробенчмарк таблицы констант.
+
+Заполняет ConstPool большим количеством Fieldref/Methodref/String констант
+(так же, как это делает make_const_pool) и сравнивает время поиска через
+индекс (`find_methodref`, `find_fieldref`, `find_string`) со временем
+линейного поиска по списку констант (`find_constant`). Линейный поиск
+слишком медленный, чтобы прогонять его по всем константам, поэтому оба
+варианта сравниваются на одной и той же выборке классов (`--sample`).
+
+Запуск:
+    python benchmarks/bench_constpool.py --classes 320 --features 10
+"""
+import argparse
+import time
+
+from serpent.codegen.constpool import (
+    ConstPool,
+    CONSTANT_Methodref,
+    CONSTANT_Fieldref,
+    CONSTANT_String)
+
+
+def fill_pool(classes: int, features: int) -> ConstPool:
+    pool = ConstPool("com/eiffel/APPLICATION")
+    for c in range(classes):
+        owner = f"com/eiffel/CLASS_{c}"
+        for f in range(features):
+            pool.add_fieldref(f"CLASS_{c}_field_{f}", "Lcom/eiffel/GENERAL;", owner)
+            pool.add_methodref(
+                f"CLASS_{c}_method_{f}",
+                "(Lcom/eiffel/GENERAL;)Lcom/eiffel/GENERAL;",
+                owner)
+        pool.add_string(f"literal {c}")
+    return pool
+
+
+def indexed_lookups(pool: ConstPool, classes: range, features: int) -> None:
+    for c in classes:
+        owner = f"com/eiffel/CLASS_{c}"
+        for f in range(features):
+            pool.find_fieldref(f"CLASS_{c}_field_{f}", owner)
+            pool.find_methodref(f"CLASS_{c}_method_{f}", owner)
+        pool.find_string(f"literal {c}")
+
+
+def linear_lookups(pool: ConstPool, classes: range, features: int) -> None:
+    for c in classes:
+        owner = f"com/eiffel/CLASS_{c}"
+        for f in range(features):
+            field_name = f"CLASS_{c}_field_{f}"
+            method_name = f"CLASS_{c}_method_{f}"
+            pool.find_constant(
+                lambda k: isinstance(k, CONSTANT_Fieldref)
+                    and k.field_name == field_name
+                    and k.fq_class_name == owner)
+            pool.find_constant(
+                lambda k: isinstance(k, CONSTANT_Methodref)
+                    and k.method_name == method_name
+                    and k.fq_class_name == owner)
+        text = f"literal {c}"
+        pool.find_constant(
+            lambda k: isinstance(k, CONSTANT_String) and k.text == text)
+
+
+def measure(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="ConstPool micro-benchmark")
+    parser.add_argument("--classes", type=int, default=320)
+    parser.add_argument("--features", type=int, default=10)
+    parser.add_argument("--sample", type=int, default=20,
+                        help="Number of classes whose constants are looked up.")
+    args = parser.parse_args()
+
+    build_time = measure(fill_pool, args.classes, args.features)
+    pool = fill_pool(args.classes, args.features)
+
+    step = max(1, args.classes // args.sample)
+    sample = range(0, args.classes, step)
+    lookups = len(sample) * (2 * args.features + 1)
+    indexed_time = measure(indexed_lookups, pool, sample, args.features)
+    linear_time = measure(linear_lookups, pool, sample, args.features)
+
+    print(f"pool entries:     {pool.count}")
+    print(f"build (add_*):    {build_time:.3f}s")
+    print(f"indexed lookups:  {indexed_time * 1e6 / lookups:.2f}us per lookup")
+    print(f"linear lookups:   {linear_time * 1e6 / lookups:.2f}us per lookup")
+    print(f"speedup:          {linear_time / indexed_time:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
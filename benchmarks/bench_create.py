@@ -0,0 +1,167 @@
+"""Бенчмарк создания объектов.
+
+Генерирует синтетическую систему на Eiffel (см. eiffel_generator.py),
+собирает ее и создает --count объектов класса --target (по умолчанию
+самого глубокого класса первой цепочки наследования). Для каждого режима
+отображения классов на JVM (--class-layout) печатает, сколько объектов
+Eiffel и сколько байт остается в куче в расчете на одно создание:
+сам объект плюс значения по умолчанию, которые ему пришлось создать.
+
+С флагом --builtins так же измеряются объекты встроенных классов
+(INTEGER, REAL, BOOLEAN, STRING, CHARACTER, PLAIN_TEXT_FILE): сколько
+байт кучи занимает одно значение вместе с его состоянием.
+
+Подсчет выполняет java/CreateBenchmark.java по гистограмме классов
+после полной сборки мусора, поэтому для запуска нужны java и javac.
+
+Запуск:
+    python benchmarks/bench_create.py --classes 100 --features 8 --count 10000
+    python benchmarks/bench_create.py --builtins --count 100000
+"""
+from __future__ import annotations
+from pathlib import Path
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+
+from serpent.build import build_class_files, find_java, user_cache_dir
+from serpent.codegen.layout import CLASS_LAYOUTS
+from serpent.errors import ErrorCollector
+from serpent.resources import get_resource_path
+from serpent.stdlib_cache import STDLIB_CACHE_NAME
+
+from eiffel_generator import (
+    ProjectShape,
+    add_shape_arguments,
+    shape_from_args,
+    write_project)
+
+
+HARNESS_DIR = Path(__file__).parent / "java"
+HARNESS_CLASS = "CreateBenchmark"
+
+BUILTIN_TARGETS = {
+    "INTEGER": "I:7",
+    "REAL": "F:0.5",
+    "BOOLEAN": "I:1",
+    "STRING": "S:serpent",
+    "CHARACTER": "S:s",
+    "PLAIN_TEXT_FILE": None,
+}
+"""Встроенные классы и значения Java, из которых создаются их объекты"""
+
+
+def build(source_dir: Path, build_dir: Path, class_layout: str) -> None:
+    """Собирает систему из source_dir вместе с CreateBenchmark"""
+    stdlib = get_resource_path("stdlib")
+    rtl = get_resource_path("rtl")
+    resources_build_dir = get_resource_path("build")
+    error_collector = ErrorCollector()
+
+    build_class_files(
+        eiffel_source_dirs=[stdlib, source_dir],
+        java_source_dirs=[rtl, HARNESS_DIR],
+        parser_path=resources_build_dir / "eiffelp",
+        error_collector=error_collector,
+        java_version=11,
+        build_dir=build_dir,
+        main_class_name="APPLICATION",
+        main_routine_name="make",
+        eiffel_package="com.eiffel",
+        verbose=False,
+        incremental=False,
+        stdlib_dir=stdlib,
+        stdlib_cache_path=resources_build_dir / STDLIB_CACHE_NAME,
+        rtl_dir=rtl,
+        java_cache_dir=user_cache_dir(),
+        class_layout=class_layout)
+
+    if not error_collector.ok():
+        error_collector.show()
+        raise SystemExit("benchmark project failed to compile")
+
+
+def measure(build_dir: Path, target: str, count: int, value: str | None = None) -> dict:
+    java = find_java()
+    if not java:
+        raise SystemExit("java executable not found")
+
+    arguments = [HARNESS_CLASS, f"com.eiffel.{target}", str(count)]
+    if value is not None:
+        arguments.append(value)
+    result = subprocess.run(
+        [java, "-noverify", "-classpath", str(build_dir), *arguments],
+        capture_output=True,
+        text=True)
+    if result.returncode != 0:
+        raise SystemExit(f"{HARNESS_CLASS} failed:\n{result.stderr}")
+
+    creates, objects, size = result.stdout.split()
+    return {
+        "creates": int(creates),
+        "objects_per_create": float(objects),
+        "bytes_per_create": float(size),
+    }
+
+
+def run_benchmark(
+        shape: ProjectShape,
+        target: str,
+        count: int,
+        layouts: list[str],
+        builtins: bool = False) -> dict:
+    targets = {target: None}
+    if builtins:
+        targets.update(BUILTIN_TARGETS)
+
+    with tempfile.TemporaryDirectory(prefix="serpent-bench-") as tmp:
+        source_dir = Path(tmp) / "src"
+        write_project(shape, source_dir)
+
+        results = {}
+        for class_layout in layouts:
+            build_dir = Path(tmp) / f"classes-{class_layout}"
+            build(source_dir, build_dir, class_layout)
+            results[class_layout] = {
+                name: measure(build_dir, name, count, value)
+                for name, value in targets.items()
+            }
+
+    return {"count": count, "layouts": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Object creation benchmark")
+    add_shape_arguments(parser)
+    parser.add_argument("--count", type=int, default=10000,
+                        help="Number of objects to create.")
+    parser.add_argument("--target",
+                        help="Class whose objects are created (default: the deepest class "
+                             "of the first inheritance chain).")
+    parser.add_argument("--class-layout", choices=CLASS_LAYOUTS, action="append",
+                        help="Layouts to measure (default: all).")
+    parser.add_argument("--builtins", action="store_true",
+                        help="Also measure objects of builtin classes (INTEGER, STRING, ...).")
+    parser.add_argument("--output", type=Path, help="Write the result as JSON.")
+    args = parser.parse_args()
+
+    shape = shape_from_args(args)
+    target = args.target or f"NODE{min(shape.depth, shape.classes) - 1}"
+    result = run_benchmark(
+        shape, target, args.count, args.class_layout or CLASS_LAYOUTS, args.builtins)
+
+    print(f"{result['count']} x create")
+    for class_layout, targets in result["layouts"].items():
+        print(f"  {class_layout}")
+        for name, numbers in targets.items():
+            print(f"    {name:<16} {numbers['objects_per_create']:>8.2f} objects/create"
+                  f"  {numbers['bytes_per_create']:>10.1f} bytes/create")
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(result, indent=1) + "\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
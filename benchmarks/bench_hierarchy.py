@@ -0,0 +1,114 @@
+"""Бенчмарк проверки соответствия классов и типов.
+
+Строит синтетические иерархии: глубокую (цепочка из --depth классов) и
+широкую ромбовидную (--layers слоев по --width классов, каждый класс
+наследует все классы предыдущего слоя, как DIAMOND в examples/diamond).
+Замеряет построение ClassHierarchy (множества предков всех классов) и
+проверку соответствия каждого класса каждому, а также соответствие типов
+с дженериками ARRAY [C] (результаты запоминаются, поэтому второй проход
+быстрее первого). Для сравнения замеряется рекурсивный обход родителей
+без запоминания (столбец walk) - на ромбовидной иерархии он
+экспоненциален по числу слоев, поэтому прогоняется на выборке --sample
+пар классов.
+
+Запуск:
+    python benchmarks/bench_hierarchy.py --depth 500 --layers 12 --width 4
+"""
+from pathlib import Path
+import argparse
+import sys
+import time
+
+from serpent.semantic_checker.symtab import ClassHierarchy, Type
+
+# Декларации классов строятся так же, как в тестах
+sys.path.append(str(Path(__file__).parents[1] / "test"))
+from testlib import declare_classes
+
+
+def deep_hierarchy(depth: int) -> dict[str, list[str]]:
+    parents = {"ANY": []}
+    for i in range(depth):
+        parents[f"C{i}"] = [f"C{i - 1}" if i else "ANY"]
+    return parents
+
+
+def wide_hierarchy(layers: int, width: int) -> dict[str, list[str]]:
+    parents = {"ANY": []}
+    previous = ["ANY"]
+    for layer in range(layers):
+        current = [f"L{layer}_{k}" for k in range(width)]
+        for name in current:
+            parents[name] = previous
+        previous = current
+    return parents
+
+
+def walk_conforms_to(hierarchy: dict[str, list[str]], child: str, parent: str) -> bool:
+    """Рекурсивный обход родителей без запоминания"""
+    if child == parent:
+        return True
+    return any(walk_conforms_to(hierarchy, p, parent) for p in hierarchy[child])
+
+
+def measure(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def all_pairs(hierarchy: ClassHierarchy, names: list[str]) -> None:
+    for child in names:
+        for parent in names:
+            hierarchy.conforms_to(child, parent)
+
+
+def sample_walks(parents: dict[str, list[str]], pairs: list[tuple[str, str]]) -> None:
+    for child, parent in pairs:
+        walk_conforms_to(parents, child, parent)
+
+
+def generic_pairs(hierarchy: ClassHierarchy, types: list[Type]) -> None:
+    for child in types:
+        for parent in types:
+            child.conforms_to(parent, hierarchy)
+
+
+def report(title: str, parents: dict[str, list[str]], sample: int) -> None:
+    names = list(parents)
+    build_time = measure(ClassHierarchy, declare_classes(parents))
+    hierarchy = ClassHierarchy(declare_classes(parents))
+    pairs_time = measure(all_pairs, hierarchy, names)
+
+    # Самые дальние пары: от последних классов к первым
+    pairs = [(child, parent) for child in names[-sample:] for parent in names[:sample]][:sample]
+    walk_time = measure(sample_walks, parents, pairs)
+
+    types = [Type("ARRAY", [Type(name)]) for name in names[-200:]]
+    first_time = measure(generic_pairs, hierarchy, types)
+    second_time = measure(generic_pairs, hierarchy, types)
+
+    queries = len(names) ** 2
+    print(f"{title:>6} {len(names):>7} {build_time * 1e3:>7.1f}ms"
+          f" {pairs_time * 1e9 / queries:>9.0f}ns"
+          f" {walk_time * 1e9 / len(pairs):>11.0f}ns"
+          f" {first_time * 1e3:>9.1f}ms {second_time * 1e3:>9.1f}ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Class conformance benchmark")
+    parser.add_argument("--depth", type=int, default=500)
+    parser.add_argument("--layers", type=int, default=12)
+    parser.add_argument("--width", type=int, default=4)
+    parser.add_argument("--sample", type=int, default=20,
+                        help="Class pairs checked by the recursive walk.")
+    args = parser.parse_args()
+
+    print(f"{'':>6} {'classes':>7} {'build':>9} {'per query':>11} {'walk/query':>13}"
+          f" {'generics':>11} {'cached':>11}")
+    report("deep", deep_hierarchy(args.depth), args.sample)
+    report("wide", wide_hierarchy(args.layers, args.width), args.sample)
+
+
+if __name__ == "__main__":
+    main()
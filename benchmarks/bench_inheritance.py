@@ -0,0 +1,94 @@
+"""Бенчмарк анализа наследования.
+
+Генерирует синтетическую систему (см. eiffel_generator.py, по умолчанию
+500 классов с глубокими цепочками наследования и ромбами), разбирает ее
+вместе со stdlib и замеряет analyze_inheritance: классы анализируются
+в топологическом порядке, и FlattenClass каждого класса строится один раз.
+Для сравнения замеряется рекурсивный анализ без запоминания (столбец
+uncached), при котором родители анализируются заново для каждого пути
+в иерархии - так ANY и COMPARABLE "сплющиваются" для каждого потомка.
+
+Запуск:
+    python benchmarks/bench_inheritance.py --classes 500 --depth 25
+"""
+from __future__ import annotations
+from pathlib import Path
+import argparse
+import json
+import tempfile
+import time
+
+from serpent.errors import ErrorCollector
+from serpent.parser_adapter import parse_files
+from serpent.resources import get_resource_path
+from serpent.semantic_checker.analyze_inheritance import (
+    FlattenClass,
+    adapt,
+    analyze_inheritance)
+from serpent.semantic_checker.examine_system import examine_system
+from serpent.stdlib_cache import collect_stdlib_files
+from serpent.tree import ClassDecl, make_ast
+
+from eiffel_generator import ProjectShape, add_shape_arguments, shape_from_args, write_project
+
+
+def parse_system(shape: ProjectShape) -> list[ClassDecl]:
+    with tempfile.TemporaryDirectory(prefix="serpent-bench-") as tmp:
+        files = write_project(shape, Path(tmp))
+        stdlib_files = collect_stdlib_files(get_resource_path("stdlib"))
+        stdout, stderr = parse_files(
+            stdlib_files + files, get_resource_path("build") / "eiffelp")
+    if stderr:
+        raise SystemExit(f"benchmark project failed to parse: {stderr}")
+
+    classes = make_ast(json.loads(stdout))
+    error_collector = ErrorCollector()
+    examine_system(classes, error_collector)
+    if not error_collector.ok():
+        error_collector.show()
+        raise SystemExit("benchmark project is incorrect")
+    return classes
+
+
+def flatten_uncached(decl: ClassDecl, class_mapping: dict[str, ClassDecl]) -> FlattenClass:
+    """Анализирует класс, заново анализируя всех его родителей"""
+    parents = {
+        parent.class_name: flatten_uncached(class_mapping[parent.class_name], class_mapping)
+        for parent in decl.inherit
+    }
+    return adapt(decl, parents)
+
+
+def analyze_uncached(classes: list[ClassDecl]) -> None:
+    class_mapping = {decl.class_name: decl for decl in classes}
+    for decl in classes:
+        flatten_uncached(decl, class_mapping)
+
+
+def best_time(repeat: int, func, *args) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Inheritance analysis benchmark")
+    add_shape_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.set_defaults(classes=500, depth=25, diamonds=20, body_size=2)
+    args = parser.parse_args()
+
+    classes = parse_system(shape_from_args(args))
+    cached = best_time(args.repeat, analyze_inheritance, classes, ErrorCollector())
+    uncached = best_time(args.repeat, analyze_uncached, classes)
+
+    print(f"{'classes':>8} {'analyze_inheritance':>20} {'uncached':>10} {'speedup':>8}")
+    print(f"{len(classes):>8} {cached * 1e3:>18.1f}ms {uncached * 1e3:>8.1f}ms"
+          f" {uncached / cached:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Бенчмарк сериализации class-файлов.
+
+Строит class-файл с --methods методами, код которых генерируется так же,
+как в bench_branches.py (вложенные условия и циклы глубины --depth, по
+--width присваиваний на уровень), и замеряет ClassFile.to_bytes: весь
+файл записывается в один ByteWriter (см. serpent/codegen/byte_utils.py).
+В ClassFile.to_bytes входит и вычисление max_stack каждого метода,
+поэтому отдельно замеряется запись только констант и кода методов в
+ByteWriter (столбец write) и сборка того же содержимого из отдельных
+объектов bytes каждой константы и команды (столбец pieces).
+
+Запуск:
+    python benchmarks/bench_serialize.py --methods 4 16 64
+    python benchmarks/bench_serialize.py --methods 8 --width 200
+"""
+import argparse
+import time
+
+from bench_branches import CLASS_NAME, make_method
+from serpent.codegen.assembler import assemble
+from serpent.codegen.byte_utils import ByteWriter
+from serpent.codegen.class_file import (
+    ACC_PUBLIC,
+    ClassFile,
+    CodeAttribute,
+    FieldsTable,
+    MethodInfo,
+    MethodsTable)
+from serpent.codegen.constpool import ConstPool
+from serpent.codegen.genbytecode import LocalTable, generate_bytecode_for_method
+from serpent.codegen.layout import JvmLayout
+
+
+def make_class_file(methods: int, depth: int, width: int) -> ClassFile:
+    pool = ConstPool(CLASS_NAME)
+    methods_table = MethodsTable()
+    code_name = pool.add_utf8("Code")
+    descriptor = pool.add_utf8("()V")
+    for i in range(methods):
+        local_table = LocalTable()
+        bytecode = assemble(
+            generate_bytecode_for_method(
+                make_method(depth, width), CLASS_NAME, pool, local_table, JvmLayout()))
+        methods_table.methods.append(
+            MethodInfo(
+                ACC_PUBLIC,
+                pool.add_utf8(f"APPLICATION_nested_{i}"),
+                descriptor,
+                CodeAttribute(code_name, local_table, bytecode)))
+    return ClassFile(
+        minor_version=0,
+        major_version=52,
+        constant_pool=pool,
+        access_flags=ACC_PUBLIC,
+        this_class=pool.add_class(CLASS_NAME),
+        super_class=pool.add_class("java/lang/Object"),
+        fields_table=FieldsTable(),
+        methods_table=methods_table)
+
+
+def write(class_file: ClassFile) -> bytes:
+    """Содержимое констант и кода методов, записанное в один ByteWriter"""
+    writer = ByteWriter()
+    class_file.constant_pool.write(writer)
+    for method in class_file.methods_table.methods:
+        for command in method.code.bytecode:
+            command.write(writer)
+    return writer.getvalue()
+
+
+def pieces(class_file: ClassFile) -> bytes:
+    """Содержимое констант и кода методов, собранное из отдельных bytes"""
+    parts = [constant.to_bytes() for constant in class_file.constant_pool]
+    for method in class_file.methods_table.methods:
+        parts.extend(command.to_bytes() for command in method.code.bytecode)
+    return b"".join(parts)
+
+
+def measure(func, class_file: ClassFile, repeat: int) -> tuple[float, bytes]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = func(class_file)
+        best = min(best, time.perf_counter() - start)
+    return best, data
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Class file serialization benchmark")
+    parser.add_argument("--methods", type=int, nargs="+", default=[4, 16, 64],
+                        help="Methods per class file.")
+    parser.add_argument("--depth", type=int, default=8)
+    parser.add_argument("--width", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'methods':>8} {'bytes':>9} {'to_bytes':>9} {'MB/s':>7} {'write':>9} {'MB/s':>7}"
+          f" {'pieces':>9}")
+    for methods in args.methods:
+        class_file = make_class_file(methods, args.depth, args.width)
+        seconds, data = measure(ClassFile.to_bytes, class_file, args.repeat)
+        write_seconds, content = measure(write, class_file, args.repeat)
+        pieces_seconds, _ = measure(pieces, class_file, args.repeat)
+        print(f"{methods:>8} {len(data):>9} {seconds * 1e3:>7.1f}ms {len(data) / seconds / 1e6:>7.1f}"
+              f" {write_seconds * 1e3:>7.1f}ms {len(content) / write_seconds / 1e6:>7.1f}"
+              f" {pieces_seconds * 1e3:>7.1f}ms")
+
+if __name__ == "__main__":
+    main()
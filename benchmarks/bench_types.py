@@ -0,0 +1,100 @@
+"""Бенчмарк интернированных типов.
+
+Моделирует программу с большим количеством дженериков: --instances
+различных конкретизаций HASH_TABLE [ARRAY [NODE<i>], STRING], каждая из
+которых встречается в --uses местах (типы выражений, локальных переменных
+и параметров). Для каждого места тип создается заново, как это делает
+type_of_class_decl_type, затем берется его full_name, хэш (поиск в словаре
+классов, как в GlobalClassTable) и выполняется сравнение с типом из словаря.
+
+Замеряется время и память (tracemalloc) для интернированного Type и для
+неинтернированного типа-датакласса со списком дженериков (столбец plain),
+у которого full_name и хэш вычисляются при каждом обращении.
+
+Запуск:
+    python benchmarks/bench_types.py --instances 200 --uses 200
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field
+import argparse
+import time
+import tracemalloc
+
+from serpent.semantic_checker.symtab import Type
+
+
+@dataclass(frozen=True)
+class PlainType:
+    """Тип без интернирования"""
+    name: str
+    generics: list[PlainType] = field(default_factory=list)
+
+    def __hash__(self) -> int:
+        return hash((self.name, tuple(self.generics)))
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PlainType):
+            return NotImplemented
+        return self.name == other.name and self.generics == other.generics
+
+    def __repr__(self) -> str:
+        return self.full_name
+
+    @property
+    def full_name(self) -> str:
+        if self.generics:
+            generics_str = "_".join(map(str, self.generics))
+            return f"{self.name}__{generics_str}"
+        return self.name
+
+
+def hash_table_type(make_type, i: int):
+    return make_type("HASH_TABLE", [make_type("ARRAY", [make_type(f"NODE{i}")]), make_type("STRING")])
+
+
+def use_types(make_type, instances: int, uses: int) -> list:
+    """Создает тип в каждом месте использования и возвращает все типы"""
+    classes = {hash_table_type(make_type, i): i for i in range(instances)}
+    names = set()
+    used = []
+    for _ in range(uses):
+        for i in range(instances):
+            typ = hash_table_type(make_type, i)
+            names.add(typ.full_name)
+            assert classes[typ] == i
+            used.append(typ)
+    return used
+
+
+def measure(make_type, instances: int, uses: int) -> tuple[float, int]:
+    start = time.perf_counter()
+    use_types(make_type, instances, uses)
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    used = use_types(make_type, instances, uses)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del used
+    return seconds, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Interned type benchmark")
+    parser.add_argument("--instances", type=int, default=200,
+                        help="Distinct HASH_TABLE instantiations.")
+    parser.add_argument("--uses", type=int, default=200,
+                        help="Places where every instantiation is used.")
+    args = parser.parse_args()
+
+    interned_time, interned_memory = measure(Type, args.instances, args.uses)
+    plain_time, plain_memory = measure(PlainType, args.instances, args.uses)
+
+    print(f"{'types':>8} {'interned':>10} {'memory':>9} {'plain':>10} {'memory':>9}")
+    print(f"{args.instances * args.uses:>8} {interned_time * 1e3:>8.1f}ms"
+          f" {interned_memory / 2**20:>7.1f}MB {plain_time * 1e3:>8.1f}ms"
+          f" {plain_memory / 2**20:>7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
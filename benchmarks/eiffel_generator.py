@@ -0,0 +1,263 @@
+"""Генератор синтетических систем на Eiffel для бенчмарков компилятора.
+
+Форма системы задается ProjectShape:
+
+* classes - число классов NODE<i>. Классы образуют цепочки
+  наследования глубины depth: NODE<i> наследует NODE<i-1>,
+  если i не кратно depth, и переопределяет (redefine) describe;
+* features - число атрибутов и столько же подпрограмм в каждом классе;
+* body_size - число инструкций в теле каждой подпрограммы;
+* diamonds - число ромбов: LEFT<d> и RIGHT<d> наследуют один
+  и тот же класс цепочки и переопределяют describe, а DIAMOND<d>
+  наследует их оба с переименованием (rename), переопределением
+  (redefine) и выбором версии (select);
+* generics - число различных конкретизаций дженерика CELL [G]
+  (CELL [NODE0], CELL [NODE1], ...).
+
+Генерация детерминирована: одна и та же форма всегда дает одни
+и те же исходники.
+
+Запуск:
+    python benchmarks/eiffel_generator.py out_dir --classes 200 --depth 5
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+import argparse
+
+
+@dataclass(frozen=True)
+class ProjectShape:
+    classes: int = 100
+    features: int = 8
+    depth: int = 4
+    diamonds: int = 5
+    generics: int = 10
+    body_size: int = 6
+
+
+def parent_of(i: int, shape: ProjectShape) -> int | None:
+    """Номер родителя NODE<i> в цепочке наследования"""
+    if shape.depth > 1 and i % shape.depth != 0:
+        return i - 1
+    return None
+
+
+def routine_body(i: int, f: int, shape: ProjectShape) -> list[str]:
+    parent = parent_of(i, shape)
+    lines = []
+    for j in range(shape.body_size):
+        match j % 3:
+            case 0:
+                lines.append(f"Result := Result + n * {j + 1} + c{i}_value_{f}")
+            case 1:
+                lines.append(f"if Result > {j * 10} then")
+                lines.append(f"    Result := Result - {j}")
+                lines.append("else")
+                lines.append("    Result := Result + 1")
+                lines.append("end")
+            case 2 if parent is not None and shape.features > 0:
+                lines.append(f"Result := Result + c{parent}_step_{f % shape.features} (n - 1)")
+            case 2:
+                lines.append(f"Result := Result + n - {j}")
+    return lines
+
+
+def indent(lines: list[str], level: int) -> list[str]:
+    return ["    " * level + line for line in lines]
+
+
+def make_chain_class(i: int, shape: ProjectShape) -> str:
+    parent = parent_of(i, shape)
+    lines = ["class", f"    NODE{i}", ""]
+    if parent is not None:
+        lines += ["inherit", f"    NODE{parent}", "        redefine", "            describe",
+                  "        end", ""]
+
+    lines += ["feature", ""]
+    for f in range(shape.features):
+        lines.append(f"    c{i}_value_{f}: INTEGER")
+    lines.append("")
+
+    for f in range(shape.features):
+        lines += [f"    c{i}_step_{f} (n: INTEGER): INTEGER", "    do"]
+        lines += indent(routine_body(i, f, shape), 2)
+        lines += ["    end", ""]
+
+    lines += ["    describe: INTEGER", "    do"]
+    if parent is not None:
+        lines.append("        Result := Precursor + 1")
+    else:
+        lines.append(f"        Result := {i}")
+    if shape.features > 0:
+        lines.append(f"        Result := Result + c{i}_step_0 (Result)")
+    lines += ["    end", "", "end"]
+    return "\n".join(lines) + "\n"
+
+
+def diamond_base(d: int, shape: ProjectShape) -> int:
+    return (d * shape.depth) % shape.classes
+
+
+def make_branch_class(name: str, d: int, shape: ProjectShape) -> str:
+    base = diamond_base(d, shape)
+    return "\n".join([
+        "class", f"    {name}{d}", "",
+        "inherit", f"    NODE{base}", "        redefine", "            describe",
+        "        end", "",
+        "feature", "",
+        f"    {name.lower()}_only: INTEGER",
+        "    do",
+        f"        Result := {len(name)}",
+        "    end", "",
+        "    describe: INTEGER",
+        "    do",
+        f"        Result := {base} + {name.lower()}_only",
+        "    end", "",
+        "end",
+    ]) + "\n"
+
+
+def make_diamond_class(d: int, shape: ProjectShape) -> str:
+    return "\n".join([
+        "class", f"    DIAMOND{d}", "",
+        "inherit",
+        f"    LEFT{d}",
+        "        rename",
+        "            describe as left_describe",
+        "        redefine",
+        "            left_only",
+        "        select",
+        "            left_describe",
+        "        end",
+        f"    RIGHT{d}",
+        "        rename",
+        "            describe as right_describe",
+        "        end", "",
+        "feature", "",
+        "    left_only: INTEGER",
+        "    do",
+        "        Result := right_only + 1",
+        "    end", "",
+        "    both: INTEGER",
+        "    do",
+        "        Result := left_describe + right_describe",
+        "    end", "",
+        "end",
+    ]) + "\n"
+
+
+def make_cell_class() -> str:
+    return "\n".join([
+        "class", "    CELL [G]", "",
+        "create", "    put", "",
+        "feature", "",
+        "    item: G", "",
+        "    put (value: G)",
+        "    do",
+        "        item := value",
+        "    end", "",
+        "    has_item: BOOLEAN",
+        "    do",
+        "        Result := item /= Void",
+        "    end", "",
+        "end",
+    ]) + "\n"
+
+
+def make_application(shape: ProjectShape) -> str:
+    generics = min(shape.generics, shape.classes)
+    locals_ = ["        total: INTEGER"]
+    locals_ += [f"        c{i}: NODE{i}" for i in range(shape.classes)]
+    locals_ += [f"        d{d}: DIAMOND{d}" for d in range(shape.diamonds)]
+    locals_ += [f"        cell{k}: CELL [NODE{k}]" for k in range(generics)]
+
+    body = []
+    for i in range(shape.classes):
+        body += [f"        create c{i}", f"        total := total + c{i}.describe"]
+    for d in range(shape.diamonds):
+        body += [f"        create d{d}", f"        total := total + d{d}.both + d{d}.left_describe"]
+    for k in range(generics):
+        body += [f"        create cell{k}.put (c{k})",
+                 f"        if cell{k}.has_item then",
+                 f"            total := total + cell{k}.item.describe",
+                 "        end"]
+    body.append("        print (total)")
+
+    return "\n".join([
+        "class", "    APPLICATION", "",
+        "create", "    make", "",
+        "feature", "",
+        "    make",
+        "    local",
+        *locals_,
+        "    do",
+        *body,
+        "    end", "",
+        "end",
+    ]) + "\n"
+
+
+def generate_project(shape: ProjectShape) -> dict[str, str]:
+    """Возвращает исходники системы: имя файла -> текст"""
+    if shape.classes < 1:
+        raise ValueError("A project needs at least one class")
+
+    files = {"application.e": make_application(shape), "cell.e": make_cell_class()}
+    for i in range(shape.classes):
+        files[f"node_{i}.e"] = make_chain_class(i, shape)
+    for d in range(shape.diamonds):
+        files[f"left_{d}.e"] = make_branch_class("LEFT", d, shape)
+        files[f"right_{d}.e"] = make_branch_class("RIGHT", d, shape)
+        files[f"diamond_{d}.e"] = make_diamond_class(d, shape)
+    return files
+
+
+def write_project(shape: ProjectShape, out_dir: Path) -> list[Path]:
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, text in generate_project(shape).items():
+        path = out_dir / name
+        path.write_text(text)
+        paths.append(path)
+    return paths
+
+
+def add_shape_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = ProjectShape()
+    parser.add_argument("--classes", type=int, default=defaults.classes)
+    parser.add_argument("--features", type=int, default=defaults.features,
+                        help="Attributes and routines per class.")
+    parser.add_argument("--depth", type=int, default=defaults.depth,
+                        help="Length of inheritance chains.")
+    parser.add_argument("--diamonds", type=int, default=defaults.diamonds,
+                        help="Number of diamond (multiple) inheritance hierarchies.")
+    parser.add_argument("--generics", type=int, default=defaults.generics,
+                        help="Number of distinct generic instantiations.")
+    parser.add_argument("--body-size", type=int, default=defaults.body_size,
+                        help="Statements per routine body.")
+
+
+def shape_from_args(args: argparse.Namespace) -> ProjectShape:
+    return ProjectShape(
+        classes=args.classes,
+        features=args.features,
+        depth=args.depth,
+        diamonds=args.diamonds,
+        generics=args.generics,
+        body_size=args.body_size)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Synthetic Eiffel project generator")
+    parser.add_argument("out_dir", type=Path)
+    add_shape_arguments(parser)
+    args = parser.parse_args()
+
+    paths = write_project(shape_from_args(args), args.out_dir)
+    print(f"{len(paths)} files written to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
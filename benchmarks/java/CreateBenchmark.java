@@ -0,0 +1,81 @@
+import java.lang.management.ManagementFactory;
+import java.lang.reflect.Constructor;
+
+import javax.management.ObjectName;
+
+/**
+ * Считает объекты Eiffel, которые остаются в куче после создания
+ * объектов заданного класса: сам объект и значения его атрибутов.
+ * Гистограмма классов строится после полной сборки мусора, поэтому
+ * временные объекты в подсчет не попадают.
+ *
+ * Объекты встроенных классов создаются из значения Java, которое
+ * передается третьим аргументом в виде тип:значение (I:1, F:1.5, S:abc).
+ *
+ * Запуск:
+ *     java -noverify -cp classes CreateBenchmark com.eiffel.NODE3 10000
+ *     java -noverify -cp classes CreateBenchmark com.eiffel.INTEGER 10000 I:1
+ * Печатает: число созданий, объектов и байт на одно создание.
+ */
+public class CreateBenchmark {
+
+    private static long[] liveObjects(String packagePrefix) throws Exception {
+        String histogram = (String) ManagementFactory.getPlatformMBeanServer().invoke(
+            new ObjectName("com.sun.management:type=DiagnosticCommand"),
+            "gcClassHistogram",
+            new Object[] { null },
+            new String[] { String[].class.getName() });
+
+        long objects = 0;
+        long bytes = 0;
+        String[] lines = histogram.split("\n");
+        for (int i = 0; i < lines.length; i++) {
+            // "   1:     10000     400000  com.eiffel.INTEGER"
+            String[] parts = lines[i].trim().split("\\s+");
+            if (parts.length >= 4 && parts[0].endsWith(":") && parts[3].startsWith(packagePrefix)) {
+                objects += Long.parseLong(parts[1]);
+                bytes += Long.parseLong(parts[2]);
+            }
+        }
+        return new long[] { objects, bytes };
+    }
+
+    public static void main(String[] args) throws Exception {
+        String className = args[0];
+        int count = Integer.parseInt(args[1]);
+        String packagePrefix = className.substring(0, className.lastIndexOf('.') + 1);
+
+        Class[] parameters = new Class[0];
+        Object[] arguments = new Object[0];
+        if (args.length > 2) {
+            String kind = args[2].substring(0, 1);
+            String value = args[2].substring(2);
+            if (kind.equals("I")) {
+                parameters = new Class[] { int.class };
+                arguments = new Object[] { Integer.valueOf(value) };
+            } else if (kind.equals("F")) {
+                parameters = new Class[] { float.class };
+                arguments = new Object[] { Float.valueOf(value) };
+            } else {
+                parameters = new Class[] { String.class };
+                arguments = new Object[] { value };
+            }
+        }
+
+        Constructor constructor = Class.forName(className).getConstructor(parameters);
+        // Первое создание загружает классы и создает общие для всех объектов значения
+        constructor.newInstance(arguments);
+
+        Object[] created = new Object[count];
+        long[] before = liveObjects(packagePrefix);
+        for (int i = 0; i < count; i++) {
+            created[i] = constructor.newInstance(arguments);
+        }
+        long[] after = liveObjects(packagePrefix);
+
+        System.out.println(
+            created.length + " "
+            + (double) (after[0] - before[0]) / count + " "
+            + (double) (after[1] - before[1]) / count);
+    }
+}
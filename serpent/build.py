@@ -1,8 +1,11 @@
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import hashlib
 import json
 import subprocess
 import sys
 import shutil
+import tempfile
 import os
 
 from tqdm import tqdm
@@ -18,8 +21,18 @@ from serpent.semantic_checker.analyze_inheritance import analyze_inheritance
 from serpent.semantic_checker.symtab import ClassHierarchy
 from serpent.semantic_checker.type_check import TClass, check_types
 from serpent.semantic_checker.symtab import mangle_name
+from serpent.codegen.constpool import ROOT_CLASS_NAME
 from serpent.codegen.preprocess import make_general_class
-from serpent.codegen.class_file import make_class_file
+from serpent.codegen.class_file import make_class_file, make_interface_file
+from serpent.codegen.peephole import MethodSavings, format_savings
+from serpent.codegen.layout import (
+    GENERAL_LAYOUT,
+    JvmLayout,
+    interface_name,
+    make_layout)
+from serpent.manifest import BuildManifest
+from serpent.stdlib_cache import load_stdlib_cache
+from serpent.timings import Span, Tracer, current_tracer, trace, tracing
 
 
 def run(classpath: str,
@@ -219,7 +232,15 @@ def build_class_files(
         main_class_name: str,
         main_routine_name: str,
         eiffel_package: str,
-        verbose: bool) -> None:
+        verbose: bool,
+        jobs: int = 1,
+        incremental: bool = True,
+        stdlib_dir: Path | None = None,
+        stdlib_cache_path: Path | None = None,
+        rtl_dir: Path | None = None,
+        java_cache_dir: Path | None = None,
+        class_layout: str = GENERAL_LAYOUT,
+        optimization_level: int = 0) -> None:
     """
     Автоматизирует процесс сборки проекта:
       - Парсит и компилирует исходные файлы Eiffel, генерируя .class файлы,
@@ -234,37 +255,111 @@ def build_class_files(
       build_dir: Каталог для размещения скомпилированных файлов.
       java_version: Версия Java для компиляции (по умолчанию 9).
       verbose: Показывать ли прогресс-бар компиляции классов?
+      jobs: Количество процессов для генерации .class файлов.
+      incremental: Использовать ли результаты предыдущей сборки из build_dir?
+        Если исходники и параметры сборки не изменились, то ничего не делается,
+        иначе заново генерируются только затронутые изменениями классы.
+      stdlib_dir: Каталог stdlib (должен входить в eiffel_source_dirs).
+      stdlib_cache_path: Путь к заранее разобранной stdlib, см. serpent.stdlib_cache.
+        Используется, только если он построен по тем же файлам, что лежат в stdlib_dir.
+      rtl_dir: Каталог исходников RTL (должен входить в java_source_dirs).
+      java_cache_dir: Каталог кэша скомпилированных классов RTL, см. install_rtl_classes.
+      class_layout: Отображение классов Eiffel на классы JVM, см. serpent.codegen.layout.
+      optimization_level: Уровень peephole-оптимизации кода методов, см. serpent.codegen.peephole.
+        В режиме verbose печатается, насколько уменьшился каждый метод.
     """
     # Создаем каталог сборки, если его нет.
     build_dir = Path(build_dir)
     make_build_dir(build_dir)
+    eiffel_package_dir = build_dir / eiffel_package.replace(".", "/")
+
+    eiffel_files = collect_sources(eiffel_source_dirs, "e", error_collector)
+    java_files = collect_sources(java_source_dirs, "java", error_collector)
+    if not error_collector.ok():
+        return
+
+    with trace("manifest"):
+        manifest = BuildManifest.for_build(
+            eiffel_files,
+            java_files,
+            java_version=java_version,
+            main_class=main_class_name,
+            main_routine=main_routine_name,
+            package=eiffel_package,
+            class_layout=class_layout,
+            optimization_level=optimization_level)
+        previous = BuildManifest.load(build_dir) if incremental else None
+        up_to_date = (previous is not None
+                      and previous.is_up_to_date(manifest, build_dir, eiffel_package_dir))
+    if up_to_date:
+        return
+    # Пока сборка не завершится успешно, каталог сборки
+    # не соответствует никакому манифесту
+    BuildManifest.remove(build_dir)
+
+    prebuilt = None
+    if stdlib_dir is not None and stdlib_cache_path is not None:
+        with trace("load_stdlib_cache"):
+            prebuilt = load_stdlib_cache(stdlib_cache_path, stdlib_dir, manifest.sources)
 
     # 1. Парсинг исходников Eiffel.
-    json_ast = parse(eiffel_source_dirs, parser_path, error_collector)
+    # Файлы заранее разобранной stdlib повторно не разбираются
+    if prebuilt is not None:
+        stdlib_classes = prebuilt.classes_in_order(eiffel_files)
+        eiffel_files = [
+            f for f in eiffel_files
+            if not f.resolve().is_relative_to(Path(stdlib_dir).resolve())]
+    else:
+        stdlib_classes = []
+
+    with trace("parse"):
+        json_ast = parse(eiffel_files, parser_path, error_collector)
     if not error_collector.ok():
         return
 
     # Создаем AST из полученного словаря.
-    ast = make_ast(json_ast)
+    with trace("make_ast"):
+        ast = stdlib_classes + make_ast(json_ast)
 
     # 2. Семантическая проверка и анализ.
-    examine_system(ast, error_collector)
+    with trace("examine_system"):
+        examine_system(ast, error_collector)
     if not error_collector.ok():
         return
 
-    flatten_classes = analyze_inheritance(ast, error_collector)
+    with trace("analyze_inheritance"):
+        flatten_classes = analyze_inheritance(
+            ast,
+            error_collector,
+            flattened=prebuilt.flatten_classes if prebuilt is not None else None)
     if not error_collector.ok():
         return
 
-    hierarchy = ClassHierarchy(ast)
-    classes = check_types(flatten_classes, hierarchy, error_collector)
+    with trace("ClassHierarchy"):
+        hierarchy = ClassHierarchy(ast)
+    with trace("check_types"):
+        classes = check_types(flatten_classes, hierarchy, error_collector)
     if not error_collector.ok():
         return
 
+    with trace("make_layout"):
+        layout = make_layout(class_layout, classes, hierarchy)
+
     # 3. Генерация .class файлов для Eiffel.
     # Определяем главный класс и входной метод.
-    eiffel_package_dir = build_dir / eiffel_package.replace(".", "/")
     make_build_dir(eiffel_package_dir)
+    with trace("manifest"):
+        manifest.record_classes(classes, ast, hierarchy)
+        manifest.record_layout(layout)
+
+    if previous is None:
+        outdated = None
+    else:
+        outdated = previous.outdated_classes(manifest, eiffel_package_dir)
+        # Удаляем class-файлы классов, которых больше нет в системе
+        for class_file in set(previous.class_files(eiffel_package_dir)) \
+                - set(manifest.class_files(eiffel_package_dir)):
+            class_file.unlink(missing_ok=True)
 
     try:
         major, minor  = map_java_version(java_version)
@@ -273,22 +368,45 @@ def build_class_files(
     if not error_collector.ok():
         return
 
-    compile_eiffel_classes(
-        classes,
-        error_collector,
-        eiffel_package_dir,
-        main_class_name=main_class_name,
-        main_routine_name=main_routine_name,
-        minor_version=minor,
-        major_version=major,
-        verbose=verbose)
+    with trace("compile_eiffel_classes"):
+        compile_eiffel_classes(
+            classes,
+            error_collector,
+            eiffel_package_dir,
+            main_class_name=main_class_name,
+            main_routine_name=main_routine_name,
+            minor_version=minor,
+            major_version=major,
+            verbose=verbose,
+            jobs=jobs,
+            only=outdated,
+            layout=layout,
+            optimization_level=optimization_level)
     if not error_collector.ok():
         return
 
     # 4. Компиляция Java исходников.
-    compile_java_files(java_source_dirs, error_collector, build_dir, java_version)
-    if not error_collector.ok():
-        return
+    if previous is None or previous.java_outdated(manifest, build_dir):
+        with trace("compile_java_files"):
+            compile_java_sources(
+                java_source_dirs,
+                error_collector,
+                build_dir,
+                java_version,
+                rtl_dir=rtl_dir,
+                cache_dir=java_cache_dir)
+        if not error_collector.ok():
+            return
+        eiffel_class_files = set(manifest.class_files(eiffel_package_dir))
+        manifest.java_classes = sorted(
+            str(path.relative_to(build_dir))
+            for path in build_dir.rglob("*.class")
+            if path not in eiffel_class_files)
+    else:
+        manifest.java_classes = previous.java_classes
+
+    with trace("manifest"):
+        manifest.save(build_dir)
 
 
 def map_java_version(java_version: int) -> tuple[int, int]:
@@ -298,6 +416,112 @@ def map_java_version(java_version: int) -> tuple[int, int]:
         f"Java version '{java_version}' is not supported")
 
 
+ClassFileResult = tuple[CompilerError | None, bool, list[Span], list[MethodSavings]]
+
+
+class ClassFileGenerator:
+    """Генерирует и записывает .class файл для одного класса системы.
+    Классы задаются индексом в all_classes, поэтому в рабочие процессы
+    система классов передается один раз, а не для каждой задачи
+    """
+
+    def __init__(
+            self,
+            all_classes: list[TClass],
+            build_dir: Path,
+            main_class_name: str,
+            main_routine: str,
+            minor_version: int,
+            major_version: int,
+            traced: bool = False,
+            layout: JvmLayout | None = None,
+            optimization_level: int = 0,
+            report_savings: bool = False) -> None:
+        self.all_classes = all_classes
+        self.build_dir = build_dir
+        self.main_class_name = main_class_name
+        self.main_routine = main_routine
+        self.minor_version = minor_version
+        self.major_version = major_version
+        self.traced = traced
+        self.layout = layout or JvmLayout()
+        self.optimization_level = optimization_level
+        self.report_savings = report_savings
+
+    def __call__(self, index: int) -> ClassFileResult:
+        """Возвращает ошибку (если она возникла), признак того,
+        что после нее сборку необходимо прекратить, интервалы
+        трассировки генерации класса (если трассировка включена)
+        и размеры методов до и после оптимизации (если нужен отчет)
+        """
+        savings = [] if self.report_savings else None
+        if not self.traced:
+            return *self.generate(index, savings), [], savings or []
+
+        # Трассировка ведется отдельно для каждого класса: генерация
+        # может выполняться в другом процессе, и интервалы
+        # передаются обратно вместе с результатом
+        tracer = Tracer()
+        class_name = self.all_classes[index].class_name
+        with tracing(tracer), trace("generate_class_file", label=class_name, class_name=class_name):
+            error, fatal = self.generate(index, savings)
+        return error, fatal, tracer.spans, savings or []
+
+    def generate(
+            self,
+            index: int,
+            savings: list[MethodSavings] | None = None) -> tuple[CompilerError | None, bool]:
+        current = self.all_classes[index]
+        rest = [cls for cls in self.all_classes if cls.class_name != current.class_name]
+        entry_method_name = (
+            self.main_routine if current.class_name == self.main_class_name else None)
+
+        try:
+            class_file = make_class_file(
+                current,
+                rest,
+                minor_version=self.minor_version,
+                major_version=self.major_version,
+                entry_point_method=entry_method_name,
+                layout=self.layout,
+                optimization_level=self.optimization_level,
+                savings=savings)
+        except CompilerError as err:
+            return err, False
+
+        class_files = {current.class_name: class_file}
+        if self.layout.per_class and self.layout.is_interface(current.class_name):
+            class_files[interface_name(current.class_name)] = make_interface_file(
+                current,
+                minor_version=self.minor_version,
+                major_version=self.major_version)
+
+        for name, class_file in class_files.items():
+            class_filename = self.build_dir / f"{name}.class"
+
+            try:
+                with trace("write_class_file"):
+                    class_file.write_file(class_filename)
+            except OSError as e:
+                return CompilerError(
+                    f"Error writing file {class_filename}: {e}", source="serpent"), True
+
+        return None, False
+
+
+# Генератор рабочего процесса, см. init_class_file_worker
+_class_file_generator: ClassFileGenerator | None = None
+
+
+def init_class_file_worker(generator: ClassFileGenerator) -> None:
+    global _class_file_generator
+    _class_file_generator = generator
+
+
+def generate_class_file_in_worker(index: int) -> ClassFileResult:
+    return _class_file_generator(index)
+
+
 def compile_eiffel_classes(
         classes: list[TClass],
         error_collector: ErrorCollector,
@@ -306,7 +530,19 @@ def compile_eiffel_classes(
         main_routine_name: str,
         minor_version: int,
         major_version: int,
-        verbose: bool = False) -> None:
+        verbose: bool = False,
+        jobs: int = 1,
+        only: set[str] | None = None,
+        layout: JvmLayout | None = None,
+        optimization_level: int = 0) -> None:
+    """Генерирует .class файлы для класса GENERAL и всех классов из classes.
+    Если задано only, то генерируются только классы с указанными именами.
+    Классы отображаются на классы JVM согласно layout (по умолчанию
+    все классы наследуют GENERAL, см. serpent.codegen.layout).
+    Код методов оптимизируется на уровне optimization_level, в режиме
+    verbose после генерации печатается отчет об оптимизации
+    """
+    layout = layout or JvmLayout()
     main_class = next(
         (cls for cls in classes if cls.class_name == main_class_name), None)
     if main_class is None:
@@ -325,59 +561,173 @@ def compile_eiffel_classes(
         feature_name=main_routine_name,
         class_name=main_class_name)
 
-    general_class = make_general_class(classes)
+    if layout.per_class:
+        general_class = TClass(class_name=ROOT_CLASS_NAME, methods=[], fields=[])
+    else:
+        general_class = make_general_class(classes)
     all_classes = [general_class] + classes
 
-    build_dir = Path(build_dir)
+    generator = ClassFileGenerator(
+        all_classes,
+        Path(build_dir),
+        main_class_name=main_class_name,
+        main_routine=main_routine,
+        minor_version=minor_version,
+        major_version=major_version,
+        traced=current_tracer() is not None,
+        layout=layout,
+        optimization_level=optimization_level,
+        report_savings=verbose and optimization_level > 0)
+    indices = [
+        index for index, cls in enumerate(all_classes)
+        if only is None or cls.class_name in only
+    ]
 
-    if verbose:
-        progress_bar = tqdm(all_classes, desc="Compiling classes")
+    # Классы не зависят друг от друга, поэтому их можно генерировать
+    # в отдельных процессах. Результаты забираются в исходном порядке классов,
+    # так что ошибки попадают в error_collector в том же порядке,
+    # что и при последовательной сборке
+    executor = None
+    if jobs > 1 and len(indices) > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=init_class_file_worker,
+            initargs=(generator,))
+        chunksize = max(1, len(indices) // (jobs * 4))
+        results = executor.map(
+            generate_class_file_in_worker, indices, chunksize=chunksize)
     else:
-        progress_bar = all_classes
+        results = map(generator, indices)
 
-    for current in progress_bar:
-        rest = [cls for cls in all_classes if cls.class_name != current.class_name]
-        entry_method_name = main_routine if current.class_name == main_class_name else None
+    if verbose:
+        results = tqdm(results, total=len(indices), desc="Compiling classes")
+
+    tracer = current_tracer()
+    savings = []
+    try:
+        for error, fatal, spans, class_savings in results:
+            if tracer is not None:
+                tracer.merge(spans, depth=tracer.depth)
+            savings.extend(class_savings)
+            if error is None:
+                continue
+            error_collector.add_error(error)
+            if fatal:
+                return
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    if savings:
+        print(format_savings(savings, optimization_level), file=sys.stderr)
+
+
+def user_cache_dir() -> Path:
+    """Каталог пользовательского кэша компилятора.
+    Может быть переопределен переменной окружения SERPENT_CACHE_DIR
+    """
+    if cache_dir := os.environ.get("SERPENT_CACHE_DIR"):
+        return Path(cache_dir)
+    if os.name == "nt" and (local_app_data := os.environ.get("LOCALAPPDATA")):
+        return Path(local_app_data) / "serpent" / "Cache"
+    xdg_cache_home = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg_cache_home) if xdg_cache_home else Path.home() / ".cache"
+    return base / "serpent"
+
+
+def rtl_cache_key(rtl_dir: Path, rtl_files: list[Path], java_version: int) -> str:
+    """Ключ кэша скомпилированных классов RTL: целевая версия Java
+    и содержимое всех исходников RTL
+    """
+    digest = hashlib.sha256(f"java {java_version}\n".encode())
+    for file in sorted(rtl_files):
+        digest.update(str(file.relative_to(rtl_dir)).encode())
+        digest.update(file.read_bytes())
+    return f"java{java_version}-{digest.hexdigest()[:32]}"
+
+
+def install_rtl_classes(
+        rtl_dir: Path,
+        error_collector: ErrorCollector,
+        build_dir: Path,
+        java_version: int,
+        cache_dir: Path) -> None:
+    """Копирует в build_dir скомпилированные классы RTL.
+    Классы компилируются один раз для каждой версии Java и каждого
+    варианта исходников RTL и хранятся в cache_dir/rtl/<ключ>,
+    поэтому javac запускается только для новой версии Java или измененного RTL
+    """
+    rtl_dir = Path(rtl_dir)
+    rtl_files = collect_sources([rtl_dir], "java", error_collector)
+    if not error_collector.ok():
+        return
+
+    rtl_cache = Path(cache_dir) / "rtl"
+    entry = rtl_cache / rtl_cache_key(rtl_dir, rtl_files, java_version)
 
+    if not entry.is_dir():
         try:
-            class_file = make_class_file(
-                current,
-                rest,
-                minor_version=minor_version,
-                major_version=major_version,
-                entry_point_method=entry_method_name)
-        except CompilerError as err:
-            error_collector.add_error(err)
-            continue
+            rtl_cache.mkdir(parents=True, exist_ok=True)
+            compiled = Path(tempfile.mkdtemp(prefix=f"{entry.name}.", dir=rtl_cache))
+        except OSError:
+            # Кэш недоступен: компилируем RTL прямо в каталог сборки
+            compile_java_files([rtl_dir], error_collector, build_dir, java_version)
+            return
 
-        class_file_code = class_file.to_bytes()
-        class_filename = build_dir / f"{current.class_name}.class"
+        compile_java_files([rtl_dir], error_collector, compiled, java_version)
+        if not error_collector.ok():
+            shutil.rmtree(compiled, ignore_errors=True)
+            return
 
         try:
-            with open(class_filename, "wb") as f:
-                f.write(class_file_code)
-        except OSError as e:
-            error_collector.add_error(
-                CompilerError(f"Error writing file {class_filename}: {e}", source="serpent")
-            )
+            compiled.rename(entry)
+        except OSError:
+            # Параллельная сборка успела сохранить классы раньше
+            shutil.rmtree(compiled, ignore_errors=True)
+
+    try:
+        for class_file in entry.rglob("*.class"):
+            target = build_dir / class_file.relative_to(entry)
+            make_build_dir(target.parent)
+            shutil.copyfile(class_file, target)
+    except OSError as e:
+        error_collector.add_error(
+            CompilerError(f"Error copying RTL classes from {entry}: {e}", source="serpent"))
+
+
+def compile_java_sources(
+        java_source_dirs,
+        error_collector: ErrorCollector,
+        build_dir: Path,
+        java_version: int,
+        rtl_dir: Path | None = None,
+        cache_dir: Path | None = None) -> None:
+    """Помещает в build_dir скомпилированные исходники Java.
+    Классы RTL берутся из кэша (если задан cache_dir), остальные
+    исходники компилируются javac с классами RTL в classpath
+    """
+    other_dirs = list(java_source_dirs)
+    if rtl_dir is not None and cache_dir is not None and rtl_dir in other_dirs:
+        other_dirs.remove(rtl_dir)
+        install_rtl_classes(rtl_dir, error_collector, build_dir, java_version, cache_dir)
+        if not error_collector.ok() or not other_dirs:
             return
 
+    compile_java_files(
+        other_dirs, error_collector, build_dir, java_version, classpath=build_dir)
+
 
 def compile_java_files(
         java_source_dirs,
         error_collector: ErrorCollector,
         build_dir: Path,
-        java_version) -> None:
+        java_version,
+        classpath: Path | None = None) -> None:
     make_build_dir(build_dir)
 
-    java_files = []
-    for java_dir in java_source_dirs:
-        try:
-            java_files.extend(
-                str(file)
-                for file in collect_files(java_dir, ext="java", recursive=True))
-        except CompilerError as err:
-            error_collector.add_error(err)
+    java_files = [
+        str(file)
+        for file in collect_sources(java_source_dirs, "java", error_collector)]
 
     if not error_collector.ok():
         return
@@ -437,7 +787,10 @@ def compile_java_files(
         javac,
         "-d", str(build_dir),
         "--release", str(java_version)
-    ] + java_files
+    ]
+    if classpath is not None:
+        javac_cmd.extend(["-classpath", str(classpath)])
+    javac_cmd.extend(java_files)
 
     try:
         result = subprocess.run(
@@ -461,22 +814,25 @@ def make_build_dir(build_dir) -> None:
     Path(build_dir).mkdir(parents=True, exist_ok=True)
 
 
-def parse(
-        eiffel_source_dirs,
-        parser_path,
-        error_collector: ErrorCollector) -> dict | None:
-    eiffel_files = []
-    for eiffel_dir in eiffel_source_dirs:
+def collect_sources(
+        source_dirs,
+        ext: str,
+        error_collector: ErrorCollector) -> list[Path]:
+    files = []
+    for source_dir in source_dirs:
         try:
-            eiffel_files.extend(
-                collect_files(eiffel_dir, ext="e", recursive=True))
+            files.extend(collect_files(source_dir, ext=ext, recursive=True))
         except CompilerError as err:
             error_collector.add_error(err)
+    return files
 
-    if not error_collector.ok():
-        return None
 
-    stdout, stderr = parse_files(eiffel_files, parser_path)
+def parse(
+        eiffel_files: list[Path],
+        parser_path,
+        error_collector: ErrorCollector) -> dict | None:
+    with trace("parse_files"):
+        stdout, stderr = parse_files(eiffel_files, parser_path)
     if stderr:
         error_collector.add_error(
             CompilerError(f"Parser error: {stderr}")
@@ -484,7 +840,8 @@ def parse(
         return None
 
     try:
-        json_ast = json.loads(stdout)
+        with trace("json.loads"):
+            json_ast = json.loads(stdout)
         return json_ast
     except json.JSONDecodeError as err:
         error_collector.add_error(
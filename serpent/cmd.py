@@ -3,8 +3,12 @@ from pathlib import Path
 import sys
 
 from serpent.errors import ErrorCollector, CompilerError
-from serpent.build import build_class_files, run, make_jar
+from serpent.build import build_class_files, run, make_jar, user_cache_dir
+from serpent.codegen.layout import CLASS_LAYOUTS, GENERAL_LAYOUT
+from serpent.codegen.peephole import OPTIMIZATION_LEVELS
 from serpent.resources import get_resource_path
+from serpent.stdlib_cache import STDLIB_CACHE_NAME
+from serpent.timings import Tracer, trace, tracing
 
 
 def init_project(name: str, error_collector: ErrorCollector) -> None:
@@ -43,6 +47,45 @@ end
         return
 
 
+def build(args: argparse.Namespace, error_collector: ErrorCollector) -> None:
+    """Собирает проект по аргументам команд build и exec"""
+    stdlib = get_resource_path("stdlib")
+    rtldir = get_resource_path("rtl")
+    resources_build_dir = get_resource_path("build")
+
+    tracer = Tracer() if args.timings or args.trace_file else None
+    with tracing(tracer), trace("build"):
+        build_class_files(
+            eiffel_source_dirs=[stdlib, args.source],
+            java_source_dirs=[rtldir],
+            parser_path=resources_build_dir / "eiffelp",
+            error_collector=error_collector,
+            build_dir=args.outputdir,
+            java_version=args.javaversion,
+            main_class_name=args.mainclass,
+            main_routine_name=args.mainroutine,
+            eiffel_package="com.eiffel",
+            verbose=args.no_verbose,
+            jobs=args.jobs,
+            incremental=not args.rebuild,
+            stdlib_dir=stdlib,
+            stdlib_cache_path=resources_build_dir / STDLIB_CACHE_NAME,
+            rtl_dir=rtldir,
+            java_cache_dir=user_cache_dir(),
+            class_layout=args.class_layout,
+            optimization_level=args.optimization_level,
+        )
+
+    if args.timings:
+        print(tracer.format_table(), file=sys.stderr)
+    if args.trace_file:
+        try:
+            tracer.write_chrome_trace(args.trace_file)
+        except OSError as e:
+            error_collector.add_error(
+                CompilerError(f"Error writing trace file {args.trace_file}: {e}", source="serpent"))
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(prog="serpent", description="Serpent Eiffel Compiler CLI")
     subparsers = parser.add_subparsers(dest="command", required=True)
@@ -59,6 +102,17 @@ def main() -> None:
     build_parser.add_argument("-j", "--javaversion", type=int, default=11, help="Java version (default: 11).")
     build_parser.add_argument("-d", "--outputdir", default="classes", help="Build folder (default: classes).")
     build_parser.add_argument("--no-verbose", action="store_false", help="Hide a progress bar of class compiling.")
+    build_parser.add_argument("-J", "--jobs", type=int, default=1, help="Number of processes generating class files (default: 1).")
+    build_parser.add_argument("--rebuild", action="store_true", help="Ignore the results of the previous build and rebuild everything.")
+    build_parser.add_argument("--timings", action="store_true", help="Print wall time and peak memory of every compiler phase.")
+    build_parser.add_argument("--trace-file", help="Write a Chrome trace-event JSON file with compiler phases.")
+    build_parser.add_argument("--class-layout", choices=CLASS_LAYOUTS, default=GENERAL_LAYOUT,
+                              help="How Eiffel classes map to JVM classes: 'general' (every class extends GENERAL, "
+                                   "which holds all features) or 'hierarchy' (a JVM class per Eiffel class) "
+                                   "(default: general).")
+    build_parser.add_argument("-O", dest="optimization_level", type=int, choices=OPTIMIZATION_LEVELS, default=0,
+                              help="Peephole optimization level of method code: -O0, -O1 or -O2 (default: 0). "
+                                   "Verbose builds report the savings of every method.")
 
     # `run` command
     run_parser = subparsers.add_parser("run", help="Run compiled class files.")
@@ -81,6 +135,17 @@ def main() -> None:
     exec_parser.add_argument("-j", "--javaversion", type=int, default=11, help="Java version (default: 11).")
     exec_parser.add_argument("-d", "--outputdir", default="classes", help="Build folder (default: classes).")
     exec_parser.add_argument("--no-verbose", action="store_false", help="Hide a progress bar of class compiling.")
+    exec_parser.add_argument("-J", "--jobs", type=int, default=1, help="Number of processes generating class files (default: 1).")
+    exec_parser.add_argument("--rebuild", action="store_true", help="Ignore the results of the previous build and rebuild everything.")
+    exec_parser.add_argument("--timings", action="store_true", help="Print wall time and peak memory of every compiler phase.")
+    exec_parser.add_argument("--trace-file", help="Write a Chrome trace-event JSON file with compiler phases.")
+    exec_parser.add_argument("--class-layout", choices=CLASS_LAYOUTS, default=GENERAL_LAYOUT,
+                              help="How Eiffel classes map to JVM classes: 'general' (every class extends GENERAL, "
+                                   "which holds all features) or 'hierarchy' (a JVM class per Eiffel class) "
+                                   "(default: general).")
+    exec_parser.add_argument("-O", dest="optimization_level", type=int, choices=OPTIMIZATION_LEVELS, default=0,
+                              help="Peephole optimization level of method code: -O0, -O1 or -O2 (default: 0). "
+                                   "Verbose builds report the savings of every method.")
 
     # `jar` command
     jar_parser = subparsers.add_parser("jar", help="Create a JAR file.")
@@ -92,25 +157,11 @@ def main() -> None:
     args, unknown = parser.parse_known_args()
 
     error_collector = ErrorCollector()
-    stdlib = get_resource_path("stdlib")
-    rtldir = get_resource_path("rtl")
-    parser_path = get_resource_path("build") / "eiffelp"
 
     if args.command == "init":
         init_project(args.name, error_collector)
     elif args.command == "build":
-        build_class_files(
-            eiffel_source_dirs=[stdlib, args.source],
-            java_source_dirs=[rtldir],
-            parser_path=parser_path,
-            error_collector=error_collector,
-            build_dir=args.outputdir,
-            java_version=args.javaversion,
-            main_class_name=args.mainclass,
-            main_routine_name=args.mainroutine,
-            eiffel_package="com.eiffel",
-            verbose=args.no_verbose,
-        )
+        build(args, error_collector)
     elif args.command == "run":
         run(
             args.classpath,
@@ -120,18 +171,7 @@ def main() -> None:
             cmd_args=unknown,
         )
     elif args.command == "exec":
-        build_class_files(
-            eiffel_source_dirs=[stdlib, args.source],
-            java_source_dirs=[rtldir],
-            parser_path=parser_path,
-            error_collector=error_collector,
-            build_dir=args.outputdir,
-            java_version=args.javaversion,
-            main_class_name=args.mainclass,
-            main_routine_name=args.mainroutine,
-            eiffel_package="com.eiffel",
-            verbose=args.no_verbose,
-        )
+        build(args, error_collector)
         if not error_collector.ok():
             error_collector.show()
             sys.exit(1)
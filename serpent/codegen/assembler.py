@@ -0,0 +1,130 @@
+"""Переходы по символическим меткам.
+
+Генераторы кода не вычисляют смещения переходов сами: место в коде
+обозначается меткой Label, а переход к нему - командой Branch, в которой
+указаны класс команды перехода (Ifeq, Goto, IfIcmplt, ...) и метка.
+assemble раскладывает команды метода, вычисляя смещение каждой метки,
+и заменяет Branch настоящими командами перехода.
+
+Смещение в goto и if* двухбайтное. Если метка дальше 32 КБ, goto
+заменяется на goto_w, а условный переход - на переход с обратным условием
+через goto_w:
+
+    ifeq L    ->    ifne +8; goto_w L
+
+Широкий переход длиннее обычного и сдвигает следующие за ним команды,
+поэтому раскладка повторяется, пока не перестанут появляться новые
+широкие переходы. Для методов короче 32 КБ раскладка всегда одна.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+
+from serpent.codegen.bytecommand import *
+
+
+@dataclass(frozen=True, eq=False)
+class Label(ByteCommand):
+    """Место в коде, на которое ссылаются переходы. Метки сравниваются
+    по идентичности, каждую метку можно поставить в код только один раз
+    """
+
+    @property
+    def tag(self) -> int:
+        raise TypeError("Label is not a JVM instruction")
+
+    def write(self, writer: ByteWriter) -> None:
+        pass
+
+
+@dataclass(frozen=True)
+class Branch(ByteCommand):
+    jump: type[ByteCommand]
+    """Класс команды перехода: Goto или одна из команд if*"""
+
+    label: Label
+
+    @property
+    def tag(self) -> int:
+        raise TypeError("Branch must be assembled first")
+
+    def write(self, writer: ByteWriter) -> None:
+        raise TypeError("Branch must be assembled first")
+
+
+INVERTED_JUMPS: dict[type[ByteCommand], type[ByteCommand]] = {
+    Ifeq: Ifne, Ifne: Ifeq,
+    Iflt: Ifge, Ifge: Iflt,
+    Ifgt: Ifle, Ifle: Ifgt,
+    IfIcmpeq: IfIcmpne, IfIcmpne: IfIcmpeq,
+    IfIcmplt: IfIcmpge, IfIcmpge: IfIcmplt,
+    IfIcmpgt: IfIcmple, IfIcmple: IfIcmpgt,
+    IfAcmpeq: IfAcmpne, IfAcmpne: IfAcmpeq,
+}
+"""Условные переходы и переходы с обратным условием"""
+
+BRANCH_SIZE = 3
+"""Размер goto и if* с двухбайтным смещением"""
+
+SHORT_OFFSETS = range(-2**15, 2**15)
+
+
+def wide_size(branch: Branch) -> int:
+    # goto_w или if* с обратным условием и goto_w
+    return 5 if branch.jump is Goto else BRANCH_SIZE + 5
+
+
+def layout(bytecode: list[ByteCommand], sizes: list[int]) -> tuple[list[int], dict[Label, int]]:
+    """Смещения всех команд и меток при заданных размерах команд"""
+    offsets = []
+    labels = {}
+    offset = 0
+    for command, size in zip(bytecode, sizes):
+        offsets.append(offset)
+        if type(command) is Label:
+            if command in labels:
+                raise ValueError("label is placed twice")
+            labels[command] = offset
+        offset += size
+    return offsets, labels
+
+
+def assemble(bytecode: list[ByteCommand]) -> list[ByteCommand]:
+    """Заменяет метки и Branch командами JVM с вычисленными смещениями"""
+    if not any(type(command) in (Label, Branch) for command in bytecode):
+        return bytecode
+
+    sizes = [
+        0 if type(command) is Label else BRANCH_SIZE if type(command) is Branch else command.size()
+        for command in bytecode]
+    wide = set()
+    while True:
+        offsets, labels = layout(bytecode, sizes)
+        grown = [
+            i for i, command in enumerate(bytecode)
+            if type(command) is Branch
+            and i not in wide
+            and labels[command.label] - offsets[i] not in SHORT_OFFSETS]
+        if not grown:
+            break
+        for i in grown:
+            wide.add(i)
+            sizes[i] = wide_size(bytecode[i])
+
+    result = []
+    for i, command in enumerate(bytecode):
+        if type(command) is Label:
+            continue
+        if type(command) is not Branch:
+            result.append(command)
+            continue
+
+        distance = labels[command.label] - offsets[i]
+        if i not in wide:
+            result.append(command.jump(distance))
+        elif command.jump is Goto:
+            result.append(GotoW(distance))
+        else:
+            # Обратный переход обходит goto_w, смещение goto_w отсчитывается от него самого
+            result.append(INVERTED_JUMPS[command.jump](BRANCH_SIZE + 5))
+            result.append(GotoW(distance - BRANCH_SIZE))
+    return result
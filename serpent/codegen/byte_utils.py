@@ -1,3 +1,6 @@
+import struct
+
+
 def u1(x: int) -> bytes:
     # Кодирует число в 1 байт (big-endian)
     return x.to_bytes(1, byteorder='big', signed=False)
@@ -13,6 +16,11 @@ def u4(x: int) -> bytes:
     return x.to_bytes(4, byteorder='big', signed=False)
 
 
+def s1(x: int) -> bytes:
+    # Кодирует число в 1 байт со знаком
+    return x.to_bytes(1, byteorder='big', signed=True)
+
+
 def s2(x: int) -> bytes:
     # Кодирует число в 2 байта (big-endian) со знаком
     return x.to_bytes(2, byteorder='big', signed=True)
@@ -31,3 +39,87 @@ def u1_seq(s: str) -> bytes:
 def merge_bytes(*bs: bytes) -> bytes:
     # Объединяет все переданные байтовые последовательности в одну
     return b"".join(bs)
+
+
+_U2 = struct.Struct(">H")
+_U4 = struct.Struct(">I")
+_S2 = struct.Struct(">h")
+_S4 = struct.Struct(">i")
+_F4 = struct.Struct(">f")
+_U1_U1 = struct.Struct(">BB")
+_U1_U2 = struct.Struct(">BH")
+_U1_S2 = struct.Struct(">Bh")
+_U1_S4 = struct.Struct(">Bi")
+_U1_U2_U2 = struct.Struct(">BHH")
+
+
+class ByteWriter:
+    """Буфер, в который class-файл записывается целиком.
+
+    Константы и команды дописывают себя в один bytearray (см. методы write),
+    поэтому при сериализации не создаются промежуточные объекты bytes для
+    каждого поля. Длины, которые становятся известны только после записи
+    (длина кода метода и атрибута Code), резервируются заранее и
+    дописываются на место через struct.pack_into
+    """
+    __slots__ = ("buffer",)
+
+    def __init__(self) -> None:
+        self.buffer = bytearray()
+
+    def __len__(self) -> int:
+        return len(self.buffer)
+
+    def getvalue(self) -> bytes:
+        return bytes(self.buffer)
+
+    def u1(self, x: int) -> None:
+        self.buffer.append(x)
+
+    def u2(self, x: int) -> None:
+        self.buffer += _U2.pack(x)
+
+    def u4(self, x: int) -> None:
+        self.buffer += _U4.pack(x)
+
+    def s1(self, x: int) -> None:
+        self.buffer += s1(x)
+
+    def s2(self, x: int) -> None:
+        self.buffer += _S2.pack(x)
+
+    def s4(self, x: int) -> None:
+        self.buffer += _S4.pack(x)
+
+    def f4(self, x: float) -> None:
+        # float в 4 байтах в формате IEEE 754 (big-endian)
+        self.buffer += _F4.pack(x)
+
+    def u1_u1(self, x: int, y: int) -> None:
+        self.buffer += _U1_U1.pack(x, y)
+
+    def u1_u2(self, x: int, y: int) -> None:
+        self.buffer += _U1_U2.pack(x, y)
+
+    def u1_s2(self, x: int, y: int) -> None:
+        self.buffer += _U1_S2.pack(x, y)
+
+    def u1_s4(self, x: int, y: int) -> None:
+        self.buffer += _U1_S4.pack(x, y)
+
+    def u1_u2_u2(self, x: int, y: int, z: int) -> None:
+        self.buffer += _U1_U2_U2.pack(x, y, z)
+
+    def raw(self, bs: bytes) -> None:
+        self.buffer += bs
+
+    def reserve_u4(self) -> int:
+        """Резервирует 4 байта под число, которое будет записано
+        позже методом patch_u4, и возвращает их позицию
+        """
+        position = len(self.buffer)
+        self.buffer += b"\0\0\0\0"
+        return position
+
+    def patch_u4(self, position: int, x: int) -> None:
+        _U4.pack_into(self.buffer, position, x)
@@ -12,7 +12,13 @@ class ByteCommand(ABC):
     def tag(self) -> int: ...
 
     @abstractmethod
-    def to_bytes(self) -> bytes: ...
+    def write(self, writer: ByteWriter) -> None:
+        """Дописывает код команды вместе с операндами в writer"""
+
+    def to_bytes(self) -> bytes:
+        writer = ByteWriter()
+        self.write(writer)
+        return writer.getvalue()
 
     def size(self) -> int:
         return len(self.to_bytes())
@@ -25,8 +31,8 @@ class Nop(ByteCommand):
     def tag(self) -> int:
         return 0
     
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 # 1. Команды загрузки констант
@@ -37,8 +43,8 @@ class Aconst_null(ByteCommand):
     def tag(self) -> int:
         return 0x1
     
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 @dataclass(frozen=True)
@@ -58,9 +64,26 @@ class Iconst_i(ByteCommand):
         }
         return i_mapping[self.i]
     
-    def to_bytes(self) -> bytes:
-        # Здесь можно вернуть только код команды, так как она не имеет операндов
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        # Здесь можно записать только код команды, так как она не имеет операндов
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Fconst_f(ByteCommand):
+    f: int
+
+    @cached_property
+    def tag(self) -> int:
+        f_mapping = {
+            0: 0xB,
+            1: 0xC,
+            2: 0xD,
+        }
+        return f_mapping[self.f]
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 @dataclass(frozen=True)
@@ -71,8 +94,8 @@ class Bipush(ByteCommand):
     def tag(self) -> int:
         return 0x10
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u1(self.value))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u1(self.tag, self.value)
 
 
 @dataclass(frozen=True)
@@ -83,8 +106,8 @@ class Sipush(ByteCommand):
     def tag(self) -> int:
         return 0x11
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u2(self.value))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2(self.tag, self.value)
 
 
 @dataclass(frozen=True)
@@ -95,8 +118,8 @@ class Ldc(ByteCommand):
     def tag(self) -> int:
         return 0x12
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u1(self.index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u1(self.tag, self.index)
 
 
 @dataclass(frozen=True)
@@ -107,8 +130,8 @@ class Ldc_w(ByteCommand):
     def tag(self) -> int:
         return 0x13
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u2(self.index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2(self.tag, self.index)
 
 
 # 2. Команды работы с локальными переменными (загрузка)
@@ -120,8 +143,8 @@ class Iload(ByteCommand):
     def tag(self) -> int:
         return 0x15
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u1(self.var_index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u1(self.tag, self.var_index)
 
 
 @dataclass(frozen=True)
@@ -132,8 +155,8 @@ class Fload(ByteCommand):
     def tag(self) -> int:
         return 0x17
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u1(self.var_index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u1(self.tag, self.var_index)
 
 
 @dataclass(frozen=True)
@@ -144,8 +167,44 @@ class Aload(ByteCommand):
     def tag(self) -> int:
         return 0x19
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u1(self.var_index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u1(self.tag, self.var_index)
+
+
+@dataclass(frozen=True)
+class Iload_n(ByteCommand):
+    var_index: int  # iload_0 ... iload_3, однобайтная форма iload для слотов 0-3
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x1a + self.var_index
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Fload_n(ByteCommand):
+    var_index: int  # fload_0 ... fload_3, однобайтная форма fload для слотов 0-3
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x22 + self.var_index
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Aload_n(ByteCommand):
+    var_index: int  # aload_0 ... aload_3, однобайтная форма aload для слотов 0-3
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x2a + self.var_index
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 # 3. Команды работы с локальными переменными (сохранение)
@@ -157,8 +216,20 @@ class Istore(ByteCommand):
     def tag(self) -> int:
         return 0x36
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u1(self.var_index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u1(self.tag, self.var_index)
+
+
+@dataclass(frozen=True)
+class Fstore(ByteCommand):
+    var_index: int
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x38
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u1(self.tag, self.var_index)
 
 
 @dataclass(frozen=True)
@@ -169,8 +240,58 @@ class Astore(ByteCommand):
     def tag(self) -> int:
         return 0x3A
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u1(self.var_index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u1(self.tag, self.var_index)
+
+
+@dataclass(frozen=True)
+class Istore_n(ByteCommand):
+    var_index: int  # istore_0 ... istore_3, однобайтная форма istore для слотов 0-3
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x3b + self.var_index
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Fstore_n(ByteCommand):
+    var_index: int  # fstore_0 ... fstore_3, однобайтная форма fstore для слотов 0-3
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x43 + self.var_index
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Astore_n(ByteCommand):
+    var_index: int  # astore_0 ... astore_3, однобайтная форма astore для слотов 0-3
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x4b + self.var_index
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Iinc(ByteCommand):
+    var_index: int
+    const: int  # прибавляется к значению слота, от -128 до 127
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x84
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u1(self.tag, self.var_index)
+        writer.s1(self.const)
 
 
 # 4. Команды работы со стеком
@@ -181,8 +302,8 @@ class Pop(ByteCommand):
     def tag(self) -> int:
         return 0x57
 
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 @dataclass(frozen=True)
@@ -192,8 +313,8 @@ class Dup(ByteCommand):
     def tag(self) -> int:
         return 0x59
     
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 @dataclass(frozen=True)
@@ -203,8 +324,8 @@ class Dup2(ByteCommand):
     def tag(self) -> int:
         return 0x5C
 
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 @dataclass(frozen=True)
@@ -214,8 +335,8 @@ class Dupx1(ByteCommand):
     def tag(self) -> int:
         return 0x5a
     
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 @dataclass(frozen=True)
@@ -225,8 +346,8 @@ class Swap(ByteCommand):
     def tag(self) -> int:
         return 0x5f
     
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 # 5. Арифметические команды
@@ -237,8 +358,8 @@ class Iadd(ByteCommand):
     def tag(self) -> int:
         return 0x60
 
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 @dataclass(frozen=True)
@@ -248,8 +369,8 @@ class Imul(ByteCommand):
     def tag(self) -> int:
         return 0x68
 
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 @dataclass(frozen=True)
@@ -259,8 +380,8 @@ class Isub(ByteCommand):
     def tag(self) -> int:
         return 0x64
 
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 @dataclass(frozen=True)
@@ -270,8 +391,153 @@ class Idiv(ByteCommand):
     def tag(self) -> int:
         return 0x6C
 
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Irem(ByteCommand):
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x70
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Ineg(ByteCommand):
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x74
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Fadd(ByteCommand):
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x62
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Fsub(ByteCommand):
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x66
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Fmul(ByteCommand):
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x6A
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Fdiv(ByteCommand):
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x6E
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Fneg(ByteCommand):
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x76
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+# 5.1 Логические операции над int
+@dataclass(frozen=True)
+class Iand(ByteCommand):
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x7E
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Ior(ByteCommand):
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x80
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Ixor(ByteCommand):
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x82
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+# 5.2 Преобразование и сравнение значений
+@dataclass(frozen=True)
+class I2f(ByteCommand):
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x86
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Fcmpl(ByteCommand):
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x95
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+
+
+@dataclass(frozen=True)
+class Fcmpg(ByteCommand):
+
+    @cached_property
+    def tag(self) -> int:
+        return 0x96
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 # 6. Команды переходов (условные, безусловные и переключатели)
@@ -284,8 +550,8 @@ class IfIcmpeq(ByteCommand):
     def tag(self) -> int:
         return 0x9F
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), s2(self.offset))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s2(self.tag, self.offset)
 
 
 @dataclass(frozen=True)
@@ -296,8 +562,8 @@ class IfIcmpne(ByteCommand):
     def tag(self) -> int:
         return 0xA0
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), s2(self.offset))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s2(self.tag, self.offset)
 
 
 @dataclass(frozen=True)
@@ -308,8 +574,8 @@ class IfIcmplt(ByteCommand):
     def tag(self) -> int:
         return 0xA1
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), s2(self.offset))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s2(self.tag, self.offset)
 
 
 @dataclass(frozen=True)
@@ -320,8 +586,8 @@ class IfIcmpge(ByteCommand):
     def tag(self) -> int:
         return 0xA2
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), s2(self.offset))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s2(self.tag, self.offset)
 
 
 @dataclass(frozen=True)
@@ -332,8 +598,8 @@ class IfIcmpgt(ByteCommand):
     def tag(self) -> int:
         return 0xA3
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), s2(self.offset))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s2(self.tag, self.offset)
 
 
 @dataclass(frozen=True)
@@ -344,8 +610,8 @@ class IfIcmple(ByteCommand):
     def tag(self) -> int:
         return 0xA4
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), s2(self.offset))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s2(self.tag, self.offset)
 
 
 # 6.2 if<cond> (сравнение со значением 0)
@@ -357,8 +623,8 @@ class Ifeq(ByteCommand):
     def tag(self) -> int:
         return 0x99
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), s2(self.offset))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s2(self.tag, self.offset)
 
 
 @dataclass(frozen=True)
@@ -369,8 +635,8 @@ class Ifne(ByteCommand):
     def tag(self) -> int:
         return 0x9A
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), s2(self.offset))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s2(self.tag, self.offset)
 
 
 @dataclass(frozen=True)
@@ -379,10 +645,10 @@ class Iflt(ByteCommand):
 
     @cached_property
     def tag(self) -> int:
-        return 0x55  # согласно описанию
+        return 0x9B
     
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), s2(self.offset))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s2(self.tag, self.offset)
 
 
 @dataclass(frozen=True)
@@ -393,8 +659,8 @@ class Ifle(ByteCommand):
     def tag(self) -> int:
         return 0x9E
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), s2(self.offset))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s2(self.tag, self.offset)
 
 
 @dataclass(frozen=True)
@@ -405,8 +671,8 @@ class Ifgt(ByteCommand):
     def tag(self) -> int:
         return 0x9D
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), s2(self.offset))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s2(self.tag, self.offset)
 
 
 @dataclass(frozen=True)
@@ -417,8 +683,8 @@ class Ifge(ByteCommand):
     def tag(self) -> int:
         return 0x9C
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), s2(self.offset))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s2(self.tag, self.offset)
 
 
 # 6.3 if_acmp<cond> (сравнение ссылок)
@@ -430,8 +696,8 @@ class IfAcmpeq(ByteCommand):
     def tag(self) -> int:
         return 0xA5
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), s2(self.offset))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s2(self.tag, self.offset)
 
 
 @dataclass(frozen=True)
@@ -442,8 +708,8 @@ class IfAcmpne(ByteCommand):
     def tag(self) -> int:
         return 0xA6
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), s2(self.offset))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s2(self.tag, self.offset)
 
 
 # 6.4 Безусловный переход
@@ -455,8 +721,20 @@ class Goto(ByteCommand):
     def tag(self) -> int:
         return 0xa7
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), s2(self.offset))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s2(self.tag, self.offset)
+
+
+@dataclass(frozen=True)
+class GotoW(ByteCommand):
+    offset: int  # четырехбайтное смещение, если переход не помещается в goto
+
+    @cached_property
+    def tag(self) -> int:
+        return 0xc8
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s4(self.tag, self.offset)
 
 
 # 6.5 Переключатели
@@ -472,19 +750,16 @@ class TableSwitch(ByteCommand):
     def tag(self) -> int:
         return 0xAA
 
-    def to_bytes(self) -> bytes:
+    def write(self, writer: ByteWriter) -> None:
         if len(self.offsets) != self.high - self.low + 1:
             raise ValueError("Количество сдвигов должно равняться high - low + 1")
-        parts = [
-            u1(self.tag),
-            self.padding,
-            s4(self.default_offset),
-            s4(self.low),
-            s4(self.high),
-        ]
+        writer.u1(self.tag)
+        writer.raw(self.padding)
+        writer.s4(self.default_offset)
+        writer.s4(self.low)
+        writer.s4(self.high)
         for off in self.offsets:
-            parts.append(s4(off))
-        return merge_bytes(*parts)
+            writer.s4(off)
 
 
 @dataclass(frozen=True)
@@ -497,18 +772,15 @@ class LookupSwitch(ByteCommand):
     def tag(self) -> int:
         return 0xAB
 
-    def to_bytes(self) -> bytes:
+    def write(self, writer: ByteWriter) -> None:
         npairs = len(self.pairs)
-        parts = [
-            u1(self.tag),
-            self.padding,
-            s4(self.default_offset),
-            s4(npairs),
-        ]
+        writer.u1(self.tag)
+        writer.raw(self.padding)
+        writer.s4(self.default_offset)
+        writer.s4(npairs)
         for key, offset in self.pairs:
-            parts.append(s2(key))
-            parts.append(s4(offset))
-        return merge_bytes(*parts)
+            writer.s2(key)
+            writer.s4(offset)
 
 
 # 7. Команды работы с массивами
@@ -520,8 +792,8 @@ class NewArray(ByteCommand):
     def tag(self) -> int:
         return 0xBC
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u1(self.element_type))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u1(self.tag, self.element_type)
 
 
 @dataclass(frozen=True)
@@ -532,8 +804,8 @@ class AnewArray(ByteCommand):
     def tag(self) -> int:
         return 0xBD
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u2(self.index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2(self.tag, self.index)
 
 
 @dataclass(frozen=True)
@@ -543,8 +815,8 @@ class ArrayLength(ByteCommand):
     def tag(self) -> int:
         return 0xBE
 
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 @dataclass(frozen=True)
@@ -554,8 +826,8 @@ class Iaload(ByteCommand):
     def tag(self) -> int:
         return 0x2E
 
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 @dataclass(frozen=True)
@@ -565,8 +837,8 @@ class Aaload(ByteCommand):
     def tag(self) -> int:
         return 0x32
 
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 @dataclass(frozen=True)
@@ -576,8 +848,8 @@ class Iastore(ByteCommand):
     def tag(self) -> int:
         return 0x4F
 
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 @dataclass(frozen=True)
@@ -587,8 +859,8 @@ class Aastore(ByteCommand):
     def tag(self) -> int:
         return 0x53
 
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 # 8. Команды работы с объектами
@@ -600,8 +872,32 @@ class New(ByteCommand):
     def tag(self) -> int:
         return 0xBB
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u2(self.index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2(self.tag, self.index)
+
+
+@dataclass(frozen=True)
+class GetStatic(ByteCommand):
+    index: int  # индекс в таблице констант для ссылки на поле
+
+    @cached_property
+    def tag(self) -> int:
+        return 0xB2
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2(self.tag, self.index)
+
+
+@dataclass(frozen=True)
+class PutStatic(ByteCommand):
+    index: int  # индекс в таблице констант для ссылки на поле
+
+    @cached_property
+    def tag(self) -> int:
+        return 0xB3
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2(self.tag, self.index)
 
 
 @dataclass(frozen=True)
@@ -612,8 +908,8 @@ class GetField(ByteCommand):
     def tag(self) -> int:
         return 0xB4
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u2(self.index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2(self.tag, self.index)
 
 
 @dataclass(frozen=True)
@@ -624,8 +920,8 @@ class PutField(ByteCommand):
     def tag(self) -> int:
         return 0xB5
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u2(self.index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2(self.tag, self.index)
 
 
 @dataclass(frozen=True)
@@ -636,8 +932,8 @@ class Instanceof(ByteCommand):
     def tag(self) -> int:
         return 0xC1
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u2(self.index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2(self.tag, self.index)
 
 
 @dataclass(frozen=True)
@@ -648,8 +944,8 @@ class CheckCast(ByteCommand):
     def tag(self) -> int:
         return 0xC0
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u2(self.index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2(self.tag, self.index)
 
 
 # 9. Команды работы с методами
@@ -661,8 +957,8 @@ class InvokeVirtual(ByteCommand):
     def tag(self) -> int:
         return 0xB6
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u2(self.index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2(self.tag, self.index)
 
 
 @dataclass(frozen=True)
@@ -673,8 +969,8 @@ class InvokeSpecial(ByteCommand):
     def tag(self) -> int:
         return 0xB7
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u2(self.index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2(self.tag, self.index)
 
 
 @dataclass(frozen=True)
@@ -685,8 +981,22 @@ class InvokeStatic(ByteCommand):
     def tag(self) -> int:
         return 0xB8
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u2(self.index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2(self.tag, self.index)
+
+
+@dataclass(frozen=True)
+class InvokeInterface(ByteCommand):
+    index: int  # индекс в таблице констант для метода интерфейса
+    count: int  # число слотов под аргументы, включая ссылку на объект
+
+    @cached_property
+    def tag(self) -> int:
+        return 0xB9
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2(self.tag, self.index)
+        writer.u1_u1(self.count, 0)
 
 
 # 10. Команды возврата из метода
@@ -697,8 +1007,8 @@ class Ireturn(ByteCommand):
     def tag(self) -> int:
         return 0xAC
 
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 @dataclass(frozen=True)
@@ -708,8 +1018,8 @@ class Areturn(ByteCommand):
     def tag(self) -> int:
         return 0xB0
 
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
 
 
 @dataclass(frozen=True)
@@ -719,5 +1029,5 @@ class Return(ByteCommand):
     def tag(self) -> int:
         return 0xB1
 
-    def to_bytes(self) -> bytes:
-        return u1(self.tag)
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass, field
+import os
 import re
 
 from serpent.semantic_checker.type_check import (
@@ -8,25 +9,57 @@ from serpent.semantic_checker.type_check import (
     TUserDefinedMethod,
     TExternalMethod,
     TField)
+from serpent.semantic_checker.symtab import Type
 from serpent.codegen.constpool import (
+    COMPILER_NAME,
     ConstPool,
     add_package_prefix,
     get_type_descriptor,
     get_method_descriptor,
     make_const_pool,
+    value_state,
     PLATFORM_CLASS_NAME,
     ROOT_CLASS_NAME)
 from serpent.codegen.bytecommand import *
+from serpent.codegen.assembler import Branch, Label, assemble
 from serpent.codegen.genbytecode import (
     LocalTable,
-    generate_bytecode_for_method)
+    SHARED_DEFAULT_TYPES,
+    VALUE_FACTORY_NAME,
+    boolean_field,
+    generate_boxed_const,
+    generate_bytecode_for_default_value,
+    generate_bytecode_for_literal,
+    generate_bytecode_for_method,
+    getter_descriptor,
+    load_boolean,
+    push_bool,
+    shared_default_field,
+    value_factory_descriptor)
+from serpent.codegen.peephole import MethodSavings, optimize
+from serpent.codegen.layout import (
+    BUILTIN_CONSTRUCTORS,
+    JvmLayout,
+    interface_name,
+    source_class_name)
+from serpent.codegen.preprocess import default_value_for
+from serpent.codegen.stack_depth import instructions_of, max_locals_count, max_stack_depth
 from serpent.codegen.byte_utils import *
+from serpent.errors import CompilerError
+from serpent.timings import trace
 
 
 ACC_PUBLIC = 0x0001
+ACC_PRIVATE = 0x0002
 ACC_SUPER = 0x0020
 ACC_STATIC = 0x0008
+ACC_FINAL = 0x0010
 ACC_VARARGS = 0x0080
+ACC_INTERFACE = 0x0200
+ACC_ABSTRACT = 0x0400
+
+MAX_CODE_LENGTH = 65535
+"""Наибольший размер кода метода в байтах, который допускает JVM"""
 
 
 @dataclass(frozen=True)
@@ -39,6 +72,8 @@ class ClassFile:
     super_class: int
     fields_table: FieldsTable
     methods_table: MethodsTable
+    interfaces: list[int] = field(default_factory=list)
+    """Индексы констант Class реализуемых интерфейсов"""
 
     @property
     def magic(self) -> int:
@@ -50,7 +85,7 @@ class ClassFile:
     
     @property
     def interfaces_count(self) -> int:
-        return 0
+        return len(self.interfaces)
     
     @property
     def fields_count(self) -> int:
@@ -65,72 +100,18 @@ class ClassFile:
         return 0
     
     def to_bytes(self) -> bytes:
-        # Получаем байтовое представление константного пула.
-        # Предполагается, что у объекта constant_pool есть метод to_bytes().
-        cp_bytes = self.constant_pool.to_bytes()
-
-        # Кодирование таблицы полей.
-        # Каждый элемент таблицы полей кодируется следующим образом:
-        #   u2 access_flags, u2 name_index, u2 descriptor_index, u2 attributes_count (обычно 0)
-        fields_bytes = b"".join(
-            merge_bytes(
-                u2(field.access_flags),
-                u2(field.name_index),
-                u2(field.descriptor_index),
-                u2(field.attributes_count)
-            )
-            for field in self.fields_table.fields
-        )
-
-        # Функция для кодирования атрибута Code метода.
-        # Формат атрибута Code (таблица 5 спецификации):
-        #   u2 attribute_name_index,
-        #   u4 attribute_length (12 + длина кода),
-        #   u2 max_stack,
-        #   u2 max_locals,
-        #   u4 code_length,
-        #   u1[code_length] – байт-код,
-        #   u2 exception_table_length (0),
-        #   u2 attributes_count (0)
-        def encode_code_attribute(code: CodeAttribute) -> bytes:
-            # Вычисляем длину байткода как сумму размеров всех команд
-            code_length = sum(cmd.size() for cmd in code.bytecode)
-            # Длина атрибута: 2 (max_stack) + 2 (max_locals) + 4 (code_length) +
-            # code_length + 2 (exception_table_length) + 2 (attributes_count) = 12 + code_length
-            attribute_length = 12 + code_length
-            code_bytes = merge_bytes(*(cmd.to_bytes() for cmd in code.bytecode))
-            return merge_bytes(
-                u2(code.attribute_name_index),
-                u4(attribute_length),
-                u2(code.max_stack),
-                # Вместо свойства code.max_locals (в нашем определении – raise)
-                # используем количество локальных переменных из local_table
-                u2(code.local_table.count),
-                u4(code_length),
-                code_bytes,
-                u2(code.exception_table_length),
-                u2(code.attributes_count)
-            )
-
-        # Кодирование таблицы методов.
-        # Каждый метод кодируется так:
-        #   u2 access_flags,
-        #   u2 name_index,
-        #   u2 descriptor_index,
-        #   u2 attributes_count (обычно 1, если есть Code),
-        #   затем идут атрибуты метода (у нас только Code)
-        methods_bytes = b"".join(
-            merge_bytes(
-                u2(method.access_flags),
-                u2(method.name_index),
-                u2(method.descriptor_index),
-                u2(method.attributes_count),
-                encode_code_attribute(method.code)
-            )
-            for method in self.methods_table.methods
-        )
-
-        # Собираем итоговое байтовое представление class‑файла.
+        writer = ByteWriter()
+        self.write(writer)
+        return writer.getvalue()
+
+    def write_file(self, path: str | os.PathLike) -> None:
+        """Записывает class-файл в файл path"""
+        writer = ByteWriter()
+        self.write(writer)
+        with open(path, "wb") as f:
+            f.write(writer.buffer)
+
+    def write(self, writer: ByteWriter) -> None:
         # Порядок полей согласно спецификации:
         #   u4 magic,
         #   u2 minor_version,
@@ -147,22 +128,43 @@ class ClassFile:
         #   u2 methods_count,
         #   methods_table,
         #   u2 attributes_count
-        return merge_bytes(
-            u4(self.magic),
-            u2(self.minor_version),
-            u2(self.major_version),
-            u2(self.cp_count_plus_one),
-            cp_bytes,
-            u2(self.access_flags),
-            u2(self.this_class),
-            u2(self.super_class),
-            u2(self.interfaces_count),
-            u2(self.fields_table.count),
-            fields_bytes,
-            u2(self.methods_table.count),
-            methods_bytes,
-            u2(self.attributes_count)
-        )
+        writer.u4(self.magic)
+        writer.u2(self.minor_version)
+        writer.u2(self.major_version)
+        writer.u2(self.cp_count_plus_one)
+        self.constant_pool.write(writer)
+        writer.u2(self.access_flags)
+        writer.u2(self.this_class)
+        writer.u2(self.super_class)
+        writer.u2(self.interfaces_count)
+        for index in self.interfaces:
+            writer.u2(index)
+
+        # Каждый элемент таблицы полей кодируется следующим образом:
+        #   u2 access_flags, u2 name_index, u2 descriptor_index, u2 attributes_count (обычно 0)
+        writer.u2(self.fields_table.count)
+        for field in self.fields_table.fields:
+            writer.u2(field.access_flags)
+            writer.u2(field.name_index)
+            writer.u2(field.descriptor_index)
+            writer.u2(field.attributes_count)
+
+        # Каждый метод кодируется так:
+        #   u2 access_flags,
+        #   u2 name_index,
+        #   u2 descriptor_index,
+        #   u2 attributes_count (1, если есть Code, у абстрактных методов 0),
+        #   затем идут атрибуты метода (у нас только Code)
+        writer.u2(self.methods_table.count)
+        for method in self.methods_table.methods:
+            writer.u2(method.access_flags)
+            writer.u2(method.name_index)
+            writer.u2(method.descriptor_index)
+            writer.u2(method.attributes_count)
+            if method.code is not None:
+                method.code.write(writer, self.constant_pool)
+
+        writer.u2(self.attributes_count)
 
 
 @dataclass(frozen=True)
@@ -184,8 +186,15 @@ class FieldsTable:
                   tfield: TField,
                   constant_pool: ConstPool,
                   access_flags: int = ACC_PUBLIC) -> None:
-        name_index = constant_pool.add_utf8(tfield.name)
-        descriptor = get_type_descriptor(tfield.expr_type)
+        self.add_raw_field(
+            tfield.name, get_type_descriptor(tfield.expr_type), constant_pool, access_flags)
+
+    def add_raw_field(self,
+                      name: str,
+                      descriptor: str,
+                      constant_pool: ConstPool,
+                      access_flags: int = ACC_PUBLIC) -> None:
+        name_index = constant_pool.add_utf8(name)
         descriptor_index = constant_pool.add_utf8(descriptor)
         field_info = FieldInfo(access_flags, name_index, descriptor_index)
         self.fields.append(field_info)
@@ -208,17 +217,49 @@ class CodeAttribute:
         attribute_length = 12 + self.code_length
         return attribute_length
     
-    @property
-    def max_stack(self) -> int:
-        return 1024
+    def max_stack(self, constant_pool: ConstPool) -> int:
+        """Наибольшая глубина стека операндов. Таблица констант нужна,
+        чтобы узнать дескрипторы вызываемых методов и полей
+        """
+        return max_stack_depth(instructions_of(self.bytecode, constant_pool))
     
-    @property
-    def max_locals(self) -> int:
-        raise self.local_table.count
+    def max_locals(self, constant_pool: ConstPool) -> int:
+        return max_locals_count(
+            instructions_of(self.bytecode, constant_pool), self.local_table.count)
+
+    def write(self, writer: ByteWriter, constant_pool: ConstPool) -> None:
+        """Записывает атрибут Code (таблица 5 спецификации):
+            u2 attribute_name_index,
+            u4 attribute_length (12 + длина кода),
+            u2 max_stack,
+            u2 max_locals,
+            u4 code_length,
+            u1[code_length] – байт-код,
+            u2 exception_table_length (0),
+            u2 attributes_count (0)
+
+        Длина кода становится известна только после записи команд,
+        поэтому обе длины дописываются на зарезервированные места
+        """
+        writer.u2(self.attribute_name_index)
+        attribute_length_position = writer.reserve_u4()
+        instructions = instructions_of(self.bytecode, constant_pool)
+        writer.u2(max_stack_depth(instructions))
+        writer.u2(max_locals_count(instructions, self.local_table.count))
+        code_length_position = writer.reserve_u4()
+        code_start = len(writer)
+        for cmd in self.bytecode:
+            cmd.write(writer)
+        code_length = len(writer) - code_start
+        writer.u2(self.exception_table_length)
+        writer.u2(self.attributes_count)
+
+        writer.patch_u4(code_length_position, code_length)
+        writer.patch_u4(attribute_length_position, 12 + code_length)
     
     @property
     def code_length(self) -> int:
-        raise sum(cmd.size() for cmd in self.bytecode)
+        return sum(cmd.size() for cmd in self.bytecode)
     
     @property
     def exception_table_length(self) -> int:
@@ -234,11 +275,12 @@ class MethodInfo:
     access_flags: int
     name_index: int
     descriptor_index: int
-    code: CodeAttribute
+    code: CodeAttribute | None
+    """Код метода, у абстрактных методов интерфейсов его нет"""
 
     @property
     def attributes_count(self) -> int:
-        return 1
+        return 0 if self.code is None else 1
     
 
 def count_method_args(descriptor: str) -> int:
@@ -276,7 +318,14 @@ class MethodsTable:
                    tmethod: TMethod,
                    fq_class_name: str,
                    constant_pool: ConstPool,
-                   access_flags: int = ACC_PUBLIC) -> None:
+                   layout: JvmLayout,
+                   access_flags: int = ACC_PUBLIC,
+                   optimization_level: int = 0,
+                   savings: list[MethodSavings] | None = None) -> None:
+        """Генерирует код метода, оптимизирует его на уровне optimization_level
+        и добавляет метод в таблицу. Если задан savings, в него записывается
+        размер кода метода до и после оптимизации
+        """
         name_index = constant_pool.add_utf8(tmethod.method_name)
         descriptor = get_method_descriptor([typ for (_, typ) in tmethod.parameters], tmethod.return_type)
         descriptor_index = constant_pool.add_utf8(descriptor)
@@ -288,8 +337,27 @@ class MethodsTable:
             for i, param in enumerate(tmethod.parameters, start=start)]
         local_table = LocalTable(variables)
 
-        bytecode = generate_bytecode_for_method(tmethod, fq_class_name, constant_pool, local_table)
-        code = CodeAttribute(code_name_index, local_table, bytecode)
+        with trace("generate_bytecode_for_method"):
+            bytecode = generate_bytecode_for_method(
+                tmethod, fq_class_name, constant_pool, local_table, layout)
+        if optimization_level > 0:
+            with trace("peephole"):
+                optimized = optimize(bytecode, constant_pool, optimization_level)
+            if savings is not None:
+                savings.append(
+                    MethodSavings.of(fq_class_name, tmethod.method_name, bytecode, optimized))
+            bytecode = optimized
+        with trace("assemble"):
+            bytecode = assemble(bytecode)
+        # Остальные слоты max_locals учитывает по командам: после
+        # оптимизации часть локальных переменных может не использоваться
+        parameters = LocalTable(local_table.variables[:len(tmethod.parameters)])
+        code = CodeAttribute(code_name_index, parameters, bytecode)
+        if code.code_length > MAX_CODE_LENGTH:
+            raise CompilerError(
+                f"Method '{tmethod.method_name}' of class '{fq_class_name}' is too large: "
+                f"{code.code_length} bytes of bytecode, the JVM limit is {MAX_CODE_LENGTH}",
+                source=COMPILER_NAME)
         method_info = MethodInfo(access_flags, name_index, descriptor_index, code)
 
         already_in = False
@@ -303,100 +371,67 @@ class MethodsTable:
             self.methods.append(method_info)
 
 
-def is_builtin_type(type_name: str) -> bool:
-    return (type_name in ["INTEGER", "REAL", "CHARACTER", "STRING", "BOOLEAN"]
-            or type_name.startswith("ARRAY["))
-
-
-def make_default_constructor_for_builtin_type(
-        builtin_type_name: str, pool: ConstPool) -> MethodInfo:
-    desc_mapping = {
-        "STRING": f"(Ljava/lang/String;)V",
-        "CHARACTER": f"(Ljava/lang/String;)V",
-        "INTEGER": f"(I)V",
-        "REAL": f"(F)V",
-        "BOOLEAN": f"(I)V"
-    }
-
-    if builtin_type_name.startswith("ARRAY["):
-        desc = f"(II)V"
-    else:
-        desc = desc_mapping[builtin_type_name]
-
-    fq_class_name = add_package_prefix(builtin_type_name)
+def make_default_constructor(
+        type_name: str,
+        pool: ConstPool,
+        super_class_name: str = ROOT_CLASS_NAME,
+        fields: list[TField] | None = None) -> MethodInfo:
+    return make_constructor(type_name, "()V", pool, super_class_name, fields)
+
+
+def make_constructor(
+        type_name: str,
+        desc: str,
+        pool: ConstPool,
+        super_class_name: str = ROOT_CLASS_NAME,
+        fields: list[TField] | None = None) -> MethodInfo:
+    """Создает конструктор с дескриптором desc, который вызывает
+    конструктор суперкласса без параметров, заполняет поле состояния
+    встроенного класса (значением-параметром или новым объектом holder)
+    и присваивает полям fields значения по умолчанию
+    """
+    fq_class_name = add_package_prefix(type_name)
 
     constructor_index = pool.add_methodref(
         method_name="<init>",
         desc=desc,
         fq_class_name=fq_class_name)
 
-    general_constructor_index = pool.add_methodref(
+    super_constructor_index = pool.add_methodref(
         method_name="<init>",
-        desc=desc,
-        fq_class_name=add_package_prefix("GENERAL"))
-
-    bytecode = []
-    # Загружаем указатель на текущий объект (this)
-    bytecode.append(Aload(0))
-    # В зависимости от дескриптора загружаем дополнительные параметры:
-    if desc == "(Ljava/lang/String;)V":
-        # Параметр типа String находится в локальной переменной 1
-        bytecode.append(Aload(1))
-    elif desc == "(I)V":
-        # Параметр типа int находится в локальной переменной 1
-        bytecode.append(Iload(1))
-    elif desc == "(F)V":
-        # Параметр типа float находится в локальной переменной 1
-        bytecode.append(Fload(1))
-    elif desc == "(II)V":
-        # Два параметра типа int находятся в локальных переменных 1 и 2
-        bytecode.append(Iload(1))
-        bytecode.append(Iload(2))
-    # Для дескриптора "()V" дополнительных параметров нет
-
-    bytecode.append(InvokeSpecial(general_constructor_index))
-    bytecode.append(Return())
-
-    # Словарь для определения необходимого количества локальных переменных для каждого конструктора
-    required_locals = {
-         "(Ljava/lang/String;)V": 1,  # 1 параметр
-         "(I)V": 1,                   # 1 параметр
-         "(F)V": 1,                   # 1 параметр
-         "(II)V": 2,                  # 2 параметра
-         "()V": 0                     # никаких параметров
-    }
-    variables = [None] * required_locals[desc]
-    code = CodeAttribute(pool.add_utf8("Code"), LocalTable(variables), bytecode)
-
-    methodref = pool.get_by_index(constructor_index)
-    nat_index = methodref.name_and_type_index
-    nat = pool.get_by_index(nat_index)
-
-    name_index = nat.name_const_index
-    descriptor_index = nat.type_const_index
+        desc="()V",
+        fq_class_name=add_package_prefix(super_class_name))
 
-    return MethodInfo(ACC_PUBLIC, name_index, descriptor_index, code)
-
-
-def make_default_constructor(type_name: str, pool: ConstPool) -> MethodInfo:
-    fq_class_name = add_package_prefix(type_name)
-    desc = "()V"
+    bytecode = [Aload(0), InvokeSpecial(super_constructor_index)]
 
-    constructor_index = pool.add_methodref(
-        method_name="<init>",
-        desc=desc,
-        fq_class_name=fq_class_name)
+    state = value_state(type_name)
+    if state is not None and (desc != "()V" or state.holder is not None):
+        field_index = pool.add_fieldref(state.field_name, state.descriptor, fq_class_name)
+        bytecode.append(Aload(0))
+        match desc:
+            case "()V":
+                holder_index = pool.add_class(state.holder)
+                holder_constructor_index = pool.add_methodref(
+                    method_name="<init>",
+                    desc="()V",
+                    fq_class_name=state.holder)
+                bytecode.extend([New(holder_index), Dup(), InvokeSpecial(holder_constructor_index)])
+            case "(I)V":
+                bytecode.append(Iload(1))
+            case "(F)V":
+                bytecode.append(Fload(1))
+            case _:
+                bytecode.append(Aload(1))
+        bytecode.append(PutField(field_index))
+
+    for tfield in fields or []:
+        bytecode.extend(
+            generate_bytecode_for_default_value(tfield, fq_class_name, pool))
 
-    general_constructor_index = pool.add_methodref(
-        method_name="<init>",
-        desc=desc,
-        fq_class_name=add_package_prefix(ROOT_CLASS_NAME))
+    bytecode.append(Return())
 
-    bytecode = [
-        Aload(0),
-        InvokeSpecial(general_constructor_index),
-        Return() ]
-    code = CodeAttribute(pool.add_utf8("Code"), LocalTable(), bytecode)
+    variables = [None] * count_method_args(desc)
+    code = CodeAttribute(pool.add_utf8("Code"), LocalTable(variables), bytecode)
 
     methodref = pool.get_by_index(constructor_index)
     nat_index = methodref.name_and_type_index
@@ -408,86 +443,158 @@ def make_default_constructor(type_name: str, pool: ConstPool) -> MethodInfo:
     return MethodInfo(ACC_PUBLIC, name_index, descriptor_index, code)
 
 
-def make_default_constructors_for_general_class(pool: ConstPool) -> list[MethodInfo]:
-    descs = [
-        "(Ljava/lang/String;)V",
-        "(I)V",
-        "(F)V",
-        "(II)V",
-        "()V"
+VALUE_CACHE_CLASS_NAME = "ValueCache"
+"""Класс RTL с границами кэша объектов INTEGER"""
+
+VALUE_CACHE_FIELD = "value_cache"
+"""Статическое поле INTEGER с массивом заранее созданных объектов"""
+
+VALUE_CACHE_DESCRIPTOR = "[" + get_type_descriptor(Type("INTEGER"))
+
+
+def value_cache_bound(bound: str, pool: ConstPool) -> ByteCommand:
+    field_index = pool.add_fieldref(
+        f"INTEGER_{bound}", "I", add_package_prefix(VALUE_CACHE_CLASS_NAME))
+    return GetStatic(field_index)
+
+
+def make_value_cache(pool: ConstPool) -> list[ByteCommand]:
+    """Создает объекты INTEGER для всех чисел из диапазона кэша:
+
+        cache = new INTEGER[SIZE];
+        for (i = 0; i < cache.length; i++) cache[i] = new INTEGER(LOW + i);
+        value_cache = cache;
+    """
+    fq_class_name = pool.fq_class_name
+    class_index = pool.add_class(fq_class_name)
+    constructor_index = pool.add_methodref("<init>", "(I)V", fq_class_name)
+    cache_index = pool.add_fieldref(
+        VALUE_CACHE_FIELD, VALUE_CACHE_DESCRIPTOR, fq_class_name)
+
+    body, condition = Label(), Label()
+    return [
+        value_cache_bound("SIZE", pool), AnewArray(class_index), Astore(0),
+        Iconst_i(0), Istore(1),
+        Branch(Goto, condition),
+        body,
+        Aload(0), Iload(1),
+        New(class_index), Dup(), value_cache_bound("LOW", pool), Iload(1), Iadd(),
+        InvokeSpecial(constructor_index),
+        Aastore(),
+        Iload(1), Iconst_i(1), Iadd(), Istore(1),
+        condition,
+        Iload(1), Aload(0), ArrayLength(), Branch(IfIcmplt, body),
+        Aload(0), PutStatic(cache_index),
     ]
 
-    fq_class_name = add_package_prefix(ROOT_CLASS_NAME)
-    fq_object_name = add_package_prefix(PLATFORM_CLASS_NAME)
-
-    # Словарь для определения необходимого количества локальных переменных для каждого конструктора
-    required_locals = {
-         "(Ljava/lang/String;)V": 1,  # 1 параметр
-         "(I)V": 1,                   # 1 параметр
-         "(F)V": 1,                   # 1 параметр
-         "(II)V": 2,                  # 2 параметра
-         "()V": 0                     # никаких параметров
-    }
-
-    methods = []
-    for desc in descs:
-        constructor_index = pool.add_methodref(
-            method_name="<init>",
-            desc=desc,
-            fq_class_name=fq_class_name)
-
-        platform_constructor_index = pool.add_methodref(
-            method_name="<init>",
-            desc=desc,
-            fq_class_name=fq_object_name)
-
-        bytecode = []
-        # Загружаем указатель на текущий объект (this)
-        bytecode.append(Aload(0))
 
-        # В зависимости от дескриптора загружаем дополнительные параметры:
-        if desc == "(Ljava/lang/String;)V":
-            # Параметр типа String находится в локальной переменной 1
-            bytecode.append(Aload(1))
-        elif desc == "(I)V":
-            # Параметр типа int находится в локальной переменной 1
-            bytecode.append(Iload(1))
-        elif desc == "(F)V":
-            # Параметр типа float находится в локальной переменной 1
-            bytecode.append(Fload(1))
-        elif desc == "(II)V":
-            # Два параметра типа int находятся в локальных переменных 1 и 2
-            bytecode.append(Iload(1))
-            bytecode.append(Iload(2))
-        elif desc == "()V":
-            pass
-        else: assert False, desc
-        # Для дескриптора "()V" дополнительных параметров нет
-
-        bytecode.append(InvokeSpecial(platform_constructor_index))
-
-        # Для объектов дополнительно необходимо проинициализировать
-        # значения всех полей по умолчанию
-        if desc == "()V":
-            set_default_values_index = pool.find_methodref("set_default_values")
-            bytecode.append(Aload(0))
-            bytecode.append(InvokeVirtual(set_default_values_index))
-
-        bytecode.append(Return())
-
-        variables = [None] * required_locals[desc]
-        code = CodeAttribute(pool.add_utf8("Code"), LocalTable(variables), bytecode)
-
-        methodref = pool.get_by_index(constructor_index)
-        nat = pool.get_by_index(methodref.name_and_type_index)
-
-        name_index = nat.name_const_index
-        descriptor_index = nat.type_const_index
-
-        methods.append(
-            MethodInfo(ACC_PUBLIC, name_index, descriptor_index, code))
+def make_value_factory(type_name: str, pool: ConstPool) -> MethodInfo:
+    """Создает статический метод valueOf встроенного класса, через который
+    упаковываются значения Java (см. `pack_builtin_type`). Для BOOLEAN он
+    возвращает общие объекты True и False, для пустой строки - общее значение
+    по умолчанию STRING, для чисел из кэша INTEGER - заранее созданный объект,
+    а в остальных случаях создает новый объект
+    """
+    fq_class_name = pool.fq_class_name
+    variables = [(None, 0)]
+
+    match type_name:
+        case "BOOLEAN":
+            false = Label()
+            lookup = [Iload(0), Branch(Ifeq, false), load_boolean(True, pool), Areturn(),
+                      false, load_boolean(False, pool), Areturn()]
+        case "STRING":
+            is_empty_index = pool.add_methodref("isEmpty", "()Z", "java/lang/String")
+            default_index = pool.add_fieldref(
+                shared_default_field("STRING"),
+                get_type_descriptor(Type("STRING")),
+                add_package_prefix(ROOT_CLASS_NAME))
+            create = Label()
+            lookup = [Aload(0), InvokeVirtual(is_empty_index), Branch(Ifeq, create),
+                      GetStatic(default_index), Areturn(), create]
+        case "INTEGER":
+            cache_index = pool.add_fieldref(
+                VALUE_CACHE_FIELD, VALUE_CACHE_DESCRIPTOR, fq_class_name)
+            # i = value - LOW; if (i >= 0 && i < SIZE) return value_cache[i]
+            create = Label()
+            lookup = [
+                Iload(0), value_cache_bound("LOW", pool), Isub(), Istore(1),
+                Iload(1), Branch(Iflt, create),
+                Iload(1), value_cache_bound("SIZE", pool), Branch(IfIcmpge, create),
+                GetStatic(cache_index), Iload(1), Aaload(), Areturn(),
+                create,
+            ]
+            variables.append((None, 1))
+        case _:
+            lookup = []
+
+    bytecode = lookup
+    if type_name != "BOOLEAN":
+        bytecode.extend(generate_boxed_const(type_name, load_value(type_name, 0), pool))
+        bytecode.append(Areturn())
+
+    code = CodeAttribute(pool.add_utf8("Code"), LocalTable(variables, is_static=True), assemble(bytecode))
+    return MethodInfo(
+        ACC_PUBLIC | ACC_STATIC,
+        pool.add_utf8(VALUE_FACTORY_NAME),
+        pool.add_utf8(value_factory_descriptor(type_name)),
+        code)
+
+
+def load_value(type_name: str, variable_index: int) -> ByteCommand:
+    match value_state(type_name).descriptor:
+        case "I": return Iload(variable_index)
+        case "F": return Fload(variable_index)
+        case _: return Aload(variable_index)
+
+
+def make_static_initializer(class_name: str, pool: ConstPool) -> MethodInfo | None:
+    """Создает статический инициализатор класса, который один раз создает
+    объекты-литералы класса (см. `ConstPool.add_literal`). У GENERAL он
+    также создает объекты True и False и общие значения по умолчанию
+    встроенных типов, у INTEGER - кэш объектов, см. `make_value_cache`.
+    Если создавать нечего, инициализатор не нужен
+    """
+    fq_class_name = pool.fq_class_name
+    bytecode = []
+    variables = []
+
+    if class_name == "INTEGER":
+        bytecode.extend(make_value_cache(pool))
+        variables = [(None, 0), (None, 1)]
+
+    if class_name == ROOT_CLASS_NAME:
+        boolean = Type("BOOLEAN")
+        for value in [True, False]:
+            bytecode.extend(generate_boxed_const("BOOLEAN", push_bool(value), pool))
+            field_index = pool.add_fieldref(
+                boolean_field(value), get_type_descriptor(boolean), fq_class_name)
+            bytecode.append(PutStatic(field_index))
+
+        for type_name in SHARED_DEFAULT_TYPES:
+            typ = Type(type_name)
+            default = default_value_for(typ)
+            if type_name == "BOOLEAN":
+                bytecode.append(load_boolean(default.value, pool))
+            else:
+                bytecode.extend(generate_bytecode_for_literal(type_name, default.value, pool))
+            field_index = pool.add_fieldref(
+                shared_default_field(type_name), get_type_descriptor(typ), fq_class_name)
+            bytecode.append(PutStatic(field_index))
+
+    for (type_name, _), (field_name, value) in pool.literals.items():
+        bytecode.extend(generate_bytecode_for_literal(type_name, value, pool))
+        field_index = pool.add_fieldref(
+            field_name, get_type_descriptor(Type(type_name)), fq_class_name)
+        bytecode.append(PutStatic(field_index))
+
+    if not bytecode:
+        return None
+    bytecode.append(Return())
 
-    return methods
+    code = CodeAttribute(pool.add_utf8("Code"), LocalTable(variables, is_static=True), assemble(bytecode))
+    return MethodInfo(
+        ACC_STATIC, pool.add_utf8("<clinit>"), pool.add_utf8("()V"), code)
 
 
 def make_class_file(
@@ -495,16 +602,19 @@ def make_class_file(
         rest_classes: list[TClass],
         minor_version: int,
         major_version: int,
-        entry_point_method: str | None = None) -> ClassFile:
-    constant_pool = make_const_pool(current_class, rest_classes)
-
-    if current_class.class_name == ROOT_CLASS_NAME:
-        fq_general_class_name = add_package_prefix(PLATFORM_CLASS_NAME)
-    else:
-        fq_general_class_name = add_package_prefix(ROOT_CLASS_NAME)
-
-    constant_pool.add_class(fq_general_class_name)
-    super_class_index = constant_pool.find_class(fq_general_class_name)
+        entry_point_method: str | None = None,
+        reference_driven: bool = True,
+        layout: JvmLayout | None = None,
+        optimization_level: int = 0,
+        savings: list[MethodSavings] | None = None) -> ClassFile:
+    layout = layout or JvmLayout()
+    with trace("make_const_pool"):
+        constant_pool = make_const_pool(
+            current_class, rest_classes, reference_driven=reference_driven)
+
+    super_class_name = layout.super_class(current_class.class_name)
+    super_class_index = constant_pool.add_class(
+        add_package_prefix(super_class_name))
 
     fields_table = FieldsTable()
     for field in current_class.fields:
@@ -513,21 +623,78 @@ def make_class_file(
     fq_class_name = add_package_prefix(current_class.class_name)
     methods_table = MethodsTable()
 
+    # Встроенные классы хранят значение Java в собственном поле
+    state = value_state(current_class.class_name)
+    if state is not None:
+        fields_table.add_raw_field(state.field_name, state.descriptor, constant_pool)
+
+    # Значения по умолчанию полям класса присваивает его
+    # конструктор без параметров, через который создаются объекты.
+    # Объекты INTEGER, REAL, BOOLEAN, STRING и CHARACTER создаются
+    # только из значений Java, поэтому у них есть лишь такой конструктор
     if current_class.class_name == ROOT_CLASS_NAME:
-        methods = make_default_constructors_for_general_class(
-            constant_pool)
-        methods_table.methods.extend(methods)
-    elif is_builtin_type(current_class.class_name):
-        default_constructor = make_default_constructor_for_builtin_type(
-            current_class.class_name, constant_pool)
-        methods_table.methods.append(default_constructor)
+        methods_table.methods.append(
+            make_default_constructor(ROOT_CLASS_NAME, constant_pool, PLATFORM_CLASS_NAME))
+        shared_fields = [boolean_field(True), boolean_field(False)]
+        for field_name in shared_fields:
+            fields_table.add_field(
+                TField(Type("BOOLEAN"), field_name),
+                constant_pool,
+                ACC_PUBLIC | ACC_STATIC | ACC_FINAL)
+        for type_name in SHARED_DEFAULT_TYPES:
+            fields_table.add_field(
+                TField(Type(type_name), shared_default_field(type_name)),
+                constant_pool,
+                ACC_PUBLIC | ACC_STATIC | ACC_FINAL)
+    elif current_class.class_name in BUILTIN_CONSTRUCTORS:
+        methods_table.methods.append(
+            make_constructor(
+                current_class.class_name,
+                BUILTIN_CONSTRUCTORS[current_class.class_name],
+                constant_pool,
+                super_class_name))
+        methods_table.methods.append(
+            make_value_factory(current_class.class_name, constant_pool))
+        if current_class.class_name == "INTEGER":
+            fields_table.add_raw_field(
+                VALUE_CACHE_FIELD,
+                VALUE_CACHE_DESCRIPTOR,
+                constant_pool,
+                ACC_PRIVATE | ACC_STATIC | ACC_FINAL)
     else:
-        default_constructor = make_default_constructor(
-            current_class.class_name, constant_pool)
-        methods_table.methods.append(default_constructor)
+        methods_table.methods.append(
+            make_default_constructor(
+                current_class.class_name,
+                constant_pool,
+                super_class_name,
+                current_class.fields))
 
     for method in current_class.methods:
-        methods_table.add_method(method, fq_class_name, constant_pool, ACC_PUBLIC)
+        methods_table.add_method(
+            method, fq_class_name, constant_pool, layout, ACC_PUBLIC,
+            optimization_level=optimization_level,
+            savings=savings)
+
+    # Литералы собираются при генерации методов, поэтому
+    # их поля и инициализатор создаются после всех методов
+    for (type_name, _), (field_name, _) in constant_pool.literals.items():
+        fields_table.add_field(
+            TField(Type(type_name), field_name),
+            constant_pool,
+            ACC_PRIVATE | ACC_STATIC | ACC_FINAL)
+    static_initializer = make_static_initializer(current_class.class_name, constant_pool)
+    if static_initializer is not None:
+        methods_table.methods.append(static_initializer)
+
+    interfaces = []
+    if layout.per_class and current_class.class_name != ROOT_CLASS_NAME:
+        classes = {cls.class_name: cls for cls in rest_classes}
+        classes[current_class.class_name] = current_class
+        methods_table.methods.extend(
+            make_inherited_methods(current_class, classes, layout, constant_pool))
+        interfaces = [
+            constant_pool.add_class(add_package_prefix(interface_name(name)))
+            for name in layout.interfaces[current_class.class_name]]
 
     this_class_index = constant_pool.add_class(fq_class_name)
 
@@ -550,12 +717,12 @@ def make_class_file(
             method_name="main",
             desc="([Ljava/lang/String;)V",
             fq_class_name=root_class_name)
-        root_class_index = constant_pool.find_class(root_class_name)
-        init_index = constant_pool.find_methodref(
+        root_class_index = constant_pool.add_class(root_class_name)
+        init_index = constant_pool.add_methodref(
             method_name="<init>",
             fq_class_name=root_class_name,
             desc="()V")
-        entry_point_index = constant_pool.find_methodref(
+        entry_point_index = constant_pool.add_methodref(
             method_name=entry_point_method,
             fq_class_name=root_class_name,
             desc="()V")
@@ -602,4 +769,140 @@ def make_class_file(
         this_class=this_class_index,
         super_class=super_class_index,
         fields_table=fields_table,
+        methods_table=methods_table,
+        interfaces=interfaces)
+
+
+def own_features(tclass: TClass) -> tuple[list[TMethod], list[TField]]:
+    """Компоненты tclass, которые вызываются по его имени (T_m)"""
+    prefix = source_class_name(tclass.class_name) + "_"
+    return ([m for m in tclass.methods if m.method_name.startswith(prefix)],
+            [f for f in tclass.fields if f.name.startswith(prefix)])
+
+
+def make_method_info(
+        name: str,
+        desc: str,
+        bytecode: list[ByteCommand],
+        locals_count: int,
+        pool: ConstPool) -> MethodInfo:
+    code = CodeAttribute(
+        pool.add_utf8("Code"), LocalTable([None] * locals_count), bytecode)
+    return MethodInfo(ACC_PUBLIC, pool.add_utf8(name), pool.add_utf8(desc), code)
+
+
+def make_inherited_methods(
+        current_class: TClass,
+        classes: dict[str, TClass],
+        layout: JvmLayout,
+        pool: ConstPool) -> list[MethodInfo]:
+    """Создает методы, через которые к объекту current_class обращаются
+    по статическому типу его предков (режим hierarchy):
+
+    * методы чтения всех атрибутов класса и его предков;
+    * методы предков T_m, которых нет у класса, но есть его собственный
+      вариант компонента C_m: такой метод лишь вызывает C_m.
+      Без него вызов по типу T выполнил бы код, унаследованный
+      в JVM от T (или вовсе не нашел бы метода у интерфейса T)
+    """
+    class_name = current_class.class_name
+    fq_class_name = add_package_prefix(class_name)
+    prefix = source_class_name(class_name) + "_"
+    methods = {m.method_name: m for m in current_class.methods}
+    fields = {f.name: f for f in current_class.fields}
+
+    result = []
+    defined = set(methods)
+    for ancestor_name in [class_name] + layout.ancestors[class_name]:
+        ancestor = classes[ancestor_name]
+        ancestor_prefix = source_class_name(ancestor_name) + "_"
+        ancestor_methods, ancestor_fields = own_features(ancestor)
+
+        for tfield in ancestor_fields:
+            feature_name = tfield.name.removeprefix(ancestor_prefix)
+            own_field = fields.get(prefix + feature_name) or fields.get(tfield.name)
+            if tfield.name in defined or own_field is None:
+                continue
+            defined.add(tfield.name)
+            field_index = pool.add_fieldref(
+                own_field.name, get_type_descriptor(own_field.expr_type), fq_class_name)
+            result.append(
+                make_method_info(
+                    tfield.name,
+                    getter_descriptor(tfield.expr_type),
+                    [Aload(0), GetField(field_index), Areturn()],
+                    0,
+                    pool))
+
+        for tmethod in ancestor_methods:
+            feature_name = tmethod.method_name.removeprefix(ancestor_prefix)
+            own_method = methods.get(prefix + feature_name)
+            if (tmethod.method_name in defined
+                    or own_method is None
+                    or len(own_method.parameters) != len(tmethod.parameters)):
+                continue
+            defined.add(tmethod.method_name)
+            arguments_count = len(tmethod.parameters)
+            own_index = pool.add_methodref(
+                own_method.method_name,
+                method_descriptor(own_method),
+                fq_class_name)
+            bytecode = [Aload(i) for i in range(arguments_count + 1)]
+            bytecode.append(InvokeVirtual(own_index))
+            if tmethod.return_type.full_name == "<VOID>":
+                bytecode.append(Return())
+            else:
+                bytecode.append(Areturn())
+            result.append(
+                make_method_info(
+                    tmethod.method_name,
+                    method_descriptor(tmethod),
+                    bytecode,
+                    arguments_count,
+                    pool))
+
+    return result
+
+
+def method_descriptor(tmethod: TMethod) -> str:
+    return get_method_descriptor(
+        [typ for (_, typ) in tmethod.parameters], tmethod.return_type)
+
+
+def make_interface_file(
+        tclass: TClass,
+        minor_version: int,
+        major_version: int) -> ClassFile:
+    """Создает интерфейс T$Interface класса T (режим hierarchy):
+    в нем объявлены все методы T и методы чтения его атрибутов
+    """
+    fq_interface_name = add_package_prefix(interface_name(tclass.class_name))
+    constant_pool = ConstPool(fq_interface_name)
+    this_class_index = constant_pool.add_class(fq_interface_name)
+    super_class_index = constant_pool.add_class("java/lang/Object")
+
+    methods, fields = own_features(tclass)
+    signatures = {}
+    for tfield in fields:
+        signatures.setdefault(tfield.name, getter_descriptor(tfield.expr_type))
+    for tmethod in methods:
+        signatures.setdefault(tmethod.method_name, method_descriptor(tmethod))
+
+    methods_table = MethodsTable()
+    for name, desc in signatures.items():
+        methods_table.methods.append(
+            MethodInfo(
+                ACC_PUBLIC | ACC_ABSTRACT,
+                constant_pool.add_utf8(name),
+                constant_pool.add_utf8(desc),
+                code=None))
+
+    return ClassFile(
+        minor_version=minor_version,
+        major_version=major_version,
+        constant_pool=constant_pool,
+        access_flags=ACC_PUBLIC | ACC_INTERFACE | ACC_ABSTRACT,
+        this_class=this_class_index,
+        super_class=super_class_index,
+        fields_table=FieldsTable(),
         methods_table=methods_table)
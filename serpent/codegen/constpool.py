@@ -1,7 +1,7 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
-import struct
+from functools import lru_cache
 from typing import Iterable
 
 from serpent.errors import CompilerError
@@ -33,19 +33,60 @@ COMPILER_NAME = "serpent"
 """
 
 
+@dataclass(frozen=True)
+class ValueState:
+    """Состояние объекта встроенного класса (значение Java),
+    которое хранится в поле самого класса, а не в PLATFORM
+    """
+    field_name: str
+    descriptor: str
+    holder: str | None = None
+    """Класс Java, объект которого создает конструктор без параметров.
+    Если его нет, значение передается конструктору с дескриптором (desc)V
+    """
+
+
+VALUE_STATES = {
+    "INTEGER": ValueState("raw_int", "I"),
+    "BOOLEAN": ValueState("raw_int", "I"),
+    "REAL": ValueState("raw_float", "F"),
+    "STRING": ValueState("raw_string", "Ljava/lang/String;"),
+    "CHARACTER": ValueState("raw_string", "Ljava/lang/String;"),
+    "ARRAY": ValueState("raw_array", "Ljava/util/ArrayList;", "java/util/ArrayList"),
+    "PLAIN_TEXT_FILE": ValueState("raw_file", "Lcom/eiffel/TextFile;", "com/eiffel/TextFile"),
+}
+"""Классы, объекты которых хранят значение Java, и поля с этими значениями"""
+
+
 @dataclass(frozen=True)
 class ConstPool:
     """Таблица констант для конкретного класса Eiffel.
     Особенность данной таблицы (а точнее особенность методов поиска констант)
     заключается в отсутствии перегружаемых методов -- т.е. у каждого метода
-    уникальное имя, за счет этого поиск Methodref осуществляется проще
+    уникальное имя, за счет этого поиск Methodref осуществляется проще.
+
+    Помимо упорядоченного списка констант таблица хранит индекс: словарь,
+    отображающий ключ вида (вид константы, имя, дескриптор, владелец) в
+    первую добавленную константу с таким ключом. За счет этого поиск и
+    добавление констант выполняются за O(1), а результат (и порядок констант)
+    совпадает с линейным поиском по списку
     """
     fq_class_name: str
     """Полное квалифицированное имя класса, для которого составляется таблица"""
     constants: list[CONSTANT] = field(default_factory=list)
     """Список всех констант, которые встречаются в теле класса"""
+    lookup: dict[tuple, CONSTANT] = field(
+        default_factory=dict, repr=False, compare=False)
+    """Индекс констант по ключам, см. `lookup_keys`"""
+    literals: dict[tuple[str, str], tuple[str, object]] = field(
+        default_factory=dict, repr=False, compare=False)
+    """Объекты-литералы встроенных типов, которые класс создает один раз
+    в статическом инициализаторе: (тип, repr значения) -> (имя поля, значение)
+    """
 
     def __post_init__(self) -> None:
+        for constant in self.constants:
+            self.register(constant)
         self.add_class(self.fq_class_name)
 
     def __iter__(self) -> Iterable[CONSTANT]:
@@ -53,7 +94,14 @@ class ConstPool:
 
     def to_bytes(self) -> bytes:
         """Возвращает таблицу констант непосредственно в виде байтов"""
-        return b"".join(const.to_bytes() for const in self.constants)
+        writer = ByteWriter()
+        self.write(writer)
+        return writer.getvalue()
+
+    def write(self, writer: ByteWriter) -> None:
+        """Дописывает все константы таблицы в writer"""
+        for const in self.constants:
+            const.write(writer)
 
     @property
     def count(self) -> int:
@@ -68,8 +116,37 @@ class ConstPool:
         """Возвращает константу по ее индексу в таблице"""
         return self.constants[index - 1]
 
+    def register(self, constant: CONSTANT) -> None:
+        """Добавляет константу в индекс. Если по какому-то ключу
+        константа уже есть, то она остается: поиск всегда возвращает
+        первую подходящую константу, как и при просмотре списка
+        """
+        for key in lookup_keys(constant):
+            self.lookup.setdefault(key, constant)
+
+    def append(self, constant: CONSTANT) -> CONSTANT:
+        """Добавляет константу в конец таблицы и в индекс"""
+        self.constants.append(constant)
+        self.register(constant)
+        return constant
+
+    def add_literal(self, type_name: str, value: int | float | str) -> int:
+        """Возвращает номер Fieldref статического поля класса,
+        в котором хранится объект-литерал value типа type_name
+        """
+        # repr различает 0.0 и -0.0, которые равны как ключи словаря
+        key = (type_name, repr(value))
+        if key not in self.literals:
+            self.literals[key] = (f"literal_{len(self.literals)}", value)
+        field_name, _ = self.literals[key]
+        return self.add_fieldref(
+            field_name, get_type_descriptor(Type(type_name)), self.fq_class_name)
+
     def find_constant(self, predicate) -> CONSTANT | None:
-        """Возвращает первую константу, удовлетворяющую предикату"""
+        """Возвращает первую константу, удовлетворяющую предикату.
+        Выполняет линейный поиск, поэтому для типовых случаев
+        следует пользоваться методами find_*
+        """
         for constant in self.constants:
             if predicate(constant):
                 return constant
@@ -79,47 +156,36 @@ class ConstPool:
         """Ищет номер константы Methodref с заданным именем метода"""
         fq_class_name = fq_class_name or self.fq_class_name
 
-        desc_check = lambda fr: desc is None or fr.type == desc
-        methodref = self.find_constant(
-            lambda c: isinstance(c, CONSTANT_Methodref)
-                and c.method_name == method_name
-                and c.fq_class_name == fq_class_name
-                and desc_check(c))
+        if desc is None:
+            key = (CONSTANT_Methodref, method_name, fq_class_name)
+        else:
+            key = (CONSTANT_Methodref, method_name, fq_class_name, desc)
+        methodref = self.lookup.get(key)
         assert methodref is not None, f"{fq_class_name}: {method_name}"
 
         return methodref.index
     
     def find_fieldref(self, field_name: str, fq_class_name: str | None = None, desc: str | None = None) -> int:
         """Ищет номер константы Fieldref с заданным именем метода"""
-        desc_check = lambda fr: desc is None or fr.type == desc
-        fieldref = self.find_constant(
-            lambda c: isinstance(c, CONSTANT_Fieldref)
-                and c.field_name == field_name
-                and c.fq_class_name == fq_class_name
-                and desc_check(c))
-        
-        if fieldref is None:
-            fieldref = self.find_constant(
-            lambda c: isinstance(c, CONSTANT_Fieldref)
-                and c.field_name == field_name
-                and c.fq_class_name == self.fq_class_name
-                and desc_check(c))
+        def key_for(class_name: str | None) -> tuple:
+            if desc is None:
+                return (CONSTANT_Fieldref, field_name, class_name)
+            return (CONSTANT_Fieldref, field_name, class_name, desc)
 
+        fieldref = self.lookup.get(key_for(fq_class_name))
+        if fieldref is None:
+            fieldref = self.lookup.get(key_for(self.fq_class_name))
             assert fieldref is not None, f"{fq_class_name}: {field_name}"
 
         return fieldref.index
 
     def find_class(self, fq_class_name: str) -> int:
-        class_const = self.find_constant(
-            lambda c: isinstance(c, CONSTANT_Class)
-                and c.class_name == fq_class_name)
+        class_const = self.lookup.get((CONSTANT_Class, fq_class_name))
         assert class_const is not None, fq_class_name
         return class_const.index
     
     def find_string(self, text: str) -> int:
-        string_const = self.find_constant(
-            lambda c: isinstance(c, CONSTANT_String)
-                and c.text == text)
+        string_const = self.lookup.get((CONSTANT_String, text))
         assert string_const is not None, text
         return string_const.index
 
@@ -128,161 +194,156 @@ class ConstPool:
             method_name: str,
             desc: str,
             fq_class_name: str | None = None) -> int:
-        try:
-            methodref_index = self.find_methodref(method_name, fq_class_name)
-            constant: CONSTANT_Methodref = self.get_by_index(methodref_index)
-
-            if constant.type != desc:
-                class_index = self.add_class(fq_class_name)
-                nat_index = self.add_name_and_type(method_name, desc)
-                methodref = CONSTANT_Methodref(
-                    self.next_index,
-                    method_name,
-                    desc,
-                    fq_class_name,
-                    class_index,
-                    nat_index)
-                self.constants.append(methodref)
-                return methodref.index
-
-            return methodref_index
-        except AssertionError:
-            class_index = self.add_class(fq_class_name)
-            nat_index = self.add_name_and_type(method_name, desc)
-            methodref = CONSTANT_Methodref(
-                self.next_index,
-                method_name,
-                desc,
-                fq_class_name,
-                class_index,
-                nat_index)
-            self.constants.append(methodref)
+        # Первая константа с таким именем и классом переиспользуется,
+        # только если совпадает дескриптор, иначе добавляется новая
+        first = self.lookup.get(
+            (CONSTANT_Methodref, method_name, fq_class_name or self.fq_class_name))
+        if first is not None and first.type == desc:
+            return first.index
+
+        class_index = self.add_class(fq_class_name)
+        nat_index = self.add_name_and_type(method_name, desc)
+        methodref = CONSTANT_Methodref(
+            self.next_index,
+            method_name,
+            desc,
+            fq_class_name,
+            class_index,
+            nat_index)
+        return self.append(methodref).index
+
+    def add_interface_methodref(
+            self,
+            method_name: str,
+            desc: str,
+            fq_interface_name: str) -> int:
+        methodref = self.lookup.get(
+            (CONSTANT_InterfaceMethodref, method_name, fq_interface_name, desc))
+        if methodref is not None:
             return methodref.index
 
+        class_index = self.add_class(fq_interface_name)
+        nat_index = self.add_name_and_type(method_name, desc)
+        methodref = CONSTANT_InterfaceMethodref(
+            self.next_index,
+            method_name,
+            desc,
+            fq_interface_name,
+            class_index,
+            nat_index)
+        return self.append(methodref).index
+
     def add_fieldref(
             self,
             field_name: str,
             desc: str,
             fq_class_name: str | None = None) -> int:
-        try:
-            fieldref_index = self.find_fieldref(field_name, fq_class_name)
-            constant: CONSTANT_Fieldref = self.get_by_index(fieldref_index)
-
-            if constant.type != desc:
-                class_index = self.add_class(fq_class_name)
-                nat_index = self.add_name_and_type(field_name, desc)
-                fieldref = CONSTANT_Fieldref(
-                    self.next_index,
-                    field_name,
-                    desc,
-                    fq_class_name,
-                    class_index,
-                    nat_index)
-                self.constants.append(fieldref)
-                return fieldref.index
-
-            return fieldref_index
-        except AssertionError:
-            class_index = self.add_class(fq_class_name)
-            nat_index = self.add_name_and_type(field_name, desc)
-            fieldref = CONSTANT_Fieldref(
-                self.next_index,
-                field_name,
-                desc,
-                fq_class_name,
-                class_index,
-                nat_index)
-            self.constants.append(fieldref)
-            return fieldref.index
+        # Как и в find_fieldref, при отсутствии поля у заданного класса
+        # поиск продолжается среди полей текущего класса
+        first = self.lookup.get((CONSTANT_Fieldref, field_name, fq_class_name))
+        if first is None:
+            first = self.lookup.get(
+                (CONSTANT_Fieldref, field_name, self.fq_class_name))
+        if first is not None and first.type == desc:
+            return first.index
+
+        class_index = self.add_class(fq_class_name)
+        nat_index = self.add_name_and_type(field_name, desc)
+        fieldref = CONSTANT_Fieldref(
+            self.next_index,
+            field_name,
+            desc,
+            fq_class_name,
+            class_index,
+            nat_index)
+        return self.append(fieldref).index
 
     def add_name_and_type(self, name: str, type: str) -> int:
-        nat = self.find_constant(
-            lambda c: isinstance(c, CONSTANT_NameAndType)
-                and c.name == name
-                and c.type == type)
+        nat = self.lookup.get((CONSTANT_NameAndType, name, type))
         
         if nat is None:
             name_index = self.add_utf8(name)
             type_index = self.add_utf8(type)
-            nat = CONSTANT_NameAndType(
-                self.next_index, name, type, name_index, type_index)
-            self.constants.append(nat)
+            nat = self.append(CONSTANT_NameAndType(
+                self.next_index, name, type, name_index, type_index))
             
         return nat.index
 
     def add_class(self, class_name: str) -> int:
-        class_const = self.find_constant(
-            lambda c: isinstance(c, CONSTANT_Class)
-                and c.class_name == class_name)
+        class_const = self.lookup.get((CONSTANT_Class, class_name))
 
         if class_const is None:
             name_index = self.add_utf8(class_name)
-            class_const = CONSTANT_Class(
-                self.next_index, class_name, name_index)
-            self.constants.append(class_const)
+            class_const = self.append(CONSTANT_Class(
+                self.next_index, class_name, name_index))
             
         return class_const.index
 
     def add_utf8(self, text: str) -> int:
-        utf8_const = self.find_constant(
-            lambda c: isinstance(c, CONSTANT_Utf8)
-                and c.text == text)
+        utf8_const = self.lookup.get((CONSTANT_Utf8, text))
 
         if utf8_const is None:
-            utf8_const = CONSTANT_Utf8(self.next_index, text)
-            self.constants.append(utf8_const)
+            utf8_const = self.append(CONSTANT_Utf8(self.next_index, text))
 
         return utf8_const.index
 
     def add_string(self, text: str) -> int:
-        string_const = self.find_constant(
-            lambda c: isinstance(c, CONSTANT_String)
-                and c.text == text)
+        string_const = self.lookup.get((CONSTANT_String, text))
 
         if string_const is None:
             string_index = self.add_utf8(text)
-            string_const = CONSTANT_String(
-                self.next_index, text, string_index)
-            self.constants.append(string_const)
+            string_const = self.append(CONSTANT_String(
+                self.next_index, text, string_index))
             
         return string_const.index
 
     def add_integer(self, value: int) -> int:
-        integer_const = self.find_constant(
-            lambda c: isinstance(c, CONSTANT_Integer)
-                and c.const == value)
+        integer_const = self.lookup.get((CONSTANT_Integer, value))
 
         if integer_const is None:
-            integer_const = CONSTANT_Integer(
-                self.next_index, value)
-            self.constants.append(integer_const)
+            integer_const = self.append(CONSTANT_Integer(
+                self.next_index, value))
             
         return integer_const.index
 
     def add_float(self, value: float) -> int:
-        float_const = self.find_constant(
-            lambda c: isinstance(c, CONSTANT_Float)
-                and c.const == value)
+        float_const = self.lookup.get((CONSTANT_Float, value))
 
         if float_const is None:
-            float_const = CONSTANT_Float(
-                self.next_index, value)
-            self.constants.append(float_const)
+            float_const = self.append(CONSTANT_Float(
+                self.next_index, value))
             
         return float_const.index
         
 
-def make_const_pool(current: TClass, rest: list[TClass]) -> ConstPool:
+def make_const_pool(
+        current: TClass,
+        rest: list[TClass],
+        reference_driven: bool = True) -> ConstPool:
     """Создает таблицу констант для current класса.
-    Делает это неэффэективным, но простым способом: для гарантии того,
-    что любой встреченный метод уже был определен в каком-то из классов,
-    запихивает в таблицу констант каждого класса все константы (поля и методы)
-    из всех других классов
+
+    По умолчанию (reference_driven=True) таблица изначально содержит
+    только сам класс: все остальные константы добавляются генератором
+    байт-кода по мере того, как на них ссылаются инструкции, поэтому
+    в class-файл попадает лишь то, что в нем действительно используется.
+
+    При reference_driven=False используется старый, неэффективный, но простой
+    способ: для гарантии того, что любой встреченный метод уже был определен
+    в каком-то из классов, в таблицу констант каждого класса запихиваются
+    все константы (поля и методы) из всех других классов
     """
     pool = ConstPool(
         fq_class_name=add_package_prefix(
             current.class_name))
 
+    if reference_driven:
+        # Корректность alias внешних методов по-прежнему
+        # проверяется до генерации байт-кода
+        for method in current.methods:
+            if isinstance(method, TExternalMethod):
+                check_external_alias(method, pool)
+        return pool
+
     # Заполняем пулл констант всеми полями и методами
     # всех классов в системе (включая тот, для которого
     # составляется таблица констант)
@@ -310,17 +371,14 @@ def make_const_pool(current: TClass, rest: list[TClass]) -> ConstPool:
                     return_type=return_type,
                     parameters=parameters,
                     alias=alias):
-                parts = split_package_path(alias)
-                if len(parts) < 2:
-                    raise CompilerError(
-                        f"Alias '{alias}' is not a correct reference to a Java method, "
-                        f"see method '{method.method_name}' of class '{pool.fq_class_name}'",
-                        source=COMPILER_NAME)
+                parts = check_external_alias(method, pool)
                 # В обход всего и вся добавляем имя внешнего метода
                 java_method_name = parts[-1]
                 fq_class_name = make_fully_qualifed_name(parts[:-1])
                 external_method_type = get_external_method_descriptor(
-                    [param_type for (_, param_type) in parameters], return_type)
+                    [param_type for (_, param_type) in parameters],
+                    return_type,
+                    external_receiver(current.class_name, java_method_name))
                 pool.add_methodref(
                     java_method_name, external_method_type, fq_class_name)
             case TUserDefinedMethod(body=body):
@@ -340,23 +398,33 @@ def make_const_pool(current: TClass, rest: list[TClass]) -> ConstPool:
                         return_type=return_type,
                         parameters=parameters,
                         alias=alias):
-                    parts = split_package_path(alias)
-                    if len(parts) < 2:
-                        raise CompilerError(
-                            f"Alias '{alias}' is not a correct reference to a Java method, "
-                            f"see method '{method.method_name}' of class '{pool.fq_class_name}'",
-                            source=COMPILER_NAME)
+                    parts = check_external_alias(method, pool)
                     # В обход всего и вся добавляем имя внешнего метода
                     java_method_name = parts[-1]
                     fq_class_name = make_fully_qualifed_name(parts[:-1])
                     external_method_type = get_external_method_descriptor(
-                        [param_type for (_, param_type) in parameters], return_type)
+                        [param_type for (_, param_type) in parameters],
+                        return_type,
+                        external_receiver(cls.class_name, java_method_name))
                     pool.add_methodref(
                         java_method_name, external_method_type, fq_class_name)
         
     return pool
 
 
+def check_external_alias(method: TExternalMethod, pool: ConstPool) -> list[str]:
+    """Проверяет, что alias внешнего метода ссылается на метод Java-класса,
+    и возвращает составные части alias
+    """
+    parts = split_package_path(method.alias)
+    if len(parts) < 2:
+        raise CompilerError(
+            f"Alias '{method.alias}' is not a correct reference to a Java method, "
+            f"see method '{method.method_name}' of class '{pool.fq_class_name}'",
+            source=COMPILER_NAME)
+    return parts
+
+
 @dataclass(frozen=True)
 class CONSTANT(ABC):
     index: int
@@ -366,7 +434,13 @@ class CONSTANT(ABC):
     def tag(self) -> int: ...
 
     @abstractmethod
-    def to_bytes(self) -> bytes: ...
+    def write(self, writer: ByteWriter) -> None:
+        """Дописывает константу в writer"""
+
+    def to_bytes(self) -> bytes:
+        writer = ByteWriter()
+        self.write(writer)
+        return writer.getvalue()
 
 
 @dataclass(frozen=True)
@@ -377,9 +451,10 @@ class CONSTANT_Utf8(CONSTANT):
     def tag(self) -> int:
         return 1
     
-    def to_bytes(self) -> bytes:
+    def write(self, writer: ByteWriter) -> None:
         text_bytes = u1_seq(self.text)
-        return merge_bytes(u1(self.tag), u2(len(text_bytes)), text_bytes)
+        writer.u1_u2(self.tag, len(text_bytes))
+        writer.raw(text_bytes)
 
 
 @dataclass(frozen=True)
@@ -390,8 +465,8 @@ class CONSTANT_Integer(CONSTANT):
     def tag(self) -> int:
         return 3
     
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), s4(self.const))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_s4(self.tag, self.const)
 
 
 @dataclass(frozen=True)
@@ -402,9 +477,9 @@ class CONSTANT_Float(CONSTANT):
     def tag(self) -> int:
         return 4
     
-    def to_bytes(self) -> bytes:
-        # Упаковываем float в 4 байта в формате IEEE 754 (big-endian)
-        return merge_bytes(u1(self.tag), struct.pack(">f", self.const))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1(self.tag)
+        writer.f4(self.const)
 
 
 @dataclass(frozen=True)
@@ -416,8 +491,8 @@ class CONSTANT_String(CONSTANT):
     def tag(self) -> int:
         return 8
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u2(self.string_index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2(self.tag, self.string_index)
 
 
 @dataclass(frozen=True)
@@ -431,8 +506,8 @@ class CONSTANT_NameAndType(CONSTANT):
     def tag(self) -> int:
         return 12
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u2(self.name_const_index), u2(self.type_const_index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2_u2(self.tag, self.name_const_index, self.type_const_index)
 
 
 @dataclass(frozen=True)
@@ -444,8 +519,8 @@ class CONSTANT_Class(CONSTANT):
     def tag(self) -> int:
         return 7
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u2(self.name_index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2(self.tag, self.name_index)
 
 
 @dataclass(frozen=True)
@@ -460,8 +535,8 @@ class CONSTANT_Fieldref(CONSTANT):
     def tag(self) -> int:
         return 9
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u2(self.class_index), u2(self.name_and_type_index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2_u2(self.tag, self.class_index, self.name_and_type_index)
 
 
 @dataclass(frozen=True)
@@ -476,8 +551,48 @@ class CONSTANT_Methodref(CONSTANT):
     def tag(self) -> int:
         return 10
 
-    def to_bytes(self) -> bytes:
-        return merge_bytes(u1(self.tag), u2(self.class_index), u2(self.name_and_type_index))
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2_u2(self.tag, self.class_index, self.name_and_type_index)
+
+
+@dataclass(frozen=True)
+class CONSTANT_InterfaceMethodref(CONSTANT):
+    method_name: str
+    type: str
+    fq_class_name: str
+    class_index: int
+    name_and_type_index: int
+
+    @property
+    def tag(self) -> int:
+        return 11
+
+    def write(self, writer: ByteWriter) -> None:
+        writer.u1_u2_u2(self.tag, self.class_index, self.name_and_type_index)
+
+
+def lookup_keys(constant: CONSTANT) -> list[tuple]:
+    """Возвращает ключи, по которым константа ищется в таблице констант.
+    Для Fieldref и Methodref ключей два: без дескриптора (поиск по имени
+    и классу) и с дескриптором
+    """
+    match constant:
+        case CONSTANT_Utf8(text=text) | CONSTANT_String(text=text):
+            return [(type(constant), text)]
+        case CONSTANT_Integer(const=const) | CONSTANT_Float(const=const):
+            return [(type(constant), const)]
+        case CONSTANT_NameAndType(name=name, type=desc):
+            return [(CONSTANT_NameAndType, name, desc)]
+        case CONSTANT_Class(class_name=class_name):
+            return [(CONSTANT_Class, class_name)]
+        case CONSTANT_Fieldref(field_name=name, type=desc, fq_class_name=owner) \
+                | CONSTANT_Methodref(method_name=name, type=desc, fq_class_name=owner) \
+                | CONSTANT_InterfaceMethodref(method_name=name, type=desc, fq_class_name=owner):
+            return [
+                (type(constant), name, owner),
+                (type(constant), name, owner, desc)]
+        case _:
+            return []
 
 
 def split_package_path(package: str) -> list[str]:
@@ -497,12 +612,20 @@ def get_type_descriptor(typ: Type) -> str:
     """
     Генерирует дескриптор типа для виртуальной машины Java.
     Для примитивных типов используется однобуквенное обозначение,
-    для ссылочных типов возвращается формат "L<fully-qualified-name>;"
+    для ссылочных типов возвращается формат "L<fully-qualified-name>;".
     """
-    if typ.name == "<VOID>":
+    return descriptor_of_full_name(typ.full_name)
+
+
+@lru_cache(maxsize=None)
+def descriptor_of_full_name(full_name: str) -> str:
+    """Дескриптор типа по его полному имени. Кэш хранит только строки,
+    поэтому не удерживает интернированные объекты Type от удаления
+    """
+    if full_name == "<VOID>":
         return "V"
     # Если имя уже содержит '/', считаем его полностью квалифицированным
-    fq_name = typ.full_name if "/" in typ.full_name else add_package_prefix(typ.full_name)
+    fq_name = full_name if "/" in full_name else add_package_prefix(full_name)
     return f"L{fq_name};"
 
 
@@ -596,7 +719,33 @@ def process_statement_literals(stmt: TStatement, pool: ConstPool) -> None:
         case _: assert False, stmt
 
 
-def get_external_method_descriptor(args_types: list[Type], return_type: Type) -> str:
+def source_class_name(class_name: str) -> str:
+    """Имя объявленного класса, из которого получен класс class_name:
+    у конкретизаций дженериков (ARRAY__INTEGER) это имя самого дженерика.
+    Именно с него начинаются имена компонентов класса (ARRAY_count)
+    """
+    return class_name.split("__", 1)[0]
+
+
+def value_state(class_name: str) -> ValueState | None:
+    return VALUE_STATES.get(source_class_name(class_name))
+
+
+def external_receiver(class_name: str, java_method_name: str) -> ValueState | None:
+    """Состояние, которое внешний метод java_method_name класса class_name
+    получает вместо объекта: методы RTL вида КЛАСС_имя встроенных классов
+    работают непосредственно со значением Java
+    """
+    state = value_state(class_name)
+    if state is not None and java_method_name.startswith(source_class_name(class_name) + "_"):
+        return state
+    return None
+
+
+def get_external_method_descriptor(
+        args_types: list[Type],
+        return_type: Type,
+        receiver: ValueState | None = None) -> str:
     type_mapping = {
         add_package_prefix("INTEGER"): "I",
         add_package_prefix("REAL"): "F",
@@ -605,6 +754,7 @@ def get_external_method_descriptor(args_types: list[Type], return_type: Type) ->
         add_package_prefix("CHARACTER"): "Ljava/lang/String;",
     }
     this = f"L{add_package_prefix(PLATFORM_CLASS_NAME)};"
+    receiver_desc = this if receiver is None else receiver.descriptor
 
     descriptors = []
     for typ in args_types:
@@ -622,7 +772,7 @@ def get_external_method_descriptor(args_types: list[Type], return_type: Type) ->
         else:
             return_desc = this
 
-    return f"({this}{full_params_desc}){return_desc}"
+    return f"({receiver_desc}{full_params_desc}){return_desc}"
 
 
 def pretty_print_const_pool(pool: ConstPool) -> None:
@@ -1,3 +1,6 @@
+from typing import Callable
+import math
+
 from serpent.semantic_checker.type_check import *
 
 from serpent.codegen.constpool import (
@@ -5,18 +8,42 @@ from serpent.codegen.constpool import (
     add_package_prefix,
     make_fully_qualifed_name,
     split_package_path,
+    get_type_descriptor,
+    get_method_descriptor,
+    get_external_method_descriptor,
+    external_receiver,
+    value_state,
+    DEFAULT_PACKAGE,
     PLATFORM_CLASS_NAME,
     ROOT_CLASS_NAME,
     COMPILER_NAME)
 from serpent.codegen.bytecommand import *
+from serpent.codegen.assembler import INVERTED_JUMPS, Branch, Label
+from serpent.codegen.layout import BUILTIN_CONSTRUCTORS, JvmLayout, interface_name
 from serpent.codegen.preprocess import default_value_for
 from serpent.errors import CompilerWarning, CompilerError
 
 
+PRIMITIVE_TYPES = ["INTEGER", "REAL", "BOOLEAN"]
+"""Встроенные типы, значения которых внутри метода хранятся
+в виде int (INTEGER, BOOLEAN) и float (REAL) JVM, а не объектов.
+Упаковка в объект происходит только при передаче значения дальше:
+в аргументы и результат метода, в атрибуты и в дженерики
+"""
+
+
+def is_primitive(typ: Type) -> bool:
+    return typ.full_name in PRIMITIVE_TYPES
+
+
 @dataclass(frozen=True)
 class LocalTable:
     variables: list[tuple[str, int]] = field(default_factory=list)
     is_static: bool = False
+    primitives: dict[str, str] = field(default_factory=dict)
+    """Локальные переменные, хранящие значения встроенного типа
+    в виде int или float, и их типы
+    """
 
     @property
     def count(self) -> int:
@@ -37,133 +64,121 @@ class LocalTable:
         return index
 
 
-def generate_bytecode_for_integer_const(
-        const: TIntegerConst,
-        pool: ConstPool) -> list[ByteCommand]:
-    fq_class_name = add_package_prefix("INTEGER")
-    class_index = pool.find_class(fq_class_name)
-    methodref_index = pool.add_methodref(
-        method_name="<init>",
-        desc="(I)V",
-        fq_class_name=fq_class_name)
-
-    value = const.value
-    
+def push_int(value: int, pool: ConstPool) -> ByteCommand:
     # sanity: ensure value fits in Java int
     if not (-2**31 <= value <= 2**31 - 1):
         raise ValueError(f"Integer constant out of Java int range: {value}")
 
     # choose smallest instruction that can encode the integer literal
+    if -1 <= value <= 5:
+        return Iconst_i(value)
     if -128 <= value <= 127:
-        int_push = Bipush(value)
-    elif -32768 <= value <= 32767:
-        int_push = Sipush(value)
-    else:
-        # put integer into constant pool and use ldc / ldc_w
-        idx = pool.add_integer(value)
-        int_push = Ldc(idx) if idx < 256 else Ldc_w(idx)
+        return Bipush(value)
+    if -32768 <= value <= 32767:
+        return Sipush(value)
+    # put integer into constant pool and use ldc / ldc_w
+    idx = pool.add_integer(value)
+    return Ldc(idx) if idx < 256 else Ldc_w(idx)
 
-    bytecode = [
-        New(class_index),
-        Dup(),
-        int_push,
-        InvokeSpecial(methodref_index)
-    ]
 
-    return bytecode
+def push_float(value: float, pool: ConstPool) -> ByteCommand:
+    value = float(value)
+    if value in (0.0, 1.0, 2.0) and math.copysign(1.0, value) > 0:
+        return Fconst_f(int(value))
+    index = pool.add_float(value)
+    return Ldc(index) if index < 256 else Ldc_w(index)
 
 
-def generate_bytecode_for_real_const(
-        const: TRealConst,
+def push_bool(value: bool | int) -> ByteCommand:
+    if value == 0:
+        return Iconst_i(0)
+    elif value == 1:
+        return Iconst_i(1)
+    else: assert False, f"Weird value for boolean const: {value}"
+
+
+def generate_boxed_const(
+        type_name: str,
+        push_command: ByteCommand,
         pool: ConstPool) -> list[ByteCommand]:
-    fq_class_name = add_package_prefix("REAL")
-    class_index = pool.find_class(fq_class_name)
+    fq_class_name = add_package_prefix(type_name)
+    class_index = pool.add_class(fq_class_name)
     methodref_idx = pool.add_methodref(
         method_name="<init>",
-        desc="(F)V",
+        desc=BUILTIN_CONSTRUCTORS[type_name],
         fq_class_name=fq_class_name)
 
-    index = pool.add_float(const.value)
-    ldc = Ldc(index) if index < 256 else Ldc_w(index)
-
     bytecode = [
         New(class_index),
         Dup(),
-        ldc,
+        push_command,
         InvokeSpecial(methodref_idx)
     ]
 
     return bytecode
 
 
-def generate_bytecode_for_bool_const(
-        const: TBoolConst,
+def generate_bytecode_for_literal(
+        type_name: str,
+        value: int | float | str,
         pool: ConstPool) -> list[ByteCommand]:
-    fq_class_name = add_package_prefix("BOOLEAN")
-    class_index = pool.find_class(fq_class_name)
-    methodref_idx = pool.add_methodref(
-        method_name="<init>",
-        desc="(I)V",
-        fq_class_name=fq_class_name)
+    """Создает объект встроенного типа type_name со значением value.
+    Используется только в статическом инициализаторе класса,
+    остальной код загружает созданный им объект, см. `ConstPool.add_literal`
+    """
+    match type_name:
+        case "INTEGER":
+            push_command = push_int(value, pool)
+        case "REAL":
+            push_command = push_float(value, pool)
+        case "STRING" | "CHARACTER":
+            index = pool.add_string(value)
+            push_command = Ldc(index) if index < 256 else Ldc_w(index)
+        case _: assert False, type_name
+    return generate_boxed_const(type_name, push_command, pool)
 
-    if const.value == 0:
-        push_command = Iconst_i(0)
-    elif const.value == 1:
-        push_command = Iconst_i(1)
-    else: assert False, f"Weird value for boolean const: {const.value}"
 
-    bytecode = [
-        New(class_index),
-        Dup(),
-        push_command,
-        InvokeSpecial(methodref_idx)
-    ]
+def generate_bytecode_for_integer_const(
+        const: TIntegerConst,
+        pool: ConstPool) -> list[ByteCommand]:
+    return [GetStatic(pool.add_literal("INTEGER", const.value))]
+
+
+def generate_bytecode_for_real_const(
+        const: TRealConst,
+        pool: ConstPool) -> list[ByteCommand]:
+    return [GetStatic(pool.add_literal("REAL", float(const.value)))]
+
+
+def boolean_field(value: bool | int) -> str:
+    """Имя статического поля GENERAL с единственным объектом True или False"""
+    return "true_BOOLEAN" if value else "false_BOOLEAN"
+
+
+def load_boolean(value: bool | int, pool: ConstPool) -> ByteCommand:
+    field_index = pool.add_fieldref(
+        boolean_field(value),
+        get_type_descriptor(Type("BOOLEAN")),
+        add_package_prefix(ROOT_CLASS_NAME))
+    return GetStatic(field_index)
 
-    return bytecode
+
+def generate_bytecode_for_bool_const(
+        const: TBoolConst,
+        pool: ConstPool) -> list[ByteCommand]:
+    return [load_boolean(const.value, pool)]
 
 
 def generate_bytecode_for_string_const(
         const: TStringConst,
         pool: ConstPool) -> list[ByteCommand]:
-    fq_class_name = add_package_prefix("STRING")
-    class_index = pool.find_class(fq_class_name)
-    methodref_idx = pool.add_methodref(
-        method_name="<init>",
-        desc="(Ljava/lang/String;)V",
-        fq_class_name=fq_class_name)
-    
-    index = pool.add_string(const.value)
-    ldc = Ldc(index) if index < 256 else Ldc_w(index)
-    bytecode = [
-        New(class_index),
-        Dup(),
-        ldc,
-        InvokeSpecial(methodref_idx)
-    ]
-
-    return bytecode
+    return [GetStatic(pool.add_literal("STRING", const.value))]
 
 
 def generate_bytecode_for_character_const(
         const: TCharacterConst,
         pool: ConstPool) -> list[ByteCommand]:
-    fq_class_name = add_package_prefix("CHARACTER")
-    class_index = pool.find_class(fq_class_name)
-    methodref_idx = pool.add_methodref(
-        method_name="<init>",
-        desc="(Ljava/lang/String;)V",
-        fq_class_name=fq_class_name)
-
-    index = pool.add_string(const.value)
-    ldc = Ldc(index) if index < 256 else Ldc_w(index)
-    bytecode = [
-        New(class_index),
-        Dup(),
-        ldc,
-        InvokeSpecial(methodref_idx)
-    ]
-
-    return bytecode
+    return [GetStatic(pool.add_literal("CHARACTER", const.value))]
 
 
 def generate_bytecode_for_void_const(pool: ConstPool) -> list[ByteCommand]:
@@ -178,9 +193,10 @@ def generate_bytecode_for_create_expr(
         tcreate_expr: TCreateExpr,
         fq_class_name: str,
         pool: ConstPool,
-        local_table: LocalTable) -> list[ByteCommand]:
+        local_table: LocalTable,
+        layout: JvmLayout) -> list[ByteCommand]:
     create_fq_class_name = add_package_prefix(tcreate_expr.expr_type.full_name)
-    class_index = pool.find_class(create_fq_class_name)
+    class_index = pool.add_class(create_fq_class_name)
     
     bytecode = [New(class_index), Dup(), Dup()]
 
@@ -192,49 +208,36 @@ def generate_bytecode_for_create_expr(
 
     for arg in tcreate_expr.arguments:
         arg_bytecode = generate_bytecode_for_expr(
-            arg, fq_class_name, pool, local_table)
+            arg, fq_class_name, pool, local_table, layout)
         bytecode.extend(arg_bytecode)
 
-    constructor_index = pool.find_methodref(
+    # Создаваемый класс известен точно, поэтому конструктор
+    # вызывается у него самого, даже если он является интерфейсом
+    if layout.per_class:
+        constructor_owner = create_fq_class_name
+    else:
+        constructor_owner = add_package_prefix(ROOT_CLASS_NAME)
+    constructor_index = pool.add_methodref(
         method_name=tcreate_expr.constructor_name,
-        fq_class_name=add_package_prefix(ROOT_CLASS_NAME))
+        desc=get_method_descriptor(
+            [arg.expr_type for arg in tcreate_expr.arguments],
+            Type("<VOID>")),
+        fq_class_name=constructor_owner)
     bytecode.append(InvokeVirtual(constructor_index))
 
     return bytecode
 
 
 def unpack_builtin_type(type_name: str, pool: ConstPool) -> list[ByteCommand]:
-    match type_name:
-        case "STRING":
-            field_index = pool.add_fieldref(
-                field_name="raw_string",
-                desc="Ljava/lang/String;",
-                fq_class_name=add_package_prefix(PLATFORM_CLASS_NAME))
-        case "CHARACTER":
-            field_index = pool.add_fieldref(
-                field_name="raw_string",
-                desc="Ljava/lang/String;",
-                fq_class_name=add_package_prefix(PLATFORM_CLASS_NAME))
-        case "INTEGER":
-            field_index = pool.add_fieldref(
-                field_name="raw_int",
-                desc="I",
-                fq_class_name=add_package_prefix(PLATFORM_CLASS_NAME))
-        case "REAL":
-            field_index = pool.add_fieldref(
-                field_name="raw_float",
-                desc="F",
-                fq_class_name=add_package_prefix(PLATFORM_CLASS_NAME))
-        case "BOOLEAN":
-            field_index = pool.add_fieldref(
-                field_name="raw_int",
-                desc="I",
-                fq_class_name=add_package_prefix(PLATFORM_CLASS_NAME))
-        case _:
-            field_index = -1
-
-    if field_index == -1:
+    """Заменяет объект встроенного типа на вершине стека его значением Java"""
+    if type_name not in BUILTIN_CONSTRUCTORS:
         return []
+
+    state = value_state(type_name)
+    field_index = pool.add_fieldref(
+        field_name=state.field_name,
+        desc=state.descriptor,
+        fq_class_name=add_package_prefix(type_name))
     return [GetField(field_index)]
 
 
@@ -242,7 +245,12 @@ def generate_bytecode_for_feature_call(
         tfeature_call: TFeatureCall,
         fq_class_name: str,
         pool: ConstPool,
-        local_table: LocalTable) -> list[ByteCommand]:
+        local_table: LocalTable,
+        layout: JvmLayout) -> list[ByteCommand]:
+    if external_call(tfeature_call, fq_class_name, layout) is not None:
+        return generate_bytecode_for_external_call(
+            tfeature_call, fq_class_name, pool, local_table, layout)
+
     bytecode = []
     
     if tfeature_call.owner is None:
@@ -252,31 +260,84 @@ def generate_bytecode_for_feature_call(
                 tfeature_call.owner,
                 fq_class_name,
                 pool,
-                local_table)
+                local_table,
+                layout)
     
     bytecode.extend(this)
 
     for arg in tfeature_call.arguments:
         arg_bytecode = generate_bytecode_for_expr(
-            arg, fq_class_name, pool, local_table)
+            arg, fq_class_name, pool, local_table, layout)
         bytecode.extend(arg_bytecode)
 
-    if tfeature_call.owner is not None:
-        fq_class_name = add_package_prefix(
-            tfeature_call.owner.expr_type.full_name)
-    methoref_idx = pool.find_methodref(
-        tfeature_call.feature_name, add_package_prefix(ROOT_CLASS_NAME))
-    bytecode.append(InvokeVirtual(methoref_idx))
+    if tfeature_call.owner is None:
+        owner_class_name = fq_class_name.rsplit("/", 1)[-1]
+    else:
+        owner_class_name = tfeature_call.owner.expr_type.full_name
+    bytecode.append(
+        generate_invoke(
+            owner_class_name,
+            tfeature_call.feature_name,
+            get_method_descriptor(
+                [arg.expr_type for arg in tfeature_call.arguments],
+                tfeature_call.expr_type),
+            len(tfeature_call.arguments),
+            pool,
+            layout,
+            on_current=tfeature_call.owner is None or isinstance(tfeature_call.owner, TCurrent)))
 
     return bytecode
 
 
+def generate_invoke(
+        owner_class_name: str,
+        method_name: str,
+        desc: str,
+        args_count: int,
+        pool: ConstPool,
+        layout: JvmLayout,
+        on_current: bool = False) -> ByteCommand:
+    """Генерирует вызов метода объекта класса owner_class_name,
+    ссылка на объект и аргументы уже должны лежать на стеке.
+    Current (on_current) всегда является экземпляром своего класса в JVM,
+    поэтому его методы вызываются через invokevirtual даже у интерфейсов
+    """
+    if layout.per_class and not on_current and layout.is_interface(owner_class_name):
+        methodref_idx = pool.add_interface_methodref(
+            method_name, desc, add_package_prefix(interface_name(owner_class_name)))
+        return InvokeInterface(methodref_idx, args_count + 1)
+
+    methodref_idx = pool.add_methodref(
+        method_name=method_name,
+        desc=desc,
+        fq_class_name=layout.method_owner(owner_class_name))
+    return InvokeVirtual(methodref_idx)
+
+
 def generate_bytecode_for_field(
         tfield: TField,
         fq_class_name: str,
         pool: ConstPool,
-        local_table: LocalTable) -> list[ByteCommand]:
+        local_table: LocalTable,
+        layout: JvmLayout) -> list[ByteCommand]:
     bytecode = []
+    if tfield.owner is not None and layout.per_class:
+        # Атрибут другого объекта читается через метод чтения:
+        # у каждого класса он возвращает актуальное значение атрибута,
+        # даже если класс хранит его в собственном поле
+        bytecode.extend(
+            generate_bytecode_for_expr(
+                tfield.owner, fq_class_name, pool, local_table, layout))
+        bytecode.append(
+            generate_invoke(
+                tfield.owner.expr_type.full_name,
+                tfield.name,
+                getter_descriptor(tfield.expr_type),
+                0,
+                pool,
+                layout,
+                on_current=isinstance(tfield.owner, TCurrent)))
+        return bytecode
     if tfield.owner is not None:
         fq_class_name = add_package_prefix(tfield.owner.expr_type.full_name)
         bytecode.extend(
@@ -284,44 +345,434 @@ def generate_bytecode_for_field(
                 tfield.owner,
                 fq_class_name,
                 pool,
-                local_table))
+                local_table,
+                layout))
     else:
         bytecode.append(Aload(0))
-    field_index = pool.find_fieldref(tfield.name, fq_class_name)
+    field_index = pool.add_fieldref(
+        tfield.name, get_type_descriptor(tfield.expr_type), fq_class_name)
     return [*bytecode, GetField(field_index)]
 
 
+def getter_descriptor(field_type: Type) -> str:
+    return f"(){get_type_descriptor(field_type)}"
+
+
 def generate_bytecode_for_variable(
         tvariable: TVariable,
+        pool: ConstPool,
         local_table: LocalTable) -> list[ByteCommand]:
     variable_index = local_table[tvariable.name]
-    return [Aload(variable_index)]
+    type_name = local_table.primitives.get(tvariable.name)
+    if type_name is None:
+        return [Aload(variable_index)]
+    return [
+        load_primitive(type_name, variable_index),
+        *pack_builtin_type(type_name, pool)
+    ]
 
 
-def unpack_boolean(pool: ConstPool) -> list[ByteCommand]:
-    return unpack_builtin_type("BOOLEAN", pool)
+def load_primitive(type_name: str, variable_index: int) -> ByteCommand:
+    if type_name == "REAL":
+        return Fload(variable_index)
+    return Iload(variable_index)
+
+
+def store_primitive(type_name: str, variable_index: int) -> ByteCommand:
+    if type_name == "REAL":
+        return Fstore(variable_index)
+    return Istore(variable_index)
 
 
 def pack_boolean(pool: ConstPool) -> list[ByteCommand]:
     return pack_builtin_type("BOOLEAN", pool)
 
 
+BUILTIN_OPERATIONS: dict[tuple[str, str], tuple[str, list[ByteCommand]]] = {
+    ("INTEGER", "plus"): ("INTEGER", [Iadd()]),
+    ("INTEGER", "minus"): ("INTEGER", [Isub()]),
+    ("INTEGER", "product"): ("INTEGER", [Imul()]),
+    ("INTEGER", "integer_quotient"): ("INTEGER", [Idiv()]),
+    ("INTEGER", "integer_remainder"): ("INTEGER", [Irem()]),
+    ("INTEGER", "quotient"): ("REAL", [Fdiv()]),
+    ("INTEGER", "identity"): ("INTEGER", []),
+    ("INTEGER", "opposite"): ("INTEGER", [Ineg()]),
+    ("INTEGER", "to_real"): ("INTEGER", [I2f()]),
+    ("REAL", "plus"): ("REAL", [Fadd()]),
+    ("REAL", "minus"): ("REAL", [Fsub()]),
+    ("REAL", "product"): ("REAL", [Fmul()]),
+    ("REAL", "quotient"): ("REAL", [Fdiv()]),
+    ("REAL", "identity"): ("REAL", []),
+    ("REAL", "opposite"): ("REAL", [Fneg()]),
+}
+"""Компоненты встроенных типов, вызовы которых компилируются
+непосредственно в команды JVM: (тип, имя) -> (тип, в котором
+вычисляются операнды, команды над операндами на стеке).
+Их семантика совпадает с реализацией в PLATFORM
+"""
+
+
+COMPARISONS: dict[str, tuple[type[ByteCommand], type[ByteCommand]]] = {
+    "is_less": (IfIcmplt, Iflt),
+    "is_less_equal": (IfIcmple, Ifle),
+    "is_greater": (IfIcmpgt, Ifgt),
+    "is_greater_equal": (IfIcmpge, Ifge),
+    "is_equal": (IfIcmpeq, Ifeq),
+    "is_not_equal": (IfIcmpne, Ifne),
+}
+"""Операции сравнения встроенных типов: имя -> (переход при сравнении
+двух int, переход по результату fcmpg для REAL).
+fcmpg дает 1, если одно из чисел NaN, поэтому is_greater, is_greater_equal
+и is_not_equal для NaN истинны, а остальные сравнения ложны - так же,
+как в реализации этих компонентов в COMPARABLE и ANY
+"""
+
+
+def builtin_operation(tfeature_call: TFeatureCall) -> tuple[str, str] | None:
+    """Возвращает тип и имя компонента встроенного типа,
+    если вызов можно скомпилировать в команды JVM
+    """
+    owner = tfeature_call.owner
+    if owner is None or not is_primitive(owner.expr_type):
+        return None
+
+    type_name = owner.expr_type.full_name
+    prefix = f"{type_name}_"
+    if not tfeature_call.feature_name.startswith(prefix):
+        return None
+
+    name = tfeature_call.feature_name.removeprefix(prefix)
+    if (type_name, name) not in BUILTIN_OPERATIONS and name not in COMPARISONS:
+        return None
+    if any(arg.expr_type.full_name != type_name for arg in tfeature_call.arguments):
+        return None
+    return type_name, name
+
+
+def builtin_comparison(tfeature_call: TFeatureCall) -> tuple[str, str] | None:
+    """Возвращает тип и имя операции сравнения встроенного типа, если это она"""
+    operation = builtin_operation(tfeature_call)
+    if operation is None or operation[1] not in COMPARISONS:
+        return None
+    return operation
+
+
+def generate_bytecode_for_builtin_operation(
+        tfeature_call: TFeatureCall,
+        fq_class_name: str,
+        pool: ConstPool,
+        local_table: LocalTable,
+        layout: JvmLayout) -> list[ByteCommand]:
+    type_name, name = builtin_operation(tfeature_call)
+
+    if name in COMPARISONS:
+        operands_type = type_name
+        int_jump, zero_jump = COMPARISONS[name]
+        if type_name == "REAL":
+            commands = [Fcmpg(), *boolean_from_jump(zero_jump)]
+        else:
+            commands = boolean_from_jump(int_jump)
+    else:
+        operands_type, commands = BUILTIN_OPERATIONS[(type_name, name)]
+
+    bytecode = []
+    for operand in [tfeature_call.owner, *tfeature_call.arguments]:
+        bytecode.extend(
+            generate_bytecode_for_primitive(
+                operand, fq_class_name, pool, local_table, layout))
+        if operands_type == "REAL" and operand.expr_type.full_name == "INTEGER":
+            bytecode.append(I2f())
+    bytecode.extend(commands)
+    return bytecode
+
+
+def boolean_from_jump(jump: type[ByteCommand]) -> list[ByteCommand]:
+    """Превращает условный переход jump в значение 1 (переход выполнен) или 0"""
+    true, end = Label(), Label()
+    bytecode = [Branch(jump, true), Iconst_i(0), Branch(Goto, end), true, Iconst_i(1), end]
+    return bytecode
+
+
+def platform_alias(java_method_name: str) -> str:
+    return f"{DEFAULT_PACKAGE}.{PLATFORM_CLASS_NAME}.{java_method_name}"
+
+
+def invoke_java(
+        invoke: type[ByteCommand],
+        fq_class_name: str,
+        method_name: str,
+        desc: str) -> Callable[[ConstPool], list[ByteCommand]]:
+    """Вызов метода класса Java как встроенная операция, см. `INTRINSICS`"""
+    return lambda pool: [invoke(pool.add_methodref(method_name, desc, fq_class_name))]
+
+
+def compare_ints(jump: type[ByteCommand]) -> Callable[[ConstPool], list[ByteCommand]]:
+    return lambda pool: boolean_from_jump(jump)
+
+
+def compare_floats(jump: type[ByteCommand]) -> Callable[[ConstPool], list[ByteCommand]]:
+    return lambda pool: [Fcmpg(), *boolean_from_jump(jump)]
+
+
+def commands(*commands: ByteCommand) -> Callable[[ConstPool], list[ByteCommand]]:
+    return lambda pool: list(commands)
+
+
+JAVA_STRING = "java/lang/String"
+JAVA_ARRAY_LIST = "java/util/ArrayList"
+
+INTRINSICS: dict[str, Callable[[ConstPool], list[ByteCommand]]] = {
+    platform_alias("INTEGER_plus"): commands(Iadd()),
+    platform_alias("INTEGER_minus"): commands(Isub()),
+    platform_alias("INTEGER_product"): commands(Imul()),
+    platform_alias("INTEGER_quotient"): commands(I2f(), Swap(), I2f(), Swap(), Fdiv()),
+    platform_alias("INTEGER_identity"): commands(),
+    platform_alias("INTEGER_opposite"): commands(Ineg()),
+    platform_alias("INTEGER_integer_quotient"): commands(Idiv()),
+    platform_alias("INTEGER_integer_remainder"): commands(Irem()),
+    platform_alias("INTEGER_is_less"): compare_ints(IfIcmplt),
+    platform_alias("INTEGER_is_equal"): compare_ints(IfIcmpeq),
+    platform_alias("INTEGER_to_real"): commands(I2f()),
+    platform_alias("INTEGER_to_string"): invoke_java(
+        InvokeStatic, "java/lang/Integer", "toString", f"(I)L{JAVA_STRING};"),
+    platform_alias("INTEGER_to_character"): invoke_java(
+        InvokeStatic, "java/lang/Character", "toString", f"(I)L{JAVA_STRING};"),
+    platform_alias("REAL_plus"): commands(Fadd()),
+    platform_alias("REAL_minus"): commands(Fsub()),
+    platform_alias("REAL_product"): commands(Fmul()),
+    platform_alias("REAL_quotient"): commands(Fdiv()),
+    platform_alias("REAL_identity"): commands(),
+    platform_alias("REAL_opposite"): commands(Fneg()),
+    platform_alias("REAL_is_less"): compare_floats(Iflt),
+    platform_alias("REAL_is_equal"): compare_floats(Ifeq),
+    platform_alias("BOOLEAN_is_less"): compare_ints(IfIcmplt),
+    platform_alias("BOOLEAN_is_equal"): compare_ints(IfIcmpeq),
+    platform_alias("STRING_count"): lambda pool: [
+        Dup(),
+        InvokeVirtual(pool.add_methodref("length", "()I", JAVA_STRING)),
+        Iconst_i(0),
+        Swap(),
+        InvokeVirtual(pool.add_methodref("codePointCount", "(II)I", JAVA_STRING)),
+    ],
+    platform_alias("STRING_hash_code"): invoke_java(
+        InvokeVirtual, JAVA_STRING, "hashCode", "()I"),
+    platform_alias("CHARACTER_code_point"): lambda pool: [
+        Iconst_i(0),
+        InvokeVirtual(pool.add_methodref("codePointAt", "(I)I", JAVA_STRING)),
+    ],
+    platform_alias("ARRAY_item_raw"): invoke_java(
+        InvokeVirtual, JAVA_ARRAY_LIST, "get", "(I)Ljava/lang/Object;"),
+    platform_alias("ARRAY_put_raw"): lambda pool: [
+        Swap(),
+        InvokeVirtual(pool.add_methodref("set", "(ILjava/lang/Object;)Ljava/lang/Object;", JAVA_ARRAY_LIST)),
+        Pop(),
+    ],
+    platform_alias("ARRAY_add_raw"): lambda pool: [
+        Swap(),
+        InvokeVirtual(pool.add_methodref("add", "(ILjava/lang/Object;)V", JAVA_ARRAY_LIST)),
+    ],
+    platform_alias("ARRAY_add_last"): lambda pool: [
+        InvokeVirtual(pool.add_methodref("add", "(Ljava/lang/Object;)Z", JAVA_ARRAY_LIST)),
+        Pop(),
+    ],
+    platform_alias("ARRAY_remove_raw"): lambda pool: [
+        InvokeVirtual(pool.add_methodref("remove", "(I)Ljava/lang/Object;", JAVA_ARRAY_LIST)),
+        Pop(),
+    ],
+}
+"""Внешние методы RTL, вызов которых заменяется командами JVM: alias ->
+команды над значениями Java цели и аргументов на стеке (в том виде,
+в котором их получает сам метод RTL). Их семантика совпадает с реализацией
+в PLATFORM. Остальные внешние методы встроенных классов вызываются
+непосредственно через invokestatic, см. `generate_bytecode_for_external_call`
+"""
+
+
+def external_call(
+        tfeature_call: TFeatureCall,
+        fq_class_name: str,
+        layout: JvmLayout) -> TExternalMethod | None:
+    """Внешний метод, в который всегда попадает вызов tfeature_call, если
+    статический тип цели - встроенный класс (см. `JvmLayout.externals`)
+    """
+    if tfeature_call.owner is None:
+        owner_class_name = fq_class_name.rsplit("/", 1)[-1]
+    else:
+        owner_class_name = tfeature_call.owner.expr_type.full_name
+    return layout.external(owner_class_name, tfeature_call.feature_name)
+
+
+def returns_java_value(
+        tfeature_call: TFeatureCall,
+        fq_class_name: str,
+        layout: JvmLayout) -> bool:
+    """Возвращает ли внешний метод вызова значение встроенного типа
+    в виде int или float, которое не нужно упаковывать
+    """
+    external = external_call(tfeature_call, fq_class_name, layout)
+    return external is not None and is_primitive(external.return_type)
+
+
+def generate_bytecode_for_external_call(
+        tfeature_call: TFeatureCall,
+        fq_class_name: str,
+        pool: ConstPool,
+        local_table: LocalTable,
+        layout: JvmLayout,
+        pack: bool = True) -> list[ByteCommand]:
+    """Вызывает внешний метод встроенного класса без виртуального вызова
+    и метода-обертки: на стек кладутся значения Java цели и аргументов,
+    затем выполняются команды из `INTRINSICS` или invokestatic метода RTL.
+    Если pack ложно, результат встроенного типа остается значением Java
+    """
+    external = external_call(tfeature_call, fq_class_name, layout)
+    owner = tfeature_call.owner or TCurrent(Type(fq_class_name.rsplit("/", 1)[-1]))
+    owner_class_name = owner.expr_type.full_name
+    parts = split_package_path(external.alias)
+    ext_method_name = parts[-1]
+    receiver = external_receiver(owner_class_name, ext_method_name)
+    bytecode = generate_bytecode_for_java_value(
+        owner, owner_class_name, fq_class_name, pool, local_table, layout)
+
+    for (_, ptype), arg in zip(external.parameters, tfeature_call.arguments):
+        if ptype.full_name in BUILTIN_CONSTRUCTORS:
+            bytecode.extend(
+                generate_bytecode_for_java_value(
+                    arg, ptype.full_name, fq_class_name, pool, local_table, layout))
+            if ptype.full_name == "REAL" and arg.expr_type.full_name == "INTEGER":
+                bytecode.append(I2f())
+        else:
+            bytecode.extend(
+                generate_bytecode_for_expr(arg, fq_class_name, pool, local_table, layout))
+
+    intrinsic = INTRINSICS.get(external.alias)
+    if intrinsic is not None:
+        bytecode.extend(intrinsic(pool))
+    else:
+        methodref_index = pool.add_methodref(
+            ext_method_name,
+            desc=get_external_method_descriptor(
+                [ptype for (_, ptype) in external.parameters], external.return_type, receiver),
+            fq_class_name=make_fully_qualifed_name(parts[:-1]))
+        bytecode.append(InvokeStatic(methodref_index))
+
+    if pack and external.return_type.full_name in BUILTIN_CONSTRUCTORS:
+        bytecode.extend(pack_builtin_type(external.return_type.full_name, pool))
+    return bytecode
+
+
+def generate_bytecode_for_java_value(
+        texpr: TExpr,
+        type_name: str,
+        fq_class_name: str,
+        pool: ConstPool,
+        local_table: LocalTable,
+        layout: JvmLayout) -> list[ByteCommand]:
+    """Генерирует код, оставляющий на стеке значение Java (см. `VALUE_STATES`)
+    выражения встроенного класса type_name. Результат внешнего метода
+    этого класса для этого не упаковывается
+    """
+    if type_name in PRIMITIVE_TYPES:
+        return generate_bytecode_for_primitive(
+            texpr, fq_class_name, pool, local_table, layout, type_name)
+
+    if isinstance(texpr, TFeatureCall):
+        external = external_call(texpr, fq_class_name, layout)
+        if external is not None and external.return_type.full_name == type_name:
+            return generate_bytecode_for_external_call(
+                texpr, fq_class_name, pool, local_table, layout, pack=False)
+
+    bytecode = generate_bytecode_for_expr(
+        texpr, fq_class_name, pool, local_table, layout)
+    state = value_state(type_name)
+    field_index = pool.add_fieldref(
+        state.field_name, state.descriptor, add_package_prefix(type_name))
+    bytecode.append(GetField(field_index))
+    return bytecode
+
+
+def generate_bytecode_for_primitive(
+        texpr: TExpr,
+        fq_class_name: str,
+        pool: ConstPool,
+        local_table: LocalTable,
+        layout: JvmLayout,
+        type_name: str | None = None) -> list[ByteCommand]:
+    """
+    Генерирует код, оставляющий на стеке значение выражения встроенного
+    типа (INTEGER, REAL, BOOLEAN) в виде int или float.
+    Константы, примитивные локальные переменные, арифметика, сравнения
+    и логические операции вычисляются без создания объектов,
+    остальные выражения вычисляются как обычно и распаковываются.
+    type_name - ожидаемый тип значения, он нужен, если статический тип
+    выражения не является встроенным (например, NONE у результата
+    внешнего метода, возвращающего параметр дженерика)
+    """
+    match texpr:
+        case TIntegerConst(value=value):
+            return [push_int(value, pool)]
+        case TRealConst(value=value):
+            return [push_float(value, pool)]
+        case TBoolConst(value=value):
+            return [push_bool(value)]
+        case TVariable(name=name) if name in local_table.primitives:
+            return [load_primitive(local_table.primitives[name], local_table[name])]
+        case TFeatureCall() if builtin_operation(texpr) is not None:
+            return generate_bytecode_for_builtin_operation(
+                texpr, fq_class_name, pool, local_table, layout)
+        case TFeatureCall() if returns_java_value(texpr, fq_class_name, layout):
+            return generate_bytecode_for_external_call(
+                texpr, fq_class_name, pool, local_table, layout, pack=False)
+        case TBinaryOp(
+                operator_name=operator_name,
+                left=left,
+                right=right):
+            match operator_name:
+                case "and":
+                    generate = generate_bytecode_for_and
+                case "or":
+                    generate = generate_bytecode_for_or
+                case "xor":
+                    generate = generate_bytecode_for_xor
+                case "and then":
+                    generate = generate_bytecode_for_and_then
+                case "or else":
+                    generate = generate_bytecode_for_or_else
+                case _:
+                    raise NotImplementedError(operator_name)
+            return generate(left, right, fq_class_name, pool, local_table, layout)
+        case TUnaryOp(
+                operator_name=operator_name,
+                argument=argument):
+            match operator_name:
+                case "not":
+                    return generate_bytecode_for_not(
+                        argument, fq_class_name, pool, local_table, layout)
+                case _:
+                    raise NotImplementedError(operator_name)
+
+    bytecode = generate_bytecode_for_expr(
+        texpr, fq_class_name, pool, local_table, layout)
+    if is_primitive(texpr.expr_type) or type_name is None:
+        type_name = texpr.expr_type.full_name
+    bytecode.extend(unpack_builtin_type(type_name, pool))
+    return bytecode
+
+
 def generate_bytecode_for_and(left: TExpr,
                               right: TExpr,
                               fq_class_name: str,
                               pool: ConstPool,
-                              local_table: LocalTable) -> list[ByteCommand]:
+                              local_table: LocalTable,
+                              layout: JvmLayout) -> list[ByteCommand]:
     """
     Нестандартное логическое И без короткого замыкания.
-    Вычисляем левый и правый операнды, затем перемножаем их (поскольку 1*1==1, а если хоть один 0, то 0).
+    Вычисляем левый и правый операнды (0 или 1), затем применяем к ним побитовое И.
     """
     bytecode = []
-    bytecode.extend(generate_bytecode_for_expr(left, fq_class_name, pool, local_table))
-    bytecode.extend(unpack_boolean(pool))
-    bytecode.extend(generate_bytecode_for_expr(right, fq_class_name, pool, local_table))
-    bytecode.extend(unpack_boolean(pool))
-    bytecode.append(Imul())
-    bytecode.extend(pack_boolean(pool))
+    bytecode.extend(generate_bytecode_for_primitive(left, fq_class_name, pool, local_table, layout))
+    bytecode.extend(generate_bytecode_for_primitive(right, fq_class_name, pool, local_table, layout))
+    bytecode.append(Iand())
     return bytecode
 
 
@@ -329,40 +780,33 @@ def generate_bytecode_for_or(left: TExpr,
                              right: TExpr,
                              fq_class_name: str,
                              pool: ConstPool,
-                             local_table: LocalTable) -> list[ByteCommand]:
+                             local_table: LocalTable,
+                             layout: JvmLayout) -> list[ByteCommand]:
     """
     Нестандартное логическое ИЛИ без короткого замыкания.
-    Вычисляются оба операнда, затем они складываются.
-    После этого, если сумма > 0 – результат истина (1), иначе ложь (0).
-    При этом выражения перед вычислениями распаковываются,
-    а итоговый int (0 или 1) оборачивается в BOOLEAN.
+    Вычисляются оба операнда (0 или 1), затем к ним применяется побитовое ИЛИ.
     """
     bytecode = []
-    # Вычисляем левый операнд и распаковываем
-    bytecode.extend(generate_bytecode_for_expr(left, fq_class_name, pool, local_table))
-    bytecode.extend(unpack_boolean(pool))
-    # Вычисляем правый операнд и распаковываем
-    bytecode.extend(generate_bytecode_for_expr(right, fq_class_name, pool, local_table))
-    bytecode.extend(unpack_boolean(pool))
-    # Складываем два int
-    bytecode.append(Iadd())
-
-    bytecode.append(Ifeq(0))
-    ifne_index = len(bytecode) - 1
-
-    bytecode.append(Iconst_i(1))
-
-    bytecode.append(Goto(0))
-    goto_index = len(bytecode) - 1
-
-    bytecode.append(Iconst_i(0))
-    
-    bytecode.append(Nop())
+    bytecode.extend(generate_bytecode_for_primitive(left, fq_class_name, pool, local_table, layout))
+    bytecode.extend(generate_bytecode_for_primitive(right, fq_class_name, pool, local_table, layout))
+    bytecode.append(Ior())
+    return bytecode
 
-    bytecode[ifne_index] = Ifeq(bytesize(bytecode[ifne_index:goto_index+1]))
-    bytecode[goto_index] = Goto(bytesize(bytecode[goto_index:len(bytecode) - 1]))
 
-    bytecode.extend(pack_boolean(pool))
+def generate_bytecode_for_xor(left: TExpr,
+                              right: TExpr,
+                              fq_class_name: str,
+                              pool: ConstPool,
+                              local_table: LocalTable,
+                              layout: JvmLayout) -> list[ByteCommand]:
+    """
+    Исключающее ИЛИ: вычисляются оба операнда (0 или 1),
+    затем к ним применяется побитовое исключающее ИЛИ.
+    """
+    bytecode = []
+    bytecode.extend(generate_bytecode_for_primitive(left, fq_class_name, pool, local_table, layout))
+    bytecode.extend(generate_bytecode_for_primitive(right, fq_class_name, pool, local_table, layout))
+    bytecode.append(Ixor())
     return bytecode
 
 
@@ -370,85 +814,45 @@ def generate_bytecode_for_and_then(left: TExpr,
                                    right: TExpr,
                                    fq_class_name: str,
                                    pool: ConstPool,
-                                   local_table: LocalTable) -> list[ByteCommand]:
+                                   local_table: LocalTable,
+                                   layout: JvmLayout) -> list[ByteCommand]:
     """
     Логическое И с коротким замыканием.
-    Если левый операнд равен 0 (ложь), то вычисление правого пропускается и результат – ложь.
-    Иначе левый отбрасывается, и результатом становится значение правого операнда.
-    Выражения распаковываются перед проверками, а итоговый результат оборачивается.
+    Если левый операнд ложен, то вычисление правого пропускается и результат – ложь.
+    Иначе результатом становится значение правого операнда.
+    Операнды проверяются переходами, см. `generate_bytecode_for_condition`
     """
+    false, end = Label(), Label()
     bytecode = []
-    
-    # Вычисляем левый операнд и распаковываем
-    bytecode.extend(generate_bytecode_for_expr(left, fq_class_name, pool, local_table))
-    bytecode.extend(unpack_boolean(pool))
-
-    bytecode.append(Ifeq(0))
-    ifeq_index1 = len(bytecode) - 1
 
-    # Вычисляем правый операнд и распаковываем
-    bytecode.extend(generate_bytecode_for_expr(right, fq_class_name, pool, local_table))
-    bytecode.extend(unpack_boolean(pool))
-
-    bytecode.append(Ifeq(0))
-    ifeq_index2 = len(bytecode) - 1
-
-    bytecode.append(Iconst_i(1))
-
-    bytecode.append(Goto(0))
-    goto_index = len(bytecode) - 1
-
-    bytecode.append(Iconst_i(0))
-    bytecode.append(Nop())
-
-    bytecode[ifeq_index1] = Ifeq(bytesize(bytecode[ifeq_index1:goto_index+1]))
-    bytecode[ifeq_index2] = Ifeq(bytesize(bytecode[ifeq_index2:goto_index+1]))
-    bytecode[goto_index] = Goto(bytesize(bytecode[goto_index:len(bytecode)-1]))
-
-    bytecode.extend(pack_boolean(pool))
+    for operand in (left, right):
+        bytecode.extend(
+            generate_bytecode_for_condition(
+                operand, False, false, fq_class_name, pool, local_table, layout))
 
+    bytecode.extend([Iconst_i(1), Branch(Goto, end), false, Iconst_i(0), end])
     return bytecode
 
 
 def generate_bytecode_for_or_else(left: TExpr, right: TExpr, fq_class_name: str,
                                   pool: ConstPool,
-                                  local_table: LocalTable) -> list[ByteCommand]:
+                                  local_table: LocalTable,
+                                  layout: JvmLayout) -> list[ByteCommand]:
     """
     Логическое ИЛИ с коротким замыканием.
-    Если левый операнд ненулевой (истина), то вычисление правого пропускается и результат – истина.
-    Иначе левый отбрасывается, и результатом становится значение правого операнда.
-    Выражения распаковываются перед проверками, а итоговый результат оборачивается.
+    Если левый операнд истинен, то вычисление правого пропускается и результат – истина.
+    Иначе результатом становится значение правого операнда.
+    Операнды проверяются переходами, см. `generate_bytecode_for_condition`
     """
+    true, end = Label(), Label()
     bytecode = []
-    
-    # Вычисляем левый операнд и распаковываем
-    bytecode.extend(generate_bytecode_for_expr(left, fq_class_name, pool, local_table))
-    bytecode.extend(unpack_boolean(pool))
-
-    bytecode.append(Ifne(0))
-    ifne_index1 = len(bytecode) - 1
-
-    # Вычисляем правый операнд и распаковываем
-    bytecode.extend(generate_bytecode_for_expr(right, fq_class_name, pool, local_table))
-    bytecode.extend(unpack_boolean(pool))
 
-    bytecode.append(Ifne(0))
-    ifne_index2 = len(bytecode) - 1
-
-    bytecode.append(Iconst_i(0))
-
-    bytecode.append(Goto(0))
-    goto_index = len(bytecode) - 1
-
-    bytecode.append(Iconst_i(1))
-    bytecode.append(Nop())
-
-    bytecode[ifne_index1] = Ifne(bytesize(bytecode[ifne_index1:goto_index+1]))
-    bytecode[ifne_index2] = Ifne(bytesize(bytecode[ifne_index2:goto_index+1]))
-    bytecode[goto_index] = Goto(bytesize(bytecode[goto_index:len(bytecode)-1]))
-
-    bytecode.extend(pack_boolean(pool))
+    for operand in (left, right):
+        bytecode.extend(
+            generate_bytecode_for_condition(
+                operand, True, true, fq_class_name, pool, local_table, layout))
 
+    bytecode.extend([Iconst_i(0), Branch(Goto, end), true, Iconst_i(1), end])
     return bytecode
 
 
@@ -456,30 +860,118 @@ def generate_bytecode_for_not(
         texpr: TExpr,
         fq_class_name: str,
         pool: ConstPool,
-        local_table: LocalTable) -> list[ByteCommand]:
+        local_table: LocalTable,
+        layout: JvmLayout) -> list[ByteCommand]:
     bytecode = []
     
-    # Вычисляем левый операнд и распаковываем
-    bytecode.extend(generate_bytecode_for_expr(
-        texpr, fq_class_name, pool, local_table))
-    bytecode.extend(unpack_boolean(pool))
+    bytecode.extend(generate_bytecode_for_primitive(
+        texpr, fq_class_name, pool, local_table, layout))
+    # 0 ^ 1 == 1, 1 ^ 1 == 0
+    bytecode.append(Iconst_i(1))
+    bytecode.append(Ixor())
 
-    bytecode.append(Ifeq(0))
-    ifeq_index = len(bytecode) - 1
+    return bytecode
 
-    bytecode.append(Iconst_i(0))
 
-    bytecode.append(Goto(0))
-    goto_index = len(bytecode) - 1
+UNSAFE_OPERATIONS = ["integer_quotient", "integer_remainder"]
+"""Встроенные операции, которые могут выбросить исключение (деление на 0)"""
 
-    bytecode.append(Iconst_i(1))
-    bytecode.append(Nop())
 
-    bytecode[ifeq_index] = Ifeq(bytesize(bytecode[ifeq_index:goto_index+1]))
-    bytecode[goto_index] = Goto(bytesize(bytecode[goto_index:len(bytecode)-1]))
+def is_pure_condition(texpr: TExpr, local_table: LocalTable) -> bool:
+    """Можно ли не вычислять выражение, если его значение не нужно:
+    оно не вызывает методов, не создает объектов и не может выбросить исключение.
 
-    bytecode.extend(pack_boolean(pool))
-    
+    Чистыми считаются константы, распакованные локальные переменные
+    (параметры и поля читаются через getfield и могут оказаться Void)
+    и встроенные операции над чистыми операндами, кроме UNSAFE_OPERATIONS.
+    and и or по правилам языка вычисляют оба операнда, поэтому
+    `generate_bytecode_for_condition` пропускает правый операнд
+    по короткому замыканию, только если он чистый: пропуск такого
+    вычисления нельзя заметить. Иначе оба операнда вычисляются
+    и объединяются iand/ior
+    """
+    match texpr:
+        case TIntegerConst() | TRealConst() | TBoolConst():
+            return True
+        case TVariable(name=name):
+            return name in local_table.primitives
+        case TFeatureCall() if builtin_operation(texpr) is not None:
+            _, name = builtin_operation(texpr)
+            return name not in UNSAFE_OPERATIONS and all(
+                is_pure_condition(operand, local_table)
+                for operand in [texpr.owner, *texpr.arguments])
+        case TBinaryOp(left=left, right=right):
+            return is_pure_condition(left, local_table) and is_pure_condition(right, local_table)
+        case TUnaryOp(argument=argument):
+            return is_pure_condition(argument, local_table)
+    return False
+
+
+def generate_bytecode_for_condition(
+        texpr: TExpr,
+        jump_if: bool,
+        target: Label,
+        fq_class_name: str,
+        pool: ConstPool,
+        local_table: LocalTable,
+        layout: JvmLayout) -> list[ByteCommand]:
+    """
+    Генерирует код, который переходит к target, если значение условия
+    texpr равно jump_if, и продолжается со следующей команды иначе.
+    Значение условия при этом не вычисляется: сравнения становятся
+    условными переходами, not меняет jump_if на противоположный,
+    а and then и or else - цепочками переходов с коротким замыканием:
+
+        a and then b, переход при лжи:     a; ifeq target; b; ifeq target
+        a and then b, переход при истине:  a; ifeq SKIP; b; ifne target; SKIP:
+
+    and и or вычисляют правый операнд всегда, поэтому компилируются
+    так же, только если он без побочных эффектов (см. `is_pure_condition`).
+    Остальные условия вычисляются в int и проверяются ifne или ifeq
+    """
+    def condition(texpr: TExpr, jump_if: bool, target: Label) -> list[ByteCommand]:
+        return generate_bytecode_for_condition(
+            texpr, jump_if, target, fq_class_name, pool, local_table, layout)
+
+    match texpr:
+        case TBoolConst(value=value):
+            return [Branch(Goto, target)] if bool(value) == jump_if else []
+        case TUnaryOp(operator_name="not", argument=argument):
+            return condition(argument, not jump_if, target)
+        case TFeatureCall() if builtin_comparison(texpr) is not None:
+            type_name, name = builtin_comparison(texpr)
+            int_jump, zero_jump = COMPARISONS[name]
+            bytecode = []
+            for operand in [texpr.owner, *texpr.arguments]:
+                bytecode.extend(
+                    generate_bytecode_for_primitive(
+                        operand, fq_class_name, pool, local_table, layout))
+            jump = int_jump
+            if type_name == "REAL":
+                bytecode.append(Fcmpg())
+                jump = zero_jump
+            if not jump_if:
+                jump = INVERTED_JUMPS[jump]
+            bytecode.append(Branch(jump, target))
+            return bytecode
+        case TBinaryOp(operator_name=operator_name, left=left, right=right) if (
+                operator_name in ("and then", "or else")
+                or operator_name in ("and", "or") and is_pure_condition(right, local_table)):
+            # a or else b == not (not a and then not b)
+            is_and = operator_name in ("and", "and then")
+            if jump_if != is_and:
+                # Переход, если хотя бы один операнд дает jump_if
+                return [*condition(left, jump_if, target), *condition(right, jump_if, target)]
+            skip = Label()
+            return [
+                *condition(left, not jump_if, skip),
+                *condition(right, jump_if, target),
+                skip
+            ]
+
+    bytecode = generate_bytecode_for_primitive(
+        texpr, fq_class_name, pool, local_table, layout, "BOOLEAN")
+    bytecode.append(Branch(Ifne if jump_if else Ifeq, target))
     return bytecode
 
 
@@ -487,7 +979,8 @@ def generate_bytecode_for_expr(
         texpr: TExpr,
         fq_class_name: str,
         pool: ConstPool,
-        local_table: LocalTable) -> list[ByteCommand]:
+        local_table: LocalTable,
+        layout: JvmLayout) -> list[ByteCommand]:
     match texpr:
         case TIntegerConst():
             return generate_bytecode_for_integer_const(texpr, pool)
@@ -503,45 +996,29 @@ def generate_bytecode_for_expr(
             return generate_bytecode_for_void_const(pool)
         case TCreateExpr():
             return generate_bytecode_for_create_expr(
-                texpr, fq_class_name, pool, local_table)
+                texpr, fq_class_name, pool, local_table, layout)
+        case TFeatureCall() if builtin_operation(texpr) is not None:
+            return [
+                *generate_bytecode_for_builtin_operation(
+                    texpr, fq_class_name, pool, local_table, layout),
+                *pack_builtin_type(texpr.expr_type.full_name, pool)
+            ]
         case TFeatureCall():
             return generate_bytecode_for_feature_call(
-                texpr, fq_class_name, pool, local_table)
+                texpr, fq_class_name, pool, local_table, layout)
         case TField():
             return generate_bytecode_for_field(
-                texpr, fq_class_name, pool, local_table)
+                texpr, fq_class_name, pool, local_table, layout)
         case TVariable():
-            return generate_bytecode_for_variable(texpr, local_table)
+            return generate_bytecode_for_variable(texpr, pool, local_table)
         case TCurrent():
             return generate_bytecode_for_current_const()
-        case TBinaryOp(
-                operator_name=operator_name,
-                left=left,
-                right=right):
-            match operator_name:
-                case "and":
-                    return generate_bytecode_for_and(
-                        left, right, fq_class_name, pool, local_table)
-                case "or":
-                    return generate_bytecode_for_or(
-                        left, right, fq_class_name, pool, local_table)
-                case "and then":
-                    return generate_bytecode_for_and_then(
-                        left, right, fq_class_name, pool, local_table)
-                case "or else":
-                    return generate_bytecode_for_or_else(
-                        left, right, fq_class_name, pool, local_table)
-                case _:
-                    raise NotImplementedError(operator_name)
-        case TUnaryOp(
-                operator_name=operator_name,
-                argument=argument):
-            match operator_name:
-                case "not":
-                    return generate_bytecode_for_not(
-                        argument, fq_class_name, pool, local_table);
-                case _:
-                    raise NotImplementedError(operator_name)
+        case TBinaryOp() | TUnaryOp():
+            return [
+                *generate_bytecode_for_primitive(
+                    texpr, fq_class_name, pool, local_table, layout),
+                *pack_boolean(pool)
+            ]
         case _:
             raise NotImplementedError(texpr)
 
@@ -550,81 +1027,104 @@ def generate_bytecode_for_assignment(
         tassignment: TAssignment,
         fq_class_name: str,
         pool: ConstPool,
-        local_table: LocalTable) -> list[ByteCommand]:
+        local_table: LocalTable,
+        layout: JvmLayout) -> list[ByteCommand]:
     lvalue = tassignment.lvalue
     rvalue = tassignment.rvalue
 
     bytecode = []
-    bytecode.extend(generate_bytecode_for_expr(rvalue, fq_class_name, pool, local_table))
 
     match lvalue:
-        case TField(name=field_name):
-            field_index = pool.find_fieldref(field_name, fq_class_name)
-            bytecode.insert(0, Aload(0))
+        case TField(name=field_name, expr_type=field_type):
+            field_index = pool.add_fieldref(
+                field_name, get_type_descriptor(field_type), fq_class_name)
+            bytecode.append(Aload(0))
+            bytecode.extend(generate_bytecode_for_expr(rvalue, fq_class_name, pool, local_table, layout))
             bytecode.append(PutField(field_index))
+        case TVariable(name=variable_name) if variable_name in local_table.primitives:
+            type_name = local_table.primitives[variable_name]
+            bytecode.extend(
+                generate_bytecode_for_primitive(
+                    rvalue, fq_class_name, pool, local_table, layout, type_name))
+            variable_index = local_table[variable_name]
+            bytecode.append(store_primitive(type_name, variable_index))
         case TVariable(name=variable_name):
+            bytecode.extend(generate_bytecode_for_expr(rvalue, fq_class_name, pool, local_table, layout))
             variable_index = local_table[variable_name]
             bytecode.append(Astore(variable_index))
 
     return bytecode
 
 
-def bytesize(commands: list[ByteCommand]) -> int:
-    return sum(command.size() for command in commands)
+SHARED_DEFAULT_TYPES = ["STRING", "CHARACTER", "INTEGER", "REAL", "BOOLEAN"]
+"""Типы, значения по умолчанию которых хранятся в статических полях
+GENERAL и разделяются всеми объектами: RTL никогда не изменяет
+объекты этих типов после создания, поэтому общий объект неотличим
+от созданного заново
+"""
+
+
+def shared_default_field(type_name: str) -> str:
+    """Имя статического поля GENERAL со значением по умолчанию типа type_name"""
+    return f"default_{type_name}"
+
+
+def generate_bytecode_for_default_value(
+        tfield: TField,
+        fq_class_name: str,
+        pool: ConstPool) -> list[ByteCommand]:
+    """Присваивает атрибуту tfield текущего объекта значение по умолчанию"""
+    type_name = tfield.expr_type.full_name
+    if type_name not in SHARED_DEFAULT_TYPES:
+        # Значение по умолчанию остальных типов - Void,
+        # а JVM и так обнуляет поля нового объекта
+        return []
+
+    desc = get_type_descriptor(tfield.expr_type)
+    default_index = pool.add_fieldref(
+        shared_default_field(type_name), desc, add_package_prefix(ROOT_CLASS_NAME))
+    field_index = pool.add_fieldref(tfield.name, desc, fq_class_name)
+    return [Aload(0), GetStatic(default_index), PutField(field_index)]
 
 
 def generate_bytecode_for_ifstmt(
         tifstmt: TIfStmt,
         fq_class_name: str,
         pool: ConstPool,
-        local_table: LocalTable) -> list[ByteCommand]:
-    bytecode = []
+        local_table: LocalTable,
+        layout: JvmLayout) -> list[ByteCommand]:
+    """
+    Каждая ветка заканчивается переходом в конец оператора, кроме
+    последней, за которой конец оператора и так следует:
 
-    ifeqs = []
-    gotos = []
+        cond; ifeq L1; then; goto END; L1: cond2; ifeq L2; ...; Ln: else; END:
 
-    bytecode.extend(
-        generate_bytecode_for_expr(
-            tifstmt.condition, fq_class_name, pool, local_table))
-    bytecode.extend(unpack_boolean(pool))
-
-    bytecode.append(Ifeq(0))
-    ifeqs.append(len(bytecode) - 1)
-    
-    bytecode.extend(
-        generate_bytecode_for_stmts(
-            tifstmt.then_branch, fq_class_name, pool, local_table))
-    bytecode.append(Goto(0))
-    gotos.append(len(bytecode) - 1)
+    Условие ветки сразу переходит к следующей ветке, если оно ложно,
+    см. `generate_bytecode_for_condition`
+    """
+    bytecode = []
+    end = Label()
 
-    for (condition, branch) in tifstmt.elseif_branches:
+    branches = [(tifstmt.condition, tifstmt.then_branch), *tifstmt.elseif_branches]
+    for i, (condition, branch) in enumerate(branches):
+        next_branch = Label()
         bytecode.extend(
-            generate_bytecode_for_expr(
-                condition, fq_class_name, pool, local_table))
-        bytecode.extend(unpack_boolean(pool))
-        bytecode.append(Ifeq(0))
-        ifeqs.append(len(bytecode) - 1)
+            generate_bytecode_for_condition(
+                condition, False, next_branch, fq_class_name, pool, local_table, layout))
 
         bytecode.extend(
             generate_bytecode_for_stmts(
-                branch, fq_class_name, pool, local_table))
-        bytecode.append(Goto(0))
-        gotos.append(len(bytecode) - 1)
+                branch, fq_class_name, pool, local_table, layout))
+        if i < len(branches) - 1 or tifstmt.else_branch:
+            bytecode.append(Branch(Goto, end))
+        bytecode.append(next_branch)
 
     if tifstmt.else_branch:
         bytecode.extend(
             generate_bytecode_for_stmts(
-                tifstmt.else_branch, fq_class_name, pool, local_table))
-        
-    bytecode.append(Nop())
-
-    assert len(ifeqs) == len(gotos)
-    for ifeq, goto in zip(ifeqs, gotos):
-        ifeq_offset = bytesize(bytecode[ifeq:goto+1])
-        bytecode[ifeq] = Ifeq(ifeq_offset)
-        goto_offset = bytesize(bytecode[goto:len(bytecode)-1])
-        bytecode[goto] = Goto(goto_offset)
+                tifstmt.else_branch, fq_class_name, pool, local_table, layout))
 
+    bytecode.append(end)
     return bytecode
 
 
@@ -632,45 +1132,32 @@ def generate_bytecode_for_loop(
         tloop: TLoopStmt,
         fq_class_name: str,
         pool: ConstPool,
-        local_table: LocalTable) -> list[ByteCommand]:
+        local_table: LocalTable,
+        layout: JvmLayout) -> list[ByteCommand]:
+    """
+    Условие выхода вычисляется в одном месте - после тела цикла,
+    а при входе в цикл выполняется переход сразу к нему:
+
+        init; goto COND; BODY: body; COND: until_cond; ifeq BODY
+
+    Условие until переходит к BODY, если оно ложно, см. `generate_bytecode_for_condition`
+    """
+    body, condition = Label(), Label()
     bytecode = []
 
     bytecode.extend(
         generate_bytecode_for_stmts(
-            tloop.init_stmts, fq_class_name, pool, local_table))
+            tloop.init_stmts, fq_class_name, pool, local_table, layout))
+    bytecode.extend([Branch(Goto, condition), body])
 
-    bytecode.extend(
-        generate_bytecode_for_expr(
-            tloop.until_cond, fq_class_name, pool, local_table))
-    bytecode.extend(unpack_boolean(pool))
-    bytecode.append(Ifne(0))
-    ifnes1_index = len(bytecode) - 1
-
-    loop_start_index = len(bytecode)
     bytecode.extend(
         generate_bytecode_for_stmts(
-            tloop.body, fq_class_name, pool, local_table))
-    
-    bytecode.extend(
-        generate_bytecode_for_expr(
-            tloop.until_cond, fq_class_name, pool, local_table))
-    bytecode.extend(unpack_boolean(pool))
-    bytecode.append(Ifne(0))
-    ifnes2_index = len(bytecode) - 1
-    
-    bytecode.append(Goto(0))
-    goto_index = len(bytecode) - 1
-
-    bytecode.append(Nop())
+            tloop.body, fq_class_name, pool, local_table, layout))
 
-    bytecode[ifnes1_index] = Ifne(
-        bytesize(bytecode[ifnes1_index:goto_index+1]))
-    bytecode[ifnes2_index] = Ifne(
-        bytesize(bytecode[ifnes2_index:goto_index+1]))
-    
-    bytecode[goto_index] = Goto(
-        -bytesize(bytecode[loop_start_index:goto_index]))
-    
+    bytecode.append(condition)
+    bytecode.extend(
+        generate_bytecode_for_condition(
+            tloop.until_cond, False, body, fq_class_name, pool, local_table, layout))
     return bytecode
 
 
@@ -678,10 +1165,11 @@ def generate_bytecode_for_routine_call(
         troutine_call: TRoutineCall,
         fq_class_name: str,
         pool: ConstPool,
-        local_table: LocalTable) -> list[ByteCommand]:
+        local_table: LocalTable,
+        layout: JvmLayout) -> list[ByteCommand]:
     tfeature_call = troutine_call.feature_call
     bytecode = generate_bytecode_for_feature_call(
-        tfeature_call, fq_class_name, pool, local_table)
+        tfeature_call, fq_class_name, pool, local_table, layout)
     if tfeature_call.expr_type.full_name != "<VOID>":
         bytecode.append(Pop())
     return bytecode
@@ -691,20 +1179,21 @@ def generate_bytecode_for_stmt(
         tstmt: TStatement,
         fq_class_name: str,
         pool: ConstPool,
-        local_table: LocalTable) -> list[ByteCommand]:
+        local_table: LocalTable,
+        layout: JvmLayout) -> list[ByteCommand]:
     match tstmt:
         case TAssignment():
             return generate_bytecode_for_assignment(
-                tstmt, fq_class_name, pool, local_table)
+                tstmt, fq_class_name, pool, local_table, layout)
         case TRoutineCall():
             return generate_bytecode_for_routine_call(
-                tstmt, fq_class_name, pool, local_table)
+                tstmt, fq_class_name, pool, local_table, layout)
         case TIfStmt():
             return generate_bytecode_for_ifstmt(
-                tstmt, fq_class_name, pool, local_table)
+                tstmt, fq_class_name, pool, local_table, layout)
         case TLoopStmt():
             return generate_bytecode_for_loop(
-                tstmt, fq_class_name, pool, local_table)
+                tstmt, fq_class_name, pool, local_table, layout)
         case _: assert False
 
 
@@ -712,54 +1201,57 @@ def generate_bytecode_for_stmts(
         tstmts: list[TStatement],
         fq_class_name: str,
         pool: ConstPool,
-        local_table: LocalTable) -> list[ByteCommand]:
+        local_table: LocalTable,
+        layout: JvmLayout) -> list[ByteCommand]:
     bytecode = []
 
     for tstmt in tstmts:
         bytecode.extend(
             generate_bytecode_for_stmt(
-                tstmt, fq_class_name, pool, local_table))
+                tstmt, fq_class_name, pool, local_table, layout))
         
     return bytecode
 
 
-def pack_builtin_type(type_name: str, pool: ConstPool) -> list[ByteCommand]:
-    this = f"L{add_package_prefix(PLATFORM_CLASS_NAME)};"
-    desc_mapping = {
-        "STRING": f"(Ljava/lang/String;)V",
-        "CHARACTER": f"(Ljava/lang/String;)V",
-        "INTEGER": f"(I)V",
-        "REAL": f"(F)V",
-        "BOOLEAN": f"(I)V"
-    }
+VALUE_FACTORY_NAME = "valueOf"
+"""Статический метод встроенного класса, создающий объект из значения Java.
+Повторяющиеся значения он берет из кэша, см. `make_value_factory`
+"""
 
-    fq_class_name = add_package_prefix(type_name)
-    class_index = pool.find_class(fq_class_name)
-    methodref_idx = pool.add_methodref(
-        method_name="<init>",
-        desc=desc_mapping[type_name],
-        fq_class_name=fq_class_name)
 
-    bytecode = [
-        New(class_index),
-        Dupx1(),
-        Swap(),
-        InvokeSpecial(methodref_idx)
-    ]
+def value_factory_descriptor(type_name: str) -> str:
+    return f"({value_state(type_name).descriptor}){get_type_descriptor(Type(type_name))}"
 
-    return bytecode
+
+def pack_builtin_type(type_name: str, pool: ConstPool) -> list[ByteCommand]:
+    """Заменяет значение Java на вершине стека объектом встроенного типа"""
+    methodref_idx = pool.add_methodref(
+        method_name=VALUE_FACTORY_NAME,
+        desc=value_factory_descriptor(type_name),
+        fq_class_name=add_package_prefix(type_name))
+    return [InvokeStatic(methodref_idx)]
 
 
 def generate_bytecode_for_method(
         method: TMethod,
         fq_class_name: str,
         pool: ConstPool,
-        local_table: LocalTable)-> list[ByteCommand]:
+        local_table: LocalTable,
+        layout: JvmLayout) -> list[ByteCommand]:
+    """Код метода с переходами по меткам: смещения переходов
+    вычисляет assemble, до этого код можно оптимизировать, см. peephole
+    """
     bytecode = []
 
     match method:
         case TUserDefinedMethod(
                 body=body, return_type=return_type, variables=variables):
+            # Параметры приходят упакованными, а локальные переменные
+            # встроенных типов (и Result) хранятся в виде int и float
+            for vname, vtype in [*variables, ("local_Result", return_type)]:
+                if is_primitive(vtype):
+                    local_table.primitives[vname] = vtype.full_name
+
             for vname, vtype in variables:
                 bytecode.extend(
                     generate_bytecode_for_assignment(
@@ -768,35 +1260,47 @@ def generate_bytecode_for_method(
                             rvalue=default_value_for(vtype)),
                         fq_class_name=fq_class_name,
                         pool=pool,
-                        local_table=local_table))
+                        local_table=local_table,
+                        layout=layout))
 
             bytecode.extend(
                 generate_bytecode_for_stmts(
                     body,
                     fq_class_name,
                     pool,
-                    local_table))
+                    local_table,
+                    layout))
         case TExternalMethod(
                 parameters=parameters,
                 return_type=return_type,
                 alias=alias):
+            parts = split_package_path(alias)
+            # 1. Получить имя и класс static метода
+            #    Тут нет проверок на корректность задания alias,
+            #    это должно проверяться на этапе заполнения таблицы констант
+            ext_method_name = parts[-1]
+            ext_fq_class_name = make_fully_qualifed_name(parts[:-1])
+
             bytecode.append(Aload(0))
-            
+            # Методы встроенных классов получают значение Java вместо объекта
+            receiver = external_receiver(fq_class_name.rsplit("/", 1)[-1], ext_method_name)
+            if receiver is not None:
+                field_index = pool.add_fieldref(
+                    receiver.field_name, receiver.descriptor, fq_class_name)
+                bytecode.append(GetField(field_index))
+
             for pname, ptype in parameters:
                 bytecode.append(Aload(local_table[pname]))
                 if ptype.full_name in ["STRING", "INTEGER", "BOOLEAN", "CHARACTER", "REAL"]:
                     bytecode.extend(
                         unpack_builtin_type(ptype.full_name, pool))
 
-            parts = split_package_path(alias)
-            # 1. Получить имя и класс static метода
-            #    Тут нет проверок на корректность задания alias,
-            #    это должно проверяться на этапе заполнения таблицы констант
-            ext_method_name = parts[-1]
-            ext_fq_class_name = make_fully_qualifed_name(parts[:-1])
             # 2. Сгенерировать вызов invokestatic
-            methodref_index = pool.find_methodref(
-                ext_method_name, fq_class_name=ext_fq_class_name)
+            methodref_index = pool.add_methodref(
+                ext_method_name,
+                desc=get_external_method_descriptor(
+                    [ptype for (_, ptype) in parameters], return_type, receiver),
+                fq_class_name=ext_fq_class_name)
             bytecode.append(InvokeStatic(methodref_index))
     
     return_type = method.return_type
@@ -819,7 +1323,9 @@ def generate_bytecode_for_method(
                     case "BOOLEAN":
                         bytecode.extend(pack_builtin_type("BOOLEAN", pool))
         else:
-            bytecode.append(Aload(local_table["local_Result"]))
+            bytecode.extend(
+                generate_bytecode_for_variable(
+                    TVariable(return_type, "local_Result"), pool, local_table))
         bytecode.append(Areturn())
     else:
         bytecode.append(Return())
@@ -0,0 +1,227 @@
+"""Отображение классов Eiffel на классы JVM.
+
+Поддерживается два режима (class layout):
+
+* general - исходный режим компилятора: все классы наследуют класс
+  GENERAL, который содержит все методы и поля всех классов системы,
+  а любой вызов компилируется в invokevirtual метода GENERAL;
+* hierarchy - каждому классу Eiffel соответствует свой класс JVM.
+  Суперклассом в JVM становится основной родитель класса (первый
+  родитель, отличный от ANY), поэтому одиночное наследование отображается
+  на наследование в JVM. Остальные предки класса становятся интерфейсами:
+  для каждого такого предка T генерируется интерфейс T$Interface,
+  который реализуют T и все его потомки. Вызовы компилируются
+  по статическому типу цели: invokevirtual T.m, либо invokeinterface
+  T$Interface.m, если T в JVM является интерфейсом. Класс GENERAL в этом
+  режиме не содержит компонентов классов системы.
+
+В режиме hierarchy чтение атрибута другого объекта (x.a) компилируется
+в вызов метода чтения (getter), который есть у каждого класса
+для каждого атрибута его самого и его предков.
+
+В обоих режимах внешние методы встроенных классов, которые не переопределяет
+ни один потомок, вызываются без виртуального вызова: по статическому типу
+цели известен сам внешний метод, см. `value_externals`
+"""
+from __future__ import annotations
+from dataclasses import asdict, dataclass, field
+import hashlib
+import json
+
+from serpent.semantic_checker.symtab import ClassHierarchy, Type
+from serpent.semantic_checker.type_check import TClass, TExternalMethod
+from serpent.codegen.constpool import (
+    add_package_prefix,
+    external_receiver,
+    source_class_name,
+    split_package_path,
+    value_state,
+    PLATFORM_CLASS_NAME,
+    ROOT_CLASS_NAME,
+    VALUE_STATES)
+
+
+GENERAL_LAYOUT = "general"
+HIERARCHY_LAYOUT = "hierarchy"
+CLASS_LAYOUTS = [GENERAL_LAYOUT, HIERARCHY_LAYOUT]
+
+ANY_CLASS_NAME = "ANY"
+
+INTERFACE_SUFFIX = "$Interface"
+"""Суффикс имени интерфейса, который генерируется для класса T,
+если T является предком какого-либо класса, но не его суперклассом в JVM
+"""
+
+BUILTIN_CONSTRUCTORS = {
+    class_name: f"({state.descriptor})V"
+    for class_name, state in VALUE_STATES.items()
+    if state.holder is None
+}
+"""Дескрипторы конструкторов встроенных типов, через которые
+создаются их объекты из значений Java
+"""
+
+
+def json_value(value: object) -> object:
+    """Представление в JSON значений, которые json не умеет записывать сам"""
+    if isinstance(value, Type):
+        return {"name": value.name, "generics": list(value.generics)}
+    return sorted(value)
+
+
+def interface_name(class_name: str) -> str:
+    return class_name + INTERFACE_SUFFIX
+
+
+@dataclass(frozen=True)
+class JvmLayout:
+    mode: str = GENERAL_LAYOUT
+
+    super_classes: dict[str, str] = field(default_factory=dict)
+    """Суперкласс JVM каждого класса системы"""
+
+    ancestors: dict[str, list[str]] = field(default_factory=dict)
+    """Все предки каждого класса (ближайшие идут первыми)"""
+
+    interfaces: dict[str, list[str]] = field(default_factory=dict)
+    """Классы, интерфейсы которых класс реализует непосредственно
+    (интерфейсы, реализованные суперклассом, не повторяются)
+    """
+
+    interface_types: frozenset[str] = frozenset()
+    """Классы, для которых генерируется интерфейс"""
+
+    externals: dict[str, dict[str, TExternalMethod]] = field(default_factory=dict)
+    """Внешние методы встроенных классов, которые можно вызвать
+    непосредственно: класс -> имя компонента -> метод, см. `value_externals`
+    """
+
+    @property
+    def per_class(self) -> bool:
+        """Имеет ли каждый класс Eiffel собственную иерархию в JVM?"""
+        return self.mode == HIERARCHY_LAYOUT
+
+    def super_class(self, class_name: str) -> str:
+        if class_name == ROOT_CLASS_NAME:
+            return PLATFORM_CLASS_NAME
+        return self.super_classes.get(class_name, ROOT_CLASS_NAME)
+
+    def is_interface(self, class_name: str) -> bool:
+        return class_name in self.interface_types
+
+    def method_owner(self, class_name: str) -> str:
+        """Класс (полное имя), в Methodref которого попадает вызов
+        компонента объекта класса class_name через invokevirtual
+        """
+        if not self.per_class:
+            return add_package_prefix(ROOT_CLASS_NAME)
+        return add_package_prefix(class_name)
+
+    def external(self, class_name: str, method_name: str) -> TExternalMethod | None:
+        return self.externals.get(class_name, {}).get(method_name)
+
+    def digest(self) -> str:
+        data = json.dumps(asdict(self), sort_keys=True, default=json_value)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+
+def make_layout(
+        mode: str,
+        classes: list[TClass],
+        hierarchy: ClassHierarchy) -> JvmLayout:
+    """Отображает классы системы на классы JVM в режиме mode"""
+    externals = value_externals(classes)
+    if mode == GENERAL_LAYOUT:
+        return JvmLayout(externals=externals)
+
+    known = {tclass.class_name for tclass in classes}
+
+    def parents_of(class_name: str) -> list[str]:
+        # Дженерики среди родителей анализом наследования не поддерживаются,
+        # поэтому родителями могут быть только классы, известные по имени
+        return [
+            parent
+            for parent in hierarchy.hierarchy.get(source_class_name(class_name), [])
+            if parent in known and parent != class_name]
+
+    super_classes = {}
+    ancestors = {}
+    for tclass in classes:
+        name = tclass.class_name
+        parents = parents_of(name)
+        primary = next((p for p in parents if p != ANY_CLASS_NAME), None)
+        if primary is None and name != ANY_CLASS_NAME and ANY_CLASS_NAME in known:
+            primary = ANY_CLASS_NAME
+        super_classes[name] = primary or ROOT_CLASS_NAME
+
+        found = []
+        pending = list(parents)
+        while pending:
+            parent = pending.pop(0)
+            if parent not in found:
+                found.append(parent)
+                pending.extend(parents_of(parent))
+        ancestors[name] = found
+
+    def jvm_chain(class_name: str) -> list[str]:
+        chain = []
+        while class_name in super_classes and class_name not in chain:
+            chain.append(class_name)
+            class_name = super_classes[class_name]
+        return chain
+
+    interface_types = set()
+    for name, found in ancestors.items():
+        interface_types.update(set(found) - set(jvm_chain(name)))
+
+    interfaces: dict[str, list[str]] = {}
+    implemented: dict[str, set[str]] = {}
+
+    def implemented_by(class_name: str) -> set[str]:
+        if class_name not in super_classes:
+            return set()
+        if class_name not in implemented:
+            inherited = implemented_by(super_classes[class_name])
+            own = [
+                t for t in [class_name] + ancestors[class_name]
+                if t in interface_types and t not in inherited]
+            interfaces[class_name] = own
+            implemented[class_name] = inherited | set(own)
+        return implemented[class_name]
+
+    for tclass in classes:
+        implemented_by(tclass.class_name)
+
+    return JvmLayout(
+        mode=mode,
+        super_classes=super_classes,
+        ancestors=ancestors,
+        interfaces={name: interfaces[name] for name in sorted(interfaces)},
+        interface_types=frozenset(interface_types),
+        externals=externals)
+
+
+def value_externals(classes: list[TClass]) -> dict[str, dict[str, TExternalMethod]]:
+    """Находит внешние методы встроенных классов, работающие со значением
+    Java (КЛАСС_имя, см. `external_receiver`), которые есть только у самого
+    класса (и конкретизаций его дженерика). Раз потомков с таким компонентом
+    нет, вызов по статическому типу цели всегда попадает в этот метод
+    """
+    owners: dict[str, set[str]] = {}
+    for tclass in classes:
+        for method in tclass.methods:
+            owners.setdefault(method.method_name, set()).add(source_class_name(tclass.class_name))
+
+    externals = {}
+    for tclass in classes:
+        if value_state(tclass.class_name) is None:
+            continue
+        methods = {}
+        for method in tclass.methods:
+            if (isinstance(method, TExternalMethod)
+                    and owners[method.method_name] == {source_class_name(tclass.class_name)}
+                    and external_receiver(
+                        tclass.class_name, split_package_path(method.alias)[-1]) is not None):
+                methods[method.method_name] = method
+        externals[tclass.class_name] = methods
+    return externals
@@ -0,0 +1,341 @@
+"""Peephole-оптимизация кода методов.
+
+Оптимизатор получает код метода так, как его построил генератор
+(с метками Label и переходами Branch, см. serpent.codegen.assembler),
+и заменяет избыточные последовательности команд более короткими.
+Он работает до assemble, поэтому правила оперируют метками, а не
+смещениями, и могут свободно удалять и добавлять команды.
+
+Уровни оптимизации (serpent build -O0, -O1, -O2):
+
+-O0 - код не изменяется.
+
+-O1 - правила, которым достаточно нескольких соседних команд:
+  * переход на goto сразу ведет к его цели, goto на return
+    заменяется самим return;
+  * if* L; goto M; L: -> if!* M; L: (обратное условие);
+  * переход по известному значению: iconst c; ifeq L превращается
+    в goto L или исчезает, а iconst c; goto L, где L: ifeq M, - в переход
+    сразу к M или за ifeq. Так BOOLEAN, полученный сравнением и тут же
+    проверенный, не кладется на стек;
+  * удаляются goto на следующую команду, недостижимые команды после
+    goto и return, метки без переходов на них, dup; pop и значения
+    без побочных эффектов, которые сразу снимаются pop;
+  * краткие формы команд: aload_0 ... astore_3, iinc вместо
+    iload n; iconst c; iadd; istore n, ldc вместо ldc_w.
+
+-O2 - дополнительно правила, которым нужен весь метод:
+  * сохранение в слот, который нигде не читается или перезаписывается
+    дальше на том же линейном участке до чтения, заменяется на pop;
+  * store n; load n, если это единственное чтение слота n, удаляется,
+    и значение просто остается на стеке.
+"""
+from __future__ import annotations
+from collections import Counter
+from dataclasses import dataclass
+
+from serpent.codegen.bytecommand import *
+from serpent.codegen.assembler import BRANCH_SIZE, INVERTED_JUMPS, Branch, Label
+from serpent.codegen.constpool import ConstPool, ROOT_CLASS_NAME, add_package_prefix
+
+
+OPTIMIZATION_LEVELS = (0, 1, 2)
+
+RETURNS = {Return, Areturn, Ireturn}
+
+LOADS = {Iload, Fload, Aload}
+
+STORES = {Istore: Iload, Fstore: Fload, Astore: Aload}
+"""Команды сохранения и соответствующие им команды загрузки"""
+
+SHORT_FORMS = {
+    Iload: Iload_n, Fload: Fload_n, Aload: Aload_n,
+    Istore: Istore_n, Fstore: Fstore_n, Astore: Astore_n,
+}
+"""Команды с номером слота и их однобайтные формы для слотов 0-3"""
+
+CONSTANTS = {Iconst_i, Fconst_f, Aconst_null, Bipush, Sipush, Ldc, Ldc_w}
+
+
+@dataclass(frozen=True)
+class MethodSavings:
+    """Размер метода до и после оптимизации"""
+    class_name: str
+    method_name: str
+    commands: int
+    optimized_commands: int
+    size: int
+    optimized_size: int
+
+    @classmethod
+    def of(cls,
+           class_name: str,
+           method_name: str,
+           bytecode: list[ByteCommand],
+           optimized: list[ByteCommand]) -> MethodSavings:
+        return cls(
+            class_name,
+            method_name,
+            command_count(bytecode),
+            command_count(optimized),
+            code_size(bytecode),
+            code_size(optimized))
+
+
+def command_count(bytecode: list[ByteCommand]) -> int:
+    return sum(type(command) is not Label for command in bytecode)
+
+
+def code_size(bytecode: list[ByteCommand]) -> int:
+    """Размер кода в байтах без учета широких переходов, см. assemble"""
+    return sum(
+        0 if type(command) is Label else BRANCH_SIZE if type(command) is Branch else command.size()
+        for command in bytecode)
+
+
+def format_savings(savings: list[MethodSavings], level: int) -> str:
+    """Отчет о методах, которые уменьшились после оптимизации"""
+    lines = [f"Peephole optimization (-O{level}):"]
+    for item in savings:
+        if (item.commands, item.size) != (item.optimized_commands, item.optimized_size):
+            lines.append(
+                f"  {item.class_name}.{item.method_name}: "
+                f"{item.commands} -> {item.optimized_commands} instructions, "
+                f"{item.size} -> {item.optimized_size} bytes")
+
+    commands = sum(item.commands for item in savings)
+    optimized_commands = sum(item.optimized_commands for item in savings)
+    size = sum(item.size for item in savings)
+    optimized_size = sum(item.optimized_size for item in savings)
+    percent = 100 * (size - optimized_size) / size if size else 0
+    lines.append(
+        f"  total ({len(savings)} methods): {commands} -> {optimized_commands} instructions, "
+        f"{size} -> {optimized_size} bytes (-{percent:.1f}%)")
+    return "\n".join(lines)
+
+
+def optimize(bytecode: list[ByteCommand], pool: ConstPool, level: int) -> list[ByteCommand]:
+    """Применяет к коду метода правила уровня level, пока они что-то меняют.
+    Каждый проход возвращает тот же список, если ничего не изменил
+    """
+    if level == 0:
+        return bytecode
+
+    while True:
+        optimized = simplify(bytecode, pool)
+        if level >= 2:
+            optimized = eliminate_stores(optimized)
+        if optimized is bytecode:
+            break
+        bytecode = optimized
+    return shorten(bytecode)
+
+
+def has_no_side_effects(command: ByteCommand, pool: ConstPool) -> bool:
+    """Кладет ли команда на стек значение, ничего больше не делая.
+    Статические поля текущего класса и GENERAL читаются без инициализации
+    класса: к моменту выполнения метода оба класса уже инициализированы
+    """
+    if type(command) in CONSTANTS or type(command) in LOADS:
+        return True
+    if type(command) is GetStatic:
+        owner = pool.get_by_index(command.index).fq_class_name
+        return owner in (pool.fq_class_name, add_package_prefix(ROOT_CLASS_NAME))
+    return False
+
+
+def simplify(bytecode: list[ByteCommand], pool: ConstPool) -> list[ByteCommand]:
+    """Один проход правил уровня -O1, кроме кратких форм команд"""
+    return remove_redundant(thread_jumps(bytecode), pool)
+
+
+def thread_jumps(bytecode: list[ByteCommand]) -> list[ByteCommand]:
+    """Направляет переходы сразу к конечной цели"""
+    positions = {command: i for i, command in enumerate(bytecode) if type(command) is Label}
+
+    def destination(label: Label) -> int | None:
+        """Индекс первой команды после метки"""
+        i = positions[label]
+        while i < len(bytecode) and type(bytecode[i]) is Label:
+            i += 1
+        return i if i < len(bytecode) else None
+
+    def final_label(label: Label) -> Label:
+        seen = {label}
+        while True:
+            i = destination(label)
+            if i is None:
+                return label
+            command = bytecode[i]
+            if type(command) is not Branch or command.jump is not Goto or command.label in seen:
+                return label
+            label = command.label
+            seen.add(label)
+
+    replacements: dict[int, list[ByteCommand]] = {}
+    after: dict[int, Label] = {}
+    for i, command in enumerate(bytecode):
+        if type(command) is not Branch:
+            continue
+
+        label = final_label(command.label)
+        target = destination(label)
+        if command.jump is Goto and target is not None:
+            target_command = bytecode[target]
+            if type(target_command) in RETURNS:
+                replacements[i] = [target_command]
+                continue
+
+            previous = bytecode[i - 1] if i > 0 else None
+            if (type(previous) is Iconst_i
+                    and type(target_command) is Branch
+                    and target_command.jump in (Ifeq, Ifne)):
+                # Значение на вершине стека известно, условный переход
+                # после метки выполнится (или нет) наверняка
+                replacements[i - 1] = []
+                if (previous.i == 0) == (target_command.jump is Ifeq):
+                    replacements[i] = [Branch(Goto, final_label(target_command.label))]
+                else:
+                    after.setdefault(target, Label())
+                    replacements[i] = [Branch(Goto, after[target])]
+                continue
+
+        if label is not command.label:
+            replacements[i] = [Branch(command.jump, label)]
+
+    if not replacements:
+        return bytecode
+
+    return rewrite(bytecode, replacements, after)
+
+
+def rewrite(
+        bytecode: list[ByteCommand],
+        replacements: dict[int, list[ByteCommand]],
+        after: dict[int, Label] | None = None) -> list[ByteCommand]:
+    """Заменяет команды с индексами из replacements и ставит метки after
+    за командами с заданными индексами
+    """
+    after = after or {}
+    result = []
+    for i, command in enumerate(bytecode):
+        if i in replacements:
+            result.extend(replacements[i])
+        else:
+            result.append(command)
+        if i in after:
+            result.append(after[i])
+    return result
+
+
+def remove_redundant(bytecode: list[ByteCommand], pool: ConstPool) -> list[ByteCommand]:
+    """Удаляет лишние переходы, недостижимый код и ненужные значения.
+    Каждое правило укорачивает код, поэтому код не изменился,
+    если его длина осталась прежней
+    """
+    referenced = {command.label for command in bytecode if type(command) is Branch}
+    result = []
+    reachable = True
+    for command in bytecode:
+        command_type = type(command)
+        if command_type is Label:
+            if command not in referenced:
+                continue
+            reachable = True
+            last = result[-1] if result else None
+            if type(last) is Branch and last.jump is Goto:
+                if last.label is command:
+                    # goto L; L:
+                    result.pop()
+                elif (len(result) >= 2
+                        and type(result[-2]) is Branch and result[-2].label is command
+                        and result[-2].jump in INVERTED_JUMPS):
+                    # if* L; goto M; L: -> if!* M; L:
+                    result.pop()
+                    result[-1] = Branch(INVERTED_JUMPS[result[-1].jump], last.label)
+            result.append(command)
+            continue
+
+        if not reachable:
+            continue
+
+        if (command_type is Branch
+                and command.jump in (Ifeq, Ifne)
+                and result and type(result[-1]) is Iconst_i):
+            value = result.pop().i
+            if (value == 0) != (command.jump is Ifeq):
+                continue
+            command = Branch(Goto, command.label)
+        elif command_type is Pop and result and (
+                type(result[-1]) is Dup or has_no_side_effects(result[-1], pool)):
+            result.pop()
+            continue
+
+        result.append(command)
+        reachable = not (command_type in RETURNS or command_type is Branch and command.jump is Goto)
+    return result if len(result) < len(bytecode) else bytecode
+
+
+def is_overwritten(bytecode: list[ByteCommand], start: int, slot: int) -> bool:
+    """Записывается ли слот заново до чтения на линейном участке, начиная с start"""
+    for i in range(start, len(bytecode)):
+        command = bytecode[i]
+        if type(command) in (Label, Branch) or type(command) in RETURNS:
+            return False
+        if type(command) in LOADS and command.var_index == slot:
+            return False
+        if type(command) in STORES and command.var_index == slot:
+            return True
+    return False
+
+
+def eliminate_stores(bytecode: list[ByteCommand]) -> list[ByteCommand]:
+    """Удаляет сохранения в слоты, которые затем не читаются (-O2)"""
+    loads = Counter(command.var_index for command in bytecode if type(command) in LOADS)
+
+    replacements = {}
+    for i, command in enumerate(bytecode):
+        if type(command) not in STORES:
+            continue
+
+        slot = command.var_index
+        following = bytecode[i + 1] if i + 1 < len(bytecode) else None
+        if loads[slot] == 0 or is_overwritten(bytecode, i + 1, slot):
+            replacements[i] = [Pop()]
+        elif loads[slot] == 1 and following == STORES[type(command)](slot):
+            # Значение читается только здесь, сразу после сохранения
+            loads[slot] = 0
+            replacements[i] = replacements[i + 1] = []
+    return rewrite(bytecode, replacements) if replacements else bytecode
+
+
+def integer_constant(command: ByteCommand) -> int | None:
+    match command:
+        case Iconst_i(i=value) | Bipush(value=value) | Sipush(value=value):
+            return value
+    return None
+
+
+def shorten(bytecode: list[ByteCommand]) -> list[ByteCommand]:
+    """Заменяет команды их краткими формами"""
+    result = []
+    for command in bytecode:
+        if type(command) is Istore and len(result) >= 3:
+            load, constant, operation = result[-3:]
+            value = integer_constant(constant)
+            if type(operation) is Isub and value is not None:
+                value = -value
+            if (load == Iload(command.var_index)
+                    and type(operation) in (Iadd, Isub)
+                    and value is not None and -128 <= value <= 127):
+                # iload n; iconst c; iadd; istore n
+                result[-3:] = [Iinc(command.var_index, value)]
+                continue
+        result.append(command)
+
+    for i, command in enumerate(result):
+        if type(command) in SHORT_FORMS and command.var_index <= 3:
+            result[i] = SHORT_FORMS[type(command)](command.var_index)
+        elif type(command) is Ldc_w and command.index <= 0xff:
+            result[i] = Ldc(command.index)
+    return result
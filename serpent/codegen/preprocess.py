@@ -1,12 +1,8 @@
-from typing import Iterable
-
 from serpent.semantic_checker.symtab import Type
 from serpent.semantic_checker.type_check import (
     TClass,
     TMethod,
-    TUserDefinedMethod,
     TField,
-    TAssignment,
     TExpr,
     TIntegerConst,
     TRealConst,
@@ -35,25 +31,6 @@ def default_value_for(typ: Type) -> TExpr:
     return value
 
 
-def make_general_constructor(fields: Iterable[TField]) -> TMethod:
-    assignments = []
-
-    for field in fields:
-        assignments.append(
-            TAssignment(
-                lvalue=field,
-                rvalue=default_value_for(field.expr_type))
-        )
-
-    return TUserDefinedMethod(
-        method_name="set_default_values",
-        parameters=[],
-        return_type=Type("<VOID>"),
-        is_constructor=True,
-        variables=[],
-        body=assignments)
-
-
 def make_general_class(classes: list[TClass]) -> TClass:
     """
     Создаёт общий класс GENERAL, объединяя все методы и поля из списка классов.
@@ -91,7 +68,4 @@ def make_general_class(classes: list[TClass]) -> TClass:
                 seen_fields[key] = True
                 unique_fields.append(field)
 
-    # Добавляем конструктор по умолчанию, он не будет конфликтовать
-    # с уже найденными конструкторами, т.к. имеет уникальное имя <init>
-    unique_methods.append(make_general_constructor(unique_fields))
     return TClass(class_name=ROOT_CLASS_NAME, methods=unique_methods, fields=unique_fields)
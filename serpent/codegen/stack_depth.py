@@ -0,0 +1,601 @@
+"""Вычисление max_stack и max_locals атрибута Code.
+
+Глубина стека операндов считается обходом команд метода: начиная с первой
+команды, для каждой достижимой команды известна глубина стека перед ней,
+а глубина после нее получается из числа снимаемых и кладемых на стек слотов
+(STACK_EFFECTS, для вызовов и полей - по дескриптору из таблицы констант).
+Дальше обход идет по всем преемникам команды: следующей команде и целям
+переходов (if*, goto, switch). Обработчики исключений начинаются с глубины 1
+(на стеке лежит исключение). max_stack - наибольшая глубина среди всех
+достижимых команд.
+
+max_locals - число слотов параметров (вместе с this) из LocalTable или
+номер наибольшего слота, к которому обращаются команды *load/*store, плюс 1.
+
+Модуль также проверяет class-файлы по выводу javap -v: стек и локальные
+переменные заново вычисляются по дизассемблированному коду и сравниваются
+со значениями stack= и locals= из файла. Независимой такая проверка
+является только для классов, собранных javac (классы RTL в каталоге
+сборки): их stack= вычислил javac. Для классов, созданных компилятором,
+stack= получен этим же модулем, поэтому проверка лишь подтверждает, что
+записанные значения соответствуют записанному коду (смещения переходов,
+сериализация команд), но не находит ошибок в STACK_EFFECTS. Без аргументов
+собираются все примеры из examples/ в обоих режимах отображения классов:
+    python -m serpent.codegen.stack_depth
+    python -m serpent.codegen.stack_depth build/classes --javap /usr/bin/javap
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+import argparse
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+from typing import Iterable
+
+from serpent.codegen.bytecommand import *
+from serpent.codegen.constpool import ConstPool
+from serpent.codegen.layout import CLASS_LAYOUTS
+
+
+STACK_EFFECTS: dict[str, tuple[int, int]] = {
+    "nop": (0, 0),
+    "aconstnull": (0, 1),
+    "iconst": (0, 1),
+    "fconst": (0, 1),
+    "bipush": (0, 1),
+    "sipush": (0, 1),
+    "ldc": (0, 1),
+    "ldcw": (0, 1),
+    "ldc2w": (0, 2),
+    "iload": (0, 1),
+    "fload": (0, 1),
+    "aload": (0, 1),
+    "lload": (0, 2),
+    "dload": (0, 2),
+    "istore": (1, 0),
+    "fstore": (1, 0),
+    "astore": (1, 0),
+    "lstore": (2, 0),
+    "dstore": (2, 0),
+    "iinc": (0, 0),
+    "pop": (1, 0),
+    "pop2": (2, 0),
+    "dup": (1, 2),
+    "dupx1": (2, 3),
+    "dupx2": (3, 4),
+    "dup2": (2, 4),
+    "dup2x1": (3, 5),
+    "dup2x2": (4, 6),
+    "swap": (2, 2),
+    "iadd": (2, 1),
+    "isub": (2, 1),
+    "imul": (2, 1),
+    "idiv": (2, 1),
+    "irem": (2, 1),
+    "ineg": (1, 1),
+    "fadd": (2, 1),
+    "fsub": (2, 1),
+    "fmul": (2, 1),
+    "fdiv": (2, 1),
+    "frem": (2, 1),
+    "fneg": (1, 1),
+    "ishl": (2, 1),
+    "ishr": (2, 1),
+    "iushr": (2, 1),
+    "iand": (2, 1),
+    "ior": (2, 1),
+    "ixor": (2, 1),
+    "i2f": (1, 1),
+    "f2i": (1, 1),
+    "i2c": (1, 1),
+    "fcmpl": (2, 1),
+    "fcmpg": (2, 1),
+    "ifeq": (1, 0),
+    "ifne": (1, 0),
+    "iflt": (1, 0),
+    "ifge": (1, 0),
+    "ifgt": (1, 0),
+    "ifle": (1, 0),
+    "ificmpeq": (2, 0),
+    "ificmpne": (2, 0),
+    "ificmplt": (2, 0),
+    "ificmpge": (2, 0),
+    "ificmpgt": (2, 0),
+    "ificmple": (2, 0),
+    "ifacmpeq": (2, 0),
+    "ifacmpne": (2, 0),
+    "ifnull": (1, 0),
+    "ifnonnull": (1, 0),
+    "goto": (0, 0),
+    "gotow": (0, 0),
+    "tableswitch": (1, 0),
+    "lookupswitch": (1, 0),
+    "ireturn": (1, 0),
+    "freturn": (1, 0),
+    "areturn": (1, 0),
+    "return": (0, 0),
+    "athrow": (1, 0),
+    "newarray": (1, 1),
+    "anewarray": (1, 1),
+    "arraylength": (1, 1),
+    "iaload": (2, 1),
+    "faload": (2, 1),
+    "aaload": (2, 1),
+    "baload": (2, 1),
+    "caload": (2, 1),
+    "iastore": (3, 0),
+    "fastore": (3, 0),
+    "aastore": (3, 0),
+    "bastore": (3, 0),
+    "castore": (3, 0),
+    "new": (0, 1),
+    "checkcast": (1, 1),
+    "instanceof": (1, 1),
+    "monitorenter": (1, 0),
+    "monitorexit": (1, 0),
+    # Команды, которые компилятор не генерирует, но которые встречаются
+    # в классах RTL, собранных javac
+    "lconst": (0, 2),
+    "dconst": (0, 2),
+    "laload": (2, 2),
+    "daload": (2, 2),
+    "saload": (2, 1),
+    "lastore": (4, 0),
+    "dastore": (4, 0),
+    "sastore": (3, 0),
+    "ladd": (4, 2),
+    "lsub": (4, 2),
+    "lmul": (4, 2),
+    "ldiv": (4, 2),
+    "lrem": (4, 2),
+    "land": (4, 2),
+    "lor": (4, 2),
+    "lxor": (4, 2),
+    "lneg": (2, 2),
+    "lshl": (3, 2),
+    "lshr": (3, 2),
+    "lushr": (3, 2),
+    "dadd": (4, 2),
+    "dsub": (4, 2),
+    "dmul": (4, 2),
+    "ddiv": (4, 2),
+    "drem": (4, 2),
+    "dneg": (2, 2),
+    "i2l": (1, 2),
+    "i2d": (1, 2),
+    "i2b": (1, 1),
+    "i2s": (1, 1),
+    "l2i": (2, 1),
+    "l2f": (2, 1),
+    "l2d": (2, 2),
+    "f2l": (1, 2),
+    "f2d": (1, 2),
+    "d2i": (2, 1),
+    "d2l": (2, 2),
+    "d2f": (2, 1),
+    "lcmp": (4, 1),
+    "dcmpl": (4, 1),
+    "dcmpg": (4, 1),
+    "lreturn": (2, 0),
+    "dreturn": (2, 0),
+}
+"""Сколько слотов команда снимает со стека и сколько кладет на него.
+Ключ - мнемоника JVM без подчеркиваний и без номера в кратких формах
+(iconst_m1 -> iconst, aload_0 -> aload, if_icmpeq -> ificmpeq)
+"""
+
+DESCRIPTOR_EFFECTS = {
+    "getstatic", "putstatic", "getfield", "putfield",
+    "invokevirtual", "invokespecial", "invokestatic", "invokeinterface", "invokedynamic",
+}
+"""Команды, действие которых на стек зависит от дескриптора поля или метода"""
+
+UNCONDITIONAL = {"goto", "gotow", "tableswitch", "lookupswitch", "athrow",
+                 "ireturn", "lreturn", "freturn", "dreturn", "areturn", "return"}
+"""Команды, после которых управление не переходит к следующей команде"""
+
+LOCAL_WIDTHS = {
+    "iload": 1, "fload": 1, "aload": 1, "istore": 1, "fstore": 1, "astore": 1, "iinc": 1,
+    "lload": 2, "dload": 2, "lstore": 2, "dstore": 2,
+}
+"""Команды, обращающиеся к локальным переменным, и число занимаемых ими слотов"""
+
+BRANCHES = {
+    "ifeq", "ifne", "iflt", "ifge", "ifgt", "ifle",
+    "ificmpeq", "ificmpne", "ificmplt", "ificmpge", "ificmpgt", "ificmple",
+    "ifacmpeq", "ifacmpne", "ifnull", "ifnonnull", "goto", "gotow",
+}
+"""Команды с одним смещением перехода"""
+
+SWITCHES = {"tableswitch", "lookupswitch"}
+
+COMMAND_MNEMONICS = {
+    Iconst_i: "iconst", Fconst_f: "fconst",
+    Iload_n: "iload", Fload_n: "fload", Aload_n: "aload",
+    Istore_n: "istore", Fstore_n: "fstore", Astore_n: "astore",
+}
+
+@dataclass(slots=True)
+class Instruction:
+    offset: int
+    mnemonic: str
+    pops: int
+    pushes: int
+    targets: tuple[int, ...] = ()
+    """Смещения команд, на которые возможен переход"""
+
+    local: int | None = None
+    """Номер слота локальной переменной для команд *load/*store"""
+
+    falls_through: bool = True
+    """Может ли управление перейти к следующей команде"""
+
+
+@dataclass(frozen=True)
+class CommandKind:
+    mnemonic: str
+    effect: tuple[int, int] | None
+    """Действие на стек, None - зависит от дескриптора"""
+
+    size: int | None
+    """Размер команды в байтах, None - зависит от операндов"""
+
+
+def normalize_mnemonic(mnemonic: str) -> str:
+    """Приводит мнемонику javap к ключу STACK_EFFECTS"""
+    return re.sub(r"_(m1|\d+)$", "", mnemonic).replace("_", "")
+
+
+def command_mnemonic(command: ByteCommand) -> str:
+    command_type = type(command)
+    return COMMAND_MNEMONICS.get(command_type) or command_type.__name__.lower().replace("_", "")
+
+
+COMMAND_KINDS: dict[type, CommandKind] = {}
+"""Сведения о командах по их классу, заполняются при первой встрече"""
+
+
+def command_kind(command: ByteCommand) -> CommandKind:
+    kind = COMMAND_KINDS.get(type(command))
+    if kind is None:
+        mnemonic = command_mnemonic(command)
+        kind = CommandKind(
+            mnemonic,
+            None if mnemonic in DESCRIPTOR_EFFECTS else STACK_EFFECTS[mnemonic],
+            None if mnemonic in SWITCHES else command.size())
+        COMMAND_KINDS[type(command)] = kind
+    return kind
+
+
+def slot_count(descriptor: str) -> int:
+    return 0 if descriptor == "V" else 2 if descriptor in ("J", "D") else 1
+
+
+@lru_cache(maxsize=None)
+def descriptor_slots(descriptor: str) -> tuple[int, int]:
+    """Возвращает число слотов аргументов и результата дескриптора метода
+    или (0, число слотов значения) для дескриптора поля
+    """
+    if not descriptor.startswith("("):
+        return 0, slot_count(descriptor)
+
+    arguments = 0
+    i = 1
+    while descriptor[i] != ")":
+        start = i
+        while descriptor[i] == "[":
+            i += 1
+        if descriptor[i] == "L":
+            i = descriptor.index(";", i)
+        i += 1
+        arguments += slot_count(descriptor[start:i]) if i - start == 1 else 1
+    return arguments, slot_count(descriptor[i + 1:])
+
+
+def stack_effect(mnemonic: str, descriptor: str | None = None) -> tuple[int, int]:
+    if mnemonic not in DESCRIPTOR_EFFECTS:
+        return STACK_EFFECTS[mnemonic]
+
+    arguments, value = descriptor_slots(descriptor)
+    match mnemonic:
+        case "getstatic":
+            return 0, value
+        case "putstatic":
+            return value, 0
+        case "getfield":
+            return 1, value
+        case "putfield":
+            return 1 + value, 0
+        case "invokestatic" | "invokedynamic":
+            return arguments, value
+        case _:
+            return arguments + 1, value
+
+
+def command_targets(command: ByteCommand, mnemonic: str, offset: int) -> tuple[int, ...]:
+    if mnemonic in BRANCHES:
+        return (offset + command.offset,)
+    if mnemonic == "tableswitch":
+        return tuple(offset + target for target in (command.default_offset, *command.offsets))
+    if mnemonic == "lookupswitch":
+        return tuple(offset + target for target in (command.default_offset, *(t for _, t in command.pairs)))
+    return ()
+
+
+def instructions_of(bytecode: list[ByteCommand], pool: ConstPool) -> list[Instruction]:
+    """Переводит команды метода в Instruction со смещениями в байтах"""
+    instructions = []
+    offset = 0
+    for command in bytecode:
+        kind = command_kind(command)
+        mnemonic = kind.mnemonic
+        pops, pushes = kind.effect or stack_effect(mnemonic, pool.get_by_index(command.index).type)
+        instructions.append(Instruction(
+            offset,
+            mnemonic,
+            pops,
+            pushes,
+            command_targets(command, mnemonic, offset),
+            command.var_index if mnemonic in LOCAL_WIDTHS else None,
+            mnemonic not in UNCONDITIONAL))
+        offset += kind.size or command.size()
+    return instructions
+
+
+def max_stack_depth(instructions: list[Instruction], handlers: Iterable[int] = ()) -> int:
+    """Наибольшая глубина стека операндов среди достижимых команд.
+    handlers - смещения начал обработчиков исключений, в них стек
+    содержит только исключение. Если в команду можно прийти с разной
+    глубиной стека или команда снимает со стека больше, чем на нем лежит,
+    выбрасывается ValueError
+    """
+    if not instructions:
+        return 0
+
+    by_offset = {instruction.offset: i for i, instruction in enumerate(instructions)}
+    depths = {0: 0}
+    for handler in handlers:
+        depths[by_offset[handler]] = 1
+    pending = list(depths)
+    max_depth = max(depths.values())
+    while pending:
+        i = pending.pop()
+        instruction = instructions[i]
+        depth = depths[i]
+        if depth < instruction.pops:
+            raise ValueError(
+                f"stack underflow at {instruction.offset}: {instruction.mnemonic}")
+        depth += instruction.pushes - instruction.pops
+        max_depth = max(max_depth, depth)
+
+        successors = [by_offset[target] for target in instruction.targets]
+        if instruction.falls_through and i + 1 < len(instructions):
+            successors.append(i + 1)
+        for successor in successors:
+            if successor not in depths:
+                depths[successor] = depth
+                pending.append(successor)
+            elif depths[successor] != depth:
+                raise ValueError(
+                    f"inconsistent stack depth at {instructions[successor].offset}: "
+                    f"{depths[successor]} and {depth}")
+
+    return max_depth
+
+
+def max_locals_count(instructions: list[Instruction], parameter_slots: int) -> int:
+    """Число слотов локальных переменных: параметры (вместе с this)
+    и все слоты, к которым обращаются команды
+    """
+    return max(
+        [parameter_slots] + [
+            instruction.local + LOCAL_WIDTHS[instruction.mnemonic]
+            for instruction in instructions
+            if instruction.local is not None])
+
+
+def compute_max_stack(bytecode: list[ByteCommand], pool: ConstPool) -> int:
+    return max_stack_depth(instructions_of(bytecode, pool))
+
+
+# Проверка по javap -v
+
+
+@dataclass(frozen=True)
+class JavapMethod:
+    name: str
+    stack: int
+    locals: int
+    args_size: int
+    instructions: list[Instruction]
+    handlers: list[int]
+    """Смещения начал обработчиков из Exception table"""
+
+
+JAVAP_INSTRUCTION = re.compile(r"^\s*(\d+): ([a-z][a-z0-9_]*)\b\s*(.*)$")
+JAVAP_SWITCH_CASE = re.compile(r"^\s*(-?\d+|default): (-?\d+)$")
+JAVAP_CODE_SIZES = re.compile(r"stack=(\d+), locals=(\d+), args_size=(\d+)")
+JAVAP_HANDLER = re.compile(r"^\s*(\d+)\s+(\d+)\s+(\d+)\s+(Class \S+|any)$")
+JAVAC_SOURCE_FILE = re.compile(r'^SourceFile: ".*\.java"$', re.MULTILINE)
+
+
+def parse_javap_instruction(offset: int, mnemonic: str, operands: str) -> Instruction:
+    key = normalize_mnemonic(mnemonic)
+    descriptor = None
+    if key in DESCRIPTOR_EFFECTS:
+        # invokevirtual #7  // Method com/eiffel/INTEGER.valueOf:(I)Lcom/eiffel/INTEGER;
+        descriptor = operands.rsplit(":", 1)[1].strip()
+    pops, pushes = stack_effect(key, descriptor)
+
+    local = None
+    if key in LOCAL_WIDTHS:
+        short_form = re.search(r"_(\d+)$", mnemonic)
+        local = int(short_form.group(1) if short_form else operands.split(",")[0])
+
+    targets = ()
+    if key in BRANCHES:
+        targets = (int(operands.split()[0]),)
+    return Instruction(offset, key, pops, pushes, targets, local, key not in UNCONDITIONAL)
+
+
+def parse_javap(output: str) -> list[JavapMethod]:
+    """Разбирает вывод javap -v -p: для каждого метода с кодом
+    возвращает stack, locals, args_size и список команд
+    """
+    methods = []
+    name = ""
+    current = None
+    switch = None
+    for line in output.splitlines():
+        if line.startswith("  ") and not line.startswith("   ") and line.rstrip().endswith(";"):
+            name = line.strip().rstrip(";")
+            current = None
+            continue
+
+        sizes = JAVAP_CODE_SIZES.search(line)
+        if sizes:
+            stack, locals_count, args_size = map(int, sizes.groups())
+            current = JavapMethod(name, stack, locals_count, args_size, [], [])
+            methods.append(current)
+            continue
+        if current is None:
+            continue
+
+        if switch is not None:
+            case = JAVAP_SWITCH_CASE.match(line)
+            if case:
+                switch.append(int(case.group(2)))
+                continue
+            if line.strip() == "}":
+                current.instructions[-1].targets = tuple(switch)
+                switch = None
+                continue
+
+        handler = JAVAP_HANDLER.match(line)
+        if handler:
+            current.handlers.append(int(handler.group(3)))
+            continue
+
+        instruction = JAVAP_INSTRUCTION.match(line)
+        if instruction:
+            offset, mnemonic, operands = instruction.groups()
+            current.instructions.append(parse_javap_instruction(int(offset), mnemonic, operands))
+            if mnemonic in SWITCHES:
+                switch = []
+        elif line.strip() and not line.startswith("      "):
+            # Конец кода метода (LineNumberTable, следующий метод и т.п.)
+            current = None
+
+    return methods
+
+
+def check_javap_output(output: str) -> list[str]:
+    """Сравнивает stack= и locals= каждого метода со значениями,
+    вычисленными по его дизассемблированному коду.
+    Возвращает список расхождений
+    """
+    problems = []
+    for method in parse_javap(output):
+        try:
+            stack = max_stack_depth(method.instructions, method.handlers)
+        except ValueError as error:
+            problems.append(f"{method.name}: {error}")
+            continue
+
+        locals_count = max_locals_count(method.instructions, method.args_size)
+        if stack != method.stack:
+            problems.append(f"{method.name}: stack={method.stack}, computed {stack}")
+        if locals_count != method.locals:
+            problems.append(f"{method.name}: locals={method.locals}, computed {locals_count}")
+    return problems
+
+
+def is_compiled_by_javac(output: str) -> bool:
+    """Собран ли класс javac: компилятор не записывает атрибут SourceFile"""
+    return JAVAC_SOURCE_FILE.search(output) is not None
+
+
+def check_class_files(class_dir: Path, javap: str) -> tuple[int, int, list[str]]:
+    """Проверяет все class-файлы каталога. Возвращает число методов классов,
+    собранных javac, число методов классов компилятора и расхождения
+    """
+    javac_methods = 0
+    generated_methods = 0
+    problems = []
+    for class_file in sorted(Path(class_dir).rglob("*.class")):
+        result = subprocess.run(
+            [javap, "-v", "-p", str(class_file)], capture_output=True, text=True)
+        if result.returncode != 0:
+            problems.append(f"{class_file}: javap failed: {result.stderr.strip()}")
+            continue
+        methods = len(parse_javap(result.stdout))
+        if is_compiled_by_javac(result.stdout):
+            javac_methods += methods
+        else:
+            generated_methods += methods
+        problems.extend(f"{class_file.name}: {problem}"
+                        for problem in check_javap_output(result.stdout))
+    return javac_methods, generated_methods, problems
+
+
+def build_examples(build_root: Path) -> list[Path]:
+    """Собирает каждый пример из examples/ в обоих режимах отображения классов,
+    возвращает каталоги с class-файлами успешно собранных примеров.
+    Каждый пример собирается отдельным процессом serpent build
+    """
+    examples_dir = Path(__file__).parents[2] / "examples"
+    class_dirs = []
+    for example in sorted(path for path in examples_dir.iterdir() if path.is_dir()):
+        for class_layout in CLASS_LAYOUTS:
+            build_dir = build_root / f"{example.name}-{class_layout}"
+            result = subprocess.run(
+                [sys.executable, "-m", "serpent.cmd", "build", str(example),
+                 "--no-verbose", "--rebuild", "--outputdir", str(build_dir),
+                 "--class-layout", class_layout],
+                capture_output=True,
+                text=True)
+            if result.returncode == 0 and build_dir.exists():
+                class_dirs.append(build_dir)
+            else:
+                print(f"skipped {example.name} ({class_layout}): does not compile")
+    return class_dirs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Cross-check max_stack and max_locals of class files with javap -v")
+    parser.add_argument("class_dirs", nargs="*", type=Path,
+                        help="Directories with class files (default: build all examples).")
+    parser.add_argument("--javap", default=shutil.which("javap"), help="Path to javap.")
+    args = parser.parse_args()
+
+    if not args.javap:
+        sys.exit("javap executable not found")
+
+    with tempfile.TemporaryDirectory(prefix="serpent-stack-") as tmp:
+        class_dirs = args.class_dirs or build_examples(Path(tmp))
+        javac_total = 0
+        generated_total = 0
+        failed = False
+        for class_dir in class_dirs:
+            javac_methods, generated_methods, problems = check_class_files(class_dir, args.javap)
+            javac_total += javac_methods
+            generated_total += generated_methods
+            for problem in problems:
+                print(f"{class_dir}: {problem}")
+            failed = failed or bool(problems)
+
+    # Только stack= классов javac вычислен независимо от этого модуля
+    print(f"checked {javac_total} javac-compiled methods against javac's stack/locals "
+          f"and {generated_total} generated methods for consistency "
+          f"in {len(class_dirs)} directories")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
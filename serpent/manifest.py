@@ -0,0 +1,262 @@
+"""Манифест инкрементальной сборки.
+
+Манифест хранится в каталоге сборки (classes/.serpent-cache) и описывает
+результат последней успешной сборки: хэши исходников Eiffel и Java,
+версию компилятора, целевую версию Java, прочие параметры сборки,
+а также зависимости между классами, найденные при проверке типов.
+
+По нему повторная сборка определяет, что ничего не изменилось
+(и тогда вообще ничего не делает), либо какие именно классы
+необходимо сгенерировать заново
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field, fields, is_dataclass, asdict
+from functools import cache
+from importlib import metadata
+from pathlib import Path
+import hashlib
+import json
+
+from serpent.tree.class_decl import ClassDecl
+from serpent.semantic_checker.symtab import ClassHierarchy, Type
+from serpent.semantic_checker.type_check import TClass
+from serpent.codegen.constpool import ROOT_CLASS_NAME
+from serpent.codegen.layout import JvmLayout, interface_name
+
+
+MANIFEST_NAME = ".serpent-cache"
+MANIFEST_FORMAT = 1
+
+
+def hash_file(path: Path) -> str:
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def hash_files(files: list[Path]) -> dict[str, str]:
+    """Возвращает хэши содержимого файлов, ключом является абсолютный путь"""
+    return {str(Path(f).resolve()): hash_file(f) for f in files}
+
+
+@cache
+def compiler_sources_hash() -> str:
+    """Хэш исходников самого компилятора"""
+    package_dir = Path(__file__).parent
+    digest = hashlib.sha256()
+    for source in sorted(package_dir.rglob("*.py")):
+        digest.update(str(source.relative_to(package_dir)).encode())
+        digest.update(source.read_bytes())
+    return digest.hexdigest()
+
+
+@cache
+def compiler_version() -> str:
+    """Версия компилятора: версия пакета и хэш исходников компилятора.
+    Хэш нужен, чтобы кэш не переиспользовался после изменения
+    компилятора без смены номера версии
+    """
+    try:
+        version = metadata.version("serpent")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    return f"{version}+{compiler_sources_hash()[:16]}"
+
+
+def collect_type_names(node: object, names: set[str]) -> None:
+    """Собирает имена всех классов, типы которых встречаются в node"""
+    match node:
+        case Type(name=name, generics=generics):
+            names.add(name)
+            for generic in generics:
+                collect_type_names(generic, names)
+        case list() | tuple():
+            for item in node:
+                collect_type_names(item, names)
+        case _ if is_dataclass(node):
+            for f in fields(node):
+                collect_type_names(getattr(node, f.name), names)
+
+
+def source_class_name(class_name: str, declared: dict[str, str]) -> str:
+    """Имя объявленного класса, из которого получен класс class_name:
+    у конкретизаций дженериков (ARRAY__INTEGER) это имя самого дженерика
+    """
+    if class_name in declared:
+        return class_name
+    return class_name.split("__", 1)[0]
+
+
+def class_dependencies(
+        tclass: TClass,
+        declared: dict[str, str],
+        hierarchy: ClassHierarchy) -> list[str]:
+    """Возвращает объявленные классы, от исходников которых зависит
+    class-файл tclass: сам класс, все классы, чьи типы в нем используются,
+    и предки всех этих классов (именно от них наследуются компоненты,
+    к которым обращается tclass)
+    """
+    referenced = {source_class_name(tclass.class_name, declared)}
+    collect_type_names(tclass, referenced)
+
+    dependencies = set()
+    pending = [name for name in referenced if name in declared]
+    while pending:
+        name = pending.pop()
+        if name in dependencies:
+            continue
+        dependencies.add(name)
+        pending.extend(
+            parent for parent in hierarchy.hierarchy.get(name, [])
+            if parent in declared)
+
+    return sorted(dependencies)
+
+
+@dataclass
+class BuildManifest:
+    settings: dict[str, str | int]
+    """Версия компилятора, целевая версия Java и параметры сборки"""
+
+    sources: dict[str, str]
+    """Хэши исходников Eiffel"""
+
+    java_sources: dict[str, str]
+    """Хэши исходников Java"""
+
+    declarations: dict[str, str] = field(default_factory=dict)
+    """Файл, в котором объявлен каждый класс Eiffel"""
+
+    dependencies: dict[str, list[str]] = field(default_factory=dict)
+    """Объявленные классы, от которых зависит class-файл каждого класса"""
+
+    java_classes: list[str] = field(default_factory=list)
+    """Class-файлы, полученные компиляцией исходников Java"""
+
+    layout: str = ""
+    """Хэш отображения классов Eiffel на классы JVM"""
+
+    interfaces: list[str] = field(default_factory=list)
+    """Классы, вместе с которыми генерируются их интерфейсы JVM"""
+
+    @classmethod
+    def for_build(
+            cls,
+            eiffel_files: list[Path],
+            java_files: list[Path],
+            **settings: str | int) -> BuildManifest:
+        return cls(
+            settings={"compiler": compiler_version(), **settings},
+            sources=hash_files(eiffel_files),
+            java_sources=hash_files(java_files))
+
+    @classmethod
+    def load(cls, build_dir: Path) -> BuildManifest | None:
+        """Загружает манифест из каталога сборки.
+        Отсутствующий, поврежденный или устаревший манифест
+        равносилен его отсутствию
+        """
+        try:
+            data = json.loads((Path(build_dir) / MANIFEST_NAME).read_text())
+            if data.pop("format") != MANIFEST_FORMAT:
+                return None
+            return cls(**data)
+        except (OSError, ValueError, TypeError, KeyError, AttributeError):
+            return None
+
+    def save(self, build_dir: Path) -> None:
+        data = {"format": MANIFEST_FORMAT, **asdict(self)}
+        (Path(build_dir) / MANIFEST_NAME).write_text(json.dumps(data, indent=1))
+
+    @staticmethod
+    def remove(build_dir: Path) -> None:
+        (Path(build_dir) / MANIFEST_NAME).unlink(missing_ok=True)
+
+    def record_classes(
+            self,
+            classes: list[TClass],
+            declarations: list[ClassDecl],
+            hierarchy: ClassHierarchy) -> None:
+        """Запоминает, где объявлен каждый класс и от чего зависит
+        каждый сгенерированный класс
+        """
+        self.declarations = {
+            decl.class_name: str(Path(decl.location.filename).resolve())
+            for decl in declarations
+        }
+        self.dependencies = {
+            tclass.class_name: class_dependencies(
+                tclass, self.declarations, hierarchy)
+            for tclass in classes
+        }
+        # GENERAL содержит компоненты всех классов системы
+        self.dependencies[ROOT_CLASS_NAME] = sorted(self.declarations)
+
+    def record_layout(self, layout: JvmLayout) -> None:
+        """Запоминает отображение классов на классы JVM: при его изменении
+        меняются вызовы в class-файлах всех классов
+        """
+        self.layout = layout.digest()
+        self.interfaces = sorted(layout.interface_types)
+
+    def class_file_names(self, class_name: str) -> list[str]:
+        """Имена class-файлов, которые генерируются для класса class_name"""
+        names = [f"{class_name}.class"]
+        if class_name in self.interfaces:
+            names.append(f"{interface_name(class_name)}.class")
+        return names
+
+    def class_files(self, eiffel_package_dir: Path) -> list[Path]:
+        return [
+            eiffel_package_dir / filename
+            for name in self.dependencies
+            for filename in self.class_file_names(name)
+        ]
+
+    def is_up_to_date(
+            self,
+            current: BuildManifest,
+            build_dir: Path,
+            eiffel_package_dir: Path) -> bool:
+        """Проверяет, что сборка по current даст в точности то же,
+        что уже лежит в каталоге сборки
+        """
+        return (self.settings == current.settings
+                and self.sources == current.sources
+                and self.java_sources == current.java_sources
+                and all(path.exists() for path in self.class_files(eiffel_package_dir))
+                and all((build_dir / path).exists() for path in self.java_classes))
+
+    def changed_classes(self, current: BuildManifest) -> set[str]:
+        """Возвращает объявленные классы, исходники которых
+        изменились по сравнению с данным (предыдущим) манифестом
+        """
+        changed = set(self.declarations) - set(current.declarations)
+        for name, source in current.declarations.items():
+            if (self.declarations.get(name) != source
+                    or self.sources.get(source) != current.sources.get(source)):
+                changed.add(name)
+        return changed
+
+    def outdated_classes(
+            self,
+            current: BuildManifest,
+            eiffel_package_dir: Path) -> set[str]:
+        """Возвращает классы current, class-файлы которых
+        необходимо сгенерировать заново
+        """
+        if self.settings != current.settings or self.layout != current.layout:
+            return set(current.dependencies)
+
+        changed = self.changed_classes(current)
+        return {
+            name for name, dependencies in current.dependencies.items()
+            if name not in self.dependencies
+                or changed.intersection(dependencies)
+                or not all(
+                    (eiffel_package_dir / filename).exists()
+                    for filename in current.class_file_names(name))
+        }
+
+    def java_outdated(self, current: BuildManifest, build_dir: Path) -> bool:
+        return (self.settings != current.settings
+                or self.java_sources != current.java_sources
+                or not all((build_dir / path).exists() for path in self.java_classes))
@@ -1,7 +1,6 @@
 package com.eiffel;
 
 import java.io.BufferedReader;
-import java.io.BufferedWriter;
 import java.io.IOException;
 import java.io.InputStream;
 import java.io.InputStreamReader;
@@ -9,103 +8,25 @@ import java.io.PrintStream;
 import java.io.UnsupportedEncodingException;
 import java.nio.charset.StandardCharsets;
 import java.util.ArrayList;
-import java.io.OutputStream;
-import java.lang.reflect.Method;
-import java.lang.reflect.Constructor;
-import java.net.InetSocketAddress;
-import com.sun.net.httpserver.HttpExchange;
-import com.sun.net.httpserver.HttpHandler;
-import com.sun.net.httpserver.HttpServer;
 
 /**
- * Класс PLATFORM представляет универсальное значение для системы Eiffel.
- * Он поддерживает хранение целых чисел, вещественных чисел, строк, символов Unicode и массивов,
- * что позволяет использовать единый интерфейс для работы с данными различных типов.
+ * Класс PLATFORM - корень иерархии классов системы Eiffel и набор внешних методов RTL.
+ * Сам он не содержит полей экземпляра: значения встроенных типов хранят свое
+ * состояние в собственных классах, которые генерирует компилятор
+ * (INTEGER и BOOLEAN - raw_int, REAL - raw_float, STRING и CHARACTER - raw_string,
+ * ARRAY - raw_array, PLAIN_TEXT_FILE - raw_file типа {@link TextFile}).
+ * Поэтому внешние методы вида КЛАСС_имя этих классов получают первым аргументом
+ * не сам объект, а его состояние, остальные внешние методы - объект PLATFORM.
  */
 public class PLATFORM {
 
-    // Флаги типов данных
-    public static final int INTEGER_TYPE     = 1;
-    public static final int REAL_TYPE        = 1 << 1;
-    public static final int STRING_TYPE      = 1 << 2;
-    public static final int CHARACTER_TYPE   = 1 << 3;
-    public static final int BOOLEAN_TYPE     = 1 << 4;
-    public static final int ARRAY_TYPE       = 1 << 5;
-    public static final int OBJECT_TYPE      = 1 << 6;
-
-    /**
-     * Флаг, определяющий тип значения.
-     */
-    public int value_type;
-
-    // Поля для хранения значений примитивных типов
-    public int raw_int;
-    public float raw_float;
-    public String raw_string;
-
     // Аргументы командной строки.
     public static String[] command_line_args;
 
-    // Файловые переменные.
-    public String fn;
-    public BufferedReader plainTextFileReader;
-    public BufferedWriter plainTextFileWriter;
-
     public static void setArgs(String[] args) {
         command_line_args = args;
     }
 
-    // Поля для представления массива значений PLATFORM
-    public ArrayList<PLATFORM> raw_array;
-
-    public PLATFORM() {
-        value_type = OBJECT_TYPE;
-    }
-
-    /**
-     * Конструктор для целочисленного значения.
-     * При значениях 0 и 1 помечает значение как логическое (BOOLEAN_TYPE) в value_type.
-     *
-     * @param integer_value целочисленное значение
-     */
-    public PLATFORM(int integer_value) {
-        value_type = INTEGER_TYPE;
-        raw_int = integer_value;
-        // Логический тип определяется по значению 0 или 1, дополнительного поля не требуется.
-        if (integer_value == 0 || integer_value == 1) {
-            value_type |= BOOLEAN_TYPE;
-        }
-    }
-
-    /**
-     * Конструктор для вещественного значения.
-     *
-     * @param real_value вещественное число
-     */
-    public PLATFORM(float real_value) {
-        value_type = REAL_TYPE;
-        raw_float = real_value;
-    }
-
-    /**
-     * Конструктор для строкового значения.
-     *
-     * @param string_value строка
-     */
-    public PLATFORM(String string_value) {
-        value_type = STRING_TYPE;
-        raw_string = string_value;
-
-        if (raw_string.codePointCount(0, raw_string.length()) == 1) {
-            value_type |= CHARACTER_TYPE;
-        }
-    }
-
-    public PLATFORM(ArrayList<PLATFORM> array) {
-        value_type = ARRAY_TYPE;
-        raw_array = array;
-    }
-
     /* ******************************************************** */
     /* Методы для класса ARGUMENTS */
     public static int ARGUMENTS_argument_count(PLATFORM self) {
@@ -145,16 +66,16 @@ public class PLATFORM {
     /* ******************************************************** */
     /* Методы для класса STRING */
 
-    public static String STRING_concat(PLATFORM self, String other) {
-        return self.raw_string + other;
+    public static String STRING_concat(String self, String other) {
+        return self + other;
     }
 
-    public static int STRING_count(PLATFORM self) {
-        return self.raw_string.codePointCount(0, self.raw_string.length());
+    public static int STRING_count(String self) {
+        return self.codePointCount(0, self.length());
     }
 
-    public static String STRING_to_string(PLATFORM self) {
-        return new String(self.raw_string);
+    public static String STRING_to_string(String self) {
+        return new String(self);
     }
 
     public static int three_way_comparison(String s1, String s2) {
@@ -179,128 +100,128 @@ public class PLATFORM {
         return 0;
     }
 
-    public static int STRING_is_less(PLATFORM self, String other) {
-        return three_way_comparison(self.raw_string, other) < 0 ? 1 : 0;
+    public static int STRING_is_less(String self, String other) {
+        return three_way_comparison(self, other) < 0 ? 1 : 0;
     }
 
-    public static int STRING_is_equal(PLATFORM self, String other) {
-        return three_way_comparison(self.raw_string, other) == 0 ? 1 : 0;
+    public static int STRING_is_equal(String self, String other) {
+        return three_way_comparison(self, other) == 0 ? 1 : 0;
     }
 
-    public static String STRING_raw_item(PLATFORM self, int index) {
+    public static String STRING_raw_item(String self, int index) {
         index -= 1;
 
-        if (index < 0 || index >= self.raw_string.codePointCount(0, self.raw_string.length())) {
+        if (index < 0 || index >= self.codePointCount(0, self.length())) {
             throw new IndexOutOfBoundsException("Index " + index + " out of bounds");
         }
 
         int offset = 0;
         int currentIndex = 0;
         while (currentIndex < index) {
-            offset += Character.charCount(self.raw_string.codePointAt(offset));
+            offset += Character.charCount(self.codePointAt(offset));
             currentIndex++;
         }
 
-        int codePoint = self.raw_string.codePointAt(offset);
+        int codePoint = self.codePointAt(offset);
         return new String(Character.toChars(codePoint));
     }
 
-    public static int STRING_hash_code(PLATFORM self) {
-        return self.raw_string.hashCode();
+    public static int STRING_hash_code(String self) {
+        return self.hashCode();
     }
 
     /* ******************************************************** */
     /* Методы для класса INTEGER */
 
-    public static int INTEGER_plus(PLATFORM self, int other) {
-        return self.raw_int + other;
+    public static int INTEGER_plus(int self, int other) {
+        return self + other;
     }
 
-    public static int INTEGER_minus(PLATFORM self, int other) {
-        return self.raw_int - other;
+    public static int INTEGER_minus(int self, int other) {
+        return self - other;
     }
 
-    public static int INTEGER_product(PLATFORM self, int other) {
-        return self.raw_int * other;
+    public static int INTEGER_product(int self, int other) {
+        return self * other;
     }
 
-    public static float INTEGER_quotient(PLATFORM self, int other) {
-        return ((float) self.raw_int) / other;
+    public static float INTEGER_quotient(int self, int other) {
+        return ((float) self) / other;
     }
 
-    public static int INTEGER_identity(PLATFORM self) {
-        return self.raw_int;
+    public static int INTEGER_identity(int self) {
+        return self;
     }
 
-    public static int INTEGER_opposite(PLATFORM self) {
-        return -self.raw_int;
+    public static int INTEGER_opposite(int self) {
+        return -self;
     }
 
-    public static int INTEGER_integer_quotient(PLATFORM self, int other) {
-        return self.raw_int / other;
+    public static int INTEGER_integer_quotient(int self, int other) {
+        return self / other;
     }
 
-    public static int INTEGER_integer_remainder(PLATFORM self, int other) {
-        return self.raw_int % other;
+    public static int INTEGER_integer_remainder(int self, int other) {
+        return self % other;
     }
 
-    public static int INTEGER_is_less(PLATFORM self, int other) {
-        return self.raw_int < other ? 1 : 0;
+    public static int INTEGER_is_less(int self, int other) {
+        return self < other ? 1 : 0;
     }
 
-    public static int INTEGER_is_equal(PLATFORM self, int other) {
-        return self.raw_int == other ? 1 : 0;
+    public static int INTEGER_is_equal(int self, int other) {
+        return self == other ? 1 : 0;
     }
 
-    public static float INTEGER_to_real(PLATFORM self) {
-        return (float) self.raw_int;
+    public static float INTEGER_to_real(int self) {
+        return (float) self;
     }
 
-    public static String INTEGER_to_string(PLATFORM self) {
-        return Integer.toString(self.raw_int);
+    public static String INTEGER_to_string(int self) {
+        return Integer.toString(self);
     }
 
-    public static String INTEGER_to_character(PLATFORM self) {
-        return Character.toString(self.raw_int);
+    public static String INTEGER_to_character(int self) {
+        return Character.toString(self);
     }
 
     /* ******************************************************** */
     /* Методы для класса REAL */
 
-    public static float REAL_plus(PLATFORM self, float other) {
-        return self.raw_float + other;
+    public static float REAL_plus(float self, float other) {
+        return self + other;
     }
 
-    public static float REAL_minus(PLATFORM self, float other) {
-        return self.raw_float - other;
+    public static float REAL_minus(float self, float other) {
+        return self - other;
     }
 
-    public static float REAL_product(PLATFORM self, float other) {
-        return self.raw_float * other;
+    public static float REAL_product(float self, float other) {
+        return self * other;
     }
 
-    public static float REAL_quotient(PLATFORM self, float other) {
-        return self.raw_float / other;
+    public static float REAL_quotient(float self, float other) {
+        return self / other;
     }
 
-    public static float REAL_identity(PLATFORM self) {
-        return self.raw_float;
+    public static float REAL_identity(float self) {
+        return self;
     }
 
-    public static float REAL_opposite(PLATFORM self) {
-        return -self.raw_float;
+    public static float REAL_opposite(float self) {
+        return -self;
     }
 
-    public static int REAL_is_less(PLATFORM self, float other) {
-        return self.raw_float < other ? 1 : 0;
+    public static int REAL_is_less(float self, float other) {
+        return self < other ? 1 : 0;
     }
 
-    public static int REAL_is_equal(PLATFORM self, float other) {
-        return self.raw_float == other ? 1 : 0;
+    public static int REAL_is_equal(float self, float other) {
+        return self == other ? 1 : 0;
     }
 
-    public static String REAL_to_string(PLATFORM self) {
-        String s = Float.toString(self.raw_float);
+    public static String REAL_to_string(float self) {
+        String s = Float.toString(self);
 
         // Убираем незначащие нули после запятой
         int index = s.length() - 1;
@@ -318,38 +239,36 @@ public class PLATFORM {
     /* ******************************************************** */
     /* Методы для класса ARRAY */
 
-    public static void ARRAY_initialize(PLATFORM self, int count, PLATFORM value) {
+    public static void ARRAY_initialize(ArrayList<PLATFORM> self, int count, PLATFORM value) {
         if (count < 0) {
             throw new IllegalArgumentException("'count' cannot be negative");
         }
 
-        ArrayList<PLATFORM> array = new ArrayList<>(count);
+        self.clear();
+        self.ensureCapacity(count);
         for (int i = 0; i < count; i++) {
-            array.add(i, value);
+            self.add(i, value);
         }
-
-        self.value_type = ARRAY_TYPE;
-        self.raw_array = array;
     }
 
-    public static PLATFORM ARRAY_item_raw(PLATFORM self, int index) {
-        return self.raw_array.get(index);
+    public static PLATFORM ARRAY_item_raw(ArrayList<PLATFORM> self, int index) {
+        return (PLATFORM) self.get(index);
     }
 
-    public static void ARRAY_put_raw(PLATFORM self, PLATFORM element, int index) {
-        self.raw_array.set(index, element);
+    public static void ARRAY_put_raw(ArrayList<PLATFORM> self, PLATFORM element, int index) {
+        self.set(index, element);
     }
 
-    public static void ARRAY_add_raw(PLATFORM self, PLATFORM element, int index) {
-        self.raw_array.add(index, element);
+    public static void ARRAY_add_raw(ArrayList<PLATFORM> self, PLATFORM element, int index) {
+        self.add(index, element);
     }
 
-    public static void ARRAY_add_last(PLATFORM self, PLATFORM element) {
-        self.raw_array.add(self.raw_array.size(), element);
+    public static void ARRAY_add_last(ArrayList<PLATFORM> self, PLATFORM element) {
+        self.add(self.size(), element);
     }
 
-    public static void ARRAY_remove_raw(PLATFORM self, int index) {
-        self.raw_array.remove(index);
+    public static void ARRAY_remove_raw(ArrayList<PLATFORM> self, int index) {
+        self.remove(index);
     }
 
     /* Методы для класса IO */
@@ -405,119 +324,119 @@ public class PLATFORM {
 
     /* Методы для класса CHARACTER */
 
-    public static int CHARACTER_is_less(PLATFORM self, String other) {
+    public static int CHARACTER_is_less(String self, String other) {
         return STRING_is_less(self, other);
     }
 
-    public static int CHARACTER_is_equal(PLATFORM self, String other) {
+    public static int CHARACTER_is_equal(String self, String other) {
         return STRING_is_equal(self, other);
     }
 
-    public static int CHARACTER_code_point(PLATFORM self) {
-        return self.raw_string.codePointAt(0);
+    public static int CHARACTER_code_point(String self) {
+        return self.codePointAt(0);
     }
 
-    public static String CHARACTER_to_string(PLATFORM self) {
+    public static String CHARACTER_to_string(String self) {
         return STRING_to_string(self);
     }
 
     /* Методы для класса BOOLEAN */
     
-    public static int BOOLEAN_is_less(PLATFORM self, int other) {
+    public static int BOOLEAN_is_less(int self, int other) {
         return INTEGER_is_less(self, other);
     }
 
-    public static int BOOLEAN_is_equal(PLATFORM self, int other) {
+    public static int BOOLEAN_is_equal(int self, int other) {
         return INTEGER_is_equal(self, other);
     }
 
-    public static String BOOLEAN_to_string(PLATFORM self) {
-        return self.raw_int == 1 ? "True" : "False";
+    public static String BOOLEAN_to_string(int self) {
+        return self == 1 ? "True" : "False";
     }
 
     /* Методы класса PLAIN_TEXT_FILE */
 
-    public static int PLAIN_TEXT_FILE_make_open_read(PLATFORM self, String fn) {
+    public static int PLAIN_TEXT_FILE_make_open_read(TextFile self, String fn) {
         try {
-            self.plainTextFileReader = new java.io.BufferedReader(
+            self.reader = new java.io.BufferedReader(
                 new java.io.InputStreamReader(
                     new java.io.FileInputStream(fn),
                     java.nio.charset.StandardCharsets.UTF_8
                 )
             );
-            self.fn = fn;
+            self.name = fn;
             return 1;
         } catch (java.io.IOException e) {
             return 0;
         }
     }
     
-    public static int PLAIN_TEXT_FILE_make_open_write(PLATFORM self, String fn) {
+    public static int PLAIN_TEXT_FILE_make_open_write(TextFile self, String fn) {
         try {
-            self.plainTextFileWriter = new java.io.BufferedWriter(
+            self.writer = new java.io.BufferedWriter(
                 new java.io.OutputStreamWriter(
                     new java.io.FileOutputStream(fn, false),
                     java.nio.charset.StandardCharsets.UTF_8
                 )
             );
-            self.fn = fn;
+            self.name = fn;
             return 1;
         } catch (java.io.IOException e) {
             return 0;
         }
     }
     
-    public static int PLAIN_TEXT_FILE_make_open_append(PLATFORM self, String fn) {
+    public static int PLAIN_TEXT_FILE_make_open_append(TextFile self, String fn) {
         try {
-            self.plainTextFileWriter = new java.io.BufferedWriter(
+            self.writer = new java.io.BufferedWriter(
                 new java.io.OutputStreamWriter(
                     new java.io.FileOutputStream(fn, true),
                     java.nio.charset.StandardCharsets.UTF_8
                 )
             );
-            self.fn = fn;
+            self.name = fn;
             return 1;
         } catch (java.io.IOException e) {
             return 0;
         }
     }
     
-    public static int PLAIN_TEXT_FILE_exists(PLATFORM self) {
-        return new java.io.File(self.fn).exists() ? 1 : 0;
+    public static int PLAIN_TEXT_FILE_exists(TextFile self) {
+        return new java.io.File(self.name).exists() ? 1 : 0;
     }
     
-    public static void PLAIN_TEXT_FILE_close(PLATFORM self) {
+    public static void PLAIN_TEXT_FILE_close(TextFile self) {
         try {
-            if (self.plainTextFileReader != null) {
-                self.plainTextFileReader.close();
-                self.plainTextFileReader = null;
+            if (self.reader != null) {
+                self.reader.close();
+                self.reader = null;
             }
-            if (self.plainTextFileWriter != null) {
-                self.plainTextFileWriter.close();
-                self.plainTextFileWriter = null;
+            if (self.writer != null) {
+                self.writer.close();
+                self.writer = null;
             }
         } catch (java.io.IOException ignored) {
         }
     }
     
-    public static void PLAIN_TEXT_FILE_put(PLATFORM self, int codePoint) {
+    public static void PLAIN_TEXT_FILE_put(TextFile self, int codePoint) {
         try {
-            self.plainTextFileWriter.write(codePoint);
+            self.writer.write(codePoint);
         } catch (java.io.IOException ignored) {
         }
     }
     
-    public static int PLAIN_TEXT_FILE_getc(PLATFORM self) {
+    public static int PLAIN_TEXT_FILE_getc(TextFile self) {
         try {
-            int first = self.plainTextFileReader.read();
+            int first = self.reader.read();
             if (first < 0) {
                 return -1;    // EOF
             }
             char c1 = (char) first;
             if (Character.isHighSurrogate(c1)) {
                 // Попробуем прочитать второй суррогатный элемент
-                self.plainTextFileReader.mark(1);
-                int second = self.plainTextFileReader.read();
+                self.reader.mark(1);
+                int second = self.reader.read();
                 if (second >= 0) {
                     char c2 = (char) second;
                     if (Character.isLowSurrogate(c2)) {
@@ -526,7 +445,7 @@ public class PLATFORM {
                     }
                 }
                 // Если не получилось составить пару – «откатаем» чтение второго элемента
-                self.plainTextFileReader.reset();
+                self.reader.reset();
             }
             // Обычный BMP-символ или незаконченная суррогатная пара
             return first;
@@ -536,187 +455,34 @@ public class PLATFORM {
     }
     
     // Проверить конец файла (нет больше codepoints)
-    public static int PLAIN_TEXT_FILE_exhausted(PLATFORM self) {
+    public static int PLAIN_TEXT_FILE_exhausted(TextFile self) {
         try {
-            self.plainTextFileReader.mark(2);
-            int first = self.plainTextFileReader.read();
+            self.reader.mark(2);
+            int first = self.reader.read();
             if (first < 0) {
                 return 1;
             }
             if (Character.isHighSurrogate((char) first)) {
-                self.plainTextFileReader.read(); // пропустить низший суррогат
+                self.reader.read(); // пропустить низший суррогат
             }
-            self.plainTextFileReader.reset();
+            self.reader.reset();
             return 0;
         } catch (java.io.IOException e) {
             return 1;
         }
     }
 
-    public static float MATH_MIXIN_sin(PLATFORM self) {
-        float value = self.value_type == REAL_TYPE ? self.raw_float : self.raw_int;
+    /* Методы класса MATH_MIXIN */
+
+    public static float MATH_MIXIN_sin(PLATFORM self, float value) {
         return (float) Math.sin(value);
     }
 
-    public static float MATH_MIXIN_cos(PLATFORM self) {
-        float value = self.value_type == REAL_TYPE ? self.raw_float : self.raw_int;
+    public static float MATH_MIXIN_cos(PLATFORM self, float value) {
         return (float) Math.cos(value);
     }
 
-    public static float MATH_MIXIN_power(PLATFORM self, PLATFORM power) {
-        float value = self.value_type == REAL_TYPE ? self.raw_float : self.raw_int;
-        float p = power.value_type == REAL_TYPE ? self.raw_float : self.raw_int;
-        return (float) Math.pow(value, p);
-    }
-
-    /* **************************************************************************** */
-    /* Веб-сервер */
-    private static HttpServer server = null;
-
-    // startServer(port, contextPath, handlerClassName) kept for compatibility; contextPath is ignored and "/" is used.
-    public static int startServer(PLATFORM self, int port, String contextPath) {
-        try {
-            if (server != null) return 0;
-            server = HttpServer.create(new InetSocketAddress(port), 0);
-            server.createContext("/", new HttpHandler() {
-                @Override
-                public void handle(HttpExchange exchange) {
-                    handleIncomingExchange(exchange);
-                }
-            });
-            server.setExecutor(null);
-            server.start();
-            return 1;
-        } catch (Exception e) {
-            e.printStackTrace(System.err);
-            return 0;
-        }
-    }
-
-    public static int stopServer(PLATFORM self) {
-        try {
-            if (server == null) return 0;
-            server.stop(0);
-            server = null;
-            return 1;
-        } catch (Exception e) {
-            return 0;
-        }
-    }
-
-    private static Object delegate = null;
-
-    public static void setDelegate(PLATFORM self, PLATFORM del) {
-        delegate = del;
-    }
-
-    public static void clearDelegate(PLATFORM self) {
-        delegate = null;
-    }
-
-    /**
-     * Handle incoming HttpExchange: call a method on the delegate that accepts a single String (the path).
-     * It searches for any public method with exactly one parameter of type java.lang.String and invokes it.
-     */
-    public static void handleIncomingExchange(HttpExchange t) {
-        try {
-            String path = t.getRequestURI().toString(); // includes path + query if present
-            String response = "No response";
-
-            if (delegate != null) {
-                try {
-                    Method chosen = null;
-                    Class<?> chosenParam = null;
-
-                    // try to load com.eiffel.STRING once (may not exist in some environments)
-                    Class<?> eiffelStringClass = null;
-                    try {
-                        eiffelStringClass = Class.forName("com.eiffel.STRING");
-                    } catch (ClassNotFoundException ignored) {
-                        // runtime may be missing or class name different; we'll handle gracefully
-                    }
-
-                    // 1) find candidate methods with exactly one parameter
-                    for (Method m : delegate.getClass().getMethods()) {
-                        if (m.getParameterCount() != 1) continue;
-                        Class<?> p = m.getParameterTypes()[0];
-
-                        // prefer exact "get" or "_get" style name
-                        if ("get".equals(m.getName()) || m.getName().endsWith("_get")) {
-                            chosen = m;
-                            chosenParam = p;
-                            break;
-                        }
-
-                        // otherwise pick first single-arg method as fallback (if none preferred)
-                        if (chosen == null) {
-                            chosen = m;
-                            chosenParam = p;
-                        }
-                    }
-
-                    if (chosen != null) {
-                        Object arg;
-                        // If method expects a plain Java String, pass it directly.
-                        if (chosenParam.equals(String.class)) {
-                            arg = path;
-                        }
-                        // If method expects com.eiffel.STRING (or something assignable from it),
-                        // construct new com.eiffel.STRING(path) via reflection.
-                        else if (eiffelStringClass != null && chosenParam.isAssignableFrom(eiffelStringClass)) {
-                            try {
-                                Constructor<?> ctor = chosenParam.getConstructor(String.class);
-                                arg = ctor.newInstance(path);
-                            } catch (NoSuchMethodException nsme) {
-                                // If constructor not found, try to instantiate using the specific com.eiffel.STRING class
-                                // (fallback) — attempt to construct com.eiffel.STRING directly
-                                try {
-                                    Constructor<?> ctor2 = eiffelStringClass.getConstructor(String.class);
-                                    arg = ctor2.newInstance(path);
-                                    // if chosenParam is a supertype, this should still be acceptable at invoke time
-                                } catch (Exception e) {
-                                    throw new RuntimeException("Cannot construct com.eiffel.STRING(String) required by handler", e);
-                                }
-                            }
-                        }
-                        // If parameter is other type that can accept a java.lang.String (e.g. Object),
-                        // pass the java String (best effort).
-                        else if (chosenParam.isAssignableFrom(String.class) || chosenParam.equals(Object.class)) {
-                            arg = path;
-                        } else {
-                            // Not compatible; fail early with helpful message
-                            throw new IllegalArgumentException("Handler parameter type " + chosenParam.getName() +
-                                    " is not supported. Expected java.lang.String or com.eiffel.STRING.");
-                        }
-
-                        // invoke and extract response
-                        PLATFORM r = (PLATFORM) chosen.invoke(delegate, arg);
-                        if (r != null) response = r.raw_string;
-                    } else {
-                        response = "No compatible handler method found on Eiffel delegate";
-                    }
-                } catch (Exception e) {
-                    response = "Handler invocation failed: " + e.toString();
-                    e.printStackTrace(System.err);
-                }
-            } else {
-                response = "No Eiffel delegate registered";
-            }
-
-            byte[] bytes = response.getBytes(StandardCharsets.UTF_8);
-            t.getResponseHeaders().add("Content-Type", "text/html; charset=utf-8");
-            t.sendResponseHeaders(200, bytes.length);
-            try (OutputStream os = t.getResponseBody()) {
-                os.write(bytes);
-            }
-        } catch (IOException ioe) {
-            try {
-                byte[] msg = ("Internal Server Error: " + ioe.getMessage()).getBytes(StandardCharsets.UTF_8);
-                t.sendResponseHeaders(500, msg.length);
-                try (OutputStream os = t.getResponseBody()) {
-                    os.write(msg);
-                }
-            } catch (Exception ignored) {}
-        }
+    public static float MATH_MIXIN_power(PLATFORM self, float value, float power) {
+        return (float) Math.pow(value, power);
     }
 }
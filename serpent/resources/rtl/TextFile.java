@@ -0,0 +1,14 @@
+package com.eiffel;
+
+import java.io.BufferedReader;
+import java.io.BufferedWriter;
+
+/**
+ * Состояние объекта PLAIN_TEXT_FILE: имя файла и потоки для чтения и записи.
+ * Создается конструктором PLAIN_TEXT_FILE и передается внешним методам PLAIN_TEXT_FILE_*.
+ */
+public class TextFile {
+    public String name;
+    public BufferedReader reader;
+    public BufferedWriter writer;
+}
@@ -0,0 +1,22 @@
+package com.eiffel;
+
+/**
+ * Границы кэша объектов INTEGER. Компилятор генерирует в классах встроенных
+ * типов статический метод valueOf, через который упаковываются значения Java
+ * (результаты внешних методов, локальные переменные и т.п.): INTEGER.valueOf
+ * возвращает заранее созданный объект для чисел из [INTEGER_LOW, INTEGER_HIGH],
+ * BOOLEAN.valueOf - один из двух общих объектов True и False,
+ * STRING.valueOf - общий объект пустой строки.
+ *
+ * Верхнюю границу можно изменить свойством JVM, например:
+ *     java -noverify -Dserpent.integer.cache.high=4096 -jar app.jar
+ * Значение меньше INTEGER_LOW отключает кэш. Сверху граница ограничена,
+ * как в java.lang.Integer.IntegerCache, чтобы INTEGER_SIZE не переполнялся.
+ */
+public class ValueCache {
+    public static final int INTEGER_LOW = -128;
+    public static final int INTEGER_HIGH = Math.min(
+        Math.max(INTEGER_LOW - 1, Integer.getInteger("serpent.integer.cache.high", 1024)),
+        Integer.MAX_VALUE - (-INTEGER_LOW) - 1);
+    public static final int INTEGER_SIZE = INTEGER_HIGH - INTEGER_LOW + 1;
+}
@@ -43,8 +43,8 @@ feature
 
     pow (power: NUMERIC): REAL
     -- Возводит `Current` в степень `power`.
-    external "Java"
-    alias "com.eiffel.PLATFORM.MATH_MIXIN_power"
+    then
+        real_power (to_real, power.to_real)
     end
 
     hypot (b: like Current): REAL
@@ -56,14 +56,14 @@ feature
 
     sin: REAL
     -- Вычисляет синус (в радианах).
-    external "Java"
-    alias "com.eiffel.PLATFORM.MATH_MIXIN_sin"
+    then
+        real_sin (to_real)
     end
 
     cos: REAL
     -- Вычисляет косинус (в радианах). 
-    external "Java"
-    alias "com.eiffel.PLATFORM.MATH_MIXIN_cos"
+    then
+        real_cos (to_real)
     end
 
     tan: REAL
@@ -72,4 +72,21 @@ feature
         sin / cos
     end
 
+feature {NONE}
+
+    real_sin (value: REAL): REAL
+    external "Java"
+    alias "com.eiffel.PLATFORM.MATH_MIXIN_sin"
+    end
+
+    real_cos (value: REAL): REAL
+    external "Java"
+    alias "com.eiffel.PLATFORM.MATH_MIXIN_cos"
+    end
+
+    real_power (value, power: REAL): REAL
+    external "Java"
+    alias "com.eiffel.PLATFORM.MATH_MIXIN_power"
+    end
+
 end
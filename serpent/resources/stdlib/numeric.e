@@ -44,4 +44,12 @@ feature
     deferred
     end
 
+feature
+-- Конвертация в другие типы.
+
+    to_real: REAL
+        -- Конвертирует в действительное число.
+        deferred
+    end
+
 end
@@ -66,6 +66,12 @@ feature
 feature
 -- Конвертация в другие типы.
 
+    to_real: REAL
+    -- Конвертирует в действительное число.
+    then
+        Current
+    end
+
     out: STRING
     -- Конвертирует в строку.
         external "Java"
@@ -44,22 +44,22 @@ feature {NONE} -- Java externals (bridge to the Java helper jar)
     set_java_delegate (del: ANY)
     -- Set Eiffel object as delegate inside Java MyEiffelHandler.
     external "java"
-    alias "com.eiffel.PLATFORM.setDelegate"
+    alias "com.eiffel.WebServer.setDelegate"
     end
 
     clear_java_delegate
     external "java"
-    alias "com.eiffel.PLATFORM.clearDelegate"
+    alias "com.eiffel.WebServer.clearDelegate"
     end
 
     webserver_start (a_port: INTEGER; route: STRING): INTEGER
     external "java"
-    alias "com.eiffel.PLATFORM.startServer"
+    alias "com.eiffel.WebServer.startServer"
     end
 
     webserver_stop: INTEGER
     external "java"
-    alias "com.eiffel.PLATFORM.stopServer"
+    alias "com.eiffel.WebServer.stopServer"
     end
 
 end
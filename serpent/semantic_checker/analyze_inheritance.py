@@ -2,6 +2,7 @@ from __future__ import annotations
 import copy
 from collections import defaultdict
 from dataclasses import dataclass
+from typing import Iterable, Iterator
 
 from ..tree import (
     ClassDecl,
@@ -35,17 +36,98 @@ class FeatureRecord:
         return self.from_class == other.from_class and self.name == other.name
 
 
+class FeatureTable:
+    """Упорядоченный список FeatureRecord с индексами по имени фичи
+    и по паре (класс, в котором фича определена, имя фичи).
+    Поиск фичи выполняется за O(1), а обход идет в порядке добавления,
+    поэтому результат анализа наследования детерминирован.
+    Индексы строятся при первом поиске и затем поддерживаются при добавлении
+    """
+
+    def __init__(self, features: Iterable[FeatureRecord] = ()) -> None:
+        self.features: list[FeatureRecord] = list(features)
+        self._by_name: dict[str, list[FeatureRecord]] | None = None
+        self._by_key: dict[tuple[str, str], FeatureRecord] | None = None
+
+    def __getstate__(self) -> dict:
+        # Индексы восстанавливаются по списку фич
+        return {"features": self.features, "_by_name": None, "_by_key": None}
+
+    @property
+    def by_name(self) -> dict[str, list[FeatureRecord]]:
+        """Фичи с заданным именем в порядке добавления"""
+        if self._by_name is None:
+            self._by_name = {}
+            for feature in self.features:
+                self._by_name.setdefault(feature.name, []).append(feature)
+        return self._by_name
+
+    @property
+    def by_key(self) -> dict[tuple[str, str], FeatureRecord]:
+        """Первая добавленная фича с заданными (from_class, name)"""
+        if self._by_key is None:
+            self._by_key = {}
+            for feature in self.features:
+                self._by_key.setdefault((feature.from_class, feature.name), feature)
+        return self._by_key
+
+    def append(self, feature: FeatureRecord) -> None:
+        self.features.append(feature)
+        if self._by_name is not None:
+            self._by_name.setdefault(feature.name, []).append(feature)
+        if self._by_key is not None:
+            self._by_key.setdefault((feature.from_class, feature.name), feature)
+
+    def extend(self, features: Iterable[FeatureRecord]) -> None:
+        if self._by_name is None and self._by_key is None:
+            self.features.extend(features)
+            return
+        for feature in features:
+            self.append(feature)
+
+    def __iter__(self) -> Iterator[FeatureRecord]:
+        return iter(self.features)
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def __bool__(self) -> bool:
+        return bool(self.features)
+
+    def __getitem__(self, index: int) -> FeatureRecord:
+        return self.features[index]
+
+    def __add__(self, other: FeatureTable) -> FeatureTable:
+        return FeatureTable(self.features + other.features)
+
+    def __contains__(self, name: str) -> bool:
+        """Есть ли в таблице фича с именем name"""
+        return name in self.by_name
+
+    def __repr__(self) -> str:
+        return f"FeatureTable({self.features!r})"
+
+    def find(self, name: str) -> FeatureRecord | None:
+        """Первая добавленная фича с именем name"""
+        features = self.by_name.get(name)
+        return features[0] if features else None
+
+    def find_in(self, from_class: str, name: str) -> FeatureRecord | None:
+        """Первая добавленная фича name, определенная в классе from_class"""
+        return self.by_key.get((from_class, name))
+
+
 @dataclass
 class FlattenClass:
     class_decl: ClassDecl
-    renamed: list[FeatureRecord]
-    undefined: list[FeatureRecord]
-    redefined: list[FeatureRecord]
-    precursors: list[FeatureRecord]
-    selected: list[FeatureRecord]
-    inherited: list[FeatureRecord]
-    own: list[FeatureRecord]
-    constructors: list[FeatureRecord]
+    renamed: FeatureTable
+    undefined: FeatureTable
+    redefined: FeatureTable
+    precursors: FeatureTable
+    selected: FeatureTable
+    inherited: FeatureTable
+    own: FeatureTable
+    constructors: FeatureTable
 
     @property
     def class_name(self) -> str:
@@ -58,8 +140,8 @@ class FlattenClass:
 
 def check_rename_clause(
         parent: Parent,
-        parent_features: list[FeatureRecord],
-        own_child_features: list[FeatureRecord]) -> None:
+        parent_features: FeatureTable,
+        own_child_features: FeatureTable) -> None:
     """Проверят, можно ли выполнить переименования фич, опираясь
     на имена фич для переименования, заданные родительские фичи и
     заданные фичи ребенка. Ошибочные ситуации возникают если:
@@ -94,8 +176,7 @@ def check_rename_clause(
 
     # Проверка на наличие несуществующих фич родителя
     for rule in rename_clause:
-        if not any(rule.original_name ==
-                   feature.name for feature in parent_features):
+        if rule.original_name not in parent_features:
             raise CompilerError(
                 f"Nonexistent parent feature in rename clause: {
                     rule.original_name}",
@@ -103,7 +184,7 @@ def check_rename_clause(
 
     # Проверка на то, что в дочернем классе нет фич с именем псевдонима
     for rule in rename_clause:
-        if any(rule.alias_name == feature.name for feature in own_child_features):
+        if rule.alias_name in own_child_features:
             # Возможно, в сообщение также нужно добавить позицию
             # той фичи, которая конфликует с rule.alias_name
             raise CompilerError(
@@ -113,24 +194,26 @@ def check_rename_clause(
 
 def rename(
         parent: Parent,
-        parent_features: list[FeatureRecord]):
+        parent_features: FeatureTable):
     rename_clause = parent.rename
     if not rename_clause:
-        return [], parent_features
+        return FeatureTable(), parent_features
 
-    inherired = []
-    renamed = []
+    inherired = FeatureTable()
+    renamed = FeatureTable()
+
+    aliases = {}
+    for rule in rename_clause:
+        aliases.setdefault(rule.original_name, rule.alias_name)
 
     for pf in parent_features:
-        rule = next(
-            (r for r in rename_clause if r.original_name == pf.name),
-            None)
+        alias_name = aliases.get(pf.name)
 
-        if rule is None:
+        if alias_name is None:
             inherired.append(pf)
             continue
 
-        inherired.append(copy.replace(pf, name=rule.alias_name))
+        inherired.append(copy.replace(pf, name=alias_name))
         renamed.append(pf)
 
     return renamed, inherired
@@ -138,8 +221,8 @@ def rename(
 
 def check_redefine_clause(
         parent: Parent,
-        parent_features: list[FeatureRecord],
-        own_child_features: list[FeatureRecord]) -> None:
+        parent_features: FeatureTable,
+        own_child_features: FeatureTable) -> None:
     """Проверят, можно ли выполнить переопределение фич, опираясь
     на имена фич для переопределения, заданные родительские фичи и
     заданные фичи ребенка. Ошибочные ситуации возникают если:
@@ -163,22 +246,21 @@ def check_redefine_clause(
 
     # Проверка на наличие фич в родительском классе
     for feature_name in redefine_clause:
-        if not any(feature_name == pf.name for pf in parent_features):
+        if feature_name not in parent_features:
             raise CompilerError(
                 f"Nonexistent parent feature in redefine clause: '{feature_name}'",
                 parent.location)
 
     # Проверка, что дочерний класс действительно переопределяет фичу
     for feature_name in redefine_clause:
-        if not any(feature_name == cf.name for cf in own_child_features):
+        if feature_name not in own_child_features:
             raise CompilerError(
                 f"Child class does not redefine a feature: '{feature_name}'",
                 parent.location)
 
     # Проверка, что не происходит попытка переопределить константу
     for feature_name in redefine_clause:
-        parent_feature = next(
-            pf.node for pf in parent_features if pf.name == feature_name)
+        parent_feature = parent_features.find(feature_name).node
         if isinstance(parent_feature, Constant):
             raise CompilerError(
                 f"Redefinition of constant '{feature_name}' is not allowed",
@@ -194,23 +276,23 @@ If you're trying to define it, just remove it from redefine clause",
 
 def redefine(
         parent: Parent,
-        parent_features: list[FeatureRecord],
-        own_child_features: list[FeatureRecord]):
+        parent_features: FeatureTable,
+        own_child_features: FeatureTable):
     redefine_clause = parent.redefine
     if not redefine_clause:
-        return [], [], parent_features
+        return FeatureTable(), FeatureTable(), parent_features
 
-    inherited = []
-    redefined = []
-    precursors = []
+    inherited = FeatureTable()
+    redefined = FeatureTable()
+    precursors = FeatureTable()
 
+    redefine_clause = set(redefine_clause)
     for pf in parent_features:
         if pf.name not in redefine_clause:
             inherited.append(pf)
             continue
 
-        child_node = next(
-            f.node for f in own_child_features if f.name == pf.name)
+        child_node = own_child_features.find(pf.name).node
         redefined.append(copy.replace(pf, node=child_node))
         precursors.append(pf)
 
@@ -219,8 +301,8 @@ def redefine(
 
 def check_undefine_clause(
         parent: Parent,
-        parent_features: list[FeatureRecord],
-        own_child_features: list[FeatureRecord]) -> None:
+        parent_features: FeatureTable,
+        own_child_features: FeatureTable) -> None:
     """Проверят, можно ли выполнить undefine фич, опираясь
     на имена фич для undefine, заданные родительские фичи и
     заданные фичи ребенка. Ошибочные ситуации возникают если:
@@ -244,7 +326,7 @@ def check_undefine_clause(
 
     # Проверка на существование фич, которые будут сделаны отложенными
     for feature_name in undefine_clause:
-        if not any(feature_name == pf.name for pf in parent_features):
+        if feature_name not in parent_features:
             raise CompilerError(
                 f"Nonexistent parent feature in undefine clause: {feature_name}",
                 parent.location)
@@ -253,15 +335,14 @@ def check_undefine_clause(
     # родительской фичи и определять её - для этого необходимо
     # воспользоваться redefine
     for feature_name in undefine_clause:
-        if any(feature_name == cf.name for cf in own_child_features):
+        if feature_name in own_child_features:
             raise CompilerError(
                 f"Child class already redefines feature: {feature_name}. \
 Cannot undefine it. Consider moving it to redefine clause", parent.location)
 
     # Проверка, что не происходит попытка переопределить константу
     for feature_name in undefine_clause:
-        parent_feature = next(
-            pf for pf in parent_features if pf.name == feature_name).node
+        parent_feature = parent_features.find(feature_name).node
 
         if isinstance(parent_feature, Constant):
             raise CompilerError(
@@ -275,7 +356,7 @@ Cannot undefine it. Consider moving it to redefine clause", parent.location)
 
 def undefine(
         parent: Parent,
-        parent_features: list[FeatureRecord]):
+        parent_features: FeatureTable):
     """Выполняет undefine родительских фич: фичи с заданными именами
     становятся отложенными
     """
@@ -283,7 +364,8 @@ def undefine(
     if not undefine_clause:
         return parent_features
 
-    inherited = []
+    inherited = FeatureTable()
+    undefine_clause = set(undefine_clause)
     for pf in parent_features:
         if pf.name not in undefine_clause:
             inherited.append(pf)
@@ -308,8 +390,8 @@ def undefine(
 
 def check_select_clause(
         select_clauses: dict[Parent, SelectedFeatures],
-        parent_to_features: dict[str, list[FeatureRecord]],
-        own_child_features: list[FeatureRecord]) -> None:
+        parent_to_features: dict[Parent, FeatureTable],
+        own_child_features: FeatureTable) -> None:
     if not any(
             select_clause.selected_features for select_clause in select_clauses.values()):
         return
@@ -334,7 +416,7 @@ def check_select_clause(
         nonexistent_features = [
             feature_name
             for feature_name in select_clause.selected_features
-            if not any(feature_name == pf.name for pf in parent_features)]
+            if feature_name not in parent_features]
         if nonexistent_features:
             ending = "" if len(nonexistent_features) == 1 else "s"
             raise CompilerError(
@@ -347,7 +429,7 @@ def check_select_clause(
         parents_with_feature = [
             parent.class_name
             for parent, features in parent_to_features.items()
-            if any(feature_name == pf.name for pf in features)]
+            if feature_name in features]
 
         if len(parents_with_feature) < 1:
             # Берем первого родителя, у которого такая фича есть
@@ -381,10 +463,10 @@ def check_select_clause(
 
 def select(
     select_clauses: list[SelectedFeatures],
-    parent_to_features: dict[Parent, list[FeatureRecord]]
-) -> tuple[dict[Parent, list[FeatureRecord]], list[FeatureRecord]]:
+    parent_to_features: dict[Parent, FeatureTable]
+) -> tuple[dict[Parent, FeatureTable], FeatureTable]:
     if not any(clause.selected_features for clause in select_clauses):
-        return parent_to_features, []
+        return parent_to_features, FeatureTable()
 
     select_map = {
         feature: clause.class_name
@@ -392,21 +474,18 @@ def select(
         for feature in clause.selected_features
     }
 
-    all_features = [pf for features in parent_to_features.values()
-                    for pf in features]
+    all_features = FeatureTable(
+        pf for features in parent_to_features.values() for pf in features)
 
     candidate_map = {
-        feature: next(
-            pf for pf in all_features
-            if pf.name == feature and pf.from_class == desired_class
-        )
+        feature: all_features.by_key[(desired_class, feature)]
         for feature, desired_class in select_map.items()
     }
 
     new_parent_to_features = {}
-    selected_features = []
+    selected_features = FeatureTable()
     for parent, features in parent_to_features.items():
-        updated_features = []
+        updated_features = FeatureTable()
         for pf in features:
             if pf.name in candidate_map:
                 feature = candidate_map[pf.name]
@@ -426,13 +505,12 @@ def select(
 
 def check_create_clause(
         class_decl: ClassDecl,
-        own_child_features: list[FeatureRecord]) -> None:
+        own_child_features: FeatureTable) -> None:
     create_clause = class_decl.create
     for feature_name in create_clause:
         # Проверка, что имя указанного конструктора действительно есть
         # среди определенных фич
-        candidate = next(
-            (cf for cf in own_child_features if cf.name == feature_name), None)
+        candidate = own_child_features.find(feature_name)
         if candidate is None:
             raise CompilerError(
                 f"Creation procedure '{feature_name}' is not defined in the class '{
@@ -453,27 +531,19 @@ def check_create_clause(
                     class_decl.class_name}'", class_decl.location)
 
 
-def check_duplicate_features(features: list[FeatureRecord]) -> None:
-    grouped_by_name = defaultdict(list)
-    for feature in features:
-        grouped_by_name[feature.name].append(feature)
-
-    for feature_name, group in grouped_by_name.items():
+def check_duplicate_features(features: FeatureTable) -> None:
+    for feature_name, group in features.by_name.items():
         if len(group) > 1:
             feature = group[0]
             raise CompilerError(f"Duplicate feature '{feature_name}' in \
                                 class '{feature.from_class}'", feature.location)
 
 
-def merge(features: list[FeatureRecord],
-          class_decl: ClassDecl) -> list[FeatureRecord]:
-    grouped_by_name = defaultdict(list)
-    for feature in features:
-        grouped_by_name[feature.name].append(feature)
-
-    inherited = []
-    undefined = []
-    for feature_name, features in grouped_by_name.items():
+def merge(features: FeatureTable,
+          class_decl: ClassDecl) -> tuple[FeatureTable, FeatureTable]:
+    inherited = FeatureTable()
+    undefined = FeatureTable()
+    for feature_name, features in features.by_name.items():
         effective = [
             feature
             for feature in features
@@ -535,19 +605,15 @@ def merge(features: list[FeatureRecord],
     return inherited, undefined
 
 
-def remove_duplicates(features: list[FeatureRecord]) -> list[FeatureRecord]:
-    seen = set()
-    unique_features = []
+def remove_duplicates(features: Iterable[FeatureRecord]) -> FeatureTable:
+    unique_features = {}
     for feature in features:
-        key = (feature.from_class, feature.name)
-        if key not in seen:
-            seen.add(key)
-            unique_features.append(feature)
-    return unique_features
+        unique_features.setdefault((feature.from_class, feature.name), feature)
+    return FeatureTable(unique_features.values())
 
 
 def check_if_all_defined(
-        features: list[FeatureRecord],
+        features: FeatureTable,
         class_decl: ClassDecl) -> None:
     deferred_features = [
         feature.node
@@ -567,10 +633,10 @@ contains deferred feature{ending}: {info_about_deferred_features}",
 
 
 def split_create_features(
-        all_features: list[FeatureRecord],
-        constructors_names: list[str]):
-    constructors = []
-    features = []
+        all_features: FeatureTable,
+        constructors_names: list[str]) -> tuple[FeatureTable, FeatureTable]:
+    constructors = FeatureTable()
+    features = FeatureTable()
 
     for feature in all_features:
         if feature.name in constructors_names:
@@ -581,28 +647,59 @@ def split_create_features(
     return constructors, features
 
 
+def inheritance_order(classes: list[ClassDecl]) -> list[ClassDecl]:
+    """Возвращает классы в таком порядке, что родители идут раньше
+    потомков. Предполагается, что система уже проверена `examine_system`:
+    все родители существуют и циклического наследования нет
+    """
+    class_mapping = {decl.class_name: decl for decl in classes}
+    order = []
+    visited = set()
+    for root in classes:
+        if root.class_name in visited:
+            continue
+        visited.add(root.class_name)
+        stack = [(root, iter(root.inherit))]
+        while stack:
+            decl, parents = stack[-1]
+            for parent in parents:
+                if parent.class_name not in visited:
+                    visited.add(parent.class_name)
+                    parent_decl = class_mapping[parent.class_name]
+                    stack.append((parent_decl, iter(parent_decl.inherit)))
+                    break
+            else:
+                stack.pop()
+                order.append(decl)
+    return order
+
+
 def adapt(class_decl: ClassDecl,
-          class_mapping: dict[str, ClassDecl]):
-    own_child_features = [
+          flattened: dict[str, FlattenClass | CompilerError]):
+    """Строит FlattenClass класса. Родители класса уже должны быть
+    в flattened: их готовый результат или ошибка, с которой
+    завершился их анализ (она же становится ошибкой и этого класса)
+    """
+    own_child_features = FeatureTable(
         FeatureRecord(
             class_decl=class_decl,
             name=feature.name,
             node=feature)
         for feature in class_decl.features
-    ]
+    )
 
     # 0 этап. Проверяем отсутствие дубликатов в собственных фичах
     check_duplicate_features(own_child_features)
 
     child_table = FlattenClass(
         class_decl=class_decl,
-        renamed=[],
-        undefined=[],
-        redefined=[],
-        precursors=[],
-        selected=[],
-        inherited=[],
-        constructors=[],
+        renamed=FeatureTable(),
+        undefined=FeatureTable(),
+        redefined=FeatureTable(),
+        precursors=FeatureTable(),
+        selected=FeatureTable(),
+        inherited=FeatureTable(),
+        constructors=FeatureTable(),
         own=own_child_features)
     if not class_decl.inherit:
         check_create_clause(class_decl, own_child_features)
@@ -616,8 +713,9 @@ def adapt(class_decl: ClassDecl,
     select_clauses = {}
 
     for parent in class_decl.inherit:
-        parent_decl = class_mapping[parent.class_name]
-        parent_table = adapt(parent_decl, class_mapping)
+        parent_table = flattened[parent.class_name]
+        if isinstance(parent_table, CompilerError):
+            raise parent_table
         parent_features = parent_table.explicit_features
 
         # 1 этап. Применяем rename clause.
@@ -674,10 +772,10 @@ def adapt(class_decl: ClassDecl,
 
     # 5 этап. Удаляем дубликаты, которые могли получится в процессе
     # наследования (одна и та же фича которая не менялась)
-    all_features = remove_duplicates([
+    all_features = remove_duplicates(
         feature
         for features in parent_to_features.values()
-        for feature in features])
+        for feature in features)
 
     own = child_table.own
 
@@ -704,15 +802,37 @@ def adapt(class_decl: ClassDecl,
 
 def analyze_inheritance(
         classes: list[ClassDecl],
-        error_collector: ErrorCollector) -> list[FlattenClass]:
-    class_mapping = {decl.class_name: decl for decl in classes}
+        error_collector: ErrorCollector,
+        flattened: list[FlattenClass] | None = None) -> list[FlattenClass]:
+    """Анализирует наследование всех классов системы.
+    Для классов из flattened (например, заранее разобранной stdlib)
+    анализ не выполняется повторно, а берется готовый результат.
+
+    Классы анализируются в порядке `inheritance_order`, и FlattenClass
+    каждого класса строится один раз: потомки берут готовый результат
+    родителя, а не анализируют его заново по каждому пути в иерархии.
+    Ошибки сообщаются для классов в исходном порядке, как если бы
+    каждый класс анализировался отдельно
+    """
+    ready = {id(fc.class_decl): fc for fc in flattened or []}
 
-    tables = []
-    for decl in classes:
+    results: dict[str, FlattenClass | CompilerError] = {}
+    for decl in inheritance_order(classes):
+        if id(decl) in ready:
+            results[decl.class_name] = ready[id(decl)]
+            continue
         try:
-            tables.append(adapt(decl, class_mapping))
+            results[decl.class_name] = adapt(decl, results)
         except CompilerError as err:
-            error_collector.add_error(err)
+            results[decl.class_name] = err
+
+    tables = []
+    for decl in classes:
+        result = results[decl.class_name]
+        if isinstance(result, CompilerError):
+            error_collector.add_error(result)
+        else:
+            tables.append(result)
 
     if not error_collector.ok():
         return []
@@ -1,17 +1,32 @@
 from __future__ import annotations
 import copy
-from collections import defaultdict
+import weakref
+from collections import deque
 from dataclasses import dataclass, field
-from typing import Iterable
+from typing import Iterable, Iterator
 
 from serpent.tree.class_decl import ClassDecl, GenericSpec
 from serpent.tree.type_decl import TypeDecl, ClassType, LikeCurrent, LikeFeature
 from serpent.tree.features import BaseMethod, Field, Constant, Method, ExternalMethod, Feature
-from serpent.semantic_checker.analyze_inheritance import FlattenClass, FeatureRecord, remove_duplicates
+from serpent.semantic_checker.analyze_inheritance import (
+    FlattenClass,
+    FeatureRecord,
+    FeatureTable,
+    remove_duplicates)
 from serpent.errors import CompilerError
 
 
 class ClassHierarchy:
+    """Иерархия классов системы.
+
+    Для каждого класса заранее вычисляется множество всех его предков
+    (включая сам класс), поэтому проверка соответствия классов - это
+    поиск в множестве. Предки вычисляются в топологическом порядке:
+    множество класса объединяет уже готовые множества его родителей,
+    так что каждый путь через ромбовидное наследование не обходится заново.
+    Результаты проверки соответствия типов с дженериками запоминаются,
+    см. `Type.conforms_to`
+    """
 
     def __init__(self, classes: Iterable[ClassDecl]) -> None:
         self.hierarchy = {"<VOID>": []}
@@ -20,9 +35,42 @@ class ClassHierarchy:
             parents = [p.class_name for p in decl.inherit]
             self.hierarchy[decl.class_name] = parents
 
+        self.ancestors: dict[str, frozenset[str]] = {}
+        for class_name in self.topological_order():
+            self.ancestors[class_name] = frozenset().union(
+                [class_name],
+                *(self.ancestors.get(parent, [parent])
+                  for parent in self.hierarchy[class_name]))
+
+        self.type_conformance: dict[tuple[Type, Type], bool] = {}
+        """Запомненные результаты `Type.conforms_to` для типов с дженериками"""
+
     def __contains__(self, class_name: str) -> bool:
         return class_name in self.hierarchy
 
+    def topological_order(self) -> list[str]:
+        """Классы в таком порядке, что родители идут раньше потомков.
+        Классы, которые (ошибочно) наследуют сами себя, обходятся один раз
+        """
+        order = []
+        visited = set()
+        for root in self.hierarchy:
+            if root in visited:
+                continue
+            visited.add(root)
+            stack = [(root, iter(self.hierarchy[root]))]
+            while stack:
+                class_name, parents = stack[-1]
+                for parent in parents:
+                    if parent not in visited and parent in self.hierarchy:
+                        visited.add(parent)
+                        stack.append((parent, iter(self.hierarchy[parent])))
+                        break
+                else:
+                    stack.pop()
+                    order.append(class_name)
+        return order
+
     def conforms_to(self, child_name: str, parent_name: str) -> bool:
         if child_name == "NONE":
             return True
@@ -30,37 +78,70 @@ class ClassHierarchy:
             return True
 
         assert child_name in self.hierarchy
-        parents = self.hierarchy[child_name]
-        if not parents:
-            return False
-
-        return (parent_name in parents
-                or any(self.conforms_to(p, parent_name) for p in parents))
+        return parent_name in self.ancestors[child_name]
 
 
-@dataclass(frozen=True)
 class Type:
+    """Тип Eiffel: имя класса и фактические параметры дженерика.
+
+    Типы интернируются: для каждой пары (имя, дженерики) существует
+    ровно один объект Type, который и возвращает конструктор. Поэтому
+    равенство типов - это сравнение объектов, а хэш и полное имя
+    вычисляются один раз при создании типа. Объекты Type неизменяемы
+    """
+    __slots__ = ("name", "generics", "full_name", "_hash", "__weakref__")
+    __match_args__ = ("name", "generics")
+
     name: str
-    generics: list[Type] = field(default_factory=list)
+    generics: tuple[Type, ...]
+    full_name: str
+    """Имя класса, в которое компилируется тип, например HASH_TABLE__INTEGER_STRING"""
+
+    _interned: weakref.WeakValueDictionary[tuple[str, tuple[Type, ...]], Type] = \
+        weakref.WeakValueDictionary()
+
+    def __new__(cls, name: str, generics: Iterable[Type] = ()) -> Type:
+        generics = tuple(generics)
+        key = (name, generics)
+        typ = cls._interned.get(key)
+        if typ is not None:
+            return typ
+
+        typ = super().__new__(cls)
+        set_attribute = super().__setattr__
+        set_attribute(typ, "name", name)
+        set_attribute(typ, "generics", generics)
+        if generics:
+            set_attribute(
+                typ, "full_name", f"{name}__{"_".join(g.full_name for g in generics)}")
+        else:
+            set_attribute(typ, "full_name", name)
+        set_attribute(typ, "_hash", hash(key))
+        cls._interned[key] = typ
+        return typ
 
-    def __hash__(self) -> int:
-        return hash((self.name, tuple(self.generics)))
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f"cannot assign to field '{name}' of immutable Type")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"cannot delete field '{name}' of immutable Type")
 
-    def __eq__(self, other: object) -> bool:
-        if not isinstance(other, Type):
-            return NotImplemented
-        return self.name == other.name and self.generics == other.generics
+    def __reduce__(self) -> tuple:
+        # При распаковке (например, в рабочем процессе) тип интернируется заново
+        return Type, (self.name, self.generics)
+
+    def __copy__(self) -> Type:
+        return self
+
+    def __deepcopy__(self, memo: dict) -> Type:
+        return self
+
+    def __hash__(self) -> int:
+        return self._hash
 
     def __repr__(self) -> str:
         return self.full_name
 
-    @property
-    def full_name(self) -> str:
-        if self.generics:
-            generics_str = "_".join(map(str, self.generics))
-            return f"{self.name}__{generics_str}"
-        return self.name
-
     def conforms_to(self, other: Type, hierarchy: ClassHierarchy) -> bool:
         # Специальный случай: тип NONE всегда соответствует
         if self.name == "NONE":
@@ -76,6 +157,13 @@ class Type:
         if not other.generics:
             return True
 
+        key = (self, other)
+        if key not in hierarchy.type_conformance:
+            hierarchy.type_conformance[key] = self.generics_conform_to(other, hierarchy)
+        return hierarchy.type_conformance[key]
+
+    def generics_conform_to(self, other: Type, hierarchy: ClassHierarchy) -> bool:
+        """Соответствие дженериков типа дженерикам other, без запоминания"""
         # Если родительский тип указывает дженерики, то их число должно
         # совпадать
         if len(self.generics) != len(other.generics):
@@ -91,13 +179,43 @@ class Type:
         return True
 
 
-# Худшее, что могло быть - глобальная переменная,
-# хранящее все встреченные дженерики...
-# Как сделать красивее не знаю, да и времени мало осталось...
-GLOBAL_GENERIC_TABLE: dict[str, list[Type]] = defaultdict(list)
+class InstantiationRegistry:
+    """Конкретизации дженерик-классов, встреченные за одну компиляцию.
+
+    Каждый тип добавляется не более одного раза (проверка по множеству
+    интернированных типов) и попадает в очередь на генерацию кода.
+    Очередь обрабатывается в порядке FIFO, пока генерация кода одних
+    конкретизаций находит новые.
+    """
+
+    def __init__(self) -> None:
+        self.seen: set[Type] = set()
+        self.worklist: deque[Type] = deque()
+
+    def add(self, typ: Type) -> bool:
+        """Регистрирует конкретизацию, возвращает True, если она новая"""
+        if typ in self.seen:
+            return False
+        self.seen.add(typ)
+        self.worklist.append(typ)
+        return True
+
+    def drain(self) -> Iterator[Type]:
+        """Выдает конкретизации из очереди, пока она не опустеет"""
+        while self.worklist:
+            yield self.worklist.popleft()
+
+    def __contains__(self, typ: Type) -> bool:
+        return typ in self.seen
 
+    def __len__(self) -> int:
+        return len(self.seen)
 
-def type_of_class_decl_type(type_decl: ClassType, generic_map: dict[str, Type]) -> Type:
+
+def type_of_class_decl_type(
+        type_decl: ClassType,
+        generic_map: dict[str, Type],
+        instantiations: InstantiationRegistry) -> Type:
     generics = []
     for generic_decl in type_decl.generics:
         if not isinstance(generic_decl, ClassType):
@@ -108,18 +226,12 @@ def type_of_class_decl_type(type_decl: ClassType, generic_map: dict[str, Type])
         if generic_decl.name in generic_map:
             generics.append(generic_map[generic_decl.name])
         else:
-            generics.append(type_of_class_decl_type(generic_decl, generic_map))
+            generics.append(type_of_class_decl_type(
+                generic_decl, generic_map, instantiations))
 
     typ = Type(name=type_decl.name, generics=generics)
-    if typ.full_name != typ.name:
-        already_in = False
-
-        for t in GLOBAL_GENERIC_TABLE[typ.name]:
-            if t.full_name == typ.full_name:
-                already_in = True
-
-        if not already_in:
-            GLOBAL_GENERIC_TABLE[typ.name].append(typ)
+    if typ.generics:
+        instantiations.add(typ)
 
     return typ
 
@@ -266,13 +378,14 @@ def check_generics(actuals, generic, hierarchy) -> None:
 
 def make_generic_map(
         actuals: list[TypeDecl],
-        generics: list[GenericSpec]) -> dict[str, Type]:
+        generics: list[GenericSpec],
+        instantiations: InstantiationRegistry) -> dict[str, Type]:
     template_names = [
         generic_spec.template_type_name
         for generic_spec in generics]
 
     actuals = [
-        type_of_class_decl_type(actual, {})
+        type_of_class_decl_type(actual, {}, instantiations)
         for actual in actuals]
 
     generic_map = {
@@ -284,40 +397,34 @@ def make_generic_map(
 
 def features_of_flatten_class(
         flatten_cls: FlattenClass,
-        actual_type: ClassType) -> tuple[list[FeatureRecord], list[FeatureRecord]]:
-    typ = type_of_class_decl_type(actual_type, {})
+        actual_type: ClassType) -> tuple[FeatureTable, FeatureTable]:
+    class_name = actual_type.name
 
-    precursors = [
+    explicit = FeatureTable()
+    explicit.extend(
         copy.replace(f, name=f"Precursor_{f.from_class}_{f.name}")
-        for f in flatten_cls.precursors
-    ]
-    inherited = [
-        copy.replace(f, name=f"{typ.name}_{f.name}")
-        for f in flatten_cls.inherited
-    ]
-    own = [
-        copy.replace(f, name=f"{typ.name}_{f.name}")
-        for f in flatten_cls.own + flatten_cls.constructors
-    ]
-
-    explicit = precursors + inherited + own
-    implicit = remove_duplicates([
+        for f in flatten_cls.precursors)
+    explicit.extend(
+        copy.replace(f, name=f"{class_name}_{f.name}")
+        for features in (flatten_cls.inherited, flatten_cls.own, flatten_cls.constructors)
+        for f in features)
+
+    implicit = remove_duplicates(
         copy.replace(f, name=f"{f.from_class}_{f.name}")
-        for f in (
-            flatten_cls.renamed
-            + flatten_cls.redefined
-            + flatten_cls.undefined
-            + flatten_cls.selected
-            + flatten_cls.inherited
+        for features in (
+            flatten_cls.renamed,
+            flatten_cls.redefined,
+            flatten_cls.undefined,
+            flatten_cls.selected,
+            flatten_cls.inherited,
             )
-    ])
+        for f in features)
 
     return explicit, implicit
 
 
 def constructors_of(flatten_cls: FlattenClass, actual_type: ClassType) -> list[str]:
-    typ = type_of_class_decl_type(actual_type, {})
-    return [f"{typ.name}_{f.name}" for f in flatten_cls.constructors]
+    return [f"{actual_type.name}_{f.name}" for f in flatten_cls.constructors]
 
 
 def check_clients_existence(
@@ -367,7 +474,8 @@ def guess_type(
         class_type: Type,
         feature_value_type_map: dict[str, Type],
         hierarchy: ClassHierarchy,
-        generic_map: dict[str, Type]) -> Type:
+        generic_map: dict[str, Type],
+        instantiations: InstantiationRegistry) -> Type:
     """Определяет тип параметра или локальной переменной"""
     match type_decl:
         case ClassType(location=location, name=name):
@@ -377,7 +485,8 @@ def guess_type(
                 raise CompilerError(
                     f"Unknown type '{name}'",
                     location=location)
-            return type_of_class_decl_type(type_decl, generic_map)
+            return type_of_class_decl_type(
+                type_decl, generic_map, instantiations)
         case LikeCurrent(location=location):
             return class_type
         case LikeFeature(location=location, feature_name=feature_name):
@@ -393,7 +502,8 @@ def guess_type(
 def make_class_symtab(
         actuals: ClassType,
         flatten_cls: FlattenClass,
-        hierarchy: ClassHierarchy) -> ClassSymbolTable:
+        hierarchy: ClassHierarchy,
+        instantiations: InstantiationRegistry) -> ClassSymbolTable:
     # Необходимо вставить код проверки корректности дженериков
     # 1. Совпадают по количеству
     # 2. conforms_to
@@ -402,7 +512,7 @@ def make_class_symtab(
         flatten_cls.class_decl.generics,
         hierarchy)
     generic_map = make_generic_map(
-        actuals.generics, flatten_cls.class_decl.generics)
+        actuals.generics, flatten_cls.class_decl.generics, instantiations)
 
     # Получаем два списка фич:
     # explicit - фичи, которые доступны для вызова непосредственно
@@ -415,7 +525,8 @@ def make_class_symtab(
     feature_clients_map = {}
     feature_value_type_map = {}
     feature_node_map = {}
-    class_type = type_of_class_decl_type(actuals, generic_map)
+    class_type = type_of_class_decl_type(
+        actuals, generic_map, instantiations)
 
     like_anchored = []
     for feature in explicit + implicit:
@@ -434,13 +545,15 @@ def make_class_symtab(
                 type_of = generic_map[type_decl.name]
                 feature_value_type_map[feature.name] = type_of
             elif type_decl.name in hierarchy:
-                type_of = type_of_class_decl_type(type_decl, generic_map)
+                type_of = type_of_class_decl_type(
+                    type_decl, generic_map, instantiations)
                 feature_value_type_map[feature.name] = type_of
             else:
                 raise CompilerError(f"Unknown type '{type_decl.name}'",
                                     location=type_decl.location)
         elif isinstance(type_decl, LikeCurrent):
-            type_of = type_of_class_decl_type(actuals, generic_map)
+            type_of = type_of_class_decl_type(
+                actuals, generic_map, instantiations)
             feature_value_type_map[feature.name] = type_of
         elif isinstance(type_decl, LikeFeature):
             like_anchored.append(
@@ -515,7 +628,8 @@ def make_class_symtab(
                 class_type,
                 feature_value_type_map,
                 hierarchy,
-                generic_map)
+                generic_map,
+                instantiations)
             typed_parameters.append((param_name, param_type))
 
         signatures[feature_name] = typed_parameters
@@ -544,7 +658,8 @@ def make_class_symtab(
                 class_type,
                 feature_value_type_map,
                 hierarchy,
-                generic_map)
+                generic_map,
+                instantiations)
             typed_variables.append((var_name, var_type))
 
         feature_return_type = feature_value_type_map[feature_name]
@@ -569,8 +684,10 @@ def make_class_symtab(
 
 class GlobalClassTable:
 
-    def __init__(self) -> None:
+    def __init__(self, instantiations: InstantiationRegistry | None = None) -> None:
         self.classes = []
+        self.instantiations = (
+            InstantiationRegistry() if instantiations is None else instantiations)
 
     def add_class_table(self, class_symtab: ClassSymbolTable) -> None:
         assert not self.has_class_table(class_symtab.type_of.full_name)
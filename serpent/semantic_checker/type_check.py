@@ -16,12 +16,12 @@ from serpent.semantic_checker.symtab import (
     ClassHierarchy,
     ClassSymbolTable,
     GlobalClassTable,
+    InstantiationRegistry,
     type_of_class_decl_type,
     make_class_symtab,
     mangle_name,
     unmangle_name,
-    class_name_of_mangled_name,
-    GLOBAL_GENERIC_TABLE)
+    class_name_of_mangled_name)
 
 
 @dataclass(frozen=True)
@@ -211,7 +211,8 @@ def annotate_feature_call(
             # декларации типа, для генерации соответствующей таблицы
             actual_type = class_decl_type_of_type(typed_owner.expr_type)
             owner_symtab = make_class_symtab(
-                actual_type, flatten_cls, hierarchy)
+                actual_type, flatten_cls, hierarchy,
+                global_class_table.instantiations)
             global_class_table.add_class_table(owner_symtab)
 
         callee_symtab = global_class_table.get_class_table(
@@ -490,6 +491,20 @@ def annotate_precursor_call(
     return real_feature
 
 
+def find_unknown_type(type_decl: ClassType, hierarchy: ClassHierarchy) -> str | None:
+    """Возвращает имя первого типа в type_decl (включая дженерики),
+    которого нет в иерархии классов
+    """
+    if type_decl.name not in hierarchy:
+        return type_decl.name
+    for generic_decl in type_decl.generics:
+        if isinstance(generic_decl, ClassType):
+            unknown_type = find_unknown_type(generic_decl, hierarchy)
+            if unknown_type is not None:
+                return unknown_type
+    return None
+
+
 def annotate_create_expr(
         create_expr: CreateExpr,
         context_method_name: str,
@@ -504,18 +519,24 @@ def annotate_create_expr(
         raise CompilerError("Concrete class types are only supported",
                             location=create_expr.location)
 
-    expr_type = type_of_class_decl_type(object_type, {})
-    if expr_type.name not in hierarchy:
-        raise CompilerError(f"Unknown type '{expr_type.name}'",
+    # Проверка выполняется до type_of_class_decl_type, чтобы
+    # несуществующий тип не попал в очередь конкретизаций
+    unknown_type = find_unknown_type(object_type, hierarchy)
+    if unknown_type is not None:
+        raise CompilerError(f"Unknown type '{unknown_type}'",
                                 location=create_expr.location)
 
+    expr_type = type_of_class_decl_type(
+        object_type, {}, global_class_table.instantiations)
+
     if not global_class_table.has_class_table(expr_type.full_name):
         flatten_cls = flatten_class_mapping[expr_type.name]
         # Костыль: из объекта Type (владельца фичи) создаем объект
         # декларации типа, для генерации соответствующей таблицы
         actual_type = class_decl_type_of_type(expr_type)
         create_object_symtab = make_class_symtab(
-            actual_type, flatten_cls, hierarchy)
+            actual_type, flatten_cls, hierarchy,
+            global_class_table.instantiations)
         global_class_table.add_class_table(create_object_symtab)
 
     create_object_symtab = global_class_table.get_class_table(
@@ -860,7 +881,8 @@ def annotate_create_stmt(create_stmt: CreateStmt,
             # декларации типа, для генерации соответствующей таблицы
             actual_type = class_decl_type_of_type(create_object_type)
             create_object_symtab = make_class_symtab(
-                actual_type, flatten_cls, hierarchy)
+                actual_type, flatten_cls, hierarchy,
+                global_class_table.instantiations)
             global_class_table.add_class_table(create_object_symtab)
 
         create_object_symtab = global_class_table.get_class_table(
@@ -877,8 +899,9 @@ def annotate_create_stmt(create_stmt: CreateStmt,
             raise CompilerError(
                 f"Unknown constructor feature '{constructor_name}'",
                 location=create_stmt.location)
+        object_type = class_decl_type_of_type(create_object_type)
     else:
-        create_object_type = type_of_class_decl_type(create_stmt.object_type, {})
+        object_type = create_stmt.object_type
 
     # Здесь нет проверки на то, существует ли object_type
     # реально в иерархии классов, т.к. данная проверка и
@@ -889,7 +912,7 @@ def annotate_create_stmt(create_stmt: CreateStmt,
 
     create_expr = CreateExpr(
         location=create_stmt.location,
-        object_type=class_decl_type_of_type(create_object_type),
+        object_type=object_type,
         constructor_call=FeatureCall(
             location=constructor_call.location,
             feature_name=constructor_call.constructor_name,
@@ -1147,13 +1170,15 @@ def make_codegen_class(flatten_cls: FlattenClass,
     if not global_class_table.has_class_table(flatten_cls.class_name):
         actual_type = actual_type or ClassType(
             location=None, name=flatten_cls.class_name)
-        class_type = type_of_class_decl_type(actual_type, {})
+        class_type = type_of_class_decl_type(
+            actual_type, {}, global_class_table.instantiations)
 
         if not global_class_table.has_class_table(class_type.full_name):
             symtab = make_class_symtab(
                 actual_type,
                 flatten_cls,
-                hierarchy)
+                hierarchy,
+                global_class_table.instantiations)
 
             global_class_table.add_class_table(symtab)
         else:
@@ -1249,12 +1274,13 @@ def make_codegen_class(flatten_cls: FlattenClass,
 def check_types(
         flatten_classes: list[FlattenClass],
         hierarchy: ClassHierarchy,
-        error_collector: ErrorCollector) -> list[TClass]:
+        error_collector: ErrorCollector,
+        instantiations: InstantiationRegistry | None = None) -> list[TClass]:
     non_generic_classes = [
         fc for fc in flatten_classes if not fc.class_decl.generics]
 
     flatten_class_mapping = {fcls.class_name: fcls for fcls in flatten_classes}
-    global_class_table = GlobalClassTable()
+    global_class_table = GlobalClassTable(instantiations)
 
     codegen_classes = []
     for flatten_cls in non_generic_classes:
@@ -1271,20 +1297,20 @@ def check_types(
     if not error_collector.ok():
         return []
 
-    for class_name, types in GLOBAL_GENERIC_TABLE.items():
-        flatten_cls = flatten_class_mapping[class_name]
-
-        for typ in types:
-            actual_type = class_decl_type_of_type(typ)
-            try:
-                tclass = make_codegen_class(
-                    flatten_cls,
-                    hierarchy,
-                    global_class_table,
-                    flatten_class_mapping,
-                    actual_type=actual_type)
-                codegen_classes.append(tclass)
-            except CompilerError as error:
-                error_collector.add_error(error)
+    # Генерация кода конкретизации может обнаружить новые конкретизации,
+    # поэтому очередь обрабатывается до тех пор, пока она не опустеет
+    for typ in global_class_table.instantiations.drain():
+        flatten_cls = flatten_class_mapping[typ.name]
+        actual_type = class_decl_type_of_type(typ)
+        try:
+            tclass = make_codegen_class(
+                flatten_cls,
+                hierarchy,
+                global_class_table,
+                flatten_class_mapping,
+                actual_type=actual_type)
+            codegen_classes.append(tclass)
+        except CompilerError as error:
+            error_collector.add_error(error)
 
     return codegen_classes
@@ -0,0 +1,182 @@
+"""Заранее разобранная стандартная библиотека.
+
+Стандартная библиотека одинакова для всех проектов, поэтому ее AST
+и результат анализа наследования (FlattenClass) сохраняются один раз
+при сборке пакета (см. Makefile) в serpent/resources/build/stdlib.pickle
+и затем загружаются вместо повторного разбора исходников.
+
+Кэш привязан к исходникам компилятора и к хэшам файлов stdlib:
+если какой-либо файл stdlib отличается от того, по которому был
+построен кэш, то кэш не используется и stdlib разбирается как обычно.
+
+Пути к файлам stdlib в позициях узлов AST хранятся относительно
+каталога stdlib и при загрузке восстанавливаются относительно
+фактического каталога, поэтому сообщения об ошибках и манифест
+сборки не зависят от того, где был построен кэш.
+
+Построение кэша:
+    python -m serpent.stdlib_cache
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+import json
+import pickle
+import sys
+
+from serpent.errors import CompilerError, ErrorCollector
+from serpent.parser_adapter import parse_files
+from serpent.tree import ClassDecl, make_ast
+from serpent.semantic_checker.analyze_inheritance import (
+    FlattenClass,
+    analyze_inheritance)
+from serpent.manifest import compiler_sources_hash, hash_file
+from serpent.resources import get_resource_path
+
+
+STDLIB_CACHE_NAME = "stdlib.pickle"
+STDLIB_CACHE_FORMAT = 1
+
+
+@dataclass
+class PrebuiltStdlib:
+    format: int
+    compiler: str
+    """Хэш исходников компилятора, которым построен кэш"""
+
+    sources: dict[str, str]
+    """Хэши файлов stdlib, ключом является имя файла относительно каталога stdlib"""
+
+    classes: list[ClassDecl]
+    flatten_classes: list[FlattenClass]
+
+    def matches(self, stdlib_dir: Path, source_hashes: dict[str, str]) -> bool:
+        """Проверяет, что кэш построен по тем же файлам stdlib,
+        хэши которых (по абсолютным путям) заданы в source_hashes
+        """
+        stdlib_dir = Path(stdlib_dir).resolve()
+        actual = {
+            str(Path(path).relative_to(stdlib_dir)): digest
+            for path, digest in source_hashes.items()
+            if Path(path).is_relative_to(stdlib_dir)
+        }
+        return (self.format == STDLIB_CACHE_FORMAT
+                and self.compiler == compiler_sources_hash()
+                and self.sources == actual)
+
+    def classes_in_order(self, files: list[Path]) -> list[ClassDecl]:
+        """Возвращает классы stdlib в том порядке, в котором они были бы
+        получены при разборе files (порядок классов влияет на порядок
+        компонентов в GENERAL)
+        """
+        order = {Path(f).resolve(): i for i, f in enumerate(files)}
+        return sorted(
+            self.classes,
+            key=lambda decl: order[Path(decl.location.filename).resolve()])
+
+
+class StdlibPickler(pickle.Pickler):
+    """Заменяет пути к файлам stdlib на имена относительно каталога stdlib"""
+
+    def __init__(self, file, filenames: dict[str, str]) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.filenames = filenames
+
+    def persistent_id(self, obj: object) -> str | None:
+        if type(obj) is str:
+            return self.filenames.get(obj)
+        return None
+
+
+class StdlibUnpickler(pickle.Unpickler):
+    """Восстанавливает пути к файлам stdlib относительно stdlib_dir"""
+
+    def __init__(self, file, stdlib_dir: Path) -> None:
+        super().__init__(file)
+        self.stdlib_dir = stdlib_dir
+
+    def persistent_load(self, pid: str) -> str:
+        return str(self.stdlib_dir / pid)
+
+
+def collect_stdlib_files(stdlib_dir: Path) -> list[Path]:
+    return sorted(Path(stdlib_dir).rglob("*.e"))
+
+
+def make_stdlib_cache(
+        stdlib_dir: Path,
+        parser_path: Path,
+        cache_path: Path,
+        error_collector: ErrorCollector) -> None:
+    """Разбирает stdlib, анализирует наследование и сохраняет результат в cache_path"""
+    stdlib_files = collect_stdlib_files(stdlib_dir)
+
+    stdout, stderr = parse_files(stdlib_files, parser_path)
+    if stderr:
+        error_collector.add_error(
+            CompilerError(f"Parser error: {stderr}", source="serpent"))
+        return
+
+    classes = make_ast(json.loads(stdout))
+    flatten_classes = analyze_inheritance(classes, error_collector)
+    if not error_collector.ok():
+        return
+
+    prebuilt = PrebuiltStdlib(
+        format=STDLIB_CACHE_FORMAT,
+        compiler=compiler_sources_hash(),
+        sources={
+            str(file.relative_to(stdlib_dir)): hash_file(file)
+            for file in stdlib_files
+        },
+        classes=classes,
+        flatten_classes=flatten_classes)
+
+    filenames = {
+        str(file): str(file.relative_to(stdlib_dir))
+        for file in stdlib_files
+    }
+    with open(cache_path, "wb") as f:
+        StdlibPickler(f, filenames).dump(prebuilt)
+
+
+def load_stdlib_cache(
+        cache_path: Path,
+        stdlib_dir: Path,
+        source_hashes: dict[str, str]) -> PrebuiltStdlib | None:
+    """Загружает заранее разобранную stdlib.
+    Возвращает None, если кэша нет, он поврежден или устарел
+    """
+    try:
+        with open(cache_path, "rb") as f:
+            prebuilt = StdlibUnpickler(f, Path(stdlib_dir)).load()
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+    if not isinstance(prebuilt, PrebuiltStdlib):
+        return None
+    if not prebuilt.matches(stdlib_dir, source_hashes):
+        return None
+    return prebuilt
+
+
+def main() -> None:
+    error_collector = ErrorCollector()
+    build_dir = get_resource_path("build")
+
+    make_stdlib_cache(
+        stdlib_dir=get_resource_path("stdlib"),
+        parser_path=build_dir / "eiffelp",
+        cache_path=build_dir / STDLIB_CACHE_NAME,
+        error_collector=error_collector)
+
+    if not error_collector.ok():
+        error_collector.show()
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    # При запуске через -m этот модуль называется __main__, а кэш
+    # должен ссылаться на классы модуля serpent.stdlib_cache
+    from serpent import stdlib_cache
+    stdlib_cache.main()
@@ -0,0 +1,158 @@
+"""Замеры времени работы фаз компилятора.
+
+Фазы размечаются контекстным менеджером trace:
+
+    with trace("check_types"):
+        classes = check_types(...)
+
+Пока трассировка не включена (см. tracing), trace ничего не делает,
+поэтому разметка не влияет на обычную сборку. Включенный Tracer
+запоминает каждый интервал и по ним строит таблицу "фаза - время -
+пиковая память" (--timings) и файл в формате Chrome trace events
+(--trace-file), который открывается в perfetto или chrome://tracing.
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+import json
+import os
+import sys
+import threading
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_memory() -> int | None:
+    """Пиковый размер резидентной памяти процесса в байтах"""
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # В Linux ru_maxrss измеряется в килобайтах, в macOS - в байтах
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+@dataclass(frozen=True)
+class Span:
+    name: str
+    """Имя фазы, по нему интервалы группируются в таблице"""
+
+    label: str
+    """Имя интервала в трассе"""
+
+    start_us: int
+    duration_us: int
+    depth: int
+    pid: int
+    tid: int
+    peak_memory: int | None
+    args: dict = field(default_factory=dict)
+
+    def to_trace_event(self) -> dict:
+        return {
+            "name": self.label,
+            "cat": self.name,
+            "ph": "X",
+            "ts": self.start_us,
+            "dur": self.duration_us,
+            "pid": self.pid,
+            "tid": self.tid,
+            "args": self.args,
+        }
+
+
+class Tracer:
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+        self.depth = 0
+
+    @contextmanager
+    def span(self, name: str, label: str | None = None, **args):
+        start = time.perf_counter_ns()
+        self.depth += 1
+        try:
+            yield
+        finally:
+            self.depth -= 1
+            end = time.perf_counter_ns()
+            self.spans.append(Span(
+                name=name,
+                label=label or name,
+                start_us=start // 1000,
+                duration_us=(end - start) // 1000,
+                depth=self.depth,
+                pid=os.getpid(),
+                tid=threading.get_native_id(),
+                peak_memory=peak_memory(),
+                args=args))
+
+    def merge(self, spans: list[Span], depth: int) -> None:
+        """Добавляет интервалы, записанные другим Tracer
+        (например, в рабочем процессе), как вложенные на глубину depth
+        """
+        self.spans.extend(
+            Span(**{**span.__dict__, "depth": span.depth + depth})
+            for span in spans)
+
+    def format_table(self) -> str:
+        """Таблица фаз: суммарное время, число вызовов и пиковая память.
+        Вложенные фазы выводятся с отступом под объемлющими
+        """
+        rows: dict[str, list] = {}
+        for span in sorted(self.spans, key=lambda s: (s.start_us, -s.duration_us)):
+            row = rows.setdefault(span.name, [span.depth, 0, 0, None])
+            row[0] = min(row[0], span.depth)
+            row[1] += 1
+            row[2] += span.duration_us
+            if span.peak_memory is not None:
+                row[3] = max(row[3] or 0, span.peak_memory)
+
+        total_us = sum(row[2] for row in rows.values() if row[0] == 0) or 1
+        header = f"{'Phase':<36} {'Calls':>7} {'Time, s':>9} {'%':>6} {'Peak RSS, MB':>13}"
+        lines = [header, "-" * len(header)]
+        for name, (depth, calls, duration_us, memory) in rows.items():
+            memory_str = "-" if memory is None else f"{memory / 2**20:.1f}"
+            lines.append(
+                f"{'  ' * depth + name:<36} {calls:>7} {duration_us / 1e6:>9.3f} "
+                f"{100 * duration_us / total_us:>6.1f} {memory_str:>13}")
+        lines.append("-" * len(header))
+        lines.append(f"{'Total':<36} {'':>7} {total_us / 1e6:>9.3f}")
+        return "\n".join(lines)
+
+    def write_chrome_trace(self, path: str | Path) -> None:
+        events = [span.to_trace_event() for span in self.spans]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+_tracer: Tracer | None = None
+
+
+def current_tracer() -> Tracer | None:
+    return _tracer
+
+
+@contextmanager
+def tracing(tracer: Tracer | None):
+    """Включает трассировку фаз в tracer на время выполнения блока"""
+    global _tracer
+    previous, _tracer = _tracer, tracer
+    try:
+        yield tracer
+    finally:
+        _tracer = previous
+
+
+@contextmanager
+def trace(name: str, label: str | None = None, **args):
+    """Размечает фазу name, если трассировка включена"""
+    if _tracer is None:
+        yield
+    else:
+        with _tracer.span(name, label, **args):
+            yield
@@ -0,0 +1,39 @@
+from types import SimpleNamespace
+
+from serpent.semantic_checker.analyze_inheritance import (
+    FeatureRecord,
+    inheritance_order,
+    remove_duplicates)
+from testlib import declare_classes
+
+
+def test_parents_are_ordered_before_children():
+    parents = {
+        "APPLICATION": ["DIAMOND"],
+        "DIAMOND": ["DERIVED1", "DERIVED2"],
+        "DERIVED1": ["BASE"],
+        "DERIVED2": ["BASE"],
+        "BASE": ["ANY"],
+        "ANY": [],
+    }
+    order = [decl.class_name for decl in inheritance_order(declare_classes(parents))]
+    assert sorted(order) == sorted(parents)
+    for name, class_parents in parents.items():
+        assert all(order.index(parent) < order.index(name) for parent in class_parents)
+
+
+def test_feature_table_keeps_order_and_first_duplicate():
+    base, child = SimpleNamespace(class_name="BASE"), SimpleNamespace(class_name="CHILD")
+    features = [
+        FeatureRecord(base, "f", node="BASE.f"),
+        FeatureRecord(child, "g", node="CHILD.g"),
+        FeatureRecord(base, "f", node="BASE.f again"),
+        FeatureRecord(child, "f", node="CHILD.f"),
+    ]
+
+    table = remove_duplicates(features)
+    assert [(f.from_class, f.name) for f in table] == [("BASE", "f"), ("CHILD", "g"), ("CHILD", "f")]
+    assert "g" in table and "h" not in table
+    assert table.find("f").node == "BASE.f"
+    assert table.find_in("CHILD", "f").node == "CHILD.f"
+    assert [f.node for f in table.by_name["f"]] == ["BASE.f", "CHILD.f"]
@@ -0,0 +1,61 @@
+from serpent.codegen.assembler import Branch, Label, assemble
+from serpent.codegen.bytecommand import (
+    Goto,
+    GotoW,
+    Iconst_i,
+    Ifeq,
+    Ifne,
+    Iload,
+    Nop,
+    Pop,
+    Return)
+from serpent.codegen.byte_utils import ByteWriter
+from serpent.codegen.class_file import CodeAttribute
+from serpent.codegen.constpool import ConstPool
+from serpent.codegen.genbytecode import LocalTable
+from serpent.codegen.stack_depth import instructions_of, max_stack_depth
+
+
+def test_labels_are_resolved_to_offsets():
+    # while flag do nothing end (условие проверяется в конце цикла)
+    body, condition = Label(), Label()
+    bytecode = assemble([
+        Branch(Goto, condition),     # 0
+        body, Nop(),                 # 3
+        condition, Iload(1),         # 4
+        Branch(Ifne, body),          # 6
+        Return(),                    # 9
+    ])
+
+    assert bytecode == [Goto(4), Nop(), Iload(1), Ifne(-3), Return()]
+
+
+def test_far_branches_become_wide():
+    end = Label()
+    padding = [Iconst_i(0), Pop()] * 20000
+    bytecode = assemble([
+        Iload(1), Branch(Ifeq, end),     # 0, 2
+        *padding,                        # 10
+        Branch(Goto, end),               # 40010
+        end, Return(),                   # 40013
+    ])
+
+    # ifeq переходит через goto_w, goto до метки помещается в 16 бит
+    assert bytecode[:3] == [Iload(1), Ifne(8), GotoW(40013 - 5)]
+    assert bytecode[-2:] == [Goto(3), Return()]
+    # Цели всех переходов совпадают с началом команд
+    assert max_stack_depth(instructions_of(bytecode, ConstPool("com/eiffel/APPLICATION"))) == 1
+
+
+def test_code_attribute_lengths_are_patched():
+    bytecode = assemble([Iload(1), Branch(Ifeq, end := Label()), Nop(), end, Return()])
+    code = CodeAttribute(7, LocalTable(), bytecode)
+    writer = ByteWriter()
+    code.write(writer, ConstPool("com/eiffel/APPLICATION"))
+
+    code_bytes = b"".join(command.to_bytes() for command in bytecode)
+    assert code_bytes == bytes([0x15, 1, 0x99, 0, 4, 0x00, 0xb1])
+    assert writer.getvalue() == (
+        bytes([0, 7]) + (12 + 7).to_bytes(4, "big")
+        + bytes([0, 1, 0, 2]) + (7).to_bytes(4, "big")
+        + code_bytes + bytes([0, 0, 0, 0]))
@@ -0,0 +1,42 @@
+from serpent.build import compile_eiffel_classes
+from serpent.errors import ErrorCollector
+
+from testlib import make_class
+
+
+def compile_classes(build_dir, jobs: int) -> tuple[list[str], dict[str, bytes]]:
+    classes = [
+        make_class("APPLICATION", "com.eiffel.PLATFORM.f"),
+        make_class("FIRST", "first"),
+        make_class("MIDDLE", "com.eiffel.PLATFORM.g"),
+        make_class("SECOND", "second"),
+    ]
+    error_collector = ErrorCollector()
+    compile_eiffel_classes(
+        classes,
+        error_collector,
+        build_dir,
+        main_class_name="APPLICATION",
+        main_routine_name="make",
+        minor_version=0,
+        major_version=55,
+        jobs=jobs)
+
+    errors = [error.desc for error in error_collector.errors]
+    files = {path.name: path.read_bytes() for path in build_dir.iterdir()}
+    return errors, files
+
+
+def test_parallel_class_generation_is_deterministic(tmp_path):
+    (tmp_path / "serial").mkdir()
+    (tmp_path / "parallel").mkdir()
+
+    serial_errors, serial_files = compile_classes(tmp_path / "serial", jobs=1)
+    parallel_errors, parallel_files = compile_classes(tmp_path / "parallel", jobs=3)
+
+    # GENERAL содержит методы всех классов, поэтому первой
+    # ошибку получает именно его генерация
+    assert [error.split("'")[1] for error in serial_errors] == ["first", "first", "second"]
+    assert parallel_errors == serial_errors
+    assert sorted(serial_files) == ["APPLICATION.class", "MIDDLE.class"]
+    assert parallel_files == serial_files
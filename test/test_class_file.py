@@ -0,0 +1,104 @@
+from serpent.codegen.assembler import assemble
+from serpent.codegen.bytecommand import *
+from serpent.codegen.class_file import (
+    ACC_PUBLIC,
+    ACC_STATIC,
+    VALUE_CACHE_FIELD,
+    make_value_cache,
+    make_value_factory)
+from serpent.codegen.constpool import ConstPool
+
+
+def run(bytecode: list[ByteCommand], pool: ConstPool, statics: dict, arguments: list) -> object:
+    """Выполняет код метода для команд, которые используют valueOf и кэш INTEGER.
+    Объект - словарь с классом и значением, поля ValueCache и INTEGER - statics
+    """
+    starts = []
+    offset = 0
+    for command in bytecode:
+        starts.append(offset)
+        offset += command.size()
+    offsets = {offset: i for i, offset in enumerate(starts)}
+
+    local_variables = dict(enumerate(arguments))
+    stack = []
+    i = 0
+    while True:
+        command, offset = bytecode[i], starts[i]
+        i += 1
+        match command:
+            case Iload(var_index=n) | Aload(var_index=n):
+                stack.append(local_variables[n])
+            case Istore(var_index=n) | Astore(var_index=n):
+                local_variables[n] = stack.pop()
+            case Iconst_i(i=value):
+                stack.append(value)
+            case GetStatic(index=index):
+                stack.append(statics[pool.get_by_index(index).field_name])
+            case PutStatic(index=index):
+                statics[pool.get_by_index(index).field_name] = stack.pop()
+            case Iadd():
+                right = stack.pop()
+                stack.append(stack.pop() + right)
+            case Isub():
+                right = stack.pop()
+                stack.append(stack.pop() - right)
+            case New(index=index):
+                stack.append({"class": pool.get_by_index(index).class_name})
+            case Dup():
+                stack.append(stack[-1])
+            case InvokeSpecial():
+                value = stack.pop()
+                stack.pop()["value"] = value
+            case AnewArray():
+                stack.append([None] * stack.pop())
+            case ArrayLength():
+                stack.append(len(stack.pop()))
+            case Aaload():
+                index = stack.pop()
+                stack.append(stack.pop()[index])
+            case Aastore():
+                value, index = stack.pop(), stack.pop()
+                stack.pop()[index] = value
+            case Iflt(offset=jump):
+                if stack.pop() < 0:
+                    i = offsets[offset + jump]
+            case IfIcmpge(offset=jump) | IfIcmplt(offset=jump):
+                right, left = stack.pop(), stack.pop()
+                if (left >= right) == isinstance(command, IfIcmpge):
+                    i = offsets[offset + jump]
+            case Goto(offset=jump):
+                i = offsets[offset + jump]
+            case Areturn():
+                return stack.pop()
+            case Return():
+                return None
+            case _:
+                assert False, f"unexpected command {command}"
+
+
+def test_integer_value_of_uses_cache_bounds():
+    pool = ConstPool("com/eiffel/INTEGER")
+    # Небольшой кэш для чисел от -2 до 3, границы берутся из ValueCache
+    statics = {"INTEGER_LOW": -2, "INTEGER_HIGH": 3, "INTEGER_SIZE": 6}
+    run(assemble(make_value_cache(pool) + [Return()]), pool, statics, [])
+
+    cache = statics[VALUE_CACHE_FIELD]
+    assert [item["value"] for item in cache] == [-2, -1, 0, 1, 2, 3]
+
+    value_of = make_value_factory("INTEGER", pool)
+    assert value_of.access_flags == ACC_PUBLIC | ACC_STATIC
+    assert pool.get_by_index(value_of.name_index).text == "valueOf"
+    assert pool.get_by_index(value_of.descriptor_index).text == "(I)Lcom/eiffel/INTEGER;"
+    assert value_of.code.max_locals(pool) == 2
+
+    def value_of_result(value: int) -> dict:
+        return run(value_of.code.bytecode, pool, statics, [value])
+
+    # Числа на границах берутся из кэша, за границами создаются новые объекты
+    assert value_of_result(-2) is cache[0]
+    assert value_of_result(3) is cache[-1]
+    for value in (-3, 4):
+        result = value_of_result(value)
+        assert result == {"class": "com/eiffel/INTEGER", "value": value}
+        assert all(result is not item for item in cache)
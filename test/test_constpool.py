@@ -0,0 +1,64 @@
+import pytest
+
+from serpent.codegen.constpool import (
+    ConstPool,
+    CONSTANT_Methodref,
+    CONSTANT_Fieldref,
+    make_const_pool)
+from serpent.errors import CompilerError
+
+from testlib import make_class
+
+
+GENERAL_DESC = "(Lcom/eiffel/GENERAL;)Lcom/eiffel/GENERAL;"
+
+
+def test_constants_are_added_once():
+    pool = ConstPool("com/eiffel/APPLICATION")
+    first = pool.add_methodref("APPLICATION_make", "()V", "com/eiffel/APPLICATION")
+    count = pool.count
+
+    assert pool.add_methodref("APPLICATION_make", "()V", "com/eiffel/APPLICATION") == first
+    assert pool.add_utf8("APPLICATION_make") == pool.add_utf8("APPLICATION_make")
+    assert pool.add_string("text") == pool.find_string("text")
+    assert pool.count == count + 2
+
+
+def test_find_returns_first_matching_constant():
+    pool = ConstPool("com/eiffel/APPLICATION")
+    owner = "com/eiffel/GENERAL"
+    void_index = pool.add_methodref("f", "()V", owner)
+    general_index = pool.add_methodref("f", GENERAL_DESC, owner)
+
+    assert void_index != general_index
+    assert pool.find_methodref("f", owner) == void_index
+    assert pool.find_methodref("f", owner, GENERAL_DESC) == general_index
+
+    linear = pool.find_constant(
+        lambda c: isinstance(c, CONSTANT_Methodref) and c.method_name == "f")
+    assert linear.index == void_index
+
+
+def test_fieldref_falls_back_to_current_class():
+    pool = ConstPool("com/eiffel/APPLICATION")
+    index = pool.add_fieldref("x", "Lcom/eiffel/INTEGER;", "com/eiffel/APPLICATION")
+
+    assert pool.find_fieldref("x", "com/eiffel/OTHER") == index
+
+
+def test_reference_driven_pool_contains_only_current_class():
+    current, other = make_class("APPLICATION", fields=("x",)), make_class("OTHER", fields=("x",))
+
+    full = make_const_pool(current, [other], reference_driven=False)
+    minimal = make_const_pool(current, [other])
+
+    assert minimal.count == 2
+    assert minimal.find_class("com/eiffel/APPLICATION") == 2
+    assert full.find_methodref("OTHER_make", "com/eiffel/OTHER")
+    assert not any(
+        isinstance(c, (CONSTANT_Methodref, CONSTANT_Fieldref)) for c in minimal)
+
+
+def test_reference_driven_pool_checks_external_aliases():
+    with pytest.raises(CompilerError):
+        make_const_pool(make_class("APPLICATION", alias="f", fields=("x",)), [])
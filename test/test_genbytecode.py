@@ -0,0 +1,253 @@
+from serpent.codegen.bytecommand import (
+    Aload,
+    Fadd,
+    Fcmpg,
+    GetField,
+    GetStatic,
+    I2f,
+    Iadd,
+    Iconst_i,
+    IfIcmpgt,
+    IfIcmple,
+    IfIcmpne,
+    Ifeq,
+    Ifgt,
+    Iload,
+    InvokeStatic,
+    InvokeVirtual,
+    Istore,
+    New,
+    PutField,
+    Return)
+from serpent.codegen.assembler import assemble
+from serpent.codegen.constpool import ConstPool
+from serpent.codegen.genbytecode import (
+    LocalTable,
+    generate_bytecode_for_default_value,
+    generate_bytecode_for_method)
+from serpent.codegen.layout import JvmLayout
+from serpent.semantic_checker.symtab import Type
+from serpent.semantic_checker.type_check import (
+    TAssignment,
+    TBinaryOp,
+    TBoolConst,
+    TExternalMethod,
+    TFeatureCall,
+    TField,
+    TIfStmt,
+    TIntegerConst,
+    TLoopStmt,
+    TRealConst,
+    TStringConst,
+    TUnaryOp,
+    TUserDefinedMethod,
+    TVariable)
+
+
+INTEGER = Type("INTEGER")
+REAL = Type("REAL")
+BOOLEAN = Type("BOOLEAN")
+STRING = Type("STRING")
+CHARACTER = Type("CHARACTER")
+
+
+def generate(method: TUserDefinedMethod, pool: ConstPool | None = None) -> list:
+    pool = pool or ConstPool("com/eiffel/APPLICATION")
+    return assemble(generate_bytecode_for_method(
+        method, "com/eiffel/APPLICATION", pool, LocalTable(), JvmLayout()))
+
+
+def test_integer_loop_does_not_allocate():
+    # from i := 1 until i > 10 loop i := i + 1 end
+    i = TVariable(INTEGER, "local_i")
+    loop = TLoopStmt(
+        init_stmts=[TAssignment(i, TIntegerConst(INTEGER, 1))],
+        until_cond=TFeatureCall(BOOLEAN, "INTEGER_is_greater", [TIntegerConst(INTEGER, 10)], i),
+        body=[TAssignment(i, TFeatureCall(INTEGER, "INTEGER_plus", [TIntegerConst(INTEGER, 1)], i))])
+    bytecode = generate(
+        TUserDefinedMethod(
+            method_name="APPLICATION_count",
+            parameters=[],
+            return_type=Type("<VOID>"),
+            is_constructor=False,
+            variables=[("local_i", INTEGER)],
+            body=[loop]))
+
+    assert not any(isinstance(command, New) for command in bytecode)
+    assert Iadd() in bytecode and Iload(1) in bytecode and Istore(1) in bytecode
+    # Условие until вычисляется один раз - в конце цикла, и сразу
+    # переходит к телу цикла, пока i <= 10
+    assert sum(isinstance(command, IfIcmple) for command in bytecode) == 1
+    assert not any(isinstance(command, IfIcmpgt) for command in bytecode)
+
+
+def test_conditions_compile_to_jumps():
+    # if i > 0 and then not (i = 5) or else flag then i := 0 end
+    i = TVariable(INTEGER, "local_i")
+    flag = TVariable(BOOLEAN, "local_flag")
+    zero = TIntegerConst(INTEGER, 0)
+    condition = TBinaryOp(
+        BOOLEAN, "or else",
+        TBinaryOp(
+            BOOLEAN, "and then",
+            TFeatureCall(BOOLEAN, "INTEGER_is_greater", [zero], i),
+            TUnaryOp(BOOLEAN, "not", TFeatureCall(BOOLEAN, "INTEGER_is_equal", [TIntegerConst(INTEGER, 5)], i))),
+        flag)
+    bytecode = generate(
+        TUserDefinedMethod(
+            method_name="APPLICATION_reset",
+            parameters=[],
+            return_type=Type("<VOID>"),
+            is_constructor=False,
+            variables=[("local_i", INTEGER), ("local_flag", BOOLEAN)],
+            body=[TIfStmt(condition, [TAssignment(i, zero)], [], [])]))
+
+    # Значения сравнений и логических операций не вычисляются:
+    # i > 0 ложно - проверяется flag, not (i = 5) истинно - сразу then
+    assert bytecode[4:] == [
+        Iload(1), Iconst_i(0), IfIcmple(9),
+        Iload(1), Iconst_i(5), IfIcmpne(8),
+        Iload(2), Ifeq(6),
+        Iconst_i(0), Istore(1),
+        Return(),
+    ]
+
+
+def test_mixed_arithmetic_boxes_only_the_result():
+    # Result := Result + n.to_real; Result > 0.0 вычисляется через fcmpg
+    result = TVariable(REAL, "local_Result")
+    n = TVariable(INTEGER, "local_n")
+    pool = ConstPool("com/eiffel/APPLICATION")
+    bytecode = generate(
+        TUserDefinedMethod(
+            method_name="APPLICATION_sum",
+            parameters=[],
+            return_type=REAL,
+            is_constructor=False,
+            variables=[("local_n", INTEGER), ("local_positive", BOOLEAN)],
+            body=[
+                TAssignment(
+                    result,
+                    TFeatureCall(REAL, "REAL_plus", [TFeatureCall(REAL, "INTEGER_to_real", [], n)], result)),
+                TAssignment(
+                    TVariable(BOOLEAN, "local_positive"),
+                    TFeatureCall(BOOLEAN, "REAL_is_greater", [TRealConst(REAL, 0.0)], result)),
+            ]),
+        pool)
+
+    assert I2f() in bytecode and Fadd() in bytecode and Fcmpg() in bytecode
+    assert any(isinstance(command, Ifgt) for command in bytecode)
+    # Упаковывается только возвращаемое значение
+    assert not any(isinstance(command, New) for command in bytecode)
+    value_of = InvokeStatic(pool.find_methodref("valueOf", "com/eiffel/REAL", "(F)Lcom/eiffel/REAL;"))
+    assert bytecode.count(value_of) == 1
+
+
+def test_fields_share_default_values():
+    pool = ConstPool("com/eiffel/APPLICATION")
+    integer_field = generate_bytecode_for_default_value(
+        TField(INTEGER, "APPLICATION_x"), "com/eiffel/APPLICATION", pool)
+    reference_field = generate_bytecode_for_default_value(
+        TField(Type("APPLICATION"), "APPLICATION_next"), "com/eiffel/APPLICATION", pool)
+
+    assert [type(command) for command in integer_field] == [Aload, GetStatic, PutField]
+    # Void уже записан в поле JVM при создании объекта
+    assert reference_field == []
+
+
+def test_builtin_externals_receive_java_value():
+    pool = ConstPool("com/eiffel/INTEGER")
+    plus = TExternalMethod(
+        method_name="INTEGER_plus",
+        parameters=[("other", INTEGER)],
+        return_type=INTEGER,
+        is_constructor=False,
+        language="Java",
+        alias="com.eiffel.PLATFORM.INTEGER_plus")
+    bytecode = generate_bytecode_for_method(
+        plus, "com/eiffel/INTEGER", pool, LocalTable([("other", 1)]), JvmLayout())
+
+    # this.raw_int и other.raw_int, объект PLATFORM не передается
+    assert bytecode[:2] == [Aload(0), GetField(pool.find_fieldref("raw_int", "com/eiffel/INTEGER"))]
+    assert bytecode[2:4] == [Aload(1), GetField(pool.find_fieldref("raw_int", "com/eiffel/INTEGER"))]
+    assert bytecode[4] == InvokeStatic(
+        pool.find_methodref("INTEGER_plus", "com/eiffel/PLATFORM", "(II)I"))
+
+
+def test_literals_are_created_once_per_class():
+    # s := "serpent"; s := "serpent"; flag := True
+    pool = ConstPool("com/eiffel/APPLICATION")
+    s = TVariable(STRING, "local_s")
+    flag = TVariable(BOOLEAN, "local_flag")
+    bytecode = generate_bytecode_for_method(
+        TUserDefinedMethod(
+            method_name="APPLICATION_literals",
+            parameters=[],
+            return_type=Type("<VOID>"),
+            is_constructor=False,
+            variables=[("local_s", STRING), ("local_flag", BOOLEAN)],
+            body=[
+                TAssignment(s, TStringConst(STRING, "serpent")),
+                TAssignment(s, TStringConst(STRING, "serpent")),
+                TAssignment(TField(BOOLEAN, "APPLICATION_flag"), TBoolConst(BOOLEAN, True)),
+            ]),
+        "com/eiffel/APPLICATION", pool, LocalTable(), JvmLayout())
+
+    assert not any(isinstance(command, New) for command in bytecode)
+    # Литерал и значение по умолчанию ("") - два поля класса
+    assert [name for name, _ in pool.literals.values()] == ["literal_0", "literal_1"]
+    literal = GetStatic(pool.find_fieldref("literal_1", "com/eiffel/APPLICATION"))
+    assert bytecode.count(literal) == 2
+    assert GetStatic(pool.find_fieldref("true_BOOLEAN", "com/eiffel/GENERAL")) in bytecode
+
+
+def test_builtin_externals_are_called_directly():
+    # n := s.count + s.item (1).code_point
+    def external(name: str, parameters: list, return_type: Type) -> TExternalMethod:
+        return TExternalMethod(
+            method_name=name,
+            parameters=parameters,
+            return_type=return_type,
+            is_constructor=False,
+            language="Java",
+            alias=f"com.eiffel.PLATFORM.{name}")
+
+    layout = JvmLayout(externals={
+        "STRING": {
+            "STRING_count": external("STRING_count", [], INTEGER),
+            "STRING_item": external("STRING_raw_item", [("index", INTEGER)], CHARACTER),
+        },
+        "CHARACTER": {"CHARACTER_code_point": external("CHARACTER_code_point", [], INTEGER)},
+    })
+    s = TVariable(STRING, "local_s")
+    item = TFeatureCall(CHARACTER, "STRING_item", [TIntegerConst(INTEGER, 1)], s)
+    pool = ConstPool("com/eiffel/APPLICATION")
+    bytecode = generate_bytecode_for_method(
+        TUserDefinedMethod(
+            method_name="APPLICATION_count",
+            parameters=[],
+            return_type=Type("<VOID>"),
+            is_constructor=False,
+            variables=[("local_s", STRING), ("local_n", INTEGER)],
+            body=[
+                TAssignment(
+                    TVariable(INTEGER, "local_n"),
+                    TFeatureCall(
+                        INTEGER,
+                        "INTEGER_plus",
+                        [TFeatureCall(INTEGER, "CHARACTER_code_point", [], item)],
+                        TFeatureCall(INTEGER, "STRING_count", [], s))),
+            ]),
+        "com/eiffel/APPLICATION", pool, LocalTable(), layout)
+
+    # Ни методы GENERAL, ни valueOf встроенных классов не вызываются:
+    # STRING_count выполняется командами JVM, а результат STRING_raw_item
+    # сразу передается CHARACTER_code_point в виде String
+    string = pool.find_class("java/lang/String")
+    assert all(pool.get_by_index(command.index).class_index == string
+               for command in bytecode if isinstance(command, InvokeVirtual))
+    assert InvokeVirtual(pool.find_methodref("codePointCount", "java/lang/String", "(II)I")) in bytecode
+    assert [command for command in bytecode if isinstance(command, InvokeStatic)] == [
+        InvokeStatic(pool.find_methodref(
+            "STRING_raw_item", "com/eiffel/PLATFORM", "(Ljava/lang/String;I)Ljava/lang/String;"))]
+    assert not any(isinstance(command, New) for command in bytecode)
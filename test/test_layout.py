@@ -0,0 +1,108 @@
+from serpent.build import compile_eiffel_classes
+from serpent.codegen.bytecommand import PutField
+from serpent.codegen.class_file import make_constructor
+from serpent.codegen.constpool import ConstPool
+from serpent.codegen.layout import HIERARCHY_LAYOUT, make_layout
+from serpent.errors import ErrorCollector
+from serpent.semantic_checker.symtab import ClassHierarchy, Type
+from serpent.semantic_checker.type_check import (
+    TClass,
+    TField,
+    TUserDefinedMethod)
+from testlib import declare_classes
+
+
+def make_method(method_name: str) -> TUserDefinedMethod:
+    return TUserDefinedMethod(
+        method_name=method_name,
+        parameters=[],
+        return_type=Type("<VOID>"),
+        is_constructor=method_name.endswith("_make"),
+        variables=[],
+        body=[])
+
+
+def make_class(class_name: str, features: tuple[str, ...] = (), parents: tuple[str, ...] = ()) -> TClass:
+    # Как и после анализа наследования, у класса есть компоненты
+    # под собственным именем и под именами предков
+    owners = [class_name, *parents]
+    return TClass(
+        class_name=class_name,
+        methods=[make_method(f"{owner}_{name}") for owner in owners for name in features],
+        fields=[TField(Type("INTEGER"), f"{owner}_x") for owner in owners if owner != "ANY"])
+
+
+def make_system() -> tuple[list[TClass], ClassHierarchy]:
+    parents = {
+        "ANY": [],
+        "APPLICATION": ["ANY"],
+        "PARENT": ["ANY"],
+        "OTHER": ["ANY"],
+        "MIX": ["PARENT", "OTHER"],
+    }
+    classes = [
+        make_class("ANY"),
+        make_class("APPLICATION", ("make",)),
+        make_class("PARENT", ("f",)),
+        make_class("OTHER", ("g",)),
+        # MIX переименовывает g, поэтому OTHER_g у него нет
+        TClass(
+            class_name="MIX",
+            methods=[make_method(name) for name in ["MIX_f", "MIX_g", "PARENT_f"]],
+            fields=[TField(Type("INTEGER"), "MIX_x"), TField(Type("INTEGER"), "PARENT_x")]),
+    ]
+    return classes, ClassHierarchy(declare_classes(parents))
+
+
+def test_secondary_parents_become_interfaces():
+    classes, hierarchy = make_system()
+    layout = make_layout(HIERARCHY_LAYOUT, classes, hierarchy)
+
+    assert layout.super_class("MIX") == "PARENT"
+    assert layout.super_class("PARENT") == "ANY"
+    assert layout.super_class("ANY") == "GENERAL"
+    assert layout.interface_types == {"OTHER"}
+    assert layout.interfaces["MIX"] == ["OTHER"]
+    assert layout.interfaces["OTHER"] == ["OTHER"]
+    assert layout.interfaces["PARENT"] == []
+    assert layout.method_owner("OTHER") == "com/eiffel/OTHER"
+
+
+def test_hierarchy_layout_generates_interfaces_and_forwarding_methods(tmp_path):
+    classes, hierarchy = make_system()
+    error_collector = ErrorCollector()
+    compile_eiffel_classes(
+        classes,
+        error_collector,
+        tmp_path,
+        main_class_name="APPLICATION",
+        main_routine_name="make",
+        minor_version=0,
+        major_version=55,
+        layout=make_layout(HIERARCHY_LAYOUT, classes, hierarchy))
+
+    assert error_collector.ok()
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "ANY.class", "APPLICATION.class", "GENERAL.class", "MIX.class",
+        "OTHER$Interface.class", "OTHER.class", "PARENT.class"]
+
+    mix = (tmp_path / "MIX.class").read_bytes()
+    # OTHER_g вызывает MIX_g, а OTHER_x читает атрибут MIX_x
+    assert b"OTHER_g" in mix and b"OTHER_x" in mix
+    assert b"com/eiffel/OTHER$Interface" in mix
+    assert b"com/eiffel/PARENT" in mix
+    # GENERAL не содержит компонентов классов системы
+    assert b"PARENT_f" not in (tmp_path / "GENERAL.class").read_bytes()
+
+
+def test_hierarchy_constructor_initialises_fields():
+    pool = ConstPool("com/eiffel/MIX")
+    fields = [TField(Type("INTEGER"), "MIX_x"), TField(Type("BOOLEAN"), "MIX_flag")]
+    constructor = make_constructor("MIX", "()V", pool, "PARENT", fields)
+
+    # Без значений по умолчанию поля остались бы null
+    # и первая же операция над ними завершилась бы NPE
+    assert [
+        pool.get_by_index(command.index).field_name
+        for command in constructor.code.bytecode
+        if isinstance(command, PutField)] == ["MIX_x", "MIX_flag"]
@@ -0,0 +1,45 @@
+from serpent.manifest import BuildManifest
+
+
+def make_manifest(sources: dict[str, str], java_version: int = 11) -> BuildManifest:
+    manifest = BuildManifest(
+        settings={"compiler": "test", "java_version": java_version},
+        sources=sources,
+        java_sources={"/rtl/PLATFORM.java": "p"})
+    manifest.declarations = {"ANY": "/any.e", "A": "/app.e", "B": "/b.e"}
+    manifest.dependencies = {
+        "ANY": ["ANY"],
+        "A": ["A", "ANY"],
+        "B": ["A", "ANY", "B"],
+        "GENERAL": ["A", "ANY", "B"],
+    }
+    return manifest
+
+
+def test_only_dependent_classes_are_outdated(tmp_path):
+    for name in ["ANY", "A", "B", "GENERAL"]:
+        (tmp_path / f"{name}.class").touch()
+    previous = make_manifest({"/any.e": "1", "/app.e": "1", "/b.e": "1"})
+
+    unchanged = make_manifest({"/any.e": "1", "/app.e": "1", "/b.e": "1"})
+    assert previous.outdated_classes(unchanged, tmp_path) == set()
+
+    changed = make_manifest({"/any.e": "1", "/app.e": "2", "/b.e": "1"})
+    assert previous.outdated_classes(changed, tmp_path) == {"A", "B", "GENERAL"}
+
+    (tmp_path / "ANY.class").unlink()
+    assert previous.outdated_classes(unchanged, tmp_path) == {"ANY"}
+
+    retargeted = make_manifest({"/any.e": "1", "/app.e": "1", "/b.e": "1"}, java_version=8)
+    assert previous.outdated_classes(retargeted, tmp_path) == {"ANY", "A", "B", "GENERAL"}
+    assert previous.java_outdated(retargeted, tmp_path)
+
+
+def test_manifest_round_trip(tmp_path):
+    manifest = make_manifest({"/any.e": "1"})
+    manifest.save(tmp_path)
+
+    assert BuildManifest.load(tmp_path) == manifest
+
+    (tmp_path / ".serpent-cache").write_text("{broken")
+    assert BuildManifest.load(tmp_path) is None
@@ -0,0 +1,196 @@
+from serpent.codegen.assembler import Branch, Label, assemble
+from serpent.codegen.bytecommand import (
+    Aload,
+    Aload_n,
+    Areturn,
+    Astore,
+    Astore_n,
+    Dup,
+    GetField,
+    GetStatic,
+    Goto,
+    Iadd,
+    Iconst_i,
+    IfIcmpeq,
+    IfIcmpne,
+    Ifeq,
+    Ifne,
+    Iinc,
+    Iload,
+    Iload_n,
+    Ireturn,
+    Istore,
+    Istore_n,
+    Ldc,
+    Ldc_w,
+    Pop,
+    Return)
+from serpent.codegen.constpool import ConstPool
+from serpent.codegen.peephole import optimize
+
+
+def test_compared_boolean_is_not_materialized():
+    # from until i = n loop i := i + 1 end
+    pool = ConstPool("com/eiffel/APPLICATION")
+    body, condition, true, end = Label(), Label(), Label(), Label()
+    bytecode = [
+        Branch(Goto, condition),
+        body, Iload(2), Iconst_i(1), Iadd(), Istore(2),
+        condition, Iload(2), Iload(1),
+        Branch(IfIcmpeq, true), Iconst_i(0), Branch(Goto, end),
+        true, Iconst_i(1),
+        end, Branch(Ifeq, body),
+        Return(),
+    ]
+
+    assert optimize(bytecode, pool, 0) is bytecode
+    assert assemble(optimize(bytecode, pool, 1)) == [
+        Goto(6),
+        Iinc(2, 1),
+        Iload_n(2), Iload_n(1), IfIcmpne(-5),
+        Return(),
+    ]
+
+
+def test_unread_stores_are_removed():
+    # Result := "a"; Result := "a"; Result := last_string
+    pool = ConstPool("com/eiffel/APPLICATION")
+    literal = GetStatic(pool.add_fieldref("literal_0", "Lcom/eiffel/STRING;", pool.fq_class_name))
+    last_string = GetField(
+        pool.add_fieldref("APPLICATION_last_string", "Lcom/eiffel/STRING;", pool.fq_class_name))
+    bytecode = [
+        literal, Astore(1),
+        literal, Astore(1),
+        Aload(0), last_string, Astore(1),
+        Aload(1), Areturn(),
+    ]
+
+    assert optimize(bytecode, pool, 1) == [
+        literal, Astore_n(1),
+        literal, Astore_n(1),
+        Aload_n(0), last_string, Astore_n(1),
+        Aload_n(1), Areturn(),
+    ]
+    assert optimize(bytecode, pool, 2) == [Aload_n(0), last_string, Areturn()]
+
+
+def test_conditional_jump_over_goto_is_inverted():
+    # if b then x := 1 end
+    pool = ConstPool("com/eiffel/APPLICATION")
+    then, end = Label(), Label()
+    bytecode = [
+        Iload(1), Branch(Ifeq, then), Branch(Goto, end),
+        then, Iconst_i(1), Istore(2),
+        end, Iload(2), Ireturn(),
+    ]
+
+    assert optimize(bytecode, pool, 1) == [
+        Iload_n(1), Branch(Ifne, end),
+        Iconst_i(1), Istore_n(2),
+        end, Iload_n(2), Ireturn(),
+    ]
+
+
+def test_goto_to_return_is_replaced_by_return():
+    # if b then x := 1 else x := 0 end
+    pool = ConstPool("com/eiffel/APPLICATION")
+    other, end, exit = Label(), Label(), Label()
+    bytecode = [
+        Iload(1), Branch(Ifeq, other),
+        Iconst_i(1), Istore(2), Branch(Goto, end),
+        other, Iconst_i(0), Istore(2),
+        end, Branch(Goto, exit),
+        exit, Return(),
+    ]
+
+    assert optimize(bytecode, pool, 1) == [
+        Iload_n(1), Branch(Ifeq, other),
+        Iconst_i(1), Istore_n(2), Return(),
+        other, Iconst_i(0), Istore_n(2), Return(),
+    ]
+
+
+def test_unreachable_code_and_unused_labels_are_removed():
+    pool = ConstPool("com/eiffel/APPLICATION")
+    unused, target = Label(), Label()
+    bytecode = [
+        Iload(1), Branch(Ifeq, target), Return(),
+        Iload(1), Istore(2),
+        unused, Iload(2), Istore(1),
+        target, Iinc(1, 1), Return(),
+    ]
+
+    # Код после метки, на которую есть переход, снова достижим
+    assert optimize(bytecode, pool, 1) == [
+        Iload_n(1), Branch(Ifeq, target), Return(),
+        target, Iinc(1, 1), Return(),
+    ]
+
+
+def test_popped_values_without_side_effects_are_removed():
+    pool = ConstPool("com/eiffel/APPLICATION")
+    own_field = GetStatic(pool.add_fieldref("literal_0", "Lcom/eiffel/STRING;", pool.fq_class_name))
+    other_field = GetStatic(pool.add_fieldref("OTHER_value", "Lcom/eiffel/STRING;", "com/eiffel/OTHER"))
+    last_string = GetField(
+        pool.add_fieldref("APPLICATION_last_string", "Lcom/eiffel/STRING;", pool.fq_class_name))
+    bytecode = [
+        Aload(0), Dup(), Pop(),
+        Iload(1), Pop(),
+        own_field, Pop(),
+        other_field, Pop(),
+        Aload(0), last_string, Pop(),
+        Aload(0), Areturn(),
+    ]
+
+    # Чтение поля другого класса может его инициализировать,
+    # а getfield проверяет объект на null, поэтому они остаются
+    assert optimize(bytecode, pool, 1) == [
+        Aload_n(0),
+        other_field, Pop(),
+        Aload_n(0), last_string, Pop(),
+        Aload_n(0), Areturn(),
+    ]
+
+
+def test_ldc_w_with_small_index_is_shortened():
+    pool = ConstPool("com/eiffel/APPLICATION")
+    bytecode = [Ldc_w(3), Astore(1), Ldc_w(0x100), Astore(2), Aload(1), Areturn()]
+
+    assert optimize(bytecode, pool, 1) == [
+        Ldc(3), Astore_n(1), Ldc_w(0x100), Astore_n(2), Aload_n(1), Areturn()]
+
+
+def test_store_followed_by_only_load_is_removed():
+    # Result := n + 1
+    pool = ConstPool("com/eiffel/APPLICATION")
+    bytecode = [Iload(1), Iconst_i(1), Iadd(), Istore(2), Iload(2), Ireturn()]
+
+    assert optimize(bytecode, pool, 1) == [
+        Iload_n(1), Iconst_i(1), Iadd(), Istore_n(2), Iload_n(2), Ireturn()]
+    assert optimize(bytecode, pool, 2) == [Iload_n(1), Iconst_i(1), Iadd(), Ireturn()]
+
+
+def test_store_is_kept_when_slot_is_read_again():
+    # x := n; Result := x + x
+    pool = ConstPool("com/eiffel/APPLICATION")
+    bytecode = [Iload(1), Istore(2), Iload(2), Iload(2), Iadd(), Ireturn()]
+
+    assert optimize(bytecode, pool, 2) == [
+        Iload_n(1), Istore_n(2), Iload_n(2), Iload_n(2), Iadd(), Ireturn()]
+
+
+def test_store_is_kept_when_label_precedes_load():
+    # from x := 0 until x /= 0 loop end
+    pool = ConstPool("com/eiffel/APPLICATION")
+    condition = Label()
+    bytecode = [
+        Iconst_i(0), Istore(2),
+        condition, Iload(2), Branch(Ifeq, condition),
+        Return(),
+    ]
+
+    assert optimize(bytecode, pool, 2) == [
+        Iconst_i(0), Istore_n(2),
+        condition, Iload_n(2), Branch(Ifeq, condition),
+        Return(),
+    ]
@@ -0,0 +1,30 @@
+from serpent.build import install_rtl_classes, rtl_cache_key
+from serpent.errors import ErrorCollector
+
+
+def test_rtl_classes_are_copied_from_cache(tmp_path):
+    rtl_dir = tmp_path / "rtl"
+    rtl_dir.mkdir()
+    (rtl_dir / "PLATFORM.java").write_text("class PLATFORM {}")
+
+    cache_dir = tmp_path / "cache"
+    entry = cache_dir / "rtl" / rtl_cache_key(rtl_dir, [rtl_dir / "PLATFORM.java"], 11)
+    (entry / "com" / "eiffel").mkdir(parents=True)
+    (entry / "com" / "eiffel" / "PLATFORM.class").write_bytes(b"\xca\xfe\xba\xbe")
+
+    # javac не нужен: классы для этой версии Java и этих исходников уже в кэше
+    error_collector = ErrorCollector()
+    install_rtl_classes(rtl_dir, error_collector, tmp_path / "classes", 11, cache_dir)
+
+    assert error_collector.ok()
+    assert (tmp_path / "classes" / "com" / "eiffel" / "PLATFORM.class").read_bytes() == b"\xca\xfe\xba\xbe"
+
+
+def test_rtl_cache_key_depends_on_sources_and_java_version(tmp_path):
+    source = tmp_path / "PLATFORM.java"
+    source.write_text("class PLATFORM {}")
+    key = rtl_cache_key(tmp_path, [source], 11)
+
+    assert rtl_cache_key(tmp_path, [source], 8) != key
+    source.write_text("class PLATFORM { }")
+    assert rtl_cache_key(tmp_path, [source], 11) != key
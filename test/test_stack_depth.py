@@ -0,0 +1,137 @@
+import pytest
+
+from serpent.codegen.bytecommand import (
+    Goto,
+    Iadd,
+    Iconst_i,
+    Ifeq,
+    Iload,
+    InvokeStatic,
+    Istore,
+    Nop,
+    Return)
+from serpent.codegen.class_file import CodeAttribute
+from serpent.codegen.constpool import ConstPool
+from serpent.codegen.genbytecode import LocalTable
+from serpent.codegen.stack_depth import (
+    check_javap_output,
+    compute_max_stack,
+    is_compiled_by_javac,
+    max_stack_depth,
+    parse_javap)
+
+
+def test_max_stack_follows_both_branches():
+    # x := if flag then 1 + 2 else 0 + sum (0, 0) end
+    pool = ConstPool("com/eiffel/APPLICATION")
+    plus = pool.add_methodref("sum", "(II)I", "com/eiffel/APPLICATION")
+    bytecode = [
+        Iload(1), Ifeq(9),                          # 0, 2
+        Iconst_i(1), Iconst_i(2), Iadd(), Goto(10),  # 5, 6, 7, 8
+        Iconst_i(0), Iconst_i(0), Iconst_i(0),       # 11, 12, 13
+        InvokeStatic(plus), Iadd(),                  # 14, 17
+        Istore(3), Return(),                         # 18, 20
+    ]
+    code = CodeAttribute(pool.add_utf8("Code"), LocalTable([("flag", 1)]), bytecode)
+
+    assert code.max_stack(pool) == 3
+    # this, flag и слот 3 (слот 2 не используется)
+    assert code.max_locals(pool) == 4
+    assert code.code_length == 21
+
+    with pytest.raises(ValueError, match="inconsistent stack depth"):
+        # Ветка then оставляет на стеке лишнее значение
+        compute_max_stack(bytecode[:4] + [Nop()] + bytecode[5:], pool)
+
+
+JAVAP_OUTPUT = """\
+Classfile /tmp/classes/com/eiffel/Counter.class
+{
+  public int count;
+    descriptor: I
+    flags: (0x0001) ACC_PUBLIC
+
+  public static int clamp(int, int);
+    descriptor: (II)I
+    flags: (0x0009) ACC_PUBLIC, ACC_STATIC
+    Code:
+      stack=2, locals=3, args_size=2
+         0: iload_0
+         1: iload_1
+         2: if_icmple     9
+         5: iload_1
+         6: goto          10
+         9: iload_0
+        10: istore_2
+        11: iload_2
+        12: ireturn
+      LineNumberTable:
+        line 5: 0
+
+  public void tick(long);
+    descriptor: (J)V
+    flags: (0x0001) ACC_PUBLIC
+    Code:
+      stack=1, locals=3, args_size=3
+         0: aload_0
+         1: dup
+         2: getfield      #7                  // Field count:I
+         5: iconst_1
+         6: iadd
+         7: putfield      #7                  // Field count:I
+        10: return
+}
+"""
+
+
+def test_javap_output_is_cross_checked():
+    clamp, tick = parse_javap(JAVAP_OUTPUT)
+
+    assert clamp.name == "public static int clamp(int, int)"
+    assert max_stack_depth(clamp.instructions) == 2
+    # В tick на стеке одновременно this, this и count + 1
+    assert max_stack_depth(tick.instructions) == 3
+    assert check_javap_output(JAVAP_OUTPUT) == [
+        "public void tick(long): stack=1, computed 3"]
+
+
+JAVAC_OUTPUT = """\
+Classfile /tmp/classes/com/eiffel/Safe.class
+{
+  public static int divide(int);
+    descriptor: (I)I
+    flags: (0x0009) ACC_PUBLIC, ACC_STATIC
+    Code:
+      stack=3, locals=2, args_size=1
+         0: iconst_1
+         1: iload_0
+         2: idiv
+         3: ireturn
+         4: astore_1
+         5: aload_1
+         6: aload_1
+         7: aload_1
+         8: pop2
+         9: pop
+        10: iconst_0
+        11: ireturn
+      Exception table:
+         from    to  target type
+             0     3     4   Class java/lang/ArithmeticException
+      LineNumberTable:
+        line 5: 0
+}
+SourceFile: "Safe.java"
+"""
+
+
+def test_exception_handlers_start_with_the_exception_on_stack():
+    divide, = parse_javap(JAVAC_OUTPUT)
+
+    assert divide.handlers == [4]
+    # Без обработчика самая глубокая часть метода недостижима
+    assert max_stack_depth(divide.instructions) == 2
+    assert max_stack_depth(divide.instructions, divide.handlers) == 3
+    assert check_javap_output(JAVAC_OUTPUT) == []
+    assert is_compiled_by_javac(JAVAC_OUTPUT)
+    assert not is_compiled_by_javac(JAVAP_OUTPUT)
@@ -0,0 +1,37 @@
+import shutil
+
+from serpent.errors import ErrorCollector
+from serpent.manifest import hash_files
+from serpent.resources import get_resource_path
+from serpent.stdlib_cache import (
+    collect_stdlib_files,
+    load_stdlib_cache,
+    make_stdlib_cache)
+
+
+def test_stdlib_cache_is_invalidated_by_changed_sources(tmp_path):
+    build_stdlib = tmp_path / "build" / "stdlib"
+    shutil.copytree(get_resource_path("stdlib"), build_stdlib)
+    cache_path = tmp_path / "stdlib.pickle"
+
+    error_collector = ErrorCollector()
+    make_stdlib_cache(
+        build_stdlib,
+        get_resource_path("build") / "eiffelp",
+        cache_path,
+        error_collector)
+    assert error_collector.ok()
+
+    # Установленная stdlib лежит не там, где строился кэш
+    stdlib = tmp_path / "installed" / "stdlib"
+    shutil.copytree(build_stdlib, stdlib)
+    files = collect_stdlib_files(stdlib)
+
+    prebuilt = load_stdlib_cache(cache_path, stdlib, hash_files(files))
+    assert prebuilt is not None
+    assert {decl.location.filename for decl in prebuilt.classes} <= {str(f) for f in files}
+    assert len(prebuilt.flatten_classes) == len(prebuilt.classes)
+
+    with open(stdlib / "any.e", "a") as f:
+        f.write("\n")
+    assert load_stdlib_cache(cache_path, stdlib, hash_files(files)) is None
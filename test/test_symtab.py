@@ -0,0 +1,83 @@
+import gc
+import pickle
+import weakref
+
+import pytest
+
+from serpent.codegen.constpool import get_type_descriptor
+from serpent.tree.type_decl import ClassType
+from serpent.semantic_checker.symtab import (
+    ClassHierarchy,
+    InstantiationRegistry,
+    Type,
+    type_of_class_decl_type)
+from testlib import declare_classes
+
+
+def test_conformance_follows_diamonds():
+    hierarchy = ClassHierarchy(declare_classes({
+        "DIAMOND": ["DERIVED1", "DERIVED2"],
+        "DERIVED1": ["BASE"],
+        "DERIVED2": ["BASE"],
+        "BASE": ["ANY"],
+        "ANY": [],
+    }))
+
+    assert hierarchy.ancestors["DIAMOND"] == {"DIAMOND", "DERIVED1", "DERIVED2", "BASE", "ANY"}
+    assert hierarchy.conforms_to("DIAMOND", "ANY")
+    assert hierarchy.conforms_to("NONE", "DIAMOND")
+    assert not hierarchy.conforms_to("DERIVED1", "DERIVED2")
+    assert not hierarchy.conforms_to("BASE", "DIAMOND")
+
+    array_of_diamonds = Type("ARRAY", [Type("DIAMOND")])
+    assert array_of_diamonds.conforms_to(Type("ARRAY", [Type("BASE")]), hierarchy)
+    assert not Type("ARRAY", [Type("BASE")]).conforms_to(array_of_diamonds, hierarchy)
+    # Результаты для типов с дженериками запоминаются
+    assert hierarchy.type_conformance[(array_of_diamonds, Type("ARRAY", [Type("BASE")]))]
+
+
+def test_types_are_interned():
+    table = Type("HASH_TABLE", [Type("ARRAY", [Type("NODE")]), Type("STRING")])
+
+    assert table is Type("HASH_TABLE", (Type("ARRAY", [Type("NODE")]), Type("STRING")))
+    assert table.full_name == "HASH_TABLE__ARRAY__NODE_STRING"
+    assert table != Type("HASH_TABLE", [Type("STRING"), Type("ARRAY", [Type("NODE")])])
+    assert pickle.loads(pickle.dumps(table)) is table
+    with pytest.raises(AttributeError):
+        table.name = "ARRAY"
+
+
+def test_instantiations_are_registered_once_in_fifo_order():
+    registry = InstantiationRegistry()
+    list_of_arrays = ClassType(location=None, name="LIST", generics=[
+        ClassType(location=None, name="ARRAY", generics=[
+            ClassType(location=None, name="INTEGER")])])
+
+    typ = type_of_class_decl_type(list_of_arrays, {}, registry)
+    type_of_class_decl_type(list_of_arrays, {}, registry)
+    assert len(registry) == 2
+    assert Type("INTEGER") not in registry
+
+    array_of_integers = Type("ARRAY", [Type("INTEGER")])
+    drained = []
+    for instance in registry.drain():
+        drained.append(instance)
+        # Новые конкретизации, найденные во время обхода, тоже обрабатываются
+        registry.add(Type("LIST", [array_of_integers]))
+        registry.add(Type("LIST", [typ]))
+    assert drained == [
+        array_of_integers,
+        typ,
+        Type("LIST", [typ]),
+    ]
+    assert not registry.add(typ)
+
+
+def test_type_descriptors_do_not_keep_types_alive():
+    typ = Type("BOX", [Type("INTEGER")])
+    assert get_type_descriptor(typ) == "Lcom/eiffel/BOX__INTEGER;"
+
+    reference = weakref.ref(typ)
+    del typ
+    gc.collect()
+    assert reference() is None
@@ -0,0 +1,31 @@
+import json
+
+from serpent.timings import Tracer, current_tracer, trace, tracing
+
+
+def test_trace_is_noop_without_tracer():
+    assert current_tracer() is None
+    with trace("parse"):
+        pass
+    assert current_tracer() is None
+
+
+def test_tracer_records_nested_phases(tmp_path):
+    tracer = Tracer()
+    with tracing(tracer):
+        with trace("build"):
+            with trace("generate_class_file", label="APPLICATION"):
+                pass
+            with trace("generate_class_file", label="GENERAL"):
+                pass
+    assert current_tracer() is None
+
+    table = tracer.format_table()
+    assert "build" in table
+    assert "  generate_class_file" in table
+
+    trace_file = tmp_path / "trace.json"
+    tracer.write_chrome_trace(trace_file)
+    events = json.loads(trace_file.read_text())["traceEvents"]
+    assert sorted(e["name"] for e in events) == ["APPLICATION", "GENERAL", "build"]
+    assert all(e["ph"] == "X" for e in events)
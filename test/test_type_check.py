@@ -0,0 +1,80 @@
+import pytest
+
+from serpent.build import collect_sources, parse
+from serpent.errors import ErrorCollector
+from serpent.resources import get_resource_path
+from serpent.semantic_checker.analyze_inheritance import analyze_inheritance
+from serpent.semantic_checker.examine_system import examine_system
+from serpent.semantic_checker.symtab import ClassHierarchy, InstantiationRegistry
+from serpent.semantic_checker.type_check import check_types
+from serpent.tree import make_ast
+
+
+BOX = """
+class
+    BOX [G]
+
+create
+    make
+
+feature
+
+    make
+    local
+        other: ANY
+    do
+        {creation}
+    end
+
+end
+"""
+
+APPLICATION = """
+class
+    APPLICATION
+
+create
+    make
+
+feature
+
+    make
+    local
+        box: BOX [INTEGER]
+    do
+        create box.make
+    end
+
+end
+"""
+
+
+def check_project(tmp_path, sources: dict[str, str]) -> tuple[ErrorCollector, InstantiationRegistry]:
+    for file_name, text in sources.items():
+        (tmp_path / file_name).write_text(text)
+
+    error_collector = ErrorCollector()
+    files = collect_sources([get_resource_path("stdlib"), tmp_path], "e", error_collector)
+    ast = make_ast(parse(files, get_resource_path("build") / "eiffelp", error_collector))
+    examine_system(ast, error_collector)
+    flatten_classes = analyze_inheritance(ast, error_collector)
+    instantiations = InstantiationRegistry()
+    check_types(flatten_classes, ClassHierarchy(ast), error_collector, instantiations)
+    return error_collector, instantiations
+
+
+@pytest.mark.parametrize("creation", [
+    "other := create {NOPE [INTEGER]}",
+    "create {NOPE [INTEGER]} other",
+    "other := create {BOX [NOPE]}",
+])
+def test_unknown_type_in_generic_class_is_reported(tmp_path, creation):
+    # Конкретизация BOX [INTEGER] разбирается уже при обходе очереди,
+    # неизвестный тип в ней не должен попасть в очередь
+    error_collector, instantiations = check_project(tmp_path, {
+        "box.e": BOX.replace("{creation}", creation),
+        "app.e": APPLICATION,
+    })
+
+    assert [error.desc for error in error_collector.errors] == ["Unknown type 'NOPE'"]
+    assert all("NOPE" not in typ.full_name for typ in instantiations.seen)
@@ -1,8 +1,11 @@
 from testlib.dsl import use, expect, run_eiffel
+from testlib.classes import declare_classes, make_class
 
 
 __all__ = [
     "use",
     "run_eiffel",
     "expect",
+    "declare_classes",
+    "make_class",
     ]
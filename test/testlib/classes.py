@@ -0,0 +1,48 @@
+from types import SimpleNamespace
+
+from serpent.semantic_checker.symtab import Type
+from serpent.semantic_checker.type_check import (
+    TClass,
+    TField,
+    TExternalMethod,
+    TUserDefinedMethod)
+
+
+def declare_classes(parents: dict[str, list[str]]) -> list[SimpleNamespace]:
+    """Декларации классов только с class_name и inherit, как у ClassDecl,
+    по отображению имени класса в имена его родителей. Их достаточно
+    для ClassHierarchy и порядка анализа наследования
+    """
+    return [
+        SimpleNamespace(
+            class_name=name,
+            inherit=[SimpleNamespace(class_name=parent) for parent in class_parents])
+        for name, class_parents in parents.items()
+    ]
+
+
+def make_class(
+        class_name: str,
+        alias: str = "com.eiffel.PLATFORM.f",
+        fields: tuple[str, ...] = ()) -> TClass:
+    """Аннотированный класс с пустым конструктором make, внешним
+    методом f на Java с заданным alias и полями INTEGER с именами fields
+    """
+    return TClass(
+        class_name=class_name,
+        methods=[
+            TUserDefinedMethod(
+                method_name=f"{class_name}_make",
+                parameters=[],
+                return_type=Type("<VOID>"),
+                is_constructor=True,
+                variables=[],
+                body=[]),
+            TExternalMethod(
+                method_name=f"{class_name}_f",
+                parameters=[],
+                return_type=Type("<VOID>"),
+                is_constructor=False,
+                language="Java",
+                alias=alias)],
+        fields=[TField(Type("INTEGER"), f"{class_name}_{name}") for name in fields])